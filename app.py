@@ -34,8 +34,8 @@ def run_simulation(simulation_time, failure_rate, algorithm):
     # 中央コントローラの初期化
     central_controller = CentralController(topology_manager, algorithm=algorithm)
 
-    # メトリクスコレクタの初期化
-    metrics_collector = MetricsCollector()
+    # メトリクスコレクタの初期化（長時間の実行でもメモリ使用量が一定になるよう、直近の行と間引いた過去の行を保持）
+    metrics_collector = MetricsCollector(retention="downsample", capacity=100000)
 
     # フローマネージャの初期化
     flow_manager = FlowManager(topology_manager, simulation_engine, central_controller, metrics_collector)
@@ -0,0 +1,98 @@
+# benchmarks/bench_event_scheduling.py
+"""
+現在時刻のイベントの即時実行キューと階層型タイマーホイールによるヒープ操作数の比較
+
+直線トポロジ上の複数のフローのパケットを送信し、配送したパケットあたりの二分ヒープの操作数
+（挿入と取り出し）と実行時間を、イベントキューの種類と即時実行キューの有無の組み合わせで比較する。
+パケットの受信ごとにスケジュールされる転送イベントは即時実行キューで、
+リンク遅延後の到着イベントはタイマーホイールでヒープを経由しなくなる。
+
+    python benchmarks/bench_event_scheduling.py --flows 20 --packets 2000 --hops 6
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation_engine import SimulationEngine
+from topology_manager import TopologyManager
+from central_controller import CentralController
+from metrics_collector import MetricsCollector
+from flow_manager import FlowManager
+from flow import Flow
+from node import Node
+from link import Link
+
+CONFIGURATIONS = [
+    ("heap", False),
+    ("heap", True),
+    ("wheel", False),
+    ("wheel", True),
+]
+
+
+def run(event_queue: str, immediate_queue: bool, args, seed: int = 0):
+    rng = random.Random(seed)
+    simulation_engine = SimulationEngine(event_queue=event_queue, immediate_queue=immediate_queue)
+    simulation_engine.initialize(1e9)
+    topology_manager = TopologyManager()
+    for node_id in range(1, args.hops + 2):
+        topology_manager.nodes[node_id] = Node(node_id=node_id, buffer_size=10 ** 12)
+    for link_id in range(1, args.hops + 1):
+        topology_manager.add_link(Link(link_id, capacity=1e8, delay=0.002, jitter=0.0,
+                                       connected_nodes=(link_id, link_id + 1)))
+    central_controller = CentralController(topology_manager)
+    metrics_collector = MetricsCollector(retention="ring", capacity=1024)
+    flow_manager = FlowManager(topology_manager, simulation_engine, central_controller, metrics_collector,
+                               link_model="serialization")
+    packet_manager = flow_manager.packet_manager
+
+    def start(flow):
+        source = topology_manager.get_node(flow.source_node)
+        for packet in packet_manager.create_packets(flow):
+            packet_manager.send_packet(packet, source)
+
+    for flow_id in range(1, args.flows + 1):
+        source = rng.randint(1, args.hops)
+        destination = rng.randint(source + 1, args.hops + 1)
+        flow = Flow(flow_id, "data", 1500 * args.packets, source, destination)
+        flow_manager.flows[flow_id] = flow
+        simulation_engine.schedule_event(rng.uniform(0.0, 1.0), lambda f=flow: start(f))
+
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        simulation_engine.run()
+    elapsed = time.perf_counter() - start_time
+    delivered = sum(accumulator.delivered_packets for accumulator in metrics_collector.flow_accumulators.values())
+    return simulation_engine, elapsed, delivered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--flows', type=int, default=20)
+    parser.add_argument('--packets', type=int, default=2000)
+    parser.add_argument('--hops', type=int, default=6)
+    args = parser.parse_args()
+
+    print(f"flows: {args.flows}, packets/flow: {args.packets}, hops: {args.hops}")
+    baseline = None
+    for event_queue, immediate_queue in CONFIGURATIONS:
+        simulation_engine, elapsed, delivered = run(event_queue, immediate_queue, args)
+        heap_operations = simulation_engine.event_queue.heap_operations / max(delivered, 1)
+        if baseline is None:
+            baseline = heap_operations
+        label = f"{event_queue}{' + immediate' if immediate_queue else ''}"
+        print(f"{label:17s}: events {simulation_engine.events_processed:9d}  "
+              f"immediate {simulation_engine.immediate_events:9d}  "
+              f"heap ops/packet {heap_operations:6.2f} ({heap_operations / baseline:5.1%})  "
+              f"{elapsed:6.2f} s  delivered {delivered}")
+
+
+if __name__ == '__main__':
+    main()
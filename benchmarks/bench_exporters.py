@@ -0,0 +1,89 @@
+# benchmarks/bench_exporters.py
+"""
+メトリクスのエクスポート形式ごとの書き出し時間とファイルサイズの計測
+
+従来の csv.DictWriter による行単位の書き出しと、DataExporter の各形式を比較する。
+
+    python benchmarks/bench_exporters.py --rows 1000000
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_exporter
+from data_exporter import DataExporter
+from metrics_collector import MetricsCollector
+
+
+def build_collector(rows: int) -> MetricsCollector:
+    rng = np.random.default_rng(0)
+    metrics_collector = MetricsCollector(capacity=rows)
+    series = metrics_collector.flow_metrics
+    for timestamp, flow_id, throughput, delay, loss, jitter in zip(
+            np.arange(rows) * 0.001, rng.integers(1, 1000, rows), rng.uniform(1e5, 1e8, rows),
+            rng.uniform(0.001, 0.5, rows), rng.uniform(0, 5, rows), rng.uniform(0, 0.01, rows)):
+        series.append_values(timestamp, flow_id, throughput, delay, loss, jitter)
+    return metrics_collector
+
+
+def legacy_csv(metrics_collector: MetricsCollector, file_path: str):
+    # 変更前の export_metrics_csv と同じ行単位の書き出し
+    with open(file_path + '_flow_metrics.csv', 'w', newline='') as csvfile:
+        fieldnames = ['timestamp', 'flow_id', 'throughput', 'delay', 'packet_loss_rate', 'jitter']
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for fm in metrics_collector.flow_metrics:
+            writer.writerow({
+                'timestamp': fm.timestamp,
+                'flow_id': fm.flow_id,
+                'throughput': fm.throughput,
+                'delay': fm.delay,
+                'packet_loss_rate': fm.packet_loss_rate,
+                'jitter': fm.jitter
+            })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--row-group-size', type=int, default=65536)
+    args = parser.parse_args()
+
+    metrics_collector = build_collector(args.rows)
+    exporter = DataExporter()
+    cases = [("legacy csv (DictWriter)", None, {}), ("csv", "csv", {})]
+    if data_exporter.pa is not None:
+        cases += [("parquet (zstd)", "parquet", {"compression": "zstd"}),
+                  ("parquet (snappy)", "parquet", {"compression": "snappy"}),
+                  ("arrow ipc", "arrow", {}),
+                  ("arrow ipc (lz4)", "arrow", {"compression": "lz4"})]
+    if data_exporter.h5py is not None:
+        cases.append(("hdf5 (gzip)", "hdf5", {}))
+
+    print(f"rows: {args.rows}")
+    with tempfile.TemporaryDirectory() as directory:
+        for label, format, options in cases:
+            file_path = os.path.join(directory, label.replace(' ', '_').replace('(', '').replace(')', ''))
+            start = time.perf_counter()
+            if format is None:
+                legacy_csv(metrics_collector, file_path)
+                output = file_path + '_flow_metrics.csv'
+            else:
+                if format != "csv":
+                    options = dict(options, row_group_size=args.row_group_size)
+                exporter.export_simulation_data(metrics_collector.flow_metrics, [], format, file_path, **options)
+                output = file_path + '_flow_metrics' + data_exporter.FORMAT_EXTENSIONS[format]
+            elapsed = time.perf_counter() - start
+            print(f"{label:<24} {elapsed:8.3f} s {os.path.getsize(output) / 1e6:10.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+# benchmarks/bench_fluid.py
+"""
+パケット単位・流体モデル・ハイブリッドの実行時間の比較
+
+    python benchmarks/bench_fluid.py --replications 5 --simulation-time 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replication_runner import run_replica
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--replications', type=int, default=5)
+    parser.add_argument('--simulation-time', type=float, default=1000.0)
+    args = parser.parse_args()
+
+    seed_sequences = np.random.SeedSequence(0).spawn(args.replications)
+    elapsed = {}
+    for mode in ("packet", "fluid", "hybrid"):
+        parameters = {
+            'simulation_time': args.simulation_time,
+            'failure_rate': 0.01,
+            'failure_distribution': 'uniform',
+            'algorithm': 'dijkstra',
+            'simulation_mode': mode
+        }
+        start = time.perf_counter()
+        results = [run_replica(parameters, seed_sequence) for seed_sequence in seed_sequences]
+        elapsed[mode] = (time.perf_counter() - start) / args.replications
+        delivered = sum(result['delivered_packets'] for result in results) / args.replications
+        print(f"{mode:7s}: {elapsed[mode] * 1000:9.2f} ms/replica, delivered packets {delivered:12.1f}")
+    print(f"speedup: {elapsed['packet'] / elapsed['fluid']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
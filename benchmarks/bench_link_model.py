@@ -0,0 +1,120 @@
+# benchmarks/bench_link_model.py
+"""
+リンクの伝送モデルごとのイベント数と実行時間の比較
+
+直線トポロジの送信元から1フローの全パケットを時刻0に送信し、以下を比較する。
+    - serialization: 仮想時刻による出力キュー（リンク側のイベントなし）
+    - queued: パケットごとに送出完了イベントを発生させる出力キュー（比較用の参照実装）
+    - legacy: 帯域幅チェックのみ（送出時間なし）
+
+    python benchmarks/bench_link_model.py --packets 20000 --hops 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict, deque
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation_engine import SimulationEngine
+from topology_manager import TopologyManager
+from central_controller import CentralController
+from metrics_collector import MetricsCollector
+from flow_manager import FlowManager
+from packet_manager import PacketManager
+from flow import Flow
+from node import Node
+from link import Link
+
+
+class QueuedLinkPacketManager(PacketManager):
+    """
+    出力キューの先頭パケットを送り終えるたびにイベントを発生させる参照実装
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queues = defaultdict(deque)
+
+    def send_packet(self, packet, current_node):
+        next_node_index = packet.current_node_index + 1
+        if next_node_index >= len(packet.route):
+            return super().send_packet(packet, current_node)
+        next_node_id = packet.route[next_node_index]
+        link = self.topology_manager.get_link(self.find_link_between_nodes(current_node.node_id, next_node_id))
+        queue = self.queues[(link.link_id, current_node.node_id)]
+        queue.append((packet, next_node_id))
+        if len(queue) == 1:
+            self._start(queue, link)
+
+    def _start(self, queue, link):
+        packet, _ = queue[0]
+        finish = self.simulation_engine.current_time + link.transmission_time(packet.size)
+        self.simulation_engine.schedule_event(finish, lambda: self._depart(queue, link))
+
+    def _depart(self, queue, link):
+        packet, next_node_id = queue.popleft()
+        packet.current_node_index += 1
+        link.update_load(packet.size, "add")
+        packet.sent_time = self.simulation_engine.current_time
+        arrival_time = self.simulation_engine.current_time + link.delay
+        self.simulation_engine.schedule_event(arrival_time, lambda p=packet, nid=next_node_id: self.receive_packet(p, nid, link))
+        if queue:
+            self._start(queue, link)
+
+
+def run(model: str, packets: int, hops: int):
+    simulation_engine = SimulationEngine()
+    simulation_engine.initialize(1e9)
+    topology_manager = TopologyManager()
+    for node_id in range(1, hops + 2):
+        topology_manager.nodes[node_id] = Node(node_id=node_id, buffer_size=10 ** 12)
+    for link_id in range(1, hops + 1):
+        topology_manager.add_link(Link(link_id, capacity=1e6, delay=0.01, jitter=0.0, connected_nodes=(link_id, link_id + 1)))
+    central_controller = CentralController(topology_manager)
+    metrics_collector = MetricsCollector(retention="ring", capacity=1024)
+    flow_manager = FlowManager(topology_manager, simulation_engine, central_controller, metrics_collector,
+                               link_model="legacy" if model == "legacy" else "serialization")
+    if model == "queued":
+        flow_manager.packet_manager = QueuedLinkPacketManager(topology_manager, simulation_engine, central_controller,
+                                                              metrics_collector, link_model="serialization")
+        flow_manager.packet_manager.flow_manager = flow_manager
+    packet_manager = flow_manager.packet_manager
+
+    flow = Flow(1, "data", packets * 1500, 1, hops + 1)
+    flow_manager.flows[1] = flow
+    flow_packets = packet_manager.create_packets(flow)
+    source = topology_manager.get_node(1)
+
+    def send_all():
+        for packet in flow_packets:
+            packet_manager.send_packet(packet, source)
+
+    simulation_engine.schedule_event(0.0, send_all)
+    start = time.perf_counter()
+    simulation_engine.run()
+    elapsed = time.perf_counter() - start
+    accumulator = metrics_collector.flow_accumulators[1]
+    finish = simulation_engine.current_time
+    goodput = accumulator.delivered_bytes * 8 / finish if finish > 0 else 0.0
+    return simulation_engine.events_processed, elapsed, accumulator.delivered_packets, finish, goodput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--packets', type=int, default=20000)
+    parser.add_argument('--hops', type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"packets: {args.packets}, hops: {args.hops}, capacity 1 Mbps")
+    for model in ("serialization", "queued", "legacy"):
+        events, elapsed, delivered, finish, goodput = run(model, args.packets, args.hops)
+        print(f"{model:13s}: events {events:9d} ({events / args.packets:5.2f}/packet)  {elapsed:7.2f} s  "
+              f"delivered {delivered:7d}  last arrival {finish:10.4f} s  goodput {goodput / 1e6:6.3f} Mbps")
+
+
+if __name__ == '__main__':
+    main()
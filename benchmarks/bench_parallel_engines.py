@@ -0,0 +1,121 @@
+# benchmarks/bench_parallel_engines.py
+"""
+逐次実行・保守的な分割実行（時間窓）・楽観的な分割実行（Time Warp）の比較
+
+クラスタ内のリンクの遅延を固定し、クラスタ間のリンクの遅延（先読み時間）を変えて実行する。
+分割実行は同じプロセス内で論理プロセスを順に実行するため、実行時間ではなく
+窓の数・巻き戻し率・効率と、並列実行した場合の速度向上の見積もりを比較する。
+
+    python benchmarks/bench_parallel_engines.py --clusters 4 --cluster-size 8 --flows 40
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation_engine import SimulationEngine
+from partitioned_engine import PartitionedSimulationEngine
+from time_warp_engine import TimeWarpSimulationEngine, PacketModelStateSaver
+from topology_manager import TopologyManager
+from flow_manager import FlowManager
+from central_controller import CentralController
+from metrics_collector import MetricsCollector
+from flow import Flow
+from node import Node
+from link import Link
+
+
+def build_topology(clusters: int, cluster_size: int, inter_delay: float) -> TopologyManager:
+    """クラスタ内はリング、クラスタ間は隣接するクラスタの先頭ノード同士をつないだトポロジ"""
+    topology_manager = TopologyManager(link_selection="lowest_delay")
+    link_id = 0
+    for cluster in range(clusters):
+        base = cluster * cluster_size
+        for offset in range(cluster_size):
+            topology_manager.nodes[base + offset] = Node(node_id=base + offset)
+    for cluster in range(clusters):
+        base = cluster * cluster_size
+        for offset in range(cluster_size):
+            link_id += 1
+            topology_manager.add_link(Link(link_id=link_id, capacity=1e7, delay=0.001, jitter=0.0001,
+                                           connected_nodes=(base + offset, base + (offset + 1) % cluster_size)))
+        link_id += 1
+        topology_manager.add_link(Link(link_id=link_id, capacity=1e7, delay=inter_delay, jitter=inter_delay / 10,
+                                       connected_nodes=(base, ((cluster + 1) % clusters) * cluster_size)))
+    return topology_manager
+
+
+def run(simulation_engine, args, inter_delay: float, seed: int = 0):
+    random.seed(seed)
+    topology_manager = build_topology(args.clusters, args.cluster_size, inter_delay)
+    if isinstance(simulation_engine, PartitionedSimulationEngine):
+        simulation_engine.assign_partitions(topology_manager, {node_id: node_id // args.cluster_size
+                                                               for node_id in topology_manager.nodes})
+    simulation_engine.initialize(args.simulation_time)
+    central_controller = CentralController(topology_manager)
+    metrics_collector = MetricsCollector()
+    flow_manager = FlowManager(topology_manager, simulation_engine, central_controller, metrics_collector,
+                               link_model="serialization")
+    packet_manager = flow_manager.packet_manager
+    packet_manager.jitter_seed = seed
+    if isinstance(simulation_engine, TimeWarpSimulationEngine):
+        simulation_engine.state_saver = PacketModelStateSaver(topology_manager, packet_manager)
+
+    def start(flow):
+        source = topology_manager.get_node(flow.source_node)
+        for packet in packet_manager.create_packets(flow):
+            packet_manager.send_packet(packet, source)
+
+    node_ids = list(topology_manager.nodes)
+    for flow_id in range(1, args.flows + 1):
+        source, destination = random.sample(node_ids, 2)
+        flow = Flow(flow_id, "data", 1500 * args.packets, source, destination)
+        flow_manager.flows[flow_id] = flow
+        simulation_engine.schedule_event(random.uniform(0, args.simulation_time / 2), lambda f=flow: start(f), owner=source)
+
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        simulation_engine.run()
+    elapsed = time.perf_counter() - start_time
+    delivered = sum(accumulator.delivered_packets for accumulator in metrics_collector.flow_accumulators.values())
+    return elapsed, delivered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clusters', type=int, default=4)
+    parser.add_argument('--cluster-size', type=int, default=8)
+    parser.add_argument('--flows', type=int, default=40)
+    parser.add_argument('--packets', type=int, default=50)
+    parser.add_argument('--simulation-time', type=float, default=2.0)
+    args = parser.parse_args()
+
+    for inter_delay in (0.1, 0.01, 0.001):
+        print(f"inter-cluster delay {inter_delay * 1000:g} ms")
+        sequential = SimulationEngine(event_ordering="entity")
+        elapsed, delivered = run(sequential, args, inter_delay)
+        print(f"  sequential  : {elapsed * 1000:8.1f} ms, {sequential.events_processed} events, {delivered} delivered")
+
+        conservative = PartitionedSimulationEngine(partitions=args.clusters)
+        elapsed, delivered = run(conservative, args, inter_delay)
+        statistics = conservative.statistics()
+        print(f"  conservative: {elapsed * 1000:8.1f} ms, {statistics['windows']} windows, "
+              f"{statistics['events_processed'] / max(statistics['windows'], 1):.1f} events/window, "
+              f"ideal speedup {statistics['ideal_speedup']:.2f}")
+
+        optimistic = TimeWarpSimulationEngine(partitions=args.clusters)
+        elapsed, delivered = run(optimistic, args, inter_delay)
+        statistics = optimistic.statistics()
+        print(f"  optimistic  : {elapsed * 1000:8.1f} ms, rollback rate {statistics['rollback_rate']:.3f}, "
+              f"efficiency {statistics['efficiency']:.3f}, anti-messages {statistics['anti_messages']}, "
+              f"estimated speedup {statistics['estimated_speedup']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+# benchmarks/bench_replications.py
+"""
+ReplicationRunner のプロセス数ごとの実行時間とスケーリングの計測
+
+    python benchmarks/bench_replications.py --replications 32
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from configuration_manager import ConfigurationManager
+from replication_runner import ReplicationRunner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--replications', type=int, default=32)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    config_manager = ConfigurationManager()
+    config_manager.load_configuration('data/config.yaml')
+    print(f"replications: {args.replications}, cpus: {os.cpu_count()}")
+
+    baseline = None
+    workers = 1
+    while workers <= args.max_workers:
+        runner = ReplicationRunner(config_manager.simulation_parameters, args.replications, max_workers=workers)
+        start = time.perf_counter()
+        runner.run()
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"workers {workers:3d}: {elapsed:8.2f} s  speedup {baseline / elapsed:5.2f}  efficiency {baseline / elapsed / workers:5.2f}")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/bench_scaling.py
+"""
+合成トポロジの規模ごとの生成・読み込み・経路計算・シミュレーションの時間
+
+topology_generator の各生成器でノード数を段階的に増やしたトポロジを生成し、次の時間を計測する。
+    - generate: 配列表現の生成（リンク属性の生成を含む）
+    - load: TopologyManager.load_arrays によるノードとリンクの作成
+    - routing: RoutingTable の計算（全ノード対の行列を持つため、--max-routing-nodes 以下の場合のみ）
+    - simulate: WorkloadGenerator のポアソン到着のフローを --run 秒実行した時のイベント数と処理速度
+      （経路を計算した場合のみ、link_model は "serialization"）
+
+    python benchmarks/bench_scaling.py --scales 1 4 16 --max-routing-nodes 8000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from topology_generator import generate_topology
+from workload_generator import WorkloadGenerator, write_scenario
+from simulation_engine import SimulationEngine
+from topology_manager import TopologyManager
+from central_controller import CentralController
+from metrics_collector import MetricsCollector
+from flow_manager import FlowManager
+
+LINK_ATTRIBUTES = {
+    "capacity": {"type": "choice", "values": [1e9, 1e10]},
+    "delay": {"type": "uniform", "low": 0.0001, "high": 0.001},
+}
+
+
+def specs(scale: int):
+    # scale=1 で各生成器が約1000ノードになる（waxman は規模によらず平均次数が約3）
+    side = int(round(32 * scale ** 0.5))
+    yield {"type": "fat_tree", "k": 2 * int(round(8 * scale ** (1 / 3)))}
+    yield {"type": "leaf_spine", "leaves": 32 * scale, "spines": 8, "hosts_per_leaf": 30}
+    yield {"type": "torus", "dimensions": [side, side]}
+    yield {"type": "barabasi_albert", "nodes": 1000 * scale, "m": 2}
+    yield {"type": "waxman", "nodes": 1000 * scale, "alpha": 0.05, "beta": 0.1 / scale, "delay": "distance"}
+
+
+def simulate(topology_manager: TopologyManager, central_controller: CentralController, directory: str, args):
+    workload = WorkloadGenerator(topology_manager, seed=0).generate(
+        args.run, {"type": "poisson", "rate": args.rate}, size={"type": "constant", "value": args.flow_size})
+    path = os.path.join(directory, "workload.npy")
+    write_scenario(path, workload)
+    simulation_engine = SimulationEngine()
+    simulation_engine.initialize(args.run)
+    flow_manager = FlowManager(topology_manager, simulation_engine, central_controller,
+                               MetricsCollector(retention="ring", capacity=1024), link_model="serialization")
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        flow_manager.stream_flows(path, simulation_engine)
+        simulation_engine.run()
+    return simulation_engine.events_processed, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 4, 16], help='規模（約1000ノードの倍数）')
+    parser.add_argument('--max-routing-nodes', type=int, default=5000, help='経路計算とシミュレーションを行う最大ノード数')
+    parser.add_argument('--run', type=float, default=0.05, help='シミュレーション時間（秒）')
+    parser.add_argument('--rate', type=float, default=2000.0, help='フローの到着率（フロー/秒）')
+    parser.add_argument('--flow-size', type=int, default=15000, help='フローサイズ（バイト）')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'topology':16s} {'nodes':>8s} {'links':>8s} {'generate':>9s} {'load':>8s} {'routing':>8s} "
+          f"{'events':>9s} {'events/s':>9s}")
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in args.scales:
+            for spec in specs(scale):
+                start = time.perf_counter()
+                arrays = generate_topology({**LINK_ATTRIBUTES, **spec}, seed=args.seed)
+                generated = time.perf_counter() - start
+
+                start = time.perf_counter()
+                topology_manager = TopologyManager()
+                topology_manager.load_arrays(arrays)
+                loaded = time.perf_counter() - start
+
+                nodes, links = len(arrays["node_id"]), len(arrays["link_id"])
+                routing = events = rate = "-"
+                if nodes <= args.max_routing_nodes:
+                    central_controller = CentralController(topology_manager)
+                    start = time.perf_counter()
+                    central_controller.update_routing_table()
+                    routing = f"{time.perf_counter() - start:7.2f}s"
+                    processed, elapsed = simulate(topology_manager, central_controller, directory, args)
+                    events, rate = str(processed), f"{processed / elapsed:9.0f}"
+                print(f"{spec['type']:16s} {nodes:8d} {links:8d} {generated:8.3f}s {loaded:7.2f}s {routing:>8s} "
+                      f"{events:>9s} {rate:>9s}")
+
+
+if __name__ == '__main__':
+    main()
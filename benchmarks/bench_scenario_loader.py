@@ -0,0 +1,91 @@
+# benchmarks/bench_scenario_loader.py
+"""
+シナリオの全フローを読み込んでからスケジュールする方式と、先読み時間内のフローだけを逐次読み込む方式の比較
+
+WorkloadGenerator で生成した大量のフローのシナリオ（.npy）について、最初のイベントを実行できるまでの時間、
+その時点のイベントキューの長さ、シミュレーションの先頭 --run 秒を実行するまでの Python のメモリ割り当ての
+最大値（tracemalloc）を比較する。
+    - eager: generate_flows で全フローを読み込み、schedule_flow_starts で全フローの開始イベントをスケジュール
+    - stream: stream_flows で開始時刻が現在時刻 + horizon 以内のフローだけを読み込んでスケジュール
+
+    python benchmarks/bench_scenario_loader.py --flows 1000000 --horizon 1.0
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from workload_generator import WorkloadGenerator, write_scenario
+from simulation_engine import SimulationEngine
+from topology_manager import TopologyManager
+from central_controller import CentralController
+from metrics_collector import MetricsCollector
+from flow_manager import FlowManager
+from node import Node
+from link import Link
+
+RATE = 1000.0  # フローの到着率（フロー/秒）
+
+
+def build_topology(nodes: int) -> TopologyManager:
+    topology_manager = TopologyManager()
+    for node_id in range(1, nodes + 1):
+        topology_manager.nodes[node_id] = Node(node_id=node_id, buffer_size=10 ** 12)
+    for node_id in range(1, nodes):
+        topology_manager.add_link(Link(node_id, capacity=1e9, delay=0.001, jitter=0.0,
+                                       connected_nodes=(node_id, node_id + 1)))
+    return topology_manager
+
+
+def run(mode: str, path: str, args):
+    simulation_engine = SimulationEngine()
+    simulation_engine.initialize(args.run)
+    topology_manager = build_topology(args.nodes)
+    flow_manager = FlowManager(topology_manager, simulation_engine, CentralController(topology_manager),
+                               MetricsCollector(retention="ring", capacity=1024), link_model="serialization")
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "eager":
+            flow_manager.generate_flows(flow_scenario=path)
+            flow_manager.schedule_flow_starts(simulation_engine)
+        else:
+            flow_manager.stream_flows(path, simulation_engine, horizon=args.horizon)
+        setup = time.perf_counter() - start
+        queued = len(simulation_engine.event_queue)
+        simulation_engine.run()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return setup, queued, elapsed, peak, len(flow_manager.flows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--flows', type=int, default=1000000)
+    parser.add_argument('--nodes', type=int, default=16)
+    parser.add_argument('--horizon', type=float, default=1.0)
+    parser.add_argument('--run', type=float, default=2.0, help='実行するシミュレーション時間（秒）')
+    args = parser.parse_args()
+
+    workload = WorkloadGenerator(build_topology(args.nodes), seed=0).generate(
+        args.flows / RATE, {"type": "poisson", "rate": RATE}, size={"type": "constant", "value": 1500})
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "workload.npy")
+        write_scenario(path, workload)
+        print(f"flows: {len(workload)} over {args.flows / RATE:g} s, horizon {args.horizon:g} s, running {args.run:g} s")
+        for mode in ("eager", "stream"):
+            setup, queued, elapsed, peak, loaded = run(mode, path, args)
+            print(f"{mode:6s}: setup {setup:6.2f} s  queued events {queued:8d}  total {elapsed:6.2f} s  "
+                  f"peak memory {peak / 2 ** 20:8.1f} MiB  flows loaded {loaded}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/bench_topology_loading.py
+"""
+トポロジの読み込み時間の比較
+
+ランダムなトポロジの YAML ファイルについて、次の方式で TopologyManager にノードとリンクを作成するまでの時間を比較する。
+    - safe_load: 純 Python の yaml.safe_load で読み込み、1要素ずつノードとリンクを作成（従来の方式）
+    - libyaml: C 実装のローダーで読み込み、配列表現からまとめて作成
+    - cache: .npz のキャッシュから読み込み（2回目以降の読み込み）
+    - csv: 同じトポロジのエッジリストCSVから読み込み
+
+    python benchmarks/bench_topology_loading.py --nodes 50000 --links 200000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import yaml
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from topology_manager import TopologyManager
+from node import Node
+from link import Link
+
+
+def write_topology(directory: str, nodes: int, links: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    node1 = rng.integers(1, nodes + 1, links)
+    node2 = (node1 + rng.integers(1, nodes, links) - 1) % nodes + 1
+    capacity = rng.choice([1e8, 1e9, 1e10], links)
+    delay = rng.uniform(0.001, 0.02, links).round(6)
+    data = {
+        'nodes': [{'id': node_id, 'buffer_size': 1000000} for node_id in range(1, nodes + 1)],
+        'links': [{'id': link_id, 'node1': a, 'node2': b, 'capacity': c, 'delay': d, 'jitter': 0.0}
+                  for link_id, (a, b, c, d) in enumerate(zip(node1.tolist(), node2.tolist(), capacity.tolist(),
+                                                             delay.tolist()), start=1)],
+    }
+    yaml_file = os.path.join(directory, "topology.yaml")
+    with open(yaml_file, 'w', encoding='utf-8') as file:
+        yaml.dump(data, file, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper))
+    csv_file = os.path.join(directory, "topology.csv")
+    with open(csv_file, 'w', encoding='utf-8') as file:
+        file.write("id,node1,node2,capacity,delay,jitter\n")
+        for link in data['links']:
+            file.write(f"{link['id']},{link['node1']},{link['node2']},{link['capacity']},{link['delay']},0.0\n")
+    return yaml_file, csv_file
+
+
+def load_safe_load(yaml_file: str) -> TopologyManager:
+    topology_manager = TopologyManager()
+    with open(yaml_file, 'r', encoding='utf-8') as file:
+        topology_data = yaml.safe_load(file)
+    for node_data in topology_data['nodes']:
+        topology_manager.nodes[node_data['id']] = Node(node_id=node_data['id'], buffer_size=node_data['buffer_size'])
+    for link_data in topology_data['links']:
+        topology_manager.add_link(Link(link_data['id'], link_data['capacity'], link_data['delay'], link_data['jitter'],
+                                       (link_data['node1'], link_data['node2'])))
+    return topology_manager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--nodes', type=int, default=10000)
+    parser.add_argument('--links', type=int, default=40000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        yaml_file, csv_file = write_topology(directory, args.nodes, args.links)
+        cache_dir = os.path.join(directory, "cache")
+        print(f"nodes: {args.nodes}, links: {args.links}, YAML {os.path.getsize(yaml_file) / 2 ** 20:.1f} MiB")
+        methods = [
+            ("safe_load", lambda: load_safe_load(yaml_file)),
+            ("libyaml", lambda: TopologyManager().load_topology(yaml_file)),
+            ("cache (miss)", lambda: TopologyManager().load_topology(yaml_file, cache_dir=cache_dir)),
+            ("cache (hit)", lambda: TopologyManager().load_topology(yaml_file, cache_dir=cache_dir)),
+            ("csv", lambda: TopologyManager().load_topology(csv_file)),
+        ]
+        baseline = None
+        for name, load in methods:
+            start = time.perf_counter()
+            load()
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{name:12s}: {elapsed:7.2f} s ({baseline / elapsed:5.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# benchmarks/bench_traffic_source.py
+"""
+開始時に全パケットを生成する方式と、送信元で逐次生成するトラフィック生成器のメモリ使用量の比較
+
+直線トポロジ上の複数のフローを送信し、Python のメモリ割り当ての最大値（tracemalloc）、
+同時に存在したパケット数の最大値、イベント数を比較する。
+    - eager: packet_store に全パケットを確保し、開始時に全パケットを送信
+    - burst: トラフィック生成器で開始時に全パケットを送出（生成は送出時）
+    - cbr: トラフィック生成器でリンク容量の80%のレートで送出
+
+    python benchmarks/bench_traffic_source.py --flows 10 --packets 10000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation_engine import SimulationEngine
+from topology_manager import TopologyManager
+from central_controller import CentralController
+from metrics_collector import MetricsCollector
+from flow_manager import FlowManager
+from flow import Flow
+from node import Node
+from link import Link
+
+CAPACITY = 1e7
+HOPS = 3
+
+
+def run(mode: str, args):
+    simulation_engine = SimulationEngine()
+    simulation_engine.initialize(1e9)
+    topology_manager = TopologyManager()
+    # フローごとに独立した直線の経路を用意し、送信元のリンクを共有しないようにする
+    for flow_id in range(args.flows):
+        base = flow_id * (HOPS + 1)
+        for offset in range(HOPS + 1):
+            topology_manager.nodes[base + offset] = Node(node_id=base + offset, buffer_size=10 ** 12)
+        for offset in range(HOPS):
+            topology_manager.add_link(Link(base + offset, capacity=CAPACITY, delay=0.005, jitter=0.0,
+                                           connected_nodes=(base + offset, base + offset + 1)))
+    pacing = None
+    if mode == "burst":
+        pacing = {"default": "burst"}
+    elif mode == "cbr":
+        pacing = {"default": {"type": "cbr", "rate": 0.8 * CAPACITY}}
+    central_controller = CentralController(topology_manager)
+    metrics_collector = MetricsCollector(retention="ring", capacity=1024)
+    flow_manager = FlowManager(topology_manager, simulation_engine, central_controller, metrics_collector,
+                               link_model="serialization", pacing=pacing)
+    packet_manager = flow_manager.packet_manager
+
+    def start(flow):
+        if pacing is not None:
+            flow_manager.start_flow(flow)
+            return
+        source = topology_manager.get_node(flow.source_node)
+        for packet in packet_manager.create_packets(flow):
+            packet_manager.send_packet(packet, source)
+
+    for flow_id in range(1, args.flows + 1):
+        base = (flow_id - 1) * (HOPS + 1)
+        flow = Flow(flow_id, "data", 1500 * args.packets, base, base + HOPS)
+        flow_manager.flows[flow_id] = flow
+        simulation_engine.schedule_event(0.0, lambda f=flow: start(f))
+
+    # 同時に存在するパケット数（送出済みで配送・ロスしていないもの）の最大値を定期的に計測
+    peak_in_flight = [0]
+
+    def sample():
+        emitted = sum(source.emitted for source in flow_manager.traffic_sources.values()) if pacing is not None \
+            else len(packet_manager.packet_store)
+        finished = sum(accumulator.delivered_packets + accumulator.lost_packets
+                       for accumulator in metrics_collector.flow_accumulators.values())
+        peak_in_flight[0] = max(peak_in_flight[0], emitted - finished)
+        if finished < args.flows * args.packets:
+            simulation_engine.schedule_event(simulation_engine.current_time + 0.05, sample)
+
+    simulation_engine.schedule_event(0.001, sample)
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        simulation_engine.run()
+    elapsed = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    delivered = sum(accumulator.delivered_packets for accumulator in metrics_collector.flow_accumulators.values())
+    return peak, peak_in_flight[0], simulation_engine.events_processed, elapsed, delivered, simulation_engine.current_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--flows', type=int, default=10)
+    parser.add_argument('--packets', type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"flows: {args.flows}, packets/flow: {args.packets}, {HOPS} hops at {CAPACITY / 1e6:g} Mbps")
+    for mode in ("eager", "burst", "cbr"):
+        peak, in_flight, events, elapsed, delivered, finish = run(mode, args)
+        print(f"{mode:6s}: peak memory {peak / 2 ** 20:8.1f} MiB  peak in flight {in_flight:8d}  "
+              f"events {events:9d}  {elapsed:6.2f} s  delivered {delivered}  last arrival {finish:8.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_workload_generator.py
+"""
+フローを1つずつ生成する方式と WorkloadGenerator によるまとめての生成の比較
+
+FlowManager.generate_flows のランダム生成と同じく random で1フローずつ Flow を生成する方式と、
+WorkloadGenerator で構造化配列を生成する方式の生成時間と、シナリオファイルの書き出し・
+チャンクごとの読み込みの時間、ファイルサイズを比較する。
+
+    python benchmarks/bench_workload_generator.py --flows 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from workload_generator import WorkloadGenerator, write_scenario, read_scenario, pq
+from topology_manager import TopologyManager
+from flow import Flow
+from node import Node
+from link import Link
+
+
+def build_topology(nodes: int) -> TopologyManager:
+    topology_manager = TopologyManager()
+    for node_id in range(1, nodes + 1):
+        topology_manager.nodes[node_id] = Node(node_id=node_id)
+    for node_id in range(1, nodes):
+        topology_manager.add_link(Link(node_id, capacity=1e9, delay=0.001, jitter=0.0,
+                                       connected_nodes=(node_id, node_id + 1)))
+    return topology_manager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--flows', type=int, default=1000000)
+    parser.add_argument('--nodes', type=int, default=100)
+    args = parser.parse_args()
+
+    topology_manager = build_topology(args.nodes)
+    node_ids = list(topology_manager.nodes)
+    start = time.perf_counter()
+    flows = {}
+    for flow_id in range(1, args.flows + 1):
+        source_node = random.choice(node_ids)
+        destination_node = random.choice(node_ids)
+        while destination_node == source_node:
+            destination_node = random.choice(node_ids)
+        flows[flow_id] = Flow(flow_id, random.choice(["video", "voice", "data"]), random.randint(1_000_000, 100_000_000),
+                              source_node, destination_node)
+    print(f"per-flow random: {time.perf_counter() - start:6.2f} s for {len(flows)} flows")
+    del flows
+
+    generator = WorkloadGenerator(topology_manager, seed=0)
+    start = time.perf_counter()
+    workload = generator.generate(args.flows / 100.0, {"type": "poisson", "rate": 100.0}, size={"type": "pareto", "alpha": 1.2},
+                                  pairs="gravity")
+    print(f"vectorized     : {time.perf_counter() - start:6.2f} s for {len(workload)} flows")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in [".npy"] + ([".parquet"] if pq is not None else []):
+            path = os.path.join(directory, "workload" + extension)
+            start = time.perf_counter()
+            write_scenario(path, workload)
+            written = time.perf_counter() - start
+            start = time.perf_counter()
+            rows = sum(len(chunk) for chunk in read_scenario(path))
+            print(f"{extension:8s}: write {written:6.2f} s  read {time.perf_counter() - start:6.2f} s ({rows} rows)  "
+                  f"{os.path.getsize(path) / 2 ** 20:7.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
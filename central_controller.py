@@ -1,8 +1,9 @@
 # central_controller.py
 
-from typing import Dict, Optional
+import time
+from typing import Dict, List, Optional
 from topology_manager import TopologyManager
-import networkx as nx
+from routing_table import RoutingTable
 
 class CentralController:
     """
@@ -12,15 +13,24 @@ class CentralController:
         algorithm (str): 使用中のルーティングアルゴリズム
         topology_manager (TopologyManager): トポロジマネージャ
         network_state (Dict): ネットワークの状態情報
+        topology_listeners (List): 障害・復旧の通知先（element_failed / element_recovered を持つオブジェクト）
+        routing_table (RoutingTable): 全ノード対の距離・次ホップ行列
+        incremental_routing (bool): 障害・復旧時に経路表を差分更新する場合True
+        compare_full_rebuild (bool): 差分更新のたびに全再計算の所要時間も計測する場合True
+        routing_update_log (List[Dict]): 障害・復旧ごとの経路表更新の記録
     """
 
-    def __init__(self, topology_manager: TopologyManager, algorithm: str = "dijkstra"):
+    def __init__(self, topology_manager: TopologyManager, algorithm: str = "dijkstra", routing_method: str = "auto",
+                 incremental_routing: bool = True, compare_full_rebuild: bool = False):
         """
         初期化
 
         Args:
             topology_manager (TopologyManager): トポロジマネージャ
             algorithm (str, optional): ルーティングアルゴリズムの種類（デフォルトは "dijkstra"）
+            routing_method (str, optional): 経路表の計算方法（"auto", "floyd_warshall", "dijkstra"）
+            incremental_routing (bool, optional): 経路表を差分更新するかどうか（デフォルトはTrue）
+            compare_full_rebuild (bool, optional): 全再計算の所要時間も計測するかどうか（デフォルトはFalse）
         """
         self.algorithm = algorithm
         self.topology_manager = topology_manager
@@ -32,8 +42,25 @@ class CentralController:
             'link_delays': {},
             'link_jitters': {}
         }
+        self.topology_listeners: List = []
+        self.routing_table = RoutingTable(routing_method)
+        self._routing_table_valid = False
+        self.incremental_routing = incremental_routing
+        self.compare_full_rebuild = compare_full_rebuild
+        self.routing_update_log: List[Dict] = []
+        self._virtual_weights_valid = False
         self.update_network_state()
 
+    def add_topology_listener(self, listener):
+        """
+        障害・復旧の通知先を登録
+
+        Args:
+            listener: element_failed(element_type, element_id) と
+                element_recovered(element_type, element_id) を持つオブジェクト
+        """
+        self.topology_listeners.append(listener)
+
     def update_network_state(self):
         """
         ノードとリンクの状態を更新
@@ -50,6 +77,115 @@ class CentralController:
             self.network_state['link_delays'][link_id] = link.delay
             self.network_state['link_jitters'][link_id] = link.jitter
 
+    def _update_element_state(self, element_type: str, element_id: int):
+        """
+        1つのノードまたはリンクの状態のみを更新
+
+        Args:
+            element_type (str): "node" または "link"
+            element_id (int): 要素のID
+        """
+        if element_type == "node":
+            node = self.topology_manager.get_node(element_id)
+            if node:
+                self.network_state['node_statuses'][element_id] = node.status
+                self.network_state['node_buffers'][element_id] = node.buffer_occupancy
+        elif element_type == "link":
+            link = self.topology_manager.get_link(element_id)
+            if link:
+                self.network_state['link_statuses'][element_id] = link.status
+
+    def update_routing_table(self):
+        """
+        経路表（距離行列と次ホップ行列）を再計算
+        """
+        self.routing_table.build(self.topology_manager)
+        self._routing_table_valid = True
+
+    def get_routing_table(self) -> RoutingTable:
+        """
+        経路表を取得（未計算の場合は計算）
+
+        Returns:
+            RoutingTable: 経路表
+        """
+        if not self._routing_table_valid:
+            self.update_routing_table()
+        return self.routing_table
+
+    def next_hop(self, node_id: int, destination_node_id: int) -> Optional[int]:
+        """
+        宛先に向けた次ホップを経路表から取得
+
+        Args:
+            node_id (int): 現在のノードID
+            destination_node_id (int): 宛先ノードID
+
+        Returns:
+            Optional[int]: 次ホップのノードID、到達不能の場合None
+        """
+        return self.get_routing_table().next_hop(node_id, destination_node_id)
+
+    def _update_routing_for_change(self, action: str, element_type: str, element_id: int):
+        """
+        状態が変化した要素に応じて経路表を更新し、所要時間を記録
+
+        Args:
+            action (str): "failure" または "recovery"
+            element_type (str): "node" または "link"
+            element_id (int): 要素のID
+        """
+        start = time.perf_counter()
+        if self.incremental_routing and self._routing_table_valid:
+            affected = self.routing_table.apply_change(self.topology_manager, element_type, element_id)
+            mode = "incremental"
+        else:
+            self.update_routing_table()
+            affected = len(self.routing_table.node_ids)
+            mode = "full"
+        record = {
+            'action': action,
+            'element_type': element_type,
+            'element_id': element_id,
+            'mode': mode,
+            'seconds': time.perf_counter() - start,
+            'affected_destinations': affected
+        }
+        message = f"Routing update ({action} {element_type} {element_id}): {mode} {record['seconds'] * 1000:.3f} ms, {affected} destinations"
+        if self.compare_full_rebuild:
+            start = time.perf_counter()
+            RoutingTable(self.routing_table.method).build(self.topology_manager)
+            record['full_rebuild_seconds'] = time.perf_counter() - start
+            message += f" (full rebuild {record['full_rebuild_seconds'] * 1000:.3f} ms)"
+        self.routing_update_log.append(record)
+        print(message)
+
+    def _refresh_virtual_weights(self, element_type: str, element_id: int):
+        """
+        状態が変化した要素に隣接するノードの仮想重みのみを更新
+
+        Args:
+            element_type (str): "node" または "link"
+            element_id (int): 要素のID
+        """
+        if self.algorithm != "dijkstra" or not self._virtual_weights_valid:
+            self.calculate_virtual_weights()
+            return
+        if element_type != "link":
+            # ダイクストラ法の仮想重みはリンクの状態のみに依存する
+            return
+        link = self.topology_manager.get_link(element_id)
+        if link is None:
+            return
+        node1, node2 = link.connected_nodes
+        links = self.topology_manager.links_between(node1, node2)
+        active_weights = [l.routing_weight() for l in links if l.status == "active"]
+        weight = min(active_weights) if active_weights else float('inf')
+        for node_id, neighbor in ((node1, node2), (node2, node1)):
+            node = self.topology_manager.get_node(node_id)
+            if node is not None:
+                node.virtual_weights[neighbor] = weight
+
     def calculate_virtual_weights(self):
         """
         仮想重みを計算し、各ノードに設定
@@ -57,6 +193,7 @@ class CentralController:
         Note:
             使用するアルゴリズムに応じて処理を分岐
         """
+        self._virtual_weights_valid = True
         if self.algorithm == "dijkstra":
             self._calculate_weights_dijkstra()
         elif self.algorithm == "dqn":
@@ -69,31 +206,20 @@ class CentralController:
     def _calculate_weights_dijkstra(self):
         """
         ダイクストラ法による仮想重みの計算
+
+        各ノードに隣接ノードへのリンク重みを設定する（ダウンしているリンクは無限大）。
         """
-        # NetworkXのグラフを作成
-        G = nx.Graph()
-        for node_id in self.topology_manager.nodes:
-            G.add_node(node_id)
+        for node in self.topology_manager.nodes.values():
+            node.virtual_weights = {}
 
         for link in self.topology_manager.links.values():
-            if link.status == "active":
-                node1, node2 = link.connected_nodes
-                # 重みはリンクの遅延と帯域幅に基づく（簡易的な例）
-                weight = link.delay + (1 / link.capacity)
-                G.add_edge(node1, node2, weight=weight)
-            else:
-                # リンクがダウンしている場合、重みを無限大に設定
-                node1, node2 = link.connected_nodes
-                G.add_edge(node1, node2, weight=float('inf'))
-
-        # 各ノードの仮想重みを更新
-        for node_id in self.topology_manager.nodes:
-            # 隣接ノードへの重みを設定
-            node = self.topology_manager.get_node(node_id)
-            node.virtual_weights = {}
-            for neighbor in G.neighbors(node_id):
-                edge_data = G.get_edge_data(node_id, neighbor)
-                node.virtual_weights[neighbor] = edge_data['weight']
+            node1, node2 = link.connected_nodes
+            # 重みはリンクの遅延と帯域幅に基づく（簡易的な例）
+            weight = link.routing_weight() if link.status == "active" else float('inf')
+            for node_id, neighbor in ((node1, node2), (node2, node1)):
+                node = self.topology_manager.get_node(node_id)
+                if node is not None:
+                    node.virtual_weights[neighbor] = min(weight, node.virtual_weights.get(neighbor, float('inf')))
 
     def _calculate_weights_dqn(self):
         """
@@ -128,6 +254,24 @@ class CentralController:
             element_id (int): 障害が発生した要素のID
         """
         print(f"Failure detected: {failure_type} {element_id}")
-        self.update_network_state()
-        self.calculate_virtual_weights()
+        self._update_element_state(failure_type, element_id)
+        self._update_routing_for_change("failure", failure_type, element_id)
+        self._refresh_virtual_weights(failure_type, element_id)
+        self.distribute_virtual_weights()
+        for listener in self.topology_listeners:
+            listener.element_failed(failure_type, element_id)
+
+    def notify_recovery(self, element_type: str, element_id: int):
+        """
+        復旧情報を受信し処理
+
+        Args:
+            element_type (str): 復旧した要素の種類（"node" または "link"）
+            element_id (int): 復旧した要素のID
+        """
+        self._update_element_state(element_type, element_id)
+        self._update_routing_for_change("recovery", element_type, element_id)
+        self._refresh_virtual_weights(element_type, element_id)
         self.distribute_virtual_weights()
+        for listener in self.topology_listeners:
+            listener.element_recovered(element_type, element_id)
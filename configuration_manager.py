@@ -6,6 +6,7 @@ if os.name == 'nt':
 
 import yaml
 from typing import Dict
+import yaml_loader
 
 class ConfigurationManager:
     """
@@ -28,7 +29,7 @@ class ConfigurationManager:
             config_file (str): 設定ファイルパス
         """
         with open(config_file, 'r', encoding='utf-8') as file:
-            config_data = yaml.safe_load(file)
+            config_data = yaml_loader.safe_load(file)
             self.simulation_parameters = config_data.get('simulation_parameters', {})
             self.flow_scenario = config_data.get('flow_scenario', {})
 
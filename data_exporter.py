@@ -1,61 +1,322 @@
 # data_exporter.py
 
 import csv
-from typing import List
-from metrics_collector import FlowMetric, NetworkMetric
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from metrics_collector import FlowMetric, NetworkMetric, FLOW_METRIC_FIELDS, NETWORK_METRIC_FIELDS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow がない環境では Parquet / Arrow IPC 形式を使用できない
+    pa = None
+    pq = None
+
+try:
+    import h5py
+except ImportError:  # h5py がない環境では HDF5 形式を使用できない
+    h5py = None
+
+# 形式ごとのファイル拡張子
+FORMAT_EXTENSIONS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+    "feather": ".feather",
+    "hdf5": ".h5",
+}
+
+
+class MetricWriter:
+    """
+    列ごとの配列をまとめて書き出すライターの基底クラス
+
+    write_batch で渡された行は row_group_size 行たまるまでバッファし、まとめて書き出す。
+
+    Attributes:
+        file_path (str): 出力ファイルのパス
+        fields (Dict[str, np.dtype]): 出力する列名と型
+        row_group_size (int): 1回に書き出す行数
+        rows_written (int): 書き出した行数
+    """
+
+    def __init__(self, file_path: str, fields: Dict[str, type], row_group_size: int = 65536):
+        if row_group_size <= 0:
+            raise ValueError("row_group_size must be positive")
+        self.file_path = file_path
+        self.fields = {name: np.dtype(dtype) for name, dtype in fields.items()}
+        self.row_group_size = row_group_size
+        self.rows_written = 0
+        self._buffer: List[Dict[str, np.ndarray]] = []
+        self._buffered_rows = 0
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_batch(self, columns: Dict[str, np.ndarray]):
+        """
+        行をまとめて追加
+
+        Args:
+            columns (Dict[str, np.ndarray]): 列名をキーとする列の配列（出力しない列は無視される）
+        """
+        batch = {name: np.asarray(columns[name], dtype=dtype) for name, dtype in self.fields.items()}
+        rows = len(next(iter(batch.values()))) if batch else 0
+        if rows == 0:
+            return
+        # 渡された配列は呼び出し元で再利用され得るため、バッファする場合はコピーする
+        self._buffer.append({name: column.copy() for name, column in batch.items()})
+        self._buffered_rows += rows
+        if self._buffered_rows >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        """
+        バッファした行を書き出す
+        """
+        if not self._buffer:
+            return
+        if len(self._buffer) == 1:
+            batch = self._buffer[0]
+        else:
+            batch = {name: np.concatenate([part[name] for part in self._buffer]) for name in self.fields}
+        self._buffer = []
+        self._buffered_rows = 0
+        rows = len(next(iter(batch.values())))
+        for start in range(0, rows, self.row_group_size):
+            self._write({name: column[start:start + self.row_group_size] for name, column in batch.items()})
+        self.rows_written += rows
+
+    def close(self):
+        """
+        残りの行を書き出してファイルを閉じる
+        """
+        if self._closed:
+            return
+        self.flush()
+        self._close()
+        self._closed = True
+
+    def _write(self, batch: Dict[str, np.ndarray]):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+
+class CSVMetricWriter(MetricWriter):
+    """
+    CSV形式のライター
+    """
+
+    def __init__(self, file_path: str, fields: Dict[str, type], row_group_size: int = 65536):
+        super().__init__(file_path, fields, row_group_size)
+        self._file = open(file_path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(list(self.fields))
+
+    def _write(self, batch: Dict[str, np.ndarray]):
+        self._writer.writerows(zip(*(column.tolist() for column in batch.values())))
+
+    def _close(self):
+        self._file.close()
+
+
+def _arrow_schema(fields: Dict[str, np.dtype]):
+    return pa.schema([(name, pa.from_numpy_dtype(dtype)) for name, dtype in fields.items()])
+
+
+def _record_batch(batch: Dict[str, np.ndarray], schema):
+    return pa.RecordBatch.from_arrays([pa.array(column) for column in batch.values()], schema=schema)
+
+
+class ParquetMetricWriter(MetricWriter):
+    """
+    Parquet形式のライター（row_group_size 行ごとに1つの行グループとして書き出す）
+    """
+
+    def __init__(self, file_path: str, fields: Dict[str, type], row_group_size: int = 65536, compression: str = "zstd"):
+        if pq is None:
+            raise ImportError("pyarrow is required for Parquet export")
+        super().__init__(file_path, fields, row_group_size)
+        self._schema = _arrow_schema(self.fields)
+        self._writer = pq.ParquetWriter(file_path, self._schema, compression=compression)
+
+    def _write(self, batch: Dict[str, np.ndarray]):
+        table = pa.Table.from_batches([_record_batch(batch, self._schema)])
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+
+    def _close(self):
+        self._writer.close()
+
+
+class ArrowIPCMetricWriter(MetricWriter):
+    """
+    Arrow IPC ファイル形式（Feather V2）のライター
+    """
+
+    def __init__(self, file_path: str, fields: Dict[str, type], row_group_size: int = 65536, compression: Optional[str] = None):
+        if pa is None:
+            raise ImportError("pyarrow is required for Arrow IPC export")
+        super().__init__(file_path, fields, row_group_size)
+        self._schema = _arrow_schema(self.fields)
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+        self._sink = pa.OSFile(file_path, 'wb')
+        self._writer = pa.ipc.new_file(self._sink, self._schema, options=options)
+
+    def _write(self, batch: Dict[str, np.ndarray]):
+        self._writer.write_batch(_record_batch(batch, self._schema))
+
+    def _close(self):
+        self._writer.close()
+        self._sink.close()
+
+
+class HDF5MetricWriter(MetricWriter):
+    """
+    HDF5形式のライター（列ごとに拡張可能なデータセットとして書き出す）
+    """
+
+    def __init__(self, file_path: str, fields: Dict[str, type], row_group_size: int = 65536,
+                 compression: Optional[str] = "gzip", group: str = "metrics"):
+        if h5py is None:
+            raise ImportError("h5py is required for HDF5 export")
+        super().__init__(file_path, fields, row_group_size)
+        self._file = h5py.File(file_path, 'w')
+        target = self._file.require_group(group)
+        self._datasets = {
+            name: target.create_dataset(name, shape=(0,), maxshape=(None,), dtype=dtype,
+                                        chunks=(row_group_size,), compression=compression)
+            for name, dtype in self.fields.items()
+        }
+
+    def _write(self, batch: Dict[str, np.ndarray]):
+        for name, column in batch.items():
+            dataset = self._datasets[name]
+            start = dataset.shape[0]
+            dataset.resize((start + len(column),))
+            dataset[start:] = column
+
+    def _close(self):
+        self._file.close()
+
+
+WRITER_TYPES = {
+    "csv": CSVMetricWriter,
+    "parquet": ParquetMetricWriter,
+    "arrow": ArrowIPCMetricWriter,
+    "feather": ArrowIPCMetricWriter,
+    "hdf5": HDF5MetricWriter,
+}
+
+
+def create_writer(format: str, file_path: str, fields: Dict[str, type], columns: Optional[Sequence[str]] = None,
+                  **options) -> MetricWriter:
+    """
+    形式に応じたライターを生成
+
+    Args:
+        format (str): 出力形式（"csv", "parquet", "arrow", "feather", "hdf5"）
+        file_path (str): 出力ファイルのパス
+        fields (Dict[str, type]): 列名と型
+        columns (Optional[Sequence[str]], optional): 出力する列名（指定がない場合は全列）
+        **options: ライターのコンストラクタ引数（row_group_size, compression など）
+
+    Returns:
+        MetricWriter: ライター
+    """
+    if format not in WRITER_TYPES:
+        raise ValueError(f"Unsupported format: {format}")
+    if columns is not None:
+        unknown = [name for name in columns if name not in fields]
+        if unknown:
+            raise ValueError(f"Unknown columns: {unknown}")
+        fields = {name: fields[name] for name in columns}
+    return WRITER_TYPES[format](file_path, fields, **options)
+
+
+def metric_columns(metrics, fields: Dict[str, type]) -> Dict[str, np.ndarray]:
+    """
+    メトリクスを列ごとの配列に変換（MetricSeries の場合はコピーなし）
+
+    Args:
+        metrics: MetricSeries、または FlowMetric / NetworkMetric のリスト
+        fields (Dict[str, type]): 列名と型
+
+    Returns:
+        Dict[str, np.ndarray]: 列名をキーとする列の配列
+    """
+    if hasattr(metrics, 'columns'):
+        return metrics.columns()
+    return {name: np.array([getattr(metric, name) for metric in metrics], dtype=dtype) for name, dtype in fields.items()}
+
 
 class DataExporter:
     """
     データエクスポートクラス
+
+    Attributes:
+        streams (List): 実行中に書き出している (時系列, ライター) の組
     """
 
-    def export_simulation_data(self, flow_metrics: List[FlowMetric], network_metrics: List[NetworkMetric], format: str, file_path: str):
+    def __init__(self):
+        self.streams: List = []
+
+    def export_simulation_data(self, flow_metrics: List[FlowMetric], network_metrics: List[NetworkMetric], format: str, file_path: str,
+                               columns: Optional[Sequence[str]] = None, **options):
         """
         シミュレーションデータを指定された形式でエクスポート
 
         Args:
-            flow_metrics (List[FlowMetric]): フローメトリクスのリスト
-            network_metrics (List[NetworkMetric]): ネットワークメトリクスのリスト
-            format (str): エクスポート形式（"csv", "json" など）
-            file_path (str): ファイルパス
+            flow_metrics (List[FlowMetric]): フローメトリクス（リストまたは MetricSeries）
+            network_metrics (List[NetworkMetric]): ネットワークメトリクス（リストまたは MetricSeries）
+            format (str): エクスポート形式（"csv", "parquet", "arrow", "feather", "hdf5"）
+            file_path (str): ファイルパス（"_flow_metrics" などと拡張子が付加される）
+            columns (Optional[Sequence[str]], optional): 出力する列名（各メトリクスに存在する列のみ適用）
+            **options: ライターのオプション（row_group_size, compression など）
         """
-        if format == "csv":
-            self._export_csv(flow_metrics, network_metrics, file_path)
-        else:
+        if format not in WRITER_TYPES:
             print(f"Unsupported format: {format}")
+            return
+        for suffix, metrics, fields in (("_flow_metrics", flow_metrics, FLOW_METRIC_FIELDS),
+                                        ("_network_metrics", network_metrics, NETWORK_METRIC_FIELDS)):
+            selected = [name for name in columns if name in fields] if columns is not None else None
+            with create_writer(format, file_path + suffix + FORMAT_EXTENSIONS[format], fields, selected, **options) as writer:
+                writer.write_batch(metric_columns(metrics, fields))
 
-    def _export_csv(self, flow_metrics: List[FlowMetric], network_metrics: List[NetworkMetric], file_path: str):
+    def stream_metrics(self, metrics_collector, format: str, file_path: str, columns: Optional[Sequence[str]] = None,
+                       batch_rows: int = 10000, **options):
         """
-        CSV形式でエクスポート
+        メトリクスを実行中に batch_rows 行ごとに書き出すよう設定
+
+        シミュレーション終了後に close_streams を呼び出すこと。
 
         Args:
-            flow_metrics (List[FlowMetric]): フローメトリクスのリスト
-            network_metrics (List[NetworkMetric]): ネットワークメトリクスのリスト
-            file_path (str): ファイルパス
-        """
-        with open(file_path + '_flow_metrics.csv', 'w', newline='') as csvfile:
-            fieldnames = ['timestamp', 'flow_id', 'throughput', 'delay', 'packet_loss_rate', 'jitter']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for fm in flow_metrics:
-                writer.writerow({
-                    'timestamp': fm.timestamp,
-                    'flow_id': fm.flow_id,
-                    'throughput': fm.throughput,
-                    'delay': fm.delay,
-                    'packet_loss_rate': fm.packet_loss_rate,
-                    'jitter': fm.jitter
-                })
-
-        with open(file_path + '_network_metrics.csv', 'w', newline='') as csvfile:
-            fieldnames = ['timestamp', 'average_throughput', 'average_delay', 'average_packet_loss_rate', 'average_jitter']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for nm in network_metrics:
-                writer.writerow({
-                    'timestamp': nm.timestamp,
-                    'average_throughput': nm.average_throughput,
-                    'average_delay': nm.average_delay,
-                    'average_packet_loss_rate': nm.average_packet_loss_rate,
-                    'average_jitter': nm.average_jitter
-                })
+            metrics_collector (MetricsCollector): メトリクスコレクタ
+            format (str): 出力形式
+            file_path (str): ファイルパス（"_flow_metrics" などと拡張子が付加される）
+            columns (Optional[Sequence[str]], optional): 出力する列名
+            batch_rows (int, optional): 時系列から書き出す行数の単位
+            **options: ライターのオプション（row_group_size, compression など）
+        """
+        for suffix, series, fields in (("_flow_metrics", metrics_collector.flow_metrics, FLOW_METRIC_FIELDS),
+                                       ("_network_metrics", metrics_collector.network_metrics, NETWORK_METRIC_FIELDS)):
+            selected = [name for name in columns if name in fields] if columns is not None else None
+            writer = create_writer(format, file_path + suffix + FORMAT_EXTENSIONS[format], fields, selected, **options)
+            series.attach_sink(writer, batch_rows)
+            self.streams.append((series, writer))
+
+    def close_streams(self):
+        """
+        書き出していない行を書き出してファイルを閉じる
+        """
+        for series, writer in self.streams:
+            series.detach_sink()
+            writer.close()
+        self.streams = []
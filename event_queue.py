@@ -0,0 +1,556 @@
+# event_queue.py
+
+import heapq
+import math
+from bisect import insort
+from itertools import count
+from typing import Callable, List, Optional, Tuple
+
+# キューの要素は (イベント時刻, シーケンス番号, コールバック) のタプル。
+# シーケンス番号は単調増加で一意なため、比較はC実装のタプル比較で完結し、
+# コールバック同士が比較されることはない。同時刻のイベントはスケジュール順に取り出される。
+QueueEntry = Tuple[float, int, Callable]
+
+
+class EventQueue:
+    """
+    イベントキューの基底クラス
+
+    サブクラスは _push_entry, pop, peek, __len__ を実装する。
+
+    Attributes:
+        heap_operations (int): 二分ヒープへの挿入・取り出しの回数（ヒープを使わない実装では0）
+    """
+
+    def __init__(self):
+        self._sequence = count()
+        self.heap_operations = 0
+
+    def push(self, event_time: float, callback: Callable) -> int:
+        """
+        イベントを追加
+
+        Args:
+            event_time (float): イベント時刻
+            callback (Callable): 実行する関数
+
+        Returns:
+            int: 割り当てられたシーケンス番号
+        """
+        seq = next(self._sequence)
+        self._push_entry((event_time, seq, callback))
+        return seq
+
+    def push_keyed(self, event_time: float, key: tuple, callback: Callable):
+        """
+        シーケンス番号の代わりに呼び出し側が決めたキーでイベントを追加
+
+        同時刻のイベントはキーの順に取り出される。キーはタプルで一意でなければならず、
+        1つのキューで push と混在させてはならない（整数とタプルは比較できない）。
+
+        Args:
+            event_time (float): イベント時刻
+            key (tuple): 同時刻のイベントの順序を決めるキー
+            callback (Callable): 実行する関数
+        """
+        self._push_entry((event_time, key, callback))
+
+    def _push_entry(self, entry: QueueEntry):
+        raise NotImplementedError
+
+    def pop(self) -> QueueEntry:
+        """
+        最も早いイベントを取り出す
+
+        Returns:
+            QueueEntry: (イベント時刻, シーケンス番号, コールバック)
+
+        Raises:
+            IndexError: キューが空の場合
+        """
+        raise NotImplementedError
+
+    def peek(self) -> Optional[QueueEntry]:
+        """
+        最も早いイベントを取り出さずに参照
+
+        Returns:
+            Optional[QueueEntry]: 先頭のイベント、キューが空の場合None
+        """
+        raise NotImplementedError
+
+    def peek_time(self) -> float:
+        """
+        先頭イベントの時刻を取得
+
+        Returns:
+            float: 先頭イベントの時刻、キューが空の場合は無限大
+        """
+        entry = self.peek()
+        return entry[0] if entry is not None else math.inf
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class HeapEventQueue(EventQueue):
+    """
+    二分ヒープによるイベントキュー
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._heap: List[QueueEntry] = []
+
+    def _push_entry(self, entry: QueueEntry):
+        self.heap_operations += 1
+        heapq.heappush(self._heap, entry)
+
+    def pop(self) -> QueueEntry:
+        entry = heapq.heappop(self._heap)
+        self.heap_operations += 1
+        return entry
+
+    def peek(self) -> Optional[QueueEntry]:
+        return self._heap[0] if self._heap else None
+
+    def peek_time(self) -> float:
+        return self._heap[0][0] if self._heap else math.inf
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class CalendarEventQueue(EventQueue):
+    """
+    カレンダーキュー（Brown, 1988）
+
+    時刻を幅 bucket_width の「日」に分割し、日番号をバケット数で割った余りのバケットに格納する。
+    要素数に応じてバケット数と幅を自動調整する。
+
+    Attributes:
+        bucket_count (int): バケット数
+        bucket_width (float): バケット幅（シミュレーション時間）
+    """
+
+    MIN_BUCKETS = 2
+    SAMPLE_SIZE = 25
+
+    def __init__(self, bucket_count: int = 2, bucket_width: float = 1.0):
+        """
+        Args:
+            bucket_count (int, optional): 初期バケット数
+            bucket_width (float, optional): 初期バケット幅
+        """
+        super().__init__()
+        self._size = 0
+        self._setup(max(bucket_count, self.MIN_BUCKETS), bucket_width, 0)
+
+    def _setup(self, bucket_count: int, bucket_width: float, current_day: int):
+        self.bucket_count = bucket_count
+        self.bucket_width = bucket_width
+        self._buckets: List[List[QueueEntry]] = [[] for _ in range(bucket_count)]
+        # 現在処理中の日番号（これより前の日のイベントは全て取り出し済み）
+        self._current_day = current_day
+
+    def _day(self, event_time: float) -> int:
+        return math.floor(event_time / self.bucket_width)
+
+    def _push_entry(self, entry: QueueEntry):
+        day = self._day(entry[0])
+        if day < self._current_day:
+            # 過去時刻のイベントにも対応できるよう走査位置を戻す
+            self._current_day = day
+        insort(self._buckets[day % self.bucket_count], entry)
+        self._size += 1
+        if self._size > 2 * self.bucket_count:
+            self._resize(2 * self.bucket_count)
+
+    def _locate(self) -> List[QueueEntry]:
+        """
+        最も早いイベントを含むバケットを探し、走査位置をそのイベントの日に合わせる
+        """
+        if self._size == 0:
+            raise IndexError("pop from empty event queue")
+        buckets = self._buckets
+        bucket_count = self.bucket_count
+        day = self._current_day
+        for _ in range(bucket_count):
+            bucket = buckets[day % bucket_count]
+            if bucket and self._day(bucket[0][0]) <= day:
+                self._current_day = day
+                return bucket
+            day += 1
+        # 1周して見つからない場合は全バケットの先頭から直接探す
+        bucket = min((b for b in buckets if b), key=lambda b: b[0])
+        self._current_day = self._day(bucket[0][0])
+        return bucket
+
+    def pop(self) -> QueueEntry:
+        entry = self._locate().pop(0)
+        self._size -= 1
+        if self.bucket_count > self.MIN_BUCKETS and self._size < self.bucket_count // 2:
+            self._resize(self.bucket_count // 2)
+        return entry
+
+    def peek(self) -> Optional[QueueEntry]:
+        if self._size == 0:
+            return None
+        return self._locate()[0]
+
+    def _resize(self, bucket_count: int):
+        entries = sorted(entry for bucket in self._buckets for entry in bucket)
+        width = self._estimate_width(entries)
+        current_time = entries[0][0] if entries else self._current_day * self.bucket_width
+        self._setup(bucket_count, width, math.floor(current_time / width))
+        for entry in entries:
+            self._buckets[self._day(entry[0]) % bucket_count].append(entry)
+
+    def _estimate_width(self, entries: List[QueueEntry]) -> float:
+        """
+        先頭付近のイベント間隔の平均からバケット幅を推定
+        """
+        sample = [entry[0] for entry in entries[:self.SAMPLE_SIZE]]
+        gaps = [b - a for a, b in zip(sample, sample[1:]) if b > a]
+        if not gaps:
+            return self.bucket_width
+        return 3.0 * sum(gaps) / len(gaps)
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class _Rung:
+    """
+    ラダーキューの1段分のバケット列
+
+    範囲は [start, end)。end は親のバケットの境界と同じ式で計算した値を受け取り、
+    使い切った段の current_start() を end と一致させる。
+    """
+
+    __slots__ = ("start", "width", "end", "buckets", "current")
+
+    def __init__(self, start: float, width: float, bucket_count: int, end: float):
+        self.start = start
+        self.width = width
+        self.end = end
+        self.buckets: List[List[QueueEntry]] = [[] for _ in range(bucket_count)]
+        self.current = 0  # 次に取り出すバケットの位置
+
+    def current_start(self) -> float:
+        if self.current == len(self.buckets):
+            return self.end
+        return self.start + self.current * self.width
+
+    def add(self, entry: QueueEntry):
+        # 呼び出し側は current_start() <= 時刻 < end を保証するため、バケット current 以降は未処理。
+        # 浮動小数点誤差で範囲外の位置になった場合のみ、未処理の端のバケットに寄せる
+        index = int((entry[0] - self.start) / self.width)
+        index = min(max(index, self.current), len(self.buckets) - 1)
+        self.buckets[index].append(entry)
+
+
+class LadderEventQueue(EventQueue):
+    """
+    ラダーキュー（Tang, Goh and Thng, 2005）
+
+    未ソートの Top、段ごとに細かくなるバケット列の Rungs、ソート済みの Bottom の3層で構成する。
+    イベントは必要になった段階でのみソートされる。
+
+    Attributes:
+        threshold (int): バケットを Bottom に移すか、さらに細かい段に分割するかの閾値
+        max_rungs (int): 段数の上限
+    """
+
+    def __init__(self, threshold: int = 50, max_rungs: int = 8):
+        """
+        Args:
+            threshold (int, optional): バケット分割の閾値
+            max_rungs (int, optional): 段数の上限
+        """
+        super().__init__()
+        self.threshold = threshold
+        self.max_rungs = max_rungs
+        self._top: List[QueueEntry] = []
+        self._top_start = -math.inf
+        self._top_min = math.inf
+        self._top_max = -math.inf
+        self._rungs: List[_Rung] = []
+        self._bottom: List[QueueEntry] = []
+        self._size = 0
+
+    def _push_entry(self, entry: QueueEntry):
+        event_time = entry[0]
+        self._size += 1
+        # 最上段の範囲（_top_start 未満）を超えるイベントは Top に入れる
+        if event_time >= self._top_start:
+            self._top.append(entry)
+            if event_time < self._top_min:
+                self._top_min = event_time
+            if event_time > self._top_max:
+                self._top_max = event_time
+            return
+        for rung in self._rungs:
+            if event_time >= rung.current_start():
+                rung.add(entry)
+                return
+        insort(self._bottom, entry)
+
+    def _refill_bottom(self):
+        """
+        Bottom が空の場合に、最も早いバケットをソートして Bottom に移す
+        """
+        while not self._bottom:
+            if not self._rungs:
+                if not self._top:
+                    raise IndexError("pop from empty event queue")
+                self._rung_from_top()
+                continue
+            rung = self._rungs[-1]
+            buckets = rung.buckets
+            while rung.current < len(buckets) and not buckets[rung.current]:
+                rung.current += 1
+            if rung.current == len(buckets):
+                self._rungs.pop()
+                continue
+            index = rung.current
+            bucket = buckets[index]
+            buckets[index] = []
+            rung.current += 1
+            if len(bucket) > self.threshold and len(self._rungs) < self.max_rungs:
+                low = min(entry[0] for entry in bucket)
+                high = max(entry[0] for entry in bucket)
+                if high > low:
+                    child = _Rung(rung.start + index * rung.width, rung.width / self.threshold, self.threshold,
+                                  rung.current_start())
+                    for entry in bucket:
+                        child.add(entry)
+                    self._rungs.append(child)
+                    continue
+            bucket.sort()
+            self._bottom = bucket
+
+    def _rung_from_top(self):
+        top = self._top
+        low, high = self._top_min, self._top_max
+        self._top = []
+        self._top_min = math.inf
+        self._top_max = -math.inf
+        if high == low:
+            # 全て同時刻の場合は分割せずにそのまま Bottom へ
+            top.sort()
+            self._bottom = top
+            self._top_start = high
+            return
+        width = (high - low) / len(top)
+        rung = _Rung(low, width, len(top) + 1, low + width * (len(top) + 1))
+        for entry in top:
+            rung.add(entry)
+        self._rungs.append(rung)
+        self._top_start = rung.end
+
+    def pop(self) -> QueueEntry:
+        if not self._bottom:
+            self._refill_bottom()
+        self._size -= 1
+        return self._bottom.pop(0)
+
+    def peek(self) -> Optional[QueueEntry]:
+        if self._size == 0:
+            return None
+        if not self._bottom:
+            self._refill_bottom()
+        return self._bottom[0]
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class TimerWheelEventQueue(EventQueue):
+    """
+    階層型タイマーホイール（Varghese and Lauck, 1987）
+
+    時刻を幅 tick の刻みに分け、刻み番号で slot_count 個のスロットを持つホイールに格納する。
+    段 l のスロットは slot_count ** l 刻み分を表し、現在の刻みに近づいた段のスロットを下の段に移す（カスケード）。
+    全段の範囲（tick * slot_count ** levels）より先のイベントのみ二分ヒープに格納するため、
+    リンク遅延のような近い将来のイベントはヒープ操作なしで挿入・取り出しできる。
+    同じ刻みのイベントは取り出す直前にソートするため、取り出し順は二分ヒープと同じになる。
+
+    Attributes:
+        tick (float): 1刻みの幅（シミュレーション時間）
+        slot_count (int): 1段あたりのスロット数
+        levels (int): 段数
+    """
+
+    def __init__(self, tick: float = 1e-4, slot_count: int = 256, levels: int = 3):
+        """
+        Args:
+            tick (float, optional): 1刻みの幅（リンク遅延より十分小さい値）
+            slot_count (int, optional): 1段あたりのスロット数
+            levels (int, optional): 段数
+        """
+        if tick <= 0 or slot_count < 2 or levels < 1:
+            raise ValueError("tick must be positive, slot_count at least 2 and levels at least 1")
+        super().__init__()
+        self.tick = tick
+        self.slot_count = slot_count
+        self.levels = levels
+        self._spans = [slot_count ** level for level in range(levels + 1)]
+        self._wheels: List[List[List[QueueEntry]]] = [[[] for _ in range(slot_count)] for _ in range(levels)]
+        self._wheel_sizes = [0] * levels
+        self._overflow: List[Tuple[int, QueueEntry]] = []  # (刻み番号, エントリ) の二分ヒープ
+        # 刻み番号が _now より前のイベントは _ready に時刻順に並べ、_ready_index から取り出す
+        self._now = 0
+        self._level0_end = slot_count  # 段 0 が表す範囲の終わりの刻み番号
+        self._ready: List[QueueEntry] = []
+        self._ready_index = 0
+        self._size = 0
+
+    def _tick_of(self, event_time: float) -> int:
+        return math.floor(event_time / self.tick)
+
+    def _push_entry(self, entry: QueueEntry):
+        self._size += 1
+        tick = math.floor(entry[0] / self.tick)
+        if tick < self._now:
+            insort(self._ready, entry, self._ready_index)
+        elif tick < self._level0_end:
+            self._wheels[0][tick % self.slot_count].append(entry)
+            self._wheel_sizes[0] += 1
+        else:
+            self._place(tick, entry)
+
+    def _set_now(self, tick: int):
+        self._now = tick
+        self._level0_end = (tick // self.slot_count + 1) * self.slot_count
+
+    def _place(self, tick: int, entry: QueueEntry):
+        """
+        刻み番号 tick（_now 以上）のエントリを、現在の刻みと同じブロックに入る最も下の段に格納
+        """
+        now = self._now
+        spans = self._spans
+        for level in range(self.levels):
+            if tick // spans[level + 1] == now // spans[level + 1]:
+                self._wheels[level][(tick // spans[level]) % self.slot_count].append(entry)
+                self._wheel_sizes[level] += 1
+                return
+        self.heap_operations += 1
+        heapq.heappush(self._overflow, (tick, entry))
+
+    def _advance(self):
+        """
+        _ready が空の場合に、次にイベントのある刻みまで進めてそのスロットを _ready に移す
+        """
+        if self._size == 0:
+            raise IndexError("pop from empty event queue")
+        slot_count = self.slot_count
+        spans = self._spans
+        while self._ready_index == len(self._ready):
+            level = next((level for level, size in enumerate(self._wheel_sizes) if size), None)
+            if level is None:
+                # 全段が空の場合はヒープの先頭のブロックまで進め、そのブロックのイベントを各段に移す
+                span = spans[self.levels]
+                self._set_now(self._overflow[0][0] // span * span)
+                while self._overflow and self._overflow[0][0] // span == self._now // span:
+                    tick, entry = heapq.heappop(self._overflow)
+                    self.heap_operations += 1
+                    self._place(tick, entry)
+                continue
+            wheel = self._wheels[level]
+            span = spans[level]
+            index = (self._now // span) % slot_count
+            # 段 0 は現在の刻み、それより上の段は現在の刻みを含むスロットより後のスロットから探す
+            if level > 0:
+                index += 1
+            while not wheel[index]:
+                index += 1
+            bucket = wheel[index]
+            wheel[index] = []
+            self._wheel_sizes[level] -= len(bucket)
+            block = self._now // spans[level + 1] * spans[level + 1]
+            if level == 0:
+                bucket.sort()
+                self._ready = bucket
+                self._ready_index = 0
+                self._set_now(block + index + 1)
+                if self._now % spans[1] == 0:
+                    self._cascade()
+            else:
+                # 上の段のスロットの先頭まで進め、そのスロットのイベントを下の段に移す
+                self._set_now(block + index * span)
+                for entry in bucket:
+                    self._place(self._tick_of(entry[0]), entry)
+
+    def _cascade(self):
+        """
+        _now が下の段の1周分を終えた時点で、上の段の該当するスロットを下の段に移す
+        """
+        slot_count = self.slot_count
+        spans = self._spans
+        for level in range(1, self.levels):
+            if self._now % spans[level] != 0:
+                break
+            index = (self._now // spans[level]) % slot_count
+            bucket = self._wheels[level][index]
+            if bucket:
+                self._wheels[level][index] = []
+                self._wheel_sizes[level] -= len(bucket)
+                for entry in bucket:
+                    self._place(self._tick_of(entry[0]), entry)
+        if self._now % spans[self.levels] == 0:
+            span = spans[self.levels]
+            while self._overflow and self._overflow[0][0] // span == self._now // span:
+                tick, entry = heapq.heappop(self._overflow)
+                self.heap_operations += 1
+                self._place(tick, entry)
+
+    def pop(self) -> QueueEntry:
+        if self._ready_index == len(self._ready):
+            self._advance()
+        entry = self._ready[self._ready_index]
+        self._ready_index += 1
+        self._size -= 1
+        return entry
+
+    def peek(self) -> Optional[QueueEntry]:
+        if self._size == 0:
+            return None
+        if self._ready_index == len(self._ready):
+            self._advance()
+        return self._ready[self._ready_index]
+
+    def peek_time(self) -> float:
+        if self._ready_index < len(self._ready):
+            return self._ready[self._ready_index][0]
+        entry = self.peek()
+        return entry[0] if entry is not None else math.inf
+
+    def __len__(self) -> int:
+        return self._size
+
+
+EVENT_QUEUE_TYPES = {
+    "heap": HeapEventQueue,
+    "calendar": CalendarEventQueue,
+    "ladder": LadderEventQueue,
+    "wheel": TimerWheelEventQueue,
+}
+
+
+def create_event_queue(queue_type: str = "heap", **kwargs) -> EventQueue:
+    """
+    種類を指定してイベントキューを生成
+
+    Args:
+        queue_type (str, optional): "heap", "calendar", "ladder", "wheel" のいずれか（デフォルトは "heap"）
+        **kwargs: 各キューのコンストラクタに渡す引数
+
+    Returns:
+        EventQueue: イベントキュー
+    """
+    try:
+        queue_class = EVENT_QUEUE_TYPES[queue_type]
+    except KeyError:
+        raise ValueError(f"Unknown event queue: {queue_type}")
+    return queue_class(**kwargs)
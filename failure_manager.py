@@ -106,7 +106,7 @@ class FailureManager:
         elif failure_event.element_type == "link":
             link = self.topology_manager.get_link(failure_event.element_id)
             if link:
-                link.fail_link(failure_event.duration)
+                link.fail_link(failure_event.duration, self.simulation_engine.current_time)
                 self.central_controller.notify_failure("link", link.link_id)
                 # 復旧イベントをスケジュール
                 recovery_time = self.simulation_engine.current_time + failure_event.duration
@@ -124,9 +124,9 @@ class FailureManager:
             node = self.topology_manager.get_node(element_id)
             if node:
                 node.recover_node()
-                self.central_controller.update_network_state()
+                self.central_controller.notify_recovery("node", node.node_id)
         elif element_type == "link":
             link = self.topology_manager.get_link(element_id)
             if link:
                 link.recover_link()
-                self.central_controller.update_network_state()
+                self.central_controller.notify_recovery("link", link.link_id)
@@ -1,8 +1,11 @@
 # flow.py
 
-from typing import List
+from typing import Optional, Sequence
 from packet import Packet
 
+# フローのシミュレーションの粒度（"packet": パケット単位、"fluid": 流体モデル）
+FIDELITIES = ("packet", "fluid")
+
 class Flow:
     """
     フロークラス
@@ -14,11 +17,14 @@ class Flow:
         packet_count (int): パケット数
         source_node (int): 送信元ノードID
         destination_node (int): 送信先ノードID
-        packets (List[Packet]): パケットのリスト
+        packets (Sequence[Packet]): パケットのシーケンス（PacketManager が生成した PacketHandle の範囲）
         status (str): フローの状態（"active", "completed", "failed"）
+        fidelity (Optional[str]): シミュレーションの粒度（"packet" または "fluid"、指定がない場合はFlowManagerが決める）
+        scheduled_start (Optional[float]): シナリオで指定された開始時刻（指定がない場合はFlowManagerが決める）
     """
 
-    def __init__(self, flow_id: int, service_type: str, flow_size: int, source_node: int, destination_node: int):
+    def __init__(self, flow_id: int, service_type: str, flow_size: int, source_node: int, destination_node: int,
+                 fidelity: Optional[str] = None, start_time: Optional[float] = None):
         """
         フローの初期化
 
@@ -28,13 +34,19 @@ class Flow:
             flow_size (int): フローサイズ（バイト）
             source_node (int): 送信元ノードID
             destination_node (int): 送信先ノードID
+            fidelity (Optional[str], optional): シミュレーションの粒度（"packet" または "fluid"）
+            start_time (Optional[float], optional): 開始時刻
         """
+        if fidelity is not None and fidelity not in FIDELITIES:
+            raise ValueError(f"Unknown fidelity: {fidelity}")
         self.flow_id = flow_id
         self.service_type = service_type
         self.flow_size = flow_size
         self.packet_count = flow_size // 1500  # パケットサイズ1500バイト
         self.source_node = source_node
         self.destination_node = destination_node
-        self.packets: List[Packet] = []
+        self.packets: Sequence[Packet] = []
         self.status = "active"
-        self.start_time: float = 0.0  # フロー開始時間
+        self.start_time: float = 0.0 if start_time is None else start_time  # フロー開始時間
+        self.scheduled_start = start_time
+        self.fidelity = fidelity
@@ -1,10 +1,17 @@
 import random
-from typing import Optional, Dict, List
-import yaml
+from typing import Optional, Dict, List, Sequence, Union
+import yaml_loader
 from flow import Flow
 from topology_manager import TopologyManager
 from simulation_engine import SimulationEngine
 from packet_manager import PacketManager
+from fluid_model import FluidModel
+from traffic_source import TrafficSource, PacingModel, create_pacing, RANDOM_PACING_TYPES, DEFAULT_PACING_KEY
+from scenario_loader import ScenarioFeeder, iter_flows, stream_format
+
+# シミュレーションの粒度（"packet": パケット単位、"fluid": フロー単位の流体モデル、
+# "hybrid": フローごとにパケット単位か流体モデルかを選択）
+SIMULATION_MODES = ("packet", "fluid", "hybrid")
 
 
 class FlowManager:
@@ -18,9 +25,20 @@ class FlowManager:
 		central_controller (CentralController): 中央コントローラ
 		metrics_collector (MetricsCollector): メトリクスコレクタ
 		packet_manager (PacketManager): パケット管理クラスのインスタンス
+		simulation_mode (str): シミュレーションの粒度（"packet", "fluid", "hybrid"）
+		packet_service_types (Tuple[str, ...]): "hybrid" で粒度の指定がないフローをパケット単位で扱うサービスの種類
+		fluid_model (Optional[FluidModel]): 流体モデル（"fluid" または "hybrid" の場合のみ）
+		pacing (Optional[Dict[str, Union[str, Dict]]]): サービスの種類ごとのペーシングモデルの指定（"default" は指定のない種類に使用）。
+			None の場合は開始時に全パケットを生成する
+		pacing_seed (Optional[int]): ペーシングの乱数のシード。指定した場合はフローごとに独立した乱数列を使う
+			（None の場合はグローバルな random を使用）
+		traffic_sources (Dict[int, TrafficSource]): フローIDをキーとする送信元のトラフィック生成器
+		scenario_feeder (Optional[ScenarioFeeder]): stream_flows で逐次読み込むシナリオのフィーダ
 	"""
 
-	def __init__(self, topology_manager, simulation_engine, central_controller, metrics_collector):
+	def __init__(self, topology_manager, simulation_engine, central_controller, metrics_collector, simulation_mode: str = "packet",
+				 packet_service_types: Sequence[str] = ("voice",), link_model: str = "legacy",
+				 pacing: Optional[Dict[str, Union[str, Dict]]] = None):
 		"""
 		FlowManagerクラスのコンストラクタ。
 
@@ -29,7 +47,19 @@ class FlowManager:
 			simulation_engine (SimulationEngine): シミュレーションの時間管理を行うエンジン
 			central_controller (CentralController): ルーティングを管理する中央コントローラ
 			metrics_collector (MetricsCollector): シミュレーションメトリクスを収集するクラス
+			simulation_mode (str, optional): シミュレーションの粒度（"packet", "fluid", "hybrid"）
+			packet_service_types (Sequence[str], optional): "hybrid" で粒度の指定がないフローをパケット単位で扱うサービスの種類
+			link_model (str, optional): リンクの伝送モデル（"legacy" または "serialization"）
+			pacing (Optional[Dict[str, Union[str, Dict]]], optional): サービスの種類ごとのペーシングモデル
+				（例: {"voice": {"type": "cbr", "rate": 64000}, "default": "burst"}）。指定した場合はパケットを
+				送信元で逐次生成し、ペーシングモデルの間隔で送出する
 		"""
+		if simulation_mode not in SIMULATION_MODES:
+			raise ValueError(f"Unknown simulation mode: {simulation_mode}")
+		if pacing is not None:
+			# 設定の誤りをフローの開始前に検出する
+			for spec in pacing.values():
+				create_pacing(spec)
 		self.topology_manager = topology_manager
 		self.simulation_engine = simulation_engine
 		self.central_controller = central_controller
@@ -41,30 +71,56 @@ class FlowManager:
 			topology_manager=self.topology_manager,
 			simulation_engine=self.simulation_engine,
 			central_controller=self.central_controller,
-			metrics_collector=self.metrics_collector
+			metrics_collector=self.metrics_collector,
+			link_model=link_model
 		)
+		self.packet_manager.flow_manager = self
+
+		# 流体モデルの初期化（経路計算はPacketManagerの経路キャッシュを共有する）
+		self.simulation_mode = simulation_mode
+		self.packet_service_types = tuple(packet_service_types)
+		self.fluid_model: Optional[FluidModel] = None
+		self.pacing = pacing
+		self.pacing_seed: Optional[int] = None
+		self.traffic_sources: Dict[int, TrafficSource] = {}
+		self._sources_by_node: Dict[int, Dict[int, TrafficSource]] = {}
+		self.scenario_feeder: Optional[ScenarioFeeder] = None
+		if simulation_mode != "packet":
+			self.fluid_model = FluidModel(topology_manager, simulation_engine, self.packet_manager, metrics_collector)
+			if central_controller is not None:
+				central_controller.add_topology_listener(self.fluid_model)
 
 	def generate_flows(self, flow_scenario: Optional[str] = None):
 		"""
 		フローの生成。
 
 		YAMLファイルからフローを読み込むか、指定がない場合はランダムにフローを生成する。
+		WorkloadGenerator が出力したシナリオファイル（.npy または .parquet）と JSONL ファイルは先頭からチャンクごとに読み込む。
+		シナリオで開始時刻を指定したフローは schedule_flow_starts でその時刻に開始する。
 
 		Args:
-			flow_scenario (Optional[str]): フローシナリオYAMLファイルのパス。指定がない場合はランダム生成。
+			flow_scenario (Optional[str]): フローシナリオファイル（YAML、JSONL、.npy または .parquet）のパス。指定がない場合はランダム生成。
 		"""
 
-		if flow_scenario:
+		if flow_scenario and stream_format(flow_scenario) != "yaml":
+			loaded = 0
+			for flow in iter_flows(flow_scenario):
+				self.flows[flow.flow_id] = flow
+				loaded += 1
+			print(f"シナリオからフローを読み込み: {loaded} フロー ({flow_scenario})")
+		elif flow_scenario:
 			# YAMLファイルからフローを読み込む
 			with open(flow_scenario, 'r', encoding='utf-8') as file:
-				flow_data = yaml.safe_load(file)
+				flow_data = yaml_loader.safe_load(file)
 			for flow_info in flow_data.get('flows', []):
 				flow = Flow(
 					flow_id=flow_info['flow_id'],
 					service_type=flow_info['service_type'],
 					flow_size=flow_info['flow_size'],
 					source_node=flow_info['source_node'],
-					destination_node=flow_info['destination_node']
+					destination_node=flow_info['destination_node'],
+					fidelity=flow_info.get('fidelity'),
+					start_time=flow_info.get('start_time')
 				)
 				self.flows[flow.flow_id] = flow
 				print(f"ランダムフロー生成: {flow.flow_id}, "
@@ -91,6 +147,27 @@ class FlowManager:
 				f"送信元: {flow.source_node}, "
 				f"送信先: {flow.destination_node}")
 
+	def stream_flows(self, flow_scenario: str, simulation_engine: SimulationEngine, horizon: float = 1.0,
+					 chunk_size: int = 65536) -> ScenarioFeeder:
+		"""
+		シナリオのフローを開始時刻の順に逐次読み込み、先読み時間内に開始するフローだけをスケジュールする。
+
+		generate_flows と schedule_flow_starts の代わりに使用する。シナリオの全フローに start_time が必要で、
+		ファイル内のフローは start_time の昇順に並んでいる必要がある。
+
+		Args:
+			flow_scenario (str): フローシナリオファイル（YAML、JSONL、.npy または .parquet）のパス
+			simulation_engine (SimulationEngine): シミュレーションエンジン
+			horizon (float, optional): 先読み時間（秒）
+			chunk_size (int, optional): ファイルから1回に読み込む行数
+
+		Returns:
+			ScenarioFeeder: シナリオのフィーダ
+		"""
+		self.scenario_feeder = ScenarioFeeder(iter_flows(flow_scenario, chunk_size), self, simulation_engine, horizon)
+		self.scenario_feeder.start()
+		return self.scenario_feeder
+
 	def track_flow(self, flow_id: int):
 		"""
 		フローの状態を追跡し、必要に応じてログやメトリクスを記録する。
@@ -115,32 +192,103 @@ class FlowManager:
 		flow = self.flows.get(flow_id)
 		if flow:
 			flow.status = "completed"
-			# メトリクスの記録など
-			pass
+			if self.fluid_model is not None:
+				# パケット単位で扱っていたフローが確保していた帯域を流体フローに戻す
+				self.fluid_model.remove_foreground(flow_id)
+
+	def fidelity(self, flow: Flow) -> str:
+		"""
+		フローのシミュレーションの粒度を決定する。
+
+		"hybrid" ではフローに指定された粒度を優先し、指定がない場合は packet_service_types に
+		含まれるサービスの種類のフローをパケット単位、それ以外を流体モデルで扱う。
+
+		Args:
+			flow (Flow): フローオブジェクト
+
+		Returns:
+			str: "packet" または "fluid"
+		"""
+		if self.simulation_mode != "hybrid":
+			return self.simulation_mode
+		if flow.fidelity is not None:
+			return flow.fidelity
+		return "packet" if flow.service_type in self.packet_service_types else "fluid"
+
+	def pacing_model(self, flow: Flow) -> Optional[PacingModel]:
+		"""
+		フローのサービスの種類に対応するペーシングモデルを生成する。
+
+		Args:
+			flow (Flow): フローオブジェクト
+
+		Returns:
+			Optional[PacingModel]: ペーシングモデル（pacing を指定していない場合None）
+		"""
+		if self.pacing is None:
+			return None
+		return create_pacing(self.pacing.get(flow.service_type, self.pacing.get(DEFAULT_PACING_KEY, "burst")))
+
+	def sources_at(self, node_id: int) -> List[TrafficSource]:
+		"""
+		指定したノードを送信元とするトラフィック生成器を取得する。
+
+		Args:
+			node_id (int): ノードID
+
+		Returns:
+			List[TrafficSource]: トラフィック生成器のリスト
+		"""
+		sources = self._sources_by_node.get(node_id)
+		return list(sources.values()) if sources else []
+
+	def finalize_flows(self, timestamp: float):
+		"""
+		シミュレーション終了時点で流体モデルで転送中のフローのメトリクスを記録する。
+
+		Args:
+			timestamp (float): 終了時刻
+		"""
+		if self.fluid_model is not None:
+			self.fluid_model.finalize(timestamp)
 
 	def schedule_flow_starts(self, simulation_engine: SimulationEngine):
 		"""
 		フロー開始イベントをシミュレーションエンジンにスケジュールする。
 
-		フローの開始時間をランダムに決定し、その時間にイベントをスケジュールする。
+		シナリオで開始時刻を指定したフローはその時刻に、それ以外のフローは開始時間をランダムに決定し、その時間にイベントをスケジュールする。
 
 		Args:
 			simulation_engine (SimulationEngine): シミュレーションエンジン。イベントをスケジュールするために使用。
 		"""
 		for flow in self.flows.values():
-			start_time = random.uniform(0, simulation_engine.simulation_end_time / 2)
+			start_time = flow.scheduled_start
+			if start_time is None:
+				start_time = random.uniform(0, simulation_engine.simulation_end_time / 2)
 			flow.start_time = start_time
-			simulation_engine.schedule_event(start_time, lambda f=flow: self.start_flow(f))
+			simulation_engine.schedule_event(start_time, lambda f=flow: self.start_flow(f), owner=flow.source_node)
 
 	def start_flow(self, flow: Flow):
 		"""
 		指定されたフローの送信を開始する。
 
 		フローに含まれるパケットを生成し、最初のパケットを送信する。
+		pacing を指定した場合はトラフィック生成器がパケットを逐次生成し、ペーシングモデルの間隔で全パケットを送信する。
+		流体モデルで扱うフローはパケットを生成せず、流体モデルでフローの転送を開始する。
+		"hybrid" でパケット単位で扱うフローは、流体フローとの帯域の計算にも加える。
 
 		Args:
 			flow (Flow): 送信を開始するフローオブジェクト
 		"""
+		if self.fluid_model is not None:
+			if self.fidelity(flow) == "fluid":
+				self.fluid_model.start_flow(flow)
+				return
+			self.fluid_model.add_foreground(flow)
+		pacing = self.pacing_model(flow)
+		if pacing is not None:
+			self._start_traffic_source(flow, pacing)
+			return
 		# パケットを生成
 		packets = self.packet_manager.create_packets(flow)
 		# 最初のパケットを送信
@@ -151,4 +299,21 @@ class FlowManager:
 				print(f"Starting flow {flow.flow_id} from node {flow.source_node}")
 				self.packet_manager.send_packet(first_packet, source_node)
 			else:
-				print(f"Source node {flow.source_node} not found for flow {flow.flow_id}")
\ No newline at end of file
+				print(f"Source node {flow.source_node} not found for flow {flow.flow_id}")
+
+	def _start_traffic_source(self, flow: Flow, pacing: PacingModel):
+		"""
+		フローのトラフィック生成器を作成し、送出を開始する。
+		"""
+		if self.topology_manager.get_node(flow.source_node) is None:
+			print(f"Source node {flow.source_node} not found for flow {flow.flow_id}")
+			return
+		rng = random
+		if self.pacing_seed is not None and isinstance(pacing, RANDOM_PACING_TYPES):
+			# フローが所有する乱数列（文字列のシードは実行ごとに同じ値に変換される）
+			rng = random.Random(f"{self.pacing_seed}:{flow.flow_id}")
+		source = TrafficSource(flow, pacing, self.packet_manager, self.simulation_engine, rng)
+		self.traffic_sources[flow.flow_id] = source
+		self._sources_by_node.setdefault(flow.source_node, {})[flow.flow_id] = source
+		print(f"Starting flow {flow.flow_id} from node {flow.source_node}")
+		source.start()
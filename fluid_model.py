@@ -0,0 +1,326 @@
+# fluid_model.py
+
+from collections import defaultdict
+from typing import Dict, Hashable, List, Sequence
+
+from flow import Flow
+
+# 残りバイト数がこの値以下になったフローは完了とみなす（浮動小数点の丸め誤差対策）
+COMPLETION_TOLERANCE = 1e-6
+
+# 遅延の計算に用いるパケットサイズ（バイト）
+PACKET_SIZE = 1500
+
+
+def max_min_fair_share(flow_links: Dict[Hashable, Sequence[int]], capacities: Dict[int, float]) -> Dict[Hashable, float]:
+    """
+    max-min 公平な帯域割り当てを計算（progressive filling）
+
+    残り容量を未確定のフロー数で割った値が最小のリンクをボトルネックとし、
+    そのリンクを通る未確定のフローの帯域を確定する操作を繰り返す。
+
+    Args:
+        flow_links (Dict[Hashable, Sequence[int]]): フローのキーをキーとする経路上のリンクIDのリスト
+        capacities (Dict[int, float]): リンクIDをキーとする容量（bps）
+
+    Returns:
+        Dict[Hashable, float]: フローのキーをキーとする割り当て帯域（bps）。リンクを通らないフローは含まない
+    """
+    users: Dict[int, set] = defaultdict(set)
+    for key, links in flow_links.items():
+        for link_id in links:
+            users[link_id].add(key)
+    remaining = {link_id: capacities[link_id] for link_id in users}
+    rates: Dict[Hashable, float] = {}
+    while users:
+        share, bottleneck = min((remaining[link_id] / len(keys), link_id) for link_id, keys in users.items())
+        share = max(share, 0.0)
+        for key in list(users[bottleneck]):
+            rates[key] = share
+            for link_id in set(flow_links[key]):
+                remaining[link_id] -= share
+                flows = users[link_id]
+                flows.discard(key)
+                if not flows:
+                    del users[link_id]
+    return rates
+
+
+class FluidFlowState:
+    """
+    流体モデルで転送中のフローの状態
+
+    Attributes:
+        flow (Flow): フローオブジェクト
+        route (List[int]): 経路上のノードIDリスト
+        links (List[int]): 経路上のリンクIDリスト
+        remaining_bytes (float): 未転送のバイト数
+        rate (float): 現在の割り当て帯域（bps）
+    """
+
+    __slots__ = ("flow", "route", "links", "remaining_bytes", "rate")
+
+    def __init__(self, flow: Flow, route: List[int], links: List[int]):
+        self.flow = flow
+        self.route = route
+        self.links = links
+        self.remaining_bytes = float(flow.flow_size)
+        self.rate = 0.0
+
+
+class FluidModel:
+    """
+    フローをリンク上のレートとして扱うフローレベル（流体）モデル
+
+    帯域はフローの開始・完了とノード・リンクの障害・復旧の時点でのみ max-min 公平に再計算し、
+    次に完了するフローの完了時刻にのみイベントをスケジュールする。そのためイベント数は
+    パケット数ではなくフロー数に比例する。
+
+    ハイブリッド実行ではパケット単位で扱うフローを前景フローとして登録する。前景フローは帯域の
+    計算に加わって公平な取り分を確保するが転送は進めない。流体フローの合計レートは各リンクの
+    fluid_load に書き込まれ、パケットの送信可能な容量と待ち行列遅延に反映される。
+
+    障害で経路を失ったフローは失敗として記録した上で保持し、ノード・リンクの復旧で経路が
+    見つかれば残りのバイト数から転送を再開する（完了時のメトリクスは失敗の記録を置き換える）。
+
+    Attributes:
+        topology_manager (TopologyManager): トポロジマネージャ
+        simulation_engine (SimulationEngine): シミュレーションエンジン
+        packet_manager (PacketManager): 経路計算とリンク選択に使用するパケットマネージャ
+        metrics_collector (MetricsCollector): メトリクスコレクタ
+        active_flows (Dict[int, FluidFlowState]): フローIDをキーとする転送中のフロー
+        foreground_flows (Dict[int, FluidFlowState]): フローIDをキーとするパケット単位で扱うフロー
+        stranded_flows (Dict[int, FluidFlowState]): フローIDをキーとする経路がなく停止しているフロー
+        stranded_foreground (Dict[int, FluidFlowState]): フローIDをキーとする経路がなく帯域の計算から除いた前景フロー
+        link_rates (Dict[int, float]): リンクIDをキーとする流体フローの合計レート（bps）
+        reallocations (int): 帯域を再計算した回数
+    """
+
+    def __init__(self, topology_manager, simulation_engine, packet_manager, metrics_collector):
+        self.topology_manager = topology_manager
+        self.simulation_engine = simulation_engine
+        self.packet_manager = packet_manager
+        self.metrics_collector = metrics_collector
+        self.active_flows: Dict[int, FluidFlowState] = {}
+        self.foreground_flows: Dict[int, FluidFlowState] = {}
+        self.stranded_flows: Dict[int, FluidFlowState] = {}
+        self.stranded_foreground: Dict[int, FluidFlowState] = {}
+        self.link_rates: Dict[int, float] = {}
+        self.reallocations = 0
+        self._last_update = 0.0
+        # 完了イベントは取り消せないため、再計算のたびに世代を進めて古いイベントを無視する
+        self._generation = 0
+
+    def start_flow(self, flow: Flow):
+        """
+        フローの転送を開始
+
+        Args:
+            flow (Flow): フローオブジェクト
+        """
+        now = self.simulation_engine.current_time
+        self._advance(now)
+        flow.start_time = now
+        flow.status = "active"
+        state = FluidFlowState(flow, [], [])
+        if not self._assign_route(state):
+            self.stranded_flows[flow.flow_id] = state
+            self._finish(state, now, "failed")
+        elif not state.links:
+            self._finish(state, now, "completed")
+        else:
+            self.active_flows[flow.flow_id] = state
+        self._reallocate()
+
+    def add_foreground(self, flow: Flow):
+        """
+        パケット単位で扱うフローを帯域の計算に加える
+
+        Args:
+            flow (Flow): フローオブジェクト
+        """
+        self._advance(self.simulation_engine.current_time)
+        state = FluidFlowState(flow, [], [])
+        if not self._assign_route(state):
+            self.stranded_foreground[flow.flow_id] = state
+        elif state.links:
+            self.foreground_flows[flow.flow_id] = state
+            self._reallocate()
+
+    def remove_foreground(self, flow_id: int):
+        """
+        パケット単位で扱うフローを帯域の計算から除く
+
+        Args:
+            flow_id (int): フローID
+        """
+        self.stranded_foreground.pop(flow_id, None)
+        if self.foreground_flows.pop(flow_id, None) is not None:
+            self._advance(self.simulation_engine.current_time)
+            self._reallocate()
+
+    def element_failed(self, element_type: str, element_id: int):
+        """
+        障害の影響を受けるフローを迂回させ、到達不能になったフローを失敗として停止する
+
+        Args:
+            element_type (str): "node" または "link"
+            element_id (int): 要素のID
+        """
+        now = self.simulation_engine.current_time
+        self._advance(now)
+        for state in list(self.active_flows.values()):
+            if element_id in (state.links if element_type == "link" else state.route):
+                if not self._assign_route(state) or not state.links:
+                    del self.active_flows[state.flow.flow_id]
+                    self.stranded_flows[state.flow.flow_id] = state
+                    self._finish(state, now, "failed")
+        for state in list(self.foreground_flows.values()):
+            if element_id in (state.links if element_type == "link" else state.route):
+                if not self._assign_route(state) or not state.links:
+                    del self.foreground_flows[state.flow.flow_id]
+                    self.stranded_foreground[state.flow.flow_id] = state
+        self._reallocate()
+
+    def element_recovered(self, element_type: str, element_id: int):
+        """
+        復旧の通知を受け、経路がなく停止していたフローを再経路して転送を再開
+
+        転送中のフローは現在の経路を維持する。
+
+        Args:
+            element_type (str): "node" または "link"
+            element_id (int): 要素のID
+        """
+        if not self.stranded_flows and not self.stranded_foreground:
+            return
+        now = self.simulation_engine.current_time
+        self._advance(now)
+        for flow_id, state in list(self.stranded_flows.items()):
+            if self._assign_route(state):
+                del self.stranded_flows[flow_id]
+                if state.links:
+                    state.flow.status = "active"
+                    self.active_flows[flow_id] = state
+                else:
+                    self._finish(state, now, "completed")
+        for flow_id, state in list(self.stranded_foreground.items()):
+            if self._assign_route(state):
+                del self.stranded_foreground[flow_id]
+                if state.links:
+                    self.foreground_flows[flow_id] = state
+        self._reallocate()
+
+    def finalize(self, timestamp: float):
+        """
+        シミュレーション終了時点で転送中のフローのメトリクスを記録
+
+        Args:
+            timestamp (float): 終了時刻
+        """
+        self._advance(timestamp)
+        for state in self.active_flows.values():
+            self._record(state, timestamp)
+
+    def _assign_route(self, state: FluidFlowState) -> bool:
+        """
+        現在の経路表からフローの経路とリンクを決定
+
+        Returns:
+            bool: 経路が見つかった場合True
+        """
+        flow = state.flow
+        route = self.packet_manager.calculate_route(flow.source_node, flow.destination_node)
+        if not route:
+            return False
+        links = []
+        for node1, node2 in zip(route, route[1:]):
+            link = self.topology_manager.select_link(node1, node2, flow.flow_id)
+            if link is None:
+                return False
+            links.append(link.link_id)
+        state.route = list(route)
+        state.links = links
+        return True
+
+    def _advance(self, now: float):
+        """
+        前回の更新からの経過時間分だけ各フローの転送を進める
+        """
+        elapsed = now - self._last_update
+        if elapsed > 0:
+            for state in self.active_flows.values():
+                state.remaining_bytes -= state.rate * elapsed / 8
+        self._last_update = now
+
+    def _reallocate(self):
+        """
+        転送中のフローの帯域を再計算し、次に完了するフローの完了イベントをスケジュール
+        """
+        self.reallocations += 1
+        self._generation += 1
+        flow_links = {flow_id: state.links for flow_id, state in self.foreground_flows.items()}
+        flow_links.update((flow_id, state.links) for flow_id, state in self.active_flows.items())
+        capacities = {}
+        for links in flow_links.values():
+            for link_id in links:
+                if link_id not in capacities:
+                    capacities[link_id] = self.topology_manager.get_link(link_id).capacity
+        rates = max_min_fair_share(flow_links, capacities)
+        for flow_id, state in self.foreground_flows.items():
+            state.rate = rates.get(flow_id, 0.0)
+
+        for link_id in self.link_rates:
+            link = self.topology_manager.get_link(link_id)
+            if link is not None:
+                link.fluid_load = 0.0
+        self.link_rates = defaultdict(float)
+        next_completion = None
+        for flow_id, state in self.active_flows.items():
+            state.rate = rates.get(flow_id, 0.0)
+            for link_id in state.links:
+                self.link_rates[link_id] += state.rate
+            if state.rate > 0:
+                completion = self._last_update + max(state.remaining_bytes, 0.0) * 8 / state.rate
+                if next_completion is None or completion < next_completion:
+                    next_completion = completion
+        for link_id, rate in self.link_rates.items():
+            self.topology_manager.get_link(link_id).fluid_load = rate
+        if next_completion is not None:
+            self.simulation_engine.schedule_event(next_completion, lambda g=self._generation: self._on_completion(g))
+
+    def _on_completion(self, generation: int):
+        """
+        完了イベントの処理（再計算済みの古いイベントは無視する）
+        """
+        if generation != self._generation:
+            return
+        now = self.simulation_engine.current_time
+        self._advance(now)
+        for flow_id, state in list(self.active_flows.items()):
+            if state.remaining_bytes <= COMPLETION_TOLERANCE * max(state.flow.flow_size, 1):
+                del self.active_flows[flow_id]
+                state.remaining_bytes = 0.0
+                self._finish(state, now, "completed")
+        self._reallocate()
+
+    def _finish(self, state: FluidFlowState, now: float, status: str):
+        state.flow.status = status
+        self._record(state, now)
+
+    def _record(self, state: FluidFlowState, now: float):
+        """
+        フローの転送結果をメトリクスコレクタに記録
+
+        遅延は経路上の各リンクの伝搬遅延と1パケットの送出時間の合計（流体モデルでは待ち行列遅延は生じない）。
+        """
+        if self.metrics_collector is None:
+            return
+        flow = state.flow
+        delay = 0.0
+        for link_id in state.links:
+            link = self.topology_manager.get_link(link_id)
+            delay += link.delay + PACKET_SIZE * 8 / link.capacity
+        transferred = flow.flow_size - max(state.remaining_bytes, 0.0)
+        self.metrics_collector.record_fluid_transfer(flow, transferred, delay, now - flow.start_time, flow.status == "failed")
+        self.metrics_collector.record_flow_metrics(now, flow)
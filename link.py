@@ -1,8 +1,11 @@
 # link.py
 
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
 from packet import Packet
 
+# 背景負荷による待ち行列遅延の計算で用いる利用率の上限（利用率1で遅延が発散するのを防ぐ）
+MAX_BACKGROUND_UTILIZATION = 0.99
+
 class Link:
     """
     リンククラス
@@ -11,13 +14,20 @@ class Link:
         link_id (int): リンクID
         capacity (float): 最大帯域幅（bps）
         current_load (float): 現在の帯域使用量（bps）
+        fluid_load (float): 流体モデルで扱うフローの合計レート（bps）
         delay (float): 遅延時間（秒）
         jitter (float): ジッター（秒）
         status (str): リンクの状態（"active" または "failed"）
         connected_nodes (Tuple[int, int]): 接続ノードIDのタプル
+        queue_limit (Optional[int]): 送出待ちのバイト数の上限（Noneの場合は上限なし）
+        busy_until (Dict[int, float]): 送信側ノードIDをキーとする、送出中のパケットを送り終える時刻
+        transmitted_bytes (int): schedule_transmission で送出したバイト数
+        failure_times (List[Optional[float]]): 障害が発生した時刻（発生順、時刻が不明な場合None）。
+            要素数を障害の世代（failure_epoch）として、送出後に発生した障害の判定に用いる
     """
 
-    def __init__(self, link_id: int, capacity: float, delay: float, jitter: float, connected_nodes: Tuple[int, int]):
+    def __init__(self, link_id: int, capacity: float, delay: float, jitter: float, connected_nodes: Tuple[int, int],
+                 queue_limit: Optional[int] = None):
         """
         リンクの初期化
 
@@ -27,15 +37,21 @@ class Link:
             delay (float): 遅延時間（秒）
             jitter (float): ジッター（秒）
             connected_nodes (Tuple[int, int]): 接続ノードIDのタプル
+            queue_limit (Optional[int], optional): 送出待ちのバイト数の上限（Noneの場合は上限なし）
         """
         self.link_id = link_id
         self.capacity = capacity
         self.current_load = 0.0
+        self.fluid_load = 0.0
         self.delay = delay
         self.jitter = jitter
         self.status = "active"
         self.connected_nodes = connected_nodes
         self.packet_loss_count: int = 0  # パケットロスのカウント
+        self.queue_limit = queue_limit
+        self.busy_until: Dict[int, float] = {}
+        self.transmitted_bytes = 0
+        self.failure_times: List[Optional[float]] = []
 
     def transmit_packet(self, packet: Packet) -> bool:
         """
@@ -60,6 +76,98 @@ class Link:
             # 帯域幅不足
             return False
 
+    def available_capacity(self) -> float:
+        """
+        流体モデルのフローが使用している帯域を除いた容量
+
+        Returns:
+            float: 容量（bps）
+        """
+        return self.capacity - self.fluid_load
+
+    def queueing_delay(self, packet_size: int) -> float:
+        """
+        流体モデルのフローによる背景負荷のもとでの待ち行列遅延（M/M/1 の待ち時間）
+
+        Args:
+            packet_size (int): パケットサイズ（バイト）
+
+        Returns:
+            float: 待ち行列遅延（秒）、背景負荷がない場合0
+        """
+        if self.fluid_load <= 0:
+            return 0.0
+        utilization = min(self.fluid_load / self.capacity, MAX_BACKGROUND_UTILIZATION)
+        return (packet_size * 8 / self.capacity) * utilization / (1 - utilization)
+
+    def transmission_time(self, packet_size: int) -> float:
+        """
+        パケットの送出時間（シリアライゼーション遅延）
+
+        流体モデルのフローが帯域を使用している場合は残りの帯域で送出する。
+
+        Args:
+            packet_size (int): パケットサイズ（バイト）
+
+        Returns:
+            float: 送出時間（秒）
+        """
+        return packet_size * 8 / self._service_rate()
+
+    def _service_rate(self) -> float:
+        return max(self.available_capacity(), self.capacity * (1 - MAX_BACKGROUND_UTILIZATION))
+
+    def backlog(self, now: float, from_node: int) -> float:
+        """
+        送出待ちのバイト数（送出中のパケットの残りを含む）
+
+        Args:
+            now (float): 現在時刻
+            from_node (int): 送信側ノードID
+
+        Returns:
+            float: バイト数
+        """
+        remaining = self.busy_until.get(from_node, 0.0) - now
+        return remaining * self._service_rate() / 8 if remaining > 0 else 0.0
+
+    def schedule_transmission(self, packet_size: int, now: float, from_node: int) -> Optional[float]:
+        """
+        パケットを送出待ちの末尾に加え、送り終える時刻を計算
+
+        方向ごとの出力キューを「送り終える時刻」だけで表す（仮想時刻）。先に送出待ちとなった
+        パケットを送り終えてから送出を始めるため、FIFOの出力キューと同じ時刻に送り終えるが、
+        送出の開始・終了にイベントを必要としない。
+        中継ノードはリンクの方向が空くまでパケットを自身のバッファに留める（PacketManager.forward_packet）
+        ため、送出待ちとして並ぶのは送信元から直接送るパケットのみとなる。
+
+        Args:
+            packet_size (int): パケットサイズ（バイト）
+            now (float): 現在時刻
+            from_node (int): 送信側ノードID
+
+        Returns:
+            Optional[float]: 送り終える時刻、リンクがダウンしているか送出待ちが上限を超える場合None
+        """
+        if self.status == "failed":
+            return None
+        if self.queue_limit is not None and self.backlog(now, from_node) + packet_size > self.queue_limit:
+            return None
+        start = max(now, self.busy_until.get(from_node, 0.0))
+        finish = start + self.transmission_time(packet_size)
+        self.busy_until[from_node] = finish
+        self.transmitted_bytes += packet_size
+        return finish
+
+    def routing_weight(self) -> float:
+        """
+        経路計算に用いるリンクの重み
+
+        Returns:
+            float: 遅延と帯域幅に基づく重み（簡易的な例）
+        """
+        return self.delay + (1 / self.capacity)
+
     def update_load(self, packet_size: int, operation: str):
         """
         帯域使用量を更新
@@ -73,16 +181,40 @@ class Link:
         elif operation == "remove":
             self.current_load -= packet_size
 
-    def fail_link(self, duration: float):
+    @property
+    def failure_epoch(self) -> int:
+        return len(self.failure_times)
+
+    def fail_link(self, duration: float, now: Optional[float] = None):
         """
         リンクを障害状態に設定
 
+        送出待ちのパケットは破棄する。送出の終了が障害の発生より後のパケットの到着イベントは
+        スケジュール済みのため、受信時に lost_in_failure で判定して破棄する。
+
         Args:
             duration (float): 障害の継続時間
+            now (Optional[float], optional): 障害の発生時刻（指定がない場合は送出中のパケットを全て破棄する）
         """
         self.status = "failed"
-        # 障害復旧イベントをスケジュール
-        pass
+        self.failure_times.append(now)
+        self.busy_until.clear()
+
+    def lost_in_failure(self, departure: float, epoch: int) -> bool:
+        """
+        送出後に発生した障害でパケットが失われたかどうかを判定
+
+        Args:
+            departure (float): パケットを送り終える時刻
+            epoch (int): 送出時の failure_epoch
+
+        Returns:
+            bool: 送出後に障害が発生し、その時点でパケットを送り終えていなかった場合True
+        """
+        if epoch >= len(self.failure_times):
+            return False
+        failed_at = self.failure_times[epoch]
+        return failed_at is None or departure > failed_at
 
     def recover_link(self):
         """
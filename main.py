@@ -1,15 +1,16 @@
 # main.py
 
-from simulation_engine import SimulationEngine
+import numpy as np
+
 from topology_manager import TopologyManager
-from flow_manager import FlowManager
-from packet_manager import PacketManager
 from central_controller import CentralController
 from failure_manager import FailureManager
 from metrics_collector import MetricsCollector
 from visualization_interface import VisualizationInterface
 from configuration_manager import ConfigurationManager
 from data_exporter import DataExporter
+from packet_trace import TraceRecorder
+from replication_runner import create_simulation_engine, create_flow_manager, seed_global_random
 
 def main():
     # 設定の読み込み
@@ -17,24 +18,34 @@ def main():
     config_manager.load_configuration('data/config.yaml')
     simulation_parameters = config_manager.simulation_parameters
 
-    # シミュレーションエンジンの初期化
-    simulation_engine = SimulationEngine()
+    # 乱数のシード（指定がない場合は実行ごとに異なる）
+    seed_sequence = np.random.SeedSequence(simulation_parameters.get('seed'))
+    seed_global_random(seed_sequence)
+
+    # シミュレーションエンジンの初期化（partitions, synchronization, event_ordering などを反映）
+    simulation_engine = create_simulation_engine(simulation_parameters)
     simulation_engine.initialize(simulation_parameters['simulation_time'])
 
     # トポロジの読み込み
-    topology_manager = TopologyManager()
-    topology_manager.load_topology('data/topology.yaml')
+    topology_manager = TopologyManager(link_selection=simulation_parameters.get('link_selection', 'lowest_load'))
+    topology_manager.load_topology('data/topology.yaml', cache_dir=simulation_parameters.get('topology_cache'))
 
     # 中央コントローラの初期化
     central_controller = CentralController(topology_manager, algorithm=simulation_parameters['algorithm'])
 
-    # フローマネージャの初期化
-    flow_manager = FlowManager(topology_manager)
+    # フローマネージャの初期化（simulation_mode, link_model, pacing などを反映）
+    metrics_collector = MetricsCollector(
+        retention=simulation_parameters.get('metrics_retention', 'unbounded'),
+        capacity=simulation_parameters.get('metrics_capacity', 4096)
+    )
+    flow_manager = create_flow_manager(simulation_parameters, topology_manager, simulation_engine, central_controller,
+                                       metrics_collector, seed_sequence)
     flow_manager.generate_flows()
-    flow_manager.packet_manager = PacketManager(topology_manager, simulation_engine)
-    flow_manager.packet_manager.flow_manager = flow_manager
-    flow_manager.packet_manager.central_controller = central_controller
-    flow_manager.packet_manager.metrics_collector = MetricsCollector()
+
+    # パケットトレースの記録（設定されている場合のみ）
+    trace_file = simulation_parameters.get('packet_trace')
+    if trace_file:
+        flow_manager.packet_manager.trace_recorder = TraceRecorder(trace_file)
 
     # フロー開始イベントのスケジュール
     flow_manager.schedule_flow_starts(simulation_engine)
@@ -47,21 +58,24 @@ def main():
         simulation_time=simulation_parameters['simulation_time']
     )
 
-    # シミュレーションの実行
-    simulation_engine.run()
-
-    # メトリクスのエクスポート
+    # メトリクスのエクスポート（実行中に書き出すため、保持方針が "ring" や "downsample" でも全ての行が出力される）
     data_exporter = DataExporter()
-    data_exporter.export_simulation_data(
-        flow_metrics=flow_manager.packet_manager.metrics_collector.flow_metrics,
-        network_metrics=flow_manager.packet_manager.metrics_collector.network_metrics,
-        format='csv',
-        file_path='output/metrics'
+    data_exporter.stream_metrics(
+        metrics_collector,
+        format=simulation_parameters.get('export_format', 'csv'),
+        file_path='output/metrics',
+        batch_rows=min(10000, metrics_collector.flow_metrics.capacity, metrics_collector.network_metrics.capacity)
     )
 
+    # シミュレーションの実行
+    simulation_engine.run()
+    data_exporter.close_streams()
+    if flow_manager.packet_manager.trace_recorder is not None:
+        flow_manager.packet_manager.trace_recorder.close()
+
     # 可視化
     visualization_interface = VisualizationInterface()
-    visualization_interface.update_visualization(flow_manager.packet_manager.metrics_collector)
+    visualization_interface.update_visualization(metrics_collector)
 
 if __name__ == '__main__':
     main()
@@ -1,9 +1,10 @@
 # metrics_collector.py
 
-from typing import List
-import csv
+from typing import Dict, List, Optional, Union
+import numpy as np
 from flow import Flow
 from packet import Packet
+from metrics_timeseries import MetricSeries
 
 class FlowMetric:
     """
@@ -45,50 +46,296 @@ class NetworkMetric:
         self.average_packet_loss_rate = average_packet_loss_rate
         self.average_jitter = average_jitter
 
+class FlowAccumulator:
+    """
+    フローのメトリクスをパケットの配送・ロスごとに逐次更新する集計器
+
+    遅延の平均と分散は Welford 法、ジッターは RFC 3550 の推定式で更新する。
+
+    Attributes:
+        flow_id (int): フローID
+        total_packets (int): フローのパケット数
+        delivered_packets (int): 配送済みパケット数
+        lost_packets (int): ロスしたパケット数（ロスの発生回数）
+        delivered_bytes (int): 配送済みバイト数
+        lost_bytes (int): ロスしたバイト数
+        mean_delay (float): 平均遅延（秒）
+        max_delay (float): 最大遅延（秒）
+        jitter (float): RFC 3550 のジッター推定値（秒）
+        duration (Optional[float]): 転送に要した時間（秒）。流体モデルで記録した場合のみ設定される
+    """
+
+    __slots__ = ("flow_id", "total_packets", "delivered_packets", "lost_packets", "delivered_bytes", "lost_bytes",
+                 "mean_delay", "max_delay", "jitter", "duration", "_m2_delay", "_last_delay", "_contribution")
+
+    def __init__(self, flow_id: int, total_packets: int = 0):
+        self.flow_id = flow_id
+        self.total_packets = total_packets
+        self.delivered_packets = 0
+        self.lost_packets = 0
+        self.delivered_bytes = 0
+        self.lost_bytes = 0
+        self.mean_delay = 0.0
+        self.max_delay = 0.0
+        self.jitter = 0.0
+        self.duration: Optional[float] = None
+        self._m2_delay = 0.0
+        self._last_delay = None
+        # ネットワーク全体の合計に現在加算されている (スループット, 遅延, ロス率, ジッター)
+        self._contribution = (0.0, 0.0, 0.0, 0.0)
+
+    def record_delivery(self, size: int, sent_time: float, arrival_time: float):
+        """
+        パケットの配送を反映
+
+        Args:
+            size (int): パケットサイズ（バイト）
+            sent_time (float): 送信時間
+            arrival_time (float): 到着時間
+        """
+        delay = arrival_time - sent_time
+        self.delivered_packets += 1
+        self.delivered_bytes += size
+        difference = delay - self.mean_delay
+        self.mean_delay += difference / self.delivered_packets
+        self._m2_delay += difference * (delay - self.mean_delay)
+        if delay > self.max_delay:
+            self.max_delay = delay
+        if self._last_delay is not None:
+            # RFC 3550 6.4.1: J += (|D(i-1, i)| - J) / 16
+            self.jitter += (abs(delay - self._last_delay) - self.jitter) / 16
+        self._last_delay = delay
+
+    def record_loss(self, size: int):
+        """
+        パケットのロスを反映
+
+        Args:
+            size (int): パケットサイズ（バイト）
+        """
+        self.lost_packets += 1
+        self.lost_bytes += size
+
+    def record_transfer(self, size: float, delay: float, duration: float, lost_bytes: float = 0, packet_size: int = 1500):
+        """
+        フロー単位の転送結果を反映（流体モデル用、これまでの値は置き換えられる）
+
+        Args:
+            size (float): 転送済みバイト数
+            delay (float): パケット換算の遅延（秒）
+            duration (float): 転送に要した時間（秒）
+            lost_bytes (float, optional): 転送できなかったバイト数（フローが失敗した場合）
+            packet_size (int, optional): パケット数の換算に用いるパケットサイズ（バイト）
+        """
+        self.delivered_bytes = int(size)
+        self.delivered_packets = min(int(size // packet_size), self.total_packets)
+        self.lost_bytes = int(lost_bytes)
+        self.lost_packets = self.total_packets - self.delivered_packets if lost_bytes > 0 else 0
+        self.mean_delay = delay
+        self.max_delay = delay
+        self.jitter = 0.0
+        self._m2_delay = 0.0
+        self.duration = duration
+
+    @property
+    def delay_variance(self) -> float:
+        return self._m2_delay / (self.delivered_packets - 1) if self.delivered_packets > 1 else 0.0
+
+    @property
+    def throughput(self) -> float:
+        if self.duration is not None:
+            # 流体モデルでは転送に要した時間あたりのビット数
+            return (self.delivered_bytes * 8) / self.duration if self.duration > 0 else 0
+        # 従来通り、配送済みバイト数を最大遅延で割る（bps）
+        return (self.delivered_bytes * 8) / self.max_delay if self.max_delay > 0 else 0
+
+    @property
+    def packet_loss_rate(self) -> float:
+        # 未配送のパケットは全てロスとみなす（%）
+        if self.total_packets <= 0:
+            return 0
+        return ((self.total_packets - self.delivered_packets) / self.total_packets) * 100
+
+FLOW_METRIC_FIELDS = {
+    'timestamp': np.float64,
+    'flow_id': np.int64,
+    'throughput': np.float64,
+    'delay': np.float64,
+    'packet_loss_rate': np.float64,
+    'jitter': np.float64
+}
+
+NETWORK_METRIC_FIELDS = {
+    'timestamp': np.float64,
+    'average_throughput': np.float64,
+    'average_delay': np.float64,
+    'average_packet_loss_rate': np.float64,
+    'average_jitter': np.float64
+}
+
 class MetricsCollector:
     """
     メトリクス収集クラス
 
     Attributes:
-        flow_metrics (List[FlowMetric]): フローメトリクスのリスト
-        network_metrics (List[NetworkMetric]): ネットワークメトリクスのリスト
+        flow_metrics (MetricSeries): フローメトリクスの時系列（要素は FlowMetric）
+        network_metrics (MetricSeries): ネットワークメトリクスの時系列（要素は NetworkMetric）
+        flow_accumulators (Dict[int, FlowAccumulator]): フローIDをキーとする逐次集計器
     """
 
-    def __init__(self):
-        self.flow_metrics: List[FlowMetric] = []
-        self.network_metrics: List[NetworkMetric] = []
+    def __init__(self, retention: str = "unbounded", capacity: int = 4096, downsample_factor: int = 10, tiers: int = 2):
+        """
+        Args:
+            retention (str, optional): 時系列の保持方針（"unbounded", "ring", "downsample"）
+            capacity (int, optional): 保持する行数（"unbounded" の場合は初期容量）
+            downsample_factor (int, optional): 集約する行数（"downsample" の場合）
+            tiers (int, optional): 集約の段数（"downsample" の場合）
+        """
+        self._series_options = {
+            'retention': retention,
+            'capacity': capacity,
+            'downsample_factor': downsample_factor,
+            'tiers': tiers
+        }
+        self.flow_metrics = MetricSeries(FLOW_METRIC_FIELDS, FlowMetric, **self._series_options)
+        self.network_metrics = MetricSeries(NETWORK_METRIC_FIELDS, NetworkMetric, **self._series_options)
+        self.flow_accumulators: Dict[int, FlowAccumulator] = {}
+        # 全フローの (スループット, 遅延, ロス率, ジッター) の合計
+        self._totals = [0.0, 0.0, 0.0, 0.0]
+
+    @property
+    def flow_metrics(self) -> MetricSeries:
+        return self._flow_metrics
+
+    @flow_metrics.setter
+    def flow_metrics(self, metrics: Union[MetricSeries, List[FlowMetric]]):
+        # リストが代入された場合は同じ保持方針の時系列に変換する
+        if not isinstance(metrics, MetricSeries):
+            series = MetricSeries(FLOW_METRIC_FIELDS, FlowMetric, **self._series_options)
+            series.extend(metrics)
+            metrics = series
+        self._flow_metrics = metrics
+
+    @property
+    def network_metrics(self) -> MetricSeries:
+        return self._network_metrics
+
+    @network_metrics.setter
+    def network_metrics(self, metrics: Union[MetricSeries, List[NetworkMetric]]):
+        if not isinstance(metrics, MetricSeries):
+            series = MetricSeries(NETWORK_METRIC_FIELDS, NetworkMetric, **self._series_options)
+            series.extend(metrics)
+            metrics = series
+        self._network_metrics = metrics
+
+    def register_flow(self, flow: Flow) -> FlowAccumulator:
+        """
+        フローの集計器を登録（既に登録済みの場合はパケット数のみ更新）
+
+        Args:
+            flow (Flow): フローオブジェクト
+
+        Returns:
+            FlowAccumulator: フローの集計器
+        """
+        accumulator = self._accumulator(flow.flow_id)
+        # 送信元で逐次生成するフローはパケットを保持しないため、フローのパケット数を用いる
+        accumulator.total_packets = len(flow.packets) or flow.packet_count
+        self._update_totals(accumulator)
+        return accumulator
+
+    def record_packet_delivered(self, packet: Packet):
+        """
+        パケットの配送をフローの集計器に反映
+
+        Args:
+            packet (Packet): 配送されたパケット
+        """
+        accumulator = self._accumulator(packet.flow_id)
+        accumulator.record_delivery(packet.size, packet.sent_time, packet.arrival_time)
+        self._update_totals(accumulator)
+
+    def record_packet_lost(self, packet: Packet):
+        """
+        パケットのロスをフローの集計器に反映
+
+        Args:
+            packet (Packet): ロスしたパケット
+        """
+        accumulator = self._accumulator(packet.flow_id)
+        accumulator.record_loss(packet.size)
+        self._update_totals(accumulator)
+
+    def record_fluid_transfer(self, flow: Flow, transferred_bytes: float, delay: float, duration: float, failed: bool = False):
+        """
+        流体モデルで計算したフローの転送結果を集計器に反映
+
+        パケット数はフローのパケット数（flow.packet_count）を用い、転送済みバイト数をパケット数に換算する。
+
+        Args:
+            flow (Flow): フローオブジェクト
+            transferred_bytes (float): 転送済みバイト数
+            delay (float): パケット換算の遅延（秒）
+            duration (float): 転送に要した時間（秒）
+            failed (bool, optional): フローが失敗した場合True（未転送のバイトをロスとして記録する）
+        """
+        accumulator = self._accumulator(flow.flow_id)
+        accumulator.total_packets = flow.packet_count
+        lost_bytes = flow.flow_size - transferred_bytes if failed else 0
+        accumulator.record_transfer(transferred_bytes, delay, duration, lost_bytes)
+        self._update_totals(accumulator)
+
+    def _accumulator(self, flow_id: int) -> FlowAccumulator:
+        accumulator = self.flow_accumulators.get(flow_id)
+        if accumulator is None:
+            accumulator = self.flow_accumulators[flow_id] = FlowAccumulator(flow_id)
+        return accumulator
+
+    def _update_totals(self, accumulator: FlowAccumulator):
+        """
+        集計器の変化分のみをネットワーク全体の合計に反映
+        """
+        contribution = (accumulator.throughput, accumulator.mean_delay, accumulator.packet_loss_rate, accumulator.jitter)
+        totals = self._totals
+        for i, (old, new) in enumerate(zip(accumulator._contribution, contribution)):
+            totals[i] += new - old
+        accumulator._contribution = contribution
+
+    def _seed_accumulator(self, flow: Flow) -> FlowAccumulator:
+        """
+        配送・ロスの通知を受けていないフローの集計器をパケットの状態から作成（1回のみ走査）
+        """
+        accumulator = self._accumulator(flow.flow_id)
+        for packet in flow.packets:
+            if packet.status == "delivered":
+                accumulator.record_delivery(packet.size, packet.sent_time, packet.arrival_time)
+            elif packet.status == "lost":
+                accumulator.record_loss(packet.size)
+        return accumulator
 
     def record_flow_metrics(self, timestamp: float, flow: Flow):
         """
         フローごとのメトリクスを記録
 
+        フローの集計器から計算するため、パケット数によらず定数時間で記録できる。
+
         Args:
             timestamp (float): 計測時刻
             flow (Flow): フローオブジェクト
         """
-        # スループットの計算（bps）
-        total_bytes_received = sum(packet.size for packet in flow.packets if packet.status == "delivered")
-        duration = max((packet.arrival_time - packet.sent_time) for packet in flow.packets if packet.status == "delivered") if flow.packets else 0
-        throughput = (total_bytes_received * 8) / duration if duration > 0 else 0
-
-        # 平均遅延の計算（秒）
-        delays = [(packet.arrival_time - packet.sent_time) for packet in flow.packets if packet.status == "delivered"]
-        delay = sum(delays) / len(delays) if delays else 0
-
-        # パケットロス率の計算（%）
-        total_packets_sent = len(flow.packets)
-        total_packets_received = sum(1 for packet in flow.packets if packet.status == "delivered")
-        packet_loss_rate = ((total_packets_sent - total_packets_received) / total_packets_sent) * 100 if total_packets_sent > 0 else 0
+        accumulator = self.flow_accumulators.get(flow.flow_id)
+        if accumulator is None:
+            accumulator = self._seed_accumulator(flow)
+        if flow.packets:
+            accumulator.total_packets = len(flow.packets)
+        self._update_totals(accumulator)
 
-        # ジッターの計算（秒）
-        if len(delays) > 1:
-            delay_diffs = [abs(delays[i] - delays[i - 1]) for i in range(1, len(delays))]
-            jitter = sum(delay_diffs) / len(delay_diffs)
-        else:
-            jitter = 0
+        throughput = accumulator.throughput
+        delay = accumulator.mean_delay
+        packet_loss_rate = accumulator.packet_loss_rate
+        jitter = accumulator.jitter
 
-        flow_metric = FlowMetric(timestamp, flow.flow_id, throughput, delay, packet_loss_rate, jitter)
-        self.flow_metrics.append(flow_metric)
+        self.flow_metrics.append_values(timestamp, flow.flow_id, throughput, delay, packet_loss_rate, jitter)
 
     def record_network_metrics(self, timestamp: float):
         """
@@ -97,16 +344,14 @@ class MetricsCollector:
         Args:
             timestamp (float): 計測時刻
         """
-        if not self.flow_metrics:
+        flow_count = len(self.flow_accumulators)
+        if flow_count == 0:
             return
 
-        avg_throughput = sum([fm.throughput for fm in self.flow_metrics]) / len(self.flow_metrics)
-        avg_delay = sum([fm.delay for fm in self.flow_metrics]) / len(self.flow_metrics)
-        avg_packet_loss_rate = sum([fm.packet_loss_rate for fm in self.flow_metrics]) / len(self.flow_metrics)
-        avg_jitter = sum([fm.jitter for fm in self.flow_metrics]) / len(self.flow_metrics)
+        # 各フローの現在の値の平均（合計は集計器の更新時に差分で維持している）
+        avg_throughput, avg_delay, avg_packet_loss_rate, avg_jitter = (total / flow_count for total in self._totals)
 
-        network_metric = NetworkMetric(timestamp, avg_throughput, avg_delay, avg_packet_loss_rate, avg_jitter)
-        self.network_metrics.append(network_metric)
+        self.network_metrics.append_values(timestamp, avg_throughput, avg_delay, avg_packet_loss_rate, avg_jitter)
 
     def export_metrics_csv(self, file_path: str):
         """
@@ -115,29 +360,5 @@ class MetricsCollector:
         Args:
             file_path (str): ファイルパス
         """
-        with open(file_path + '_flow_metrics.csv', 'w', newline='') as csvfile:
-            fieldnames = ['timestamp', 'flow_id', 'throughput', 'delay', 'packet_loss_rate', 'jitter']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for fm in self.flow_metrics:
-                writer.writerow({
-                    'timestamp': fm.timestamp,
-                    'flow_id': fm.flow_id,
-                    'throughput': fm.throughput,
-                    'delay': fm.delay,
-                    'packet_loss_rate': fm.packet_loss_rate,
-                    'jitter': fm.jitter
-                })
-
-        with open(file_path + '_network_metrics.csv', 'w', newline='') as csvfile:
-            fieldnames = ['timestamp', 'average_throughput', 'average_delay', 'average_packet_loss_rate', 'average_jitter']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for nm in self.network_metrics:
-                writer.writerow({
-                    'timestamp': nm.timestamp,
-                    'average_throughput': nm.average_throughput,
-                    'average_delay': nm.average_delay,
-                    'average_packet_loss_rate': nm.average_packet_loss_rate,
-                    'average_jitter': nm.average_jitter
-                })
+        from data_exporter import DataExporter
+        DataExporter().export_simulation_data(self.flow_metrics, self.network_metrics, "csv", file_path)
@@ -0,0 +1,291 @@
+# metrics_timeseries.py
+
+from collections.abc import Sequence
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+RETENTION_POLICIES = ("unbounded", "ring", "downsample")
+
+
+class MetricSeries(Sequence):
+    """
+    メトリクスの時系列を列ごとの NumPy 配列で保持するストア
+
+    保持方針:
+        - "unbounded": 全ての行を保持する（容量が足りなくなると倍に拡張）
+        - "ring": 直近 capacity 行のみを保持する
+        - "downsample": 直近 capacity 行を保持し、あふれた行は downsample_factor 行ごとに
+          集約して1段粗い時系列に移す（tiers 段まで、最も粗い段はリングバッファ）
+
+    リングバッファは容量の2倍の配列に同じ値を2箇所書き込む（ミラーリング）ことで、
+    保持中の行が常に連続領域となり、コピーなしで参照できる。
+
+    Attributes:
+        fields (Dict[str, np.dtype]): 列名と型
+        record_type (Optional[Callable]): 1行を表すオブジェクトの生成関数（列名をキーワード引数とする）
+        retention (str): 保持方針
+        capacity (int): 保持する行数（"unbounded" の場合は初期容量）
+        downsample_factor (int): 集約する行数
+        coarser (Optional[MetricSeries]): 1段粗い時系列（"downsample" の場合のみ）
+        appended (int): これまでに追加された行数（破棄された行を含む）
+    """
+
+    def __init__(self, fields: Dict[str, type], record_type: Optional[Callable] = None, retention: str = "unbounded",
+                 capacity: int = 4096, downsample_factor: int = 10, tiers: int = 2,
+                 aggregations: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            fields (Dict[str, type]): 列名と型（列の順序が行の値の順序となる）
+            record_type (Optional[Callable], optional): 1行を表すオブジェクトの生成関数
+            retention (str, optional): 保持方針（"unbounded", "ring", "downsample"）
+            capacity (int, optional): 保持する行数
+            downsample_factor (int, optional): 集約する行数（"downsample" の場合）
+            tiers (int, optional): 元の時系列を含む段数（"downsample" の場合）
+            aggregations (Optional[Dict[str, str]], optional): 集約方法（"mean" または "last"）。
+                指定のない列は浮動小数点数なら "mean"、それ以外と timestamp は "last"
+        """
+        if retention not in RETENTION_POLICIES:
+            raise ValueError(f"Unknown retention policy: {retention}")
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.fields = {name: np.dtype(dtype) for name, dtype in fields.items()}
+        self.record_type = record_type
+        self.retention = retention
+        self.capacity = capacity
+        self.downsample_factor = downsample_factor
+        self.aggregations = {
+            name: (aggregations or {}).get(name, "mean" if dtype.kind == "f" and name != "timestamp" else "last")
+            for name, dtype in self.fields.items()
+        }
+        size = capacity if retention == "unbounded" else 2 * capacity
+        self._columns = {name: np.zeros(size, dtype=dtype) for name, dtype in self.fields.items()}
+        self._start = 0
+        self._length = 0
+        self.appended = 0
+        self._sink = None
+        self._sink_batch_rows = 0
+        self._unflushed = 0
+        self.coarser: Optional[MetricSeries] = None
+        if retention == "downsample":
+            if downsample_factor < 2 or tiers < 2:
+                raise ValueError("downsample retention requires downsample_factor >= 2 and tiers >= 2")
+            self.coarser = MetricSeries(
+                fields, record_type, "downsample" if tiers > 2 else "ring", capacity,
+                downsample_factor, tiers - 1, self.aggregations
+            )
+            self._pending: List[tuple] = []
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("metric index out of range")
+        position = self._start + index
+        values = {name: column[position].item() for name, column in self._columns.items()}
+        return self.record_type(**values) if self.record_type else values
+
+    def __iter__(self) -> Iterator:
+        names = list(self._columns)
+        record_type = self.record_type or dict
+        for row in zip(*(self.column(name).tolist() for name in names)):
+            yield record_type(**dict(zip(names, row)))
+
+    def append(self, record):
+        """
+        1行を追加（列名と同じ名前の属性を持つオブジェクト、または辞書）
+
+        Args:
+            record: 追加する行
+        """
+        if isinstance(record, dict):
+            self.append_values(*(record[name] for name in self._columns))
+        else:
+            self.append_values(*(getattr(record, name) for name in self._columns))
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def append_values(self, *values):
+        """
+        列の順序で値を指定して1行を追加（オブジェクトを生成しない）
+
+        Args:
+            *values: 各列の値
+        """
+        columns = self._columns
+        self.appended += 1
+        if self.retention == "unbounded":
+            if self._length == len(next(iter(columns.values()))):
+                self._grow()
+            position = self._length
+            self._length += 1
+            for column, value in zip(columns.values(), values):
+                column[position] = value
+            if self._sink is not None:
+                self._count_unflushed()
+            return
+
+        capacity = self.capacity
+        if self._length < capacity:
+            position = (self._start + self._length) % capacity
+            self._length += 1
+        else:
+            position = self._start
+            if self.coarser is not None:
+                self._evict(position)
+            self._start = (self._start + 1) % capacity
+        mirror = position + capacity
+        for column, value in zip(columns.values(), values):
+            column[position] = value
+            column[mirror] = value
+        if self._sink is not None:
+            self._count_unflushed()
+
+    def attach_sink(self, sink, batch_rows: int = 10000):
+        """
+        追加された行を batch_rows 行ごとに書き出す出力先を登録
+
+        リングバッファで上書きされる前に書き出すため、batch_rows は capacity 以下とする。
+
+        Args:
+            sink: write_batch(columns: Dict[str, np.ndarray]) を持つオブジェクト
+            batch_rows (int, optional): 1回に書き出す行数
+        """
+        if batch_rows <= 0:
+            raise ValueError("batch_rows must be positive")
+        if self.retention != "unbounded" and batch_rows > self.capacity:
+            raise ValueError("batch_rows must not exceed the capacity of a bounded series")
+        self._sink = sink
+        self._sink_batch_rows = batch_rows
+        self._unflushed = 0
+
+    def detach_sink(self):
+        """
+        書き出していない行を書き出して出力先の登録を解除
+        """
+        self.flush_sink()
+        self._sink = None
+
+    def flush_sink(self):
+        """
+        書き出していない行を出力先に書き出す
+        """
+        if self._sink is not None and self._unflushed:
+            self._sink.write_batch(self.tail(self._unflushed))
+            self._unflushed = 0
+
+    def _count_unflushed(self):
+        self._unflushed += 1
+        if self._unflushed >= self._sink_batch_rows:
+            self.flush_sink()
+
+    def tail(self, count: int) -> Dict[str, np.ndarray]:
+        """
+        直近 count 行の列を参照（コピーなし）
+
+        Args:
+            count (int): 行数（保持中の行数を超える場合は保持中の全行）
+
+        Returns:
+            Dict[str, np.ndarray]: 列名をキーとする列のビュー
+        """
+        count = min(count, self._length)
+        end = self._start + self._length
+        return {name: column[end - count:end] for name, column in self._columns.items()}
+
+    def _grow(self):
+        for name, column in self._columns.items():
+            grown = np.zeros(2 * len(column), dtype=column.dtype)
+            grown[:len(column)] = column
+            self._columns[name] = grown
+
+    def _evict(self, position: int):
+        """
+        あふれる行を集約待ちに加え、downsample_factor 行たまったら粗い時系列へ移す
+        """
+        self._pending.append(tuple(column[position] for column in self._columns.values()))
+        if len(self._pending) < self.downsample_factor:
+            return
+        rows = list(zip(*self._pending))
+        values = []
+        for (name, aggregation), column_values in zip(self.aggregations.items(), rows):
+            values.append(np.mean(column_values) if aggregation == "mean" else column_values[-1])
+        self._pending.clear()
+        self.coarser.append_values(*values)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        保持中の行の列を古い順に参照（コピーなし）
+
+        Args:
+            name (str): 列名
+
+        Returns:
+            np.ndarray: 列のビュー
+        """
+        return self._columns[name][self._start:self._start + self._length]
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        全ての列を参照（コピーなし）
+
+        Returns:
+            Dict[str, np.ndarray]: 列名をキーとする列のビュー
+        """
+        return {name: self.column(name) for name in self._columns}
+
+    def to_dataframe(self, include_downsampled: bool = False) -> pd.DataFrame:
+        """
+        データフレームに変換
+
+        Args:
+            include_downsampled (bool, optional): 粗い時系列の行も古い順に含める場合True
+                （含める場合は連結のためコピーが発生する）
+
+        Returns:
+            pd.DataFrame: 列ごとの配列を参照するデータフレーム
+        """
+        frame = pd.DataFrame(self.columns(), copy=False)
+        if include_downsampled and self.coarser is not None:
+            older = self.coarser.to_dataframe(include_downsampled=True)
+            if len(older):
+                frame = pd.concat([older, frame], ignore_index=True)
+        return frame
+
+    def total_length(self) -> int:
+        """
+        粗い時系列を含めた保持中の行数を取得
+
+        Returns:
+            int: 行数
+        """
+        return self._length + (self.coarser.total_length() if self.coarser is not None else 0)
+
+    def memory_usage(self) -> int:
+        """
+        確保済みの配列の使用メモリ量を取得（粗い時系列を含む）
+
+        Returns:
+            int: バイト数
+        """
+        usage = sum(column.nbytes for column in self._columns.values())
+        return usage + (self.coarser.memory_usage() if self.coarser is not None else 0)
+
+    def clear(self):
+        """
+        全ての行を破棄
+        """
+        self._start = 0
+        self._length = 0
+        self._unflushed = 0
+        if self.coarser is not None:
+            self._pending.clear()
+            self.coarser.clear()
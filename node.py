@@ -1,5 +1,7 @@
-from typing import List, Dict, Optional
+import copy
+from typing import Callable, List, Dict, Optional, Tuple, Union
 from packet import Packet
+from queue_discipline import Scheduler, ActiveQueueManager, create_scheduler, create_aqm
 
 class Node:
     """
@@ -7,61 +9,153 @@ class Node:
 
     Attributes:
         node_id (int): ノードID
-        buffer (List[Packet]): パケットバッファ
+        buffer (Scheduler): パケットバッファ（取り出し順を決めるスケジューラ）
+        aqm (Optional[ActiveQueueManager]): 能動的キュー管理（使用しない場合None）
         adjacent_links (List[int]): 隣接リンクIDのリスト
         virtual_weights (Dict[int, float]): 仮想重み（リンクIDをキーとする辞書）
         status (str): ノードの状態（"active" または "failed"）
         buffer_size (int): バッファの最大容量（バイト）
         buffer_occupancy (int): 現在のバッファ使用量（バイト）
+        aqm_drop_count (int): AQMにより破棄したパケット数
+        held_packet (Optional[Packet]): スケジューラが選んだが、出力先のリンクが送出中のため送出を待っているパケット
+            （buffer_occupancy に含み、次の dequeue_packet で最初に取り出される）
+        forward_time (Optional[float]): スケジュール済みの送信イベントのうち最も早い時刻（ない場合None）
+        state_observer: バッファを変更する前に通知を受けるオブジェクト（buffer_changing(node) と
+            packet_leaving(node, packet) を持つ。Time Warp の状態の保存に使用し、通常はNone）
     """
 
-    def __init__(self, node_id: int, buffer_size: int = 1000000, demand_params: float = 0.0):
+    def __init__(self, node_id: int, buffer_size: int = 1000000, demand_params: float = 0.0,
+                 scheduler: Union[str, Dict, Scheduler] = "fifo", aqm: Union[None, str, Dict, ActiveQueueManager] = None):
         """
         ノードの初期化
 
         Args:
             node_id (int): ノードID
             buffer_size (int, optional): バッファサイズ（デフォルトは1,000,000バイト）
+            scheduler (Union[str, Dict, Scheduler], optional): スケジューラ（"fifo", "priority", "drr", "wfq"）
+            aqm (Union[None, str, Dict, ActiveQueueManager], optional): AQM（"red", "codel"、デフォルトはなし）
         """
         self.node_id = node_id
-        self.buffer: List[Packet] = []
+        self.buffer: Scheduler = create_scheduler(scheduler)
+        self.aqm: Optional[ActiveQueueManager] = create_aqm(aqm)
         self.adjacent_links: List[int] = []
         self.virtual_weights: Dict[int, float] = {}
         self.status: str = "active"
         self.buffer_size = buffer_size
         self.buffer_occupancy = 0
+        self.aqm_drop_count = 0
+        self.held_packet: Optional[Packet] = None
+        self.forward_time: Optional[float] = None
+        self.state_observer = None
 
-    def enqueue_packet(self, packet: Packet) -> bool:
+    def enqueue_packet(self, packet: Packet, now: float = 0.0) -> bool:
         """
         パケットをバッファに追加
 
         Args:
             packet (Packet): 追加するパケット
+            now (float, optional): 現在時刻（AQMで使用）
 
         Returns:
-            bool: 成功した場合True、バッファオーバーフローの場合False
+            bool: 成功した場合True、バッファオーバーフローまたはAQMによる破棄の場合False
         """
-        if self.buffer_occupancy + packet.size <= self.buffer_size:
-            self.buffer.append(packet)
-            self.buffer_occupancy += packet.size
-            return True
-        else:
+        if self.buffer_occupancy + packet.size > self.buffer_size:
             # バッファオーバーフロー
             return False
+        if self.state_observer is not None:
+            self.state_observer.buffer_changing(self)
+        if self.aqm is not None and self.aqm.on_enqueue(self.buffer_occupancy, now):
+            self.aqm_drop_count += 1
+            return False
+        self.buffer.push(packet, now)
+        self.buffer_occupancy += packet.size
+        return True
 
-    def dequeue_packet(self) -> Optional[Packet]:
+    def dequeue_packet(self, now: float = 0.0, on_drop: Optional[Callable[[Packet], None]] = None) -> Optional[Packet]:
         """
-        バッファからパケットを取り出す
+        スケジューラの順序でバッファからパケットを取り出す
+
+        AQMが取り出し時の破棄を判定した場合、そのパケットの状態を "lost" にして次のパケットを取り出す。
+
+        Args:
+            now (float, optional): 現在時刻（AQMで使用）
+            on_drop (Optional[Callable[[Packet], None]], optional): AQMが破棄したパケットの通知先
 
         Returns:
             Optional[Packet]: 取り出したパケット、バッファが空の場合None
         """
-        if self.buffer:
-            packet = self.buffer.pop(0)
+        observer = self.state_observer
+        if observer is not None and (self.buffer or self.held_packet is not None):
+            observer.buffer_changing(self)
+        packet = self.held_packet
+        if packet is not None:
+            # 保持していたパケットはAQMの判定を済ませている
+            if observer is not None:
+                observer.packet_leaving(self, packet)
+            self.held_packet = None
             self.buffer_occupancy -= packet.size
             return packet
+        entry = self.buffer.pop()
+        while entry is not None:
+            packet, enqueue_time = entry
+            if observer is not None:
+                observer.packet_leaving(self, packet)
+            self.buffer_occupancy -= packet.size
+            if self.aqm is None or not self.aqm.on_dequeue(now - enqueue_time, self.buffer_occupancy, now):
+                return packet
+            packet.status = "lost"
+            self.aqm_drop_count += 1
+            if on_drop is not None:
+                on_drop(packet)
+            entry = self.buffer.pop()
         return None
 
+    def hold_packet(self, packet: Packet):
+        """
+        取り出したパケットを出力先のリンクが空くまでバッファに戻して保持
+
+        Args:
+            packet (Packet): dequeue_packet で取り出したパケット
+        """
+        if self.state_observer is not None:
+            self.state_observer.buffer_changing(self)
+        self.held_packet = packet
+        self.buffer_occupancy += packet.size
+
+    def set_forward_time(self, time: Optional[float]):
+        """
+        スケジュール済みの送信イベントの時刻を更新
+
+        Args:
+            time (Optional[float]): 送信イベントの時刻（None の場合はスケジュール済みのイベントなし）
+        """
+        if self.state_observer is not None:
+            self.state_observer.buffer_changing(self)
+        self.forward_time = time
+
+    def save_state(self) -> Tuple:
+        """
+        バッファ（スケジューラとAQM、保持中のパケット、送信イベントの時刻）の状態を保存
+
+        スケジューラとAQMはコピーするが、バッファ内のパケットはコピーせず同じオブジェクトを参照する。
+
+        Returns:
+            Tuple: restore_state に渡す状態
+        """
+        aqm = copy.deepcopy(self.aqm) if self.aqm is not None else None
+        return (self.buffer.copy(), aqm, self.buffer_occupancy, self.aqm_drop_count, self.held_packet,
+                self.forward_time)
+
+    def restore_state(self, state: Tuple):
+        """
+        save_state で保存した状態に戻す
+
+        Args:
+            state (Tuple): save_state の戻り値
+        """
+        (self.buffer, self.aqm, self.buffer_occupancy, self.aqm_drop_count, self.held_packet,
+         self.forward_time) = state
+
     def process_buffer(self):
         """
         バッファ内のパケットを処理（送信など）
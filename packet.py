@@ -10,12 +10,15 @@ class Packet:
         packet_id (int): パケットID
         flow_id (int): フローID
         size (int): パケットサイズ（バイト）
+        service_type (str): サービスの種類（ノードのスケジューラが分類に使用）
         route (List[int]): 通過予定ノードIDのリスト
         current_node_index (int): 現在のノードインデックス
         status (str): パケットの状態（"in_transit", "delivered", "lost"）
     """
 
-    def __init__(self, packet_id: int, flow_id: int, size: int):
+    __slots__ = ("packet_id", "flow_id", "size", "service_type", "route", "current_node_index", "status", "sent_time", "arrival_time")
+
+    def __init__(self, packet_id: int, flow_id: int, size: int, service_type: str = "data"):
         """
         パケットの初期化
 
@@ -23,10 +26,12 @@ class Packet:
             packet_id (int): パケットID
             flow_id (int): フローID
             size (int): パケットサイズ（バイト）
+            service_type (str, optional): サービスの種類（デフォルトは "data"）
         """
         self.packet_id = packet_id
         self.flow_id = flow_id
         self.size = size
+        self.service_type = service_type
         self.route: List[int] = []
         self.current_node_index = 0
         self.status = "in_transit"
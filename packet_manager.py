@@ -1,71 +1,139 @@
 # packet_manager.py
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from packet import Packet
+from packet_store import PacketStore, PacketRange
 from flow import Flow
 from link import Link
 from node import Node
+from route_cache import RouteCache
+from packet_trace import TraceRecorder, TRACE_SEND, TRACE_RECEIVE, TRACE_DELIVER, TRACE_DROP, NO_ELEMENT
 
 import random
 
-import networkx as nx
+# リンクの伝送モデル（"legacy": 帯域幅チェックのみ、"serialization": 送出時間と出力キューを考慮）
+LINK_MODELS = ("legacy", "serialization")
+
+# パケットIDのうちフロー内の番号に使う下位ビット数（上位ビットはフローID）
+PACKET_INDEX_BITS = 32
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+def _mix64(value: int) -> int:
+    """
+    splitmix64 の出力関数（64ビット整数を一様に混ぜる）
+    """
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+def make_packet_id(flow_id: int, index: int) -> int:
+    """
+    フローIDとフロー内の番号から一意なパケットIDを作成
+
+    Args:
+        flow_id (int): フローID
+        index (int): フロー内のパケットの番号（2**32 未満）
+
+    Returns:
+        int: パケットID（64ビット符号付き整数に収まる）
+    """
+    return (flow_id << PACKET_INDEX_BITS) | index
+
 class PacketManager:
     """
     パケット管理クラス
 
     Attributes:
         packets_in_transit (List[Packet]): 転送中のパケットリスト
+        packet_store (PacketStore): 生成したパケットを保持する列指向ストア
+        route_cache (RouteCache): 経路計算結果のキャッシュ
+        trace_recorder (Optional[TraceRecorder]): パケットのホップごとのイベントの記録先（記録しない場合None）
+        link_model (str): リンクの伝送モデル（"legacy" または "serialization"）
+        jitter_seed (Optional[int]): ジッターの乱数のシード。指定した場合はリンクの方向ごとに独立した乱数列を使い、
+            イベントの実行順序によらず同じ値になる（None の場合はグローバルな random を使用）
+        jitter_states (Dict[Tuple[int, int], int]): (リンクID, 送信側ノードID) をキーとするジッターの乱数列（splitmix64）の状態
         topology_manager (TopologyManager): トポロジマネージャ
         simulation_engine (SimulationEngine): シミュレーションエンジン
     """
 
-    def __init__(self, topology_manager, simulation_engine, central_controller, metrics_collector):
+    def __init__(self, topology_manager, simulation_engine, central_controller, metrics_collector, link_model: str = "legacy"):
         """
         パケットマネージャの初期化
 
         Args:
             topology_manager (TopologyManager): トポロジマネージャ
             simulation_engine (SimulationEngine): シミュレーションエンジン
+            link_model (str, optional): リンクの伝送モデル（"legacy" または "serialization"）
         """
+        if link_model not in LINK_MODELS:
+            raise ValueError(f"Unknown link model: {link_model}")
         self.packets_in_transit: List[Packet] = []
+        self.packet_store = PacketStore()
         self.topology_manager = topology_manager
         self.simulation_engine = simulation_engine
         self.central_controller = central_controller
         self.metrics_collector = metrics_collector
-
-    def create_packets(self, flow: Flow) -> List[Packet]:
+        self.route_cache = RouteCache(central_controller.routing_table if central_controller is not None else None)
+        self.trace_recorder: Optional[TraceRecorder] = None
+        self.link_model = link_model
+        self.jitter_seed: Optional[int] = None
+        self.jitter_states: Dict[Tuple[int, int], int] = {}
+        self.flow_manager = None
+        if central_controller is not None:
+            # 障害・復旧時に経路表が修復した宛先への経路のみを無効化する
+            central_controller.add_topology_listener(self.route_cache)
+
+    def create_packets(self, flow: Flow) -> PacketRange:
         """
         フローからパケットを生成
 
+        パケットは packet_store にまとめて確保され、経路はフロー内で共有される。
+
         Args:
             flow (Flow): フローオブジェクト
 
         Returns:
-            List[Packet]: 生成されたパケットのリスト
-        """
-        packets = []
-        for i in range(flow.packet_count):
-            packet_id = flow.flow_id * 100000 + i  # 一意なID
-            packet = Packet(packet_id, flow.flow_id, 1500)  # パケットサイズ1500バイト
-            packet.route = self.calculate_route(flow.source_node, flow.destination_node)
-            packets.append(packet)
+            PacketRange: 生成されたパケットのシーケンス（要素は PacketHandle）
+        """
+        route = self.calculate_route(flow.source_node, flow.destination_node)
+        packets = self.packet_store.allocate(
+            flow_id=flow.flow_id,
+            count=flow.packet_count,
+            size=1500,  # パケットサイズ1500バイト
+            first_packet_id=make_packet_id(flow.flow_id, 0),  # 一意なID
+            route=route,
+            service_type=flow.service_type
+        )
         flow.packets = packets
+        self.register_flow(flow)
         return packets
 
-    def calculate_route(self, source_node_id: int, destination_node_id: int) -> List[int]:
+    def create_packet(self, flow: Flow, index: int) -> Packet:
         """
-        パケットの経路を計算
+        フローの index 番目のパケットを1つ生成（送信元での逐次生成用）
+
+        packet_store には確保せず、経路はその時点の経路キャッシュから取得する。
 
         Args:
-            source_node_id (int): 送信元ノードID
-            destination_node_id (int): 送信先ノードID
+            flow (Flow): フローオブジェクト
+            index (int): フロー内のパケットの番号
 
         Returns:
-            List[int]: 経路上のノードIDリスト
+            Packet: 生成されたパケット
         """
-        # ルーティングアルゴリズムを実装（例：ダイクストラ法）
-        # 仮の実装として直接接続を返す
-        return [source_node_id, destination_node_id]
+        packet = Packet(packet_id=make_packet_id(flow.flow_id, index), flow_id=flow.flow_id, size=1500,
+                        service_type=flow.service_type)
+        packet.route = self.calculate_route(flow.source_node, flow.destination_node)
+        return packet
+
+    def register_flow(self, flow: Flow):
+        """
+        フローをメトリクスコレクタに登録
+        """
+        if self.metrics_collector is not None:
+            self.simulation_engine.defer(lambda: self.metrics_collector.register_flow(flow))
 
     def send_packet(self, packet: Packet, current_node: Node):
         """
@@ -77,45 +145,65 @@ class PacketManager:
         """
         if current_node.status == "failed":
             # ノードがダウンしている場合
-            packet.status = "lost"
+            self._drop_packet(packet, current_node.node_id)
             return
 
         next_node_index = packet.current_node_index + 1
         if next_node_index < len(packet.route):
             next_node_id = packet.route[next_node_index]
-            link_id = self.find_link_between_nodes(current_node.node_id, next_node_id)
+            link_id = self.find_link_between_nodes(current_node.node_id, next_node_id, packet.flow_id)
             link = self.topology_manager.get_link(link_id)
 
             if link and link.status == "active":
                 # リンクが使用可能な場合
-                # 帯域幅チェック
-                if link.current_load + packet.size <= link.capacity:
+                now = self.simulation_engine.current_time
+                if self.link_model == "serialization":
+                    # 出力キューの送出待ちと送出時間を仮想時刻で計算（リンク側のイベントは発生しない）
+                    departure = link.schedule_transmission(packet.size, now, current_node.node_id)
+                    background_delay = 0.0
+                elif link.current_load + packet.size <= link.available_capacity():
+                    # 帯域幅チェック（流体モデルのフローが使用している帯域は除く）
+                    departure = now
+                    background_delay = link.queueing_delay(packet.size)
+                else:
+                    departure = None
+
+                if departure is not None:
                     link.update_load(packet.size, "add")
-                    packet.sent_time = self.simulation_engine.current_time
+                    packet.sent_time = now
                     packet.current_node_index = next_node_index
+                    if self.trace_recorder is not None:
+                        self._trace(packet, current_node.node_id, link.link_id, TRACE_SEND)
 
-                    # 遅延とジッターを考慮
-                    actual_delay = link.delay + random.uniform(-link.jitter, link.jitter)
-                    arrival_time = self.simulation_engine.current_time + actual_delay
+                    # 伝搬遅延とジッター、流体モデルのフローによる待ち行列遅延を考慮
+                    actual_delay = link.delay + self._jitter(link, current_node.node_id) + background_delay
+                    arrival_time = departure + actual_delay
 
                     # パケット到着イベントをスケジュール
-                    self.simulation_engine.schedule_event(arrival_time, lambda p=packet, nid=next_node_id: self.receive_packet(p, nid, link))
+                    epoch = link.failure_epoch
+                    self.simulation_engine.schedule_event(
+                        arrival_time, lambda p=packet, nid=next_node_id: self.receive_packet(p, nid, link, departure, epoch),
+                        owner=next_node_id)
                 else:
-                    # 帯域幅不足
-                    # パケットをバッファに戻すか、ロスとするかの判断
-                    packet.status = "lost"
+                    # 帯域幅不足または出力キューのあふれ
+                    self._drop_packet(packet, current_node.node_id, link.link_id)
                     link.packet_loss_count += 1
             else:
                 # リンクが使用不可の場合
-                packet.status = "lost"
+                self._drop_packet(packet, current_node.node_id, link_id if link_id is not None else NO_ELEMENT)
+        elif not packet.route or packet.route[-1] != current_node.node_id:
+            # 生成時に送信先へ到達できなかった（経路が空の）パケット
+            self._drop_packet(packet, current_node.node_id)
         else:
             # 目的地に到達
             packet.status = "delivered"
             packet.arrival_time = self.simulation_engine.current_time
-            # フローのメトリクスを更新
-            self.metrics_collector.record_flow_metrics(self.simulation_engine.current_time, self.flow_manager.flows[packet.flow_id])
+            if self.trace_recorder is not None:
+                self._trace(packet, current_node.node_id, NO_ELEMENT, TRACE_DELIVER)
+            self.simulation_engine.defer(lambda: self._packet_delivered(packet))
 
-    def receive_packet(self, packet: Packet, node_id: int, link: Link):
+    def receive_packet(self, packet: Packet, node_id: int, link: Link, departure: Optional[float] = None,
+                       epoch: Optional[int] = None):
         """
         パケットを受信
 
@@ -123,39 +211,149 @@ class PacketManager:
             packet (Packet): パケットオブジェクト
             node_id (int): 受信ノードID
             link (Link): パケットを通過したリンク
+            departure (Optional[float], optional): 送信側でパケットを送り終えた時刻
+            epoch (Optional[int], optional): 送信時のリンクの failure_epoch（指定した場合、送出後に発生した
+                リンクの障害の時点で送り終えていなかったパケットは破棄する）
         """
         link.update_load(packet.size, "remove")
         node = self.topology_manager.get_node(node_id)
-        if node and node.status == "active":
+        if epoch is not None and link.lost_in_failure(departure, epoch):
+            # 送出待ちのままリンクの障害で失われたパケット
+            self._drop_packet(packet, node_id, link.link_id)
+            link.packet_loss_count += 1
+        elif node and node.status == "active":
             # バッファにパケットを追加
-            if node.enqueue_packet(packet):
-                # 次の送信をスケジュール
-                self.simulation_engine.schedule_event(self.simulation_engine.current_time, lambda: self.send_packet(packet, node))
+            if node.enqueue_packet(packet, self.simulation_engine.current_time):
+                if self.trace_recorder is not None:
+                    self._trace(packet, node_id, link.link_id, TRACE_RECEIVE)
+                # 次の送信をスケジュール（送信するパケットはノードのスケジューラが決める）
+                self._schedule_forward(node, self.simulation_engine.current_time)
             else:
-                # バッファオーバーフロー
-                packet.status = "lost"
+                # バッファオーバーフロー（またはAQMによる破棄）
+                self._drop_packet(packet, node_id, link.link_id)
         else:
             # ノードがダウンしている場合
-            packet.status = "lost"
+            self._drop_packet(packet, node_id, link.link_id)
 
-    def find_link_between_nodes(self, node1_id: int, node2_id: int) -> Optional[int]:
+    def forward_packet(self, node: Node):
+        """
+        ノードのバッファからスケジューラの順序でパケットを取り出して送信
+
+        出力先のリンクの方向が送出中（Link.busy_until が現在時刻より後）のパケットを取り出した場合は
+        ノードに保持し、送り終える時刻に送信イベントを1つだけスケジュールして取り出しを止める。
+        送出待ちのパケットはノードのバッファに残るため、次に送るパケットはリンクが空いた時点で
+        ノードのスケジューラとAQMが選ぶ。
+
+        Args:
+            node (Node): 送信するノード
+        """
+        now = self.simulation_engine.current_time
+        if node.forward_time is not None and node.forward_time <= now:
+            node.set_forward_time(None)
+        on_drop = lambda dropped: self._packet_dropped(dropped, node.node_id, NO_ELEMENT)
+        while True:
+            packet = node.dequeue_packet(now, on_drop=on_drop)
+            if packet is None:
+                return
+            busy_until = self._busy_until(packet, node)
+            if busy_until > now:
+                node.hold_packet(packet)
+                self._schedule_forward(node, busy_until)
+                return
+            self.send_packet(packet, node)
+
+    def _schedule_forward(self, node: Node, time: float):
+        """
+        ノードの送信イベントをスケジュール（同時刻またはより早い送信イベントがある場合は何もしない）
+        """
+        if node.forward_time is not None and node.forward_time <= time:
+            return
+        node.set_forward_time(time)
+        self.simulation_engine.schedule_event(time, lambda: self.forward_packet(node), owner=node.node_id)
+
+    def _busy_until(self, packet: Packet, node: Node) -> float:
+        """
+        パケットの出力先のリンクの方向が送出を終える時刻（送出中でない場合0）
+        """
+        next_node_index = packet.current_node_index + 1
+        if next_node_index >= len(packet.route):
+            return 0.0
+        link = self.topology_manager.select_link(node.node_id, packet.route[next_node_index], packet.flow_id)
+        if link is None:
+            return 0.0
+        return link.busy_until.get(node.node_id, 0.0)
+
+    def _jitter(self, link: Link, from_node: int) -> float:
+        """
+        リンクを通過するパケットのジッターを抽出
+        """
+        if self.jitter_seed is None:
+            return random.uniform(-link.jitter, link.jitter)
+        key = (link.link_id, from_node)
+        state = self.jitter_states.get(key)
+        if state is None:
+            # 送信側ノードが所有する乱数列の初期状態（シード・リンクID・ノードIDから決まる）
+            state = _mix64(_mix64((self.jitter_seed ^ link.link_id) & _MASK64) ^ (from_node & _MASK64))
+        # 状態を整数1つで表すため、Time Warp での保存・復元が軽い
+        state = (state + _GOLDEN_GAMMA) & _MASK64
+        self.jitter_states[key] = state
+        return link.jitter * ((_mix64(state) >> 11) * 2.0 ** -52 - 1.0)
+
+    def _drop_packet(self, packet: Packet, node_id: int = NO_ELEMENT, link_id: int = NO_ELEMENT):
+        """
+        パケットをロスとし、メトリクスとトレースに反映
+        """
+        packet.status = "lost"
+        self._packet_dropped(packet, node_id, link_id)
+
+    def _packet_delivered(self, packet: Packet):
+        """
+        配送したパケットをフローのメトリクスに反映
+        """
+        self.metrics_collector.record_packet_delivered(packet)
+        self.metrics_collector.record_flow_metrics(self.simulation_engine.current_time, self.flow_manager.flows[packet.flow_id])
+        self._check_flow_finished(packet.flow_id)
+
+    def _packet_dropped(self, packet: Packet, node_id: int = NO_ELEMENT, link_id: int = NO_ELEMENT):
+        if self.metrics_collector is not None:
+            self.simulation_engine.defer(lambda: self._packet_lost(packet))
+        if self.trace_recorder is not None:
+            self._trace(packet, node_id, link_id, TRACE_DROP)
+
+    def _packet_lost(self, packet: Packet):
+        self.metrics_collector.record_packet_lost(packet)
+        self._check_flow_finished(packet.flow_id)
+
+    def _check_flow_finished(self, flow_id: int):
+        """
+        フローの全パケットが配送またはロスした場合にフローの完了を通知
+        """
+        if self.flow_manager is None:
+            return
+        accumulator = self.metrics_collector.flow_accumulators.get(flow_id)
+        if accumulator is not None and accumulator.delivered_packets + accumulator.lost_packets >= accumulator.total_packets:
+            self.flow_manager.handle_flow_completion(flow_id)
+
+    def _trace(self, packet: Packet, node_id: int, link_id: int, kind: int):
+        now = self.simulation_engine.current_time
+        self.simulation_engine.defer(lambda: self.trace_recorder.record(now, packet.packet_id, packet.flow_id, node_id, link_id, kind))
+
+    def find_link_between_nodes(self, node1_id: int, node2_id: int, flow_id: Optional[int] = None) -> Optional[int]:
         """
         2つのノード間のリンクIDを取得
 
+        並行リンクがある場合はトポロジマネージャの選択方針に従って稼働中のリンクを選ぶ。
+
         Args:
             node1_id (int): ノード1のID
             node2_id (int): ノード2のID
+            flow_id (Optional[int], optional): フローID（ECMPのハッシュに使用）
 
         Returns:
             Optional[int]: リンクIDまたはNone
         """
-        node1 = self.topology_manager.get_node(node1_id)
-        if node1:
-            for link_id in node1.adjacent_links:
-                link = self.topology_manager.get_link(link_id)
-                if link and node2_id in link.connected_nodes:
-                    return link_id
-        return None
+        link = self.topology_manager.select_link(node1_id, node2_id, flow_id)
+        return link.link_id if link else None
 
     def retransmit_packet(self, packet: Packet):
         """
@@ -171,6 +369,8 @@ class PacketManager:
         """
         パケットの経路を計算
 
+        計算結果は (送信元, 送信先, アルゴリズム) をキーとして route_cache に保持される。
+
         Args:
             source_node_id (int): 送信元ノードID
             destination_node_id (int): 送信先ノードID
@@ -178,19 +378,23 @@ class PacketManager:
         Returns:
             List[int]: 経路上のノードIDリスト
         """
-        if self.central_controller.algorithm == "dijkstra":
-            return self._calculate_route_dijkstra(source_node_id, destination_node_id)
-        elif self.central_controller.algorithm == "dqn":
-            return self._calculate_route_dqn(source_node_id, destination_node_id)
-        elif self.central_controller.algorithm == "ddpg":
-            return self._calculate_route_ddpg(source_node_id, destination_node_id)
+        algorithm = self.central_controller.algorithm
+        if algorithm == "dijkstra":
+            compute = self._calculate_route_dijkstra
+        elif algorithm == "dqn":
+            compute = self._calculate_route_dqn
+        elif algorithm == "ddpg":
+            compute = self._calculate_route_ddpg
         else:
-            raise ValueError(f"Unknown algorithm: {self.central_controller.algorithm}")
+            raise ValueError(f"Unknown algorithm: {algorithm}")
+        return self.route_cache.get_route(source_node_id, destination_node_id, algorithm, compute)
 
     def _calculate_route_dijkstra(self, source_node_id: int, destination_node_id: int) -> List[int]:
         """
         ダイクストラ法による経路計算
 
+        中央コントローラが事前計算した次ホップ行列を辿って経路を求める。
+
         Args:
             source_node_id (int): 送信元ノードID
             destination_node_id (int): 送信先ノードID
@@ -198,26 +402,10 @@ class PacketManager:
         Returns:
             List[int]: 経路上のノードIDリスト
         """
-        G = nx.Graph()
-        for node_id in self.topology_manager.nodes:
-            G.add_node(node_id)
-
-        for link in self.topology_manager.links.values():
-            if link.status == "active":
-                node1, node2 = link.connected_nodes
-                # 重みはリンクの遅延と帯域幅に基づく（簡易的な例）
-                weight = link.delay + (1 / link.capacity)
-                G.add_edge(node1, node2, weight=weight)
-            else:
-                # リンクがダウンしている場合、エッジを追加しない
-                pass
-
-        try:
-            path = nx.dijkstra_path(G, source=source_node_id, target=destination_node_id)
-            return path
-        except nx.NetworkXNoPath:
+        path = self.central_controller.get_routing_table().path(source_node_id, destination_node_id)
+        if not path:
             print(f"No path between {source_node_id} and {destination_node_id}")
-            return []
+        return path
 
     def _calculate_route_dqn(self, source_node_id: int, destination_node_id: int) -> List[int]:
         """
@@ -0,0 +1,290 @@
+# packet_store.py
+
+from array import array
+from typing import Dict, Iterator, List, Sequence, Tuple, Union
+
+import numpy as np
+
+# パケット状態の文字列とストア内部のコードの対応
+STATUS_IN_TRANSIT = 0
+STATUS_DELIVERED = 1
+STATUS_LOST = 2
+STATUS_NAMES: Tuple[str, ...] = ("in_transit", "delivered", "lost")
+STATUS_CODES: Dict[str, int] = {name: code for code, name in enumerate(STATUS_NAMES)}
+
+
+class PacketStore:
+    """
+    パケット情報を列ごとの配列で保持するストア（Struct of Arrays）
+
+    パケットごとにオブジェクトを生成せず、各属性を array.array の列として保持する。
+    経路は同一の内容を1つのタプルとして共有し、各パケットは経路番号のみを持つ。
+
+    Attributes:
+        packet_ids (array): パケットID
+        flow_ids (array): フローID
+        sizes (array): パケットサイズ（バイト）
+        hop_indices (array): 現在のノードインデックス
+        status_codes (array): パケット状態コード
+        sent_times (array): 送信時間
+        arrival_times (array): 到着時間
+        route_indices (array): 経路番号（routes のインデックス）
+        service_codes (array): サービス種別番号（service_types のインデックス）
+        routes (List[Tuple[int, ...]]): 共有される経路のリスト
+        service_types (List[str]): サービス種別のリスト
+    """
+
+    # 列名と array の型コード、NumPy の dtype
+    COLUMNS = {
+        "packet_ids": ("q", np.int64),
+        "flow_ids": ("q", np.int64),
+        "sizes": ("i", np.int32),
+        "hop_indices": ("i", np.int32),
+        "status_codes": ("b", np.int8),
+        "sent_times": ("d", np.float64),
+        "arrival_times": ("d", np.float64),
+        "route_indices": ("i", np.int32),
+        "service_codes": ("b", np.int8),
+    }
+
+    def __init__(self):
+        for name, (typecode, _) in self.COLUMNS.items():
+            setattr(self, name, array(typecode))
+        self.routes: List[Tuple[int, ...]] = [()]
+        self._route_lookup: Dict[Tuple[int, ...], int] = {(): 0}
+        self.service_types: List[str] = []
+        self._service_lookup: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.packet_ids)
+
+    def intern_route(self, route: Sequence[int]) -> int:
+        """
+        経路を登録し、経路番号を取得
+
+        Args:
+            route (Sequence[int]): 経路上のノードIDのリスト
+
+        Returns:
+            int: 経路番号
+        """
+        route = tuple(route)
+        route_index = self._route_lookup.get(route)
+        if route_index is None:
+            route_index = len(self.routes)
+            self.routes.append(route)
+            self._route_lookup[route] = route_index
+        return route_index
+
+    def intern_service_type(self, service_type: str) -> int:
+        """
+        サービス種別を登録し、サービス種別番号を取得
+
+        Args:
+            service_type (str): サービス種別
+
+        Returns:
+            int: サービス種別番号
+        """
+        code = self._service_lookup.get(service_type)
+        if code is None:
+            code = len(self.service_types)
+            self.service_types.append(service_type)
+            self._service_lookup[service_type] = code
+        return code
+
+    def allocate(self, flow_id: int, count: int, size: int, first_packet_id: int, route: Sequence[int] = (),
+                 service_type: str = "data") -> "PacketRange":
+        """
+        フローのパケットをまとめて確保
+
+        Args:
+            flow_id (int): フローID
+            count (int): パケット数
+            size (int): パケットサイズ（バイト）
+            first_packet_id (int): 先頭パケットのID（以降は連番）
+            route (Sequence[int], optional): 全パケット共通の経路
+            service_type (str, optional): サービス種別（デフォルトは "data"）
+
+        Returns:
+            PacketRange: 確保したパケットの範囲
+        """
+        start = len(self)
+        route_index = self.intern_route(route)
+        service_code = self.intern_service_type(service_type)
+        self.packet_ids.frombytes(np.arange(first_packet_id, first_packet_id + count, dtype=np.int64).tobytes())
+        self.flow_ids.extend(array("q", [flow_id]) * count)
+        self.sizes.extend(array("i", [size]) * count)
+        self.hop_indices.extend(array("i", [0]) * count)
+        self.status_codes.extend(array("b", [STATUS_IN_TRANSIT]) * count)
+        self.sent_times.extend(array("d", [0.0]) * count)
+        self.arrival_times.extend(array("d", [0.0]) * count)
+        self.route_indices.extend(array("i", [route_index]) * count)
+        self.service_codes.extend(array("b", [service_code]) * count)
+        return PacketRange(self, start, count)
+
+    def handle(self, index: int) -> "PacketHandle":
+        """
+        指定位置のパケットへのハンドルを取得
+
+        Args:
+            index (int): ストア内の位置
+
+        Returns:
+            PacketHandle: パケットハンドル
+        """
+        return PacketHandle(self, index)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        列を NumPy 配列として参照（コピーなし）
+
+        Note:
+            返される配列はストアのバッファを直接参照するため、パケットを追加する前に破棄すること
+
+        Args:
+            name (str): 列名（COLUMNS のキー）
+
+        Returns:
+            np.ndarray: 列のビュー
+        """
+        return np.frombuffer(getattr(self, name), dtype=self.COLUMNS[name][1])
+
+    def memory_usage(self) -> int:
+        """
+        列データの使用メモリ量を取得
+
+        Returns:
+            int: バイト数
+        """
+        return sum(len(getattr(self, name)) * getattr(self, name).itemsize for name in self.COLUMNS)
+
+
+class PacketHandle:
+    """
+    PacketStore 内の1パケットを Packet と同じ属性名で参照する軽量ハンドル
+
+    Attributes:
+        store (PacketStore): 参照先のストア
+        index (int): ストア内の位置
+    """
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store: PacketStore, index: int):
+        self.store = store
+        self.index = index
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PacketHandle) and self.store is other.store and self.index == other.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.store), self.index))
+
+    def __repr__(self) -> str:
+        return f"PacketHandle(packet_id={self.packet_id}, flow_id={self.flow_id}, status={self.status!r})"
+
+    @property
+    def packet_id(self) -> int:
+        return self.store.packet_ids[self.index]
+
+    @property
+    def flow_id(self) -> int:
+        return self.store.flow_ids[self.index]
+
+    @property
+    def size(self) -> int:
+        return self.store.sizes[self.index]
+
+    @property
+    def service_type(self) -> str:
+        return self.store.service_types[self.store.service_codes[self.index]]
+
+    @property
+    def route(self) -> Tuple[int, ...]:
+        return self.store.routes[self.store.route_indices[self.index]]
+
+    @route.setter
+    def route(self, route: Sequence[int]):
+        self.store.route_indices[self.index] = self.store.intern_route(route)
+
+    @property
+    def current_node_index(self) -> int:
+        return self.store.hop_indices[self.index]
+
+    @current_node_index.setter
+    def current_node_index(self, value: int):
+        self.store.hop_indices[self.index] = value
+
+    @property
+    def status(self) -> str:
+        return STATUS_NAMES[self.store.status_codes[self.index]]
+
+    @status.setter
+    def status(self, value: str):
+        self.store.status_codes[self.index] = STATUS_CODES[value]
+
+    @property
+    def sent_time(self) -> float:
+        return self.store.sent_times[self.index]
+
+    @sent_time.setter
+    def sent_time(self, value: float):
+        self.store.sent_times[self.index] = value
+
+    @property
+    def arrival_time(self) -> float:
+        return self.store.arrival_times[self.index]
+
+    @arrival_time.setter
+    def arrival_time(self, value: float):
+        self.store.arrival_times[self.index] = value
+
+
+class PacketRange(Sequence):
+    """
+    フローに属するパケットの連続領域を表すシーケンス
+
+    要素にアクセスしたときにのみ PacketHandle を生成する。
+
+    Attributes:
+        store (PacketStore): 参照先のストア
+        start (int): 先頭の位置
+        count (int): パケット数
+    """
+
+    __slots__ = ("store", "start", "count")
+
+    def __init__(self, store: PacketStore, start: int, count: int):
+        self.store = store
+        self.start = start
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("packet index out of range")
+        return PacketHandle(self.store, self.start + index)
+
+    def __iter__(self) -> Iterator[PacketHandle]:
+        store = self.store
+        for index in range(self.start, self.start + self.count):
+            yield PacketHandle(store, index)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        この範囲の列を NumPy 配列として参照（コピーなし）
+
+        Args:
+            name (str): 列名
+
+        Returns:
+            np.ndarray: 列のビュー
+        """
+        return self.store.column(name)[self.start:self.start + self.count]
@@ -0,0 +1,168 @@
+# packet_trace.py
+
+import os
+import struct
+from typing import Optional
+
+import numpy as np
+
+# トレースの1レコード（固定長、リトルエンディアン）
+TRACE_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("packet_id", "<i8"),
+    ("flow_id", "<i8"),
+    ("node", "<i4"),
+    ("link", "<i4"),
+    ("kind", "u1"),
+])
+
+# イベントの種類
+TRACE_SEND = 0      # ノードからリンクへ送出
+TRACE_RECEIVE = 1   # ノードに到着しバッファに格納
+TRACE_DELIVER = 2   # 宛先に到達
+TRACE_DROP = 3      # ロス
+TRACE_KIND_NAMES = ("send", "receive", "deliver", "drop")
+
+# ノードやリンクが該当しない場合の値
+NO_ELEMENT = -1
+
+# ヘッダ: マジック(8) + バージョン(4) + レコード長(4) + レコード数(8)
+_HEADER = struct.Struct("<8sIIQ")
+_MAGIC = b"PSTRACE1"
+_VERSION = 1
+
+
+class TraceRecorder:
+    """
+    パケットのホップごとのイベントを固定長のバイナリレコードとしてファイルに記録するクラス
+
+    ファイルはメモリマップで書き込み、容量が足りなくなると倍に拡張する。
+    レコード数はヘッダに記録され、flush / close 時に更新される。
+
+    Attributes:
+        file_path (str): トレースファイルのパス
+        count (int): 記録したレコード数
+        capacity (int): 現在確保しているレコード数
+    """
+
+    def __init__(self, file_path: str, initial_capacity: int = 1 << 16):
+        """
+        Args:
+            file_path (str): トレースファイルのパス（既存のファイルは上書きされる）
+            initial_capacity (int, optional): 最初に確保するレコード数
+        """
+        if initial_capacity <= 0:
+            raise ValueError("initial_capacity must be positive")
+        self.file_path = file_path
+        self.count = 0
+        self.capacity = 0
+        self._records: Optional[np.memmap] = None
+        self._file = open(file_path, "w+b")
+        self._write_header()
+        self._resize(initial_capacity)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _write_header(self):
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, TRACE_DTYPE.itemsize, self.count))
+        self._file.flush()
+
+    def _resize(self, capacity: int):
+        if self._records is not None:
+            self._records.flush()
+            self._records = None
+        self._file.truncate(_HEADER.size + capacity * TRACE_DTYPE.itemsize)
+        self._records = np.memmap(self._file, dtype=TRACE_DTYPE, mode="r+", offset=_HEADER.size, shape=(capacity,))
+        self.capacity = capacity
+
+    def record(self, time: float, packet_id: int, flow_id: int, node: int, link: int, kind: int):
+        """
+        1イベントを記録
+
+        Args:
+            time (float): シミュレーション時刻
+            packet_id (int): パケットID
+            flow_id (int): フローID
+            node (int): ノードID（該当しない場合 NO_ELEMENT）
+            link (int): リンクID（該当しない場合 NO_ELEMENT）
+            kind (int): イベントの種類（TRACE_SEND など）
+        """
+        if self.count == self.capacity:
+            self._resize(2 * self.capacity)
+        self._records[self.count] = (time, packet_id, flow_id, node, link, kind)
+        self.count += 1
+
+    def records(self) -> np.ndarray:
+        """
+        記録済みのレコードを参照（コピーなし）
+
+        Returns:
+            np.ndarray: TRACE_DTYPE の構造化配列
+        """
+        return self._records[:self.count]
+
+    def flush(self):
+        """
+        レコードとレコード数をファイルに書き出す
+        """
+        self._records.flush()
+        self._write_header()
+
+    def close(self):
+        """
+        ファイルを記録済みの長さに切り詰めて閉じる
+        """
+        if self._file.closed:
+            return
+        self._records.flush()
+        self._records = None
+        self._file.truncate(_HEADER.size + self.count * TRACE_DTYPE.itemsize)
+        self._write_header()
+        self._file.close()
+
+
+def read_trace(file_path: str, mmap: bool = True) -> np.ndarray:
+    """
+    トレースファイルを構造化配列として読み込む
+
+    Args:
+        file_path (str): トレースファイルのパス
+        mmap (bool, optional): メモリマップで参照する場合True（大きなファイルでも全体を読み込まない）
+
+    Returns:
+        np.ndarray: TRACE_DTYPE の構造化配列
+    """
+    with open(file_path, "rb") as file:
+        magic, version, record_size, count = _HEADER.unpack(file.read(_HEADER.size))
+    if magic != _MAGIC:
+        raise ValueError(f"Not a packet trace file: {file_path}")
+    if version != _VERSION or record_size != TRACE_DTYPE.itemsize:
+        raise ValueError(f"Unsupported packet trace version {version} (record size {record_size})")
+    # 異常終了などでヘッダのレコード数が更新されていない場合もファイルの長さを超えて読まない
+    count = min(count, (os.path.getsize(file_path) - _HEADER.size) // record_size)
+    if count == 0:
+        return np.empty(0, dtype=TRACE_DTYPE)
+    if mmap:
+        return np.memmap(file_path, dtype=TRACE_DTYPE, mode="r", offset=_HEADER.size, shape=(count,))
+    return np.fromfile(file_path, dtype=TRACE_DTYPE, count=count, offset=_HEADER.size)
+
+
+def packet_history(trace: np.ndarray, packet_id: int) -> np.ndarray:
+    """
+    1パケットのイベントを時刻順に取得
+
+    Args:
+        trace (np.ndarray): read_trace で読み込んだトレース
+        packet_id (int): パケットID
+
+    Returns:
+        np.ndarray: 該当するレコード
+    """
+    events = trace[trace["packet_id"] == packet_id]
+    return events[np.argsort(events["time"], kind="stable")]
+
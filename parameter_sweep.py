@@ -0,0 +1,321 @@
+# parameter_sweep.py
+
+import argparse
+import glob
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import yaml_loader
+from replication_runner import ReplicationRunner, run_replica
+
+SWEEP_METHODS = ("grid", "lhs")
+
+# スイープできるパラメータ（topology はトポロジ定義のYAMLファイルパス）
+SWEEP_PARAMETERS = ("simulation_time", "failure_rate", "failure_distribution", "algorithm", "topology")
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def code_version() -> str:
+    """
+    シミュレータのソースコードのハッシュを取得（テストとベンチマークは含まない）
+
+    Returns:
+        str: SHA-256 の16進文字列
+    """
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(_PACKAGE_DIR, "*.py"))):
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def file_digest(path: str) -> str:
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def expand_grid(parameters: Dict) -> List[Dict]:
+    """
+    各パラメータの値のリストの直積を展開
+
+    Args:
+        parameters (Dict): パラメータ名をキーとする値のリスト（リストでない値は固定値）
+
+    Returns:
+        List[Dict]: 実行する点のリスト
+    """
+    names = list(parameters)
+    values = [value if isinstance(value, list) else [value] for value in parameters.values()]
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+
+def expand_latin_hypercube(parameters: Dict, samples: int, seed: int = 0) -> List[Dict]:
+    """
+    ラテン超方格法でパラメータ空間から点を抽出
+
+    連続値は {min, max} で指定し、各区間を samples 等分した層から1点ずつ抽出する。
+    値のリストで指定したパラメータはリストの添字を同様に層別して選ぶ。
+
+    Args:
+        parameters (Dict): パラメータ名をキーとする {min, max}、値のリスト、または固定値
+        samples (int): 抽出する点の数
+        seed (int, optional): 乱数のシード
+
+    Returns:
+        List[Dict]: 実行する点のリスト
+    """
+    if samples <= 0:
+        raise ValueError("samples must be positive")
+    rng = np.random.default_rng(seed)
+    points = [{} for _ in range(samples)]
+    for name, spec in parameters.items():
+        # 各層 [k/n, (k+1)/n) から1点ずつ抽出し、層の順序を並べ替える
+        quantiles = (rng.permutation(samples) + rng.random(samples)) / samples
+        if isinstance(spec, dict):
+            low, high = spec['min'], spec['max']
+            values = low + quantiles * (high - low)
+            if isinstance(low, int) and isinstance(high, int):
+                values = np.floor(low + quantiles * (high - low + 1)).astype(int)
+            values = values.tolist()
+        elif isinstance(spec, list):
+            values = [spec[int(q * len(spec))] for q in quantiles]
+        else:
+            values = [spec] * samples
+        for point, value in zip(points, values):
+            point[name] = value
+    return points
+
+
+def load_sweep_spec(spec_file: str) -> Dict:
+    """
+    スイープ定義のYAMLファイルを読み込む
+
+    Args:
+        spec_file (str): スイープ定義のYAMLファイルパス
+
+    Returns:
+        Dict: sweep セクションの内容
+    """
+    with open(spec_file, 'r', encoding='utf-8') as file:
+        spec = yaml_loader.safe_load(file).get('sweep', {})
+    base = spec.get('base', {})
+    if isinstance(base, str):
+        # 設定ファイルのパスが指定された場合はその simulation_parameters を基準とする
+        from configuration_manager import ConfigurationManager
+        config_manager = ConfigurationManager()
+        config_manager.load_configuration(base)
+        spec['base'] = config_manager.simulation_parameters
+    return spec
+
+
+class ResultCache:
+    """
+    実行結果をディスクに保存するキャッシュ
+
+    1つの結果を1つのJSONファイルとして保存する。書き込みは一時ファイルからの置き換えで行うため、
+    中断された場合も不完全なファイルは残らない。
+
+    Attributes:
+        cache_dir (str): 保存先のディレクトリ
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        保存済みの結果を取得
+
+        Args:
+            key (str): キャッシュキー
+
+        Returns:
+            Optional[Dict]: 結果、存在しない場合None
+        """
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, result: Dict):
+        """
+        結果を保存
+
+        Args:
+            key (str): キャッシュキー
+            result (Dict): 結果
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+            json.dump(result, file)
+        os.replace(temporary, path)
+
+
+def _run_point(task) -> Dict:
+    key, parameters, topology_file, flow_scenario, seed_sequence = task
+    return key, run_replica(parameters, seed_sequence, topology_file, flow_scenario)
+
+
+class ParameterSweep:
+    """
+    パラメータスイープの実行と結果のキャッシュを管理するクラス
+
+    各実行の結果は、パラメータ・トポロジファイルの内容・シード・ソースコードのハッシュから
+    求めたキーでキャッシュされる。再実行時はキャッシュにない点のみを実行する。
+
+    Attributes:
+        base_parameters (Dict): 全ての点に共通するシミュレーションパラメータ
+        points (List[Dict]): 実行する点のリスト
+        replications (int): 点ごとのレプリカ数
+        seed (int): 全体のシード
+        cache (ResultCache): 結果のキャッシュ
+        max_workers (Optional[int]): プロセス数（1の場合は現在のプロセスで実行）
+        flow_scenario (Optional[str]): フローシナリオYAMLファイルのパス
+        executed (int): 直近の run で実行した数
+        cached (int): 直近の run でキャッシュから取得した数
+    """
+
+    def __init__(self, spec: Dict, cache_dir: Optional[str] = None, max_workers: Optional[int] = None):
+        """
+        Args:
+            spec (Dict): スイープ定義（load_sweep_spec の戻り値と同じ形式）
+            cache_dir (Optional[str], optional): キャッシュの保存先（指定がない場合は spec の cache_dir）
+            max_workers (Optional[int], optional): プロセス数
+        """
+        method = spec.get('method', 'grid')
+        if method not in SWEEP_METHODS:
+            raise ValueError(f"Unknown sweep method: {method}")
+        parameters = spec.get('parameters', {})
+        unknown = [name for name in parameters if name not in SWEEP_PARAMETERS]
+        if unknown:
+            raise ValueError(f"Unknown sweep parameters: {unknown}")
+        self.base_parameters = dict(spec.get('base', {}))
+        self.replications = spec.get('replications', 1)
+        self.seed = spec.get('seed', 0)
+        if method == 'grid':
+            self.points = expand_grid(parameters)
+        else:
+            self.points = expand_latin_hypercube(parameters, spec.get('samples', 10), self.seed)
+        self.cache = ResultCache(cache_dir or spec.get('cache_dir', 'output/sweep_cache'))
+        self.max_workers = max_workers
+        self.flow_scenario = spec.get('flow_scenario')
+        self.executed = 0
+        self.cached = 0
+
+    def cache_key(self, parameters: Dict, topology_file: str, seed_sequence: np.random.SeedSequence, version: str) -> str:
+        """
+        1回の実行のキャッシュキーを計算
+
+        Args:
+            parameters (Dict): シミュレーションパラメータ
+            topology_file (str): トポロジ定義のYAMLファイルパス
+            seed_sequence (np.random.SeedSequence): レプリカのシード系列
+            version (str): ソースコードのハッシュ
+
+        Returns:
+            str: SHA-256 の16進文字列
+        """
+        content = {
+            'parameters': parameters,
+            'topology': file_digest(topology_file),
+            'flow_scenario': file_digest(self.flow_scenario) if self.flow_scenario else None,
+            'seed': [seed_sequence.entropy, list(seed_sequence.spawn_key)],
+            'code_version': version
+        }
+        return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+    def run(self) -> pd.DataFrame:
+        """
+        キャッシュにない点を実行し、全ての点の結果を取得
+
+        結果は1件ごとにキャッシュに保存するため、中断しても再実行時は続きから実行される。
+
+        Returns:
+            pd.DataFrame: 1行1レプリカの結果（点番号、レプリカ番号、点のパラメータ、各指標、キャッシュキー）
+        """
+        version = code_version()
+        seed_sequences = np.random.SeedSequence(self.seed).spawn(self.replications)
+        rows, tasks = [], []
+        for point_index, point in enumerate(self.points):
+            parameters = {**self.base_parameters, **point}
+            topology_file = parameters.pop('topology', 'data/topology.yaml')
+            for replica, seed_sequence in enumerate(seed_sequences):
+                key = self.cache_key(parameters, topology_file, seed_sequence, version)
+                row = {'point': point_index, 'replica': replica, **point, 'cache_key': key}
+                rows.append(row)
+                if self.cache.get(key) is None:
+                    tasks.append((key, parameters, topology_file, self.flow_scenario, seed_sequence))
+
+        self.cached = len(rows) - len(tasks)
+        self.executed = 0
+        if tasks:
+            if self.max_workers == 1:
+                for task in tasks:
+                    self._store(*_run_point(task))
+            else:
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    for future in as_completed([executor.submit(_run_point, task) for task in tasks]):
+                        self._store(*future.result())
+
+        for row in rows:
+            row.update(self.cache.get(row['cache_key']))
+        return pd.DataFrame(rows)
+
+    def _store(self, key: str, result: Dict):
+        self.cache.put(key, result)
+        self.executed += 1
+
+    def summarize(self, results: pd.DataFrame, confidence: float = 0.95) -> pd.DataFrame:
+        """
+        点ごとに各指標の平均と信頼区間を計算
+
+        Args:
+            results (pd.DataFrame): run の結果
+            confidence (float, optional): 信頼係数
+
+        Returns:
+            pd.DataFrame: 1行1点の集計結果
+        """
+        by = ['point'] + [name for name in SWEEP_PARAMETERS if name in results.columns]
+        return ReplicationRunner.summarize(results, confidence, by=by)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YAMLのスイープ定義に従ってシミュレーションを実行する（実行済みの点はキャッシュを使用）")
+    parser.add_argument('spec', help='スイープ定義のYAMLファイル')
+    parser.add_argument('--cache-dir', default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default=None, help='点ごとの集計結果を保存するCSVファイル')
+    args = parser.parse_args()
+
+    sweep = ParameterSweep(load_sweep_spec(args.spec), args.cache_dir, args.workers)
+    start = time.perf_counter()
+    results = sweep.run()
+    print(f"{len(sweep.points)} points x {sweep.replications} replications: "
+          f"{sweep.executed} executed, {sweep.cached} cached ({time.perf_counter() - start:.2f} s)")
+    summary = sweep.summarize(results)
+    if args.output:
+        summary.to_csv(args.output, index=False)
+    print(summary.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
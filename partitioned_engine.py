@@ -0,0 +1,406 @@
+# partitioned_engine.py
+
+import heapq
+import math
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+import networkx as nx
+
+from simulation_engine import SimulationEngine
+from traffic_source import create_pacing, RANDOM_PACING_TYPES
+
+try:
+    import pymetis
+except ImportError:  # pymetis がない環境では "metis" による分割は使用できない
+    pymetis = None
+
+PARTITION_METHODS = ("community", "metis")
+
+# 伝搬遅延が0のリンクを分割しないための重み
+_ZERO_DELAY_WEIGHT = 1e9
+
+# 到着時刻の丸め誤差で窓の終端をわずかに下回らないよう、先読み時間を小さめに見積もる
+_LOOKAHEAD_MARGIN = 1e-9
+
+
+def _minimum_delay(link) -> float:
+    """リンクを通過するパケットの最小の遅延（伝搬遅延 − ジッターの最大値）"""
+    return link.delay - link.jitter
+
+
+def topology_graph(topology_manager) -> nx.Graph:
+    """
+    分割に用いる重み付きグラフを構築
+
+    辺の重みは最小遅延の逆数で、遅延の小さいリンクほど同じ区画にまとめられやすい
+    （区画をまたぐリンクの最小遅延が先読み時間となるため）。
+
+    Args:
+        topology_manager (TopologyManager): トポロジマネージャ
+
+    Returns:
+        nx.Graph: ノードIDを頂点とするグラフ
+    """
+    graph = nx.Graph()
+    graph.add_nodes_from(topology_manager.nodes)
+    for link in topology_manager.links.values():
+        node1, node2 = link.connected_nodes
+        if node1 == node2:
+            continue
+        delay = _minimum_delay(link)
+        weight = 1.0 / delay if delay > 0 else _ZERO_DELAY_WEIGHT
+        if graph.has_edge(node1, node2):
+            weight = max(weight, graph[node1][node2]['weight'])
+        graph.add_edge(node1, node2, weight=weight)
+    return graph
+
+
+def partition_topology(topology_manager, partitions: int, method: str = "community") -> Dict[int, int]:
+    """
+    ノードを論理プロセス（区画）に分割
+
+    Args:
+        topology_manager (TopologyManager): トポロジマネージャ
+        partitions (int): 区画数の上限
+        method (str, optional): 分割方法（"community": networkx の貪欲なモジュラリティ最大化、
+            "metis": pymetis によるグラフ分割）
+
+    Returns:
+        Dict[int, int]: ノードIDをキーとする区画番号（0から連番）
+    """
+    if method not in PARTITION_METHODS:
+        raise ValueError(f"Unknown partition method: {method}")
+    if partitions < 1:
+        raise ValueError("partitions must be positive")
+    graph = topology_graph(topology_manager)
+    node_ids = sorted(graph.nodes)
+    if partitions == 1 or len(node_ids) <= 1:
+        return {node_id: 0 for node_id in node_ids}
+
+    if method == "metis":
+        if pymetis is None:
+            raise ImportError("pymetis is required for partition method 'metis'")
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+        adjacency = [[index[neighbor] for neighbor in sorted(graph.neighbors(node_id))] for node_id in node_ids]
+        _, membership = pymetis.part_graph(partitions, adjacency=adjacency)
+        groups = defaultdict(list)
+        for node_id, part in zip(node_ids, membership):
+            groups[part].append(node_id)
+        communities = list(groups.values())
+    else:
+        communities = nx.community.greedy_modularity_communities(graph, weight='weight', cutoff=1, best_n=partitions)
+
+    # 区画番号は最小のノードIDの順に振る（分割結果の表現を一意にする）
+    ordered = sorted((sorted(community) for community in communities if community), key=lambda nodes: nodes[0])
+    return {node_id: part for part, nodes in enumerate(ordered) for node_id in nodes}
+
+
+def partition_lookahead(topology_manager, partition: Dict[int, int]) -> float:
+    """
+    区画をまたぐリンクの最小遅延（先読み時間）を計算
+
+    Args:
+        topology_manager (TopologyManager): トポロジマネージャ
+        partition (Dict[int, int]): ノードIDをキーとする区画番号
+
+    Returns:
+        float: 先読み時間（区画をまたぐリンクがない場合は無限大）
+
+    Raises:
+        ValueError: 区画をまたぐリンクの最小遅延が0以下の場合
+    """
+    lookahead = math.inf
+    for link in topology_manager.links.values():
+        node1, node2 = link.connected_nodes
+        if partition[node1] != partition[node2]:
+            delay = _minimum_delay(link)
+            if delay <= 0:
+                raise ValueError(f"Link {link.link_id} crosses partitions but has no positive minimum delay")
+            lookahead = min(lookahead, delay)
+    return lookahead * (1 - _LOOKAHEAD_MARGIN)
+
+
+def check_partitionable(flow_manager):
+    """
+    分割実行で逐次実行と同じ結果が得られる設定かを確認
+
+    分割実行では、各ノードは他の区画の状態を先読み時間だけ遅れてしか観測できない。
+    そのため、送信側が受信側で更新される状態を参照する設定は使用できない。
+
+    Args:
+        flow_manager (FlowManager): フローマネージャ
+
+    Raises:
+        ValueError: 分割実行に対応していない設定の場合
+    """
+    packet_manager = flow_manager.packet_manager
+    topology_manager = flow_manager.topology_manager
+    if flow_manager.fluid_model is not None:
+        raise ValueError("Partitioned execution requires simulation_mode 'packet'")
+    if packet_manager.link_model != "serialization":
+        # "legacy" の帯域幅チェックは受信側で減算される current_load を参照する
+        raise ValueError("Partitioned execution requires link_model 'serialization'")
+    if packet_manager.jitter_seed is None and any(link.jitter > 0 for link in topology_manager.links.values()):
+        raise ValueError("Partitioned execution requires PacketManager.jitter_seed for links with jitter")
+    if flow_manager.pacing is not None and flow_manager.pacing_seed is None:
+        if any(isinstance(create_pacing(spec), RANDOM_PACING_TYPES) for spec in flow_manager.pacing.values()):
+            raise ValueError("Partitioned execution requires FlowManager.pacing_seed for random pacing models")
+    if topology_manager.link_selection == "lowest_load":
+        pairs = set()
+        for link in topology_manager.links.values():
+            pair = tuple(sorted(link.connected_nodes))
+            if pair in pairs:
+                raise ValueError("Partitioned execution does not support link_selection 'lowest_load' with parallel links")
+            pairs.add(pair)
+
+
+class LogicalProcess:
+    """
+    1つの区画のイベントを実行する論理プロセス
+
+    Attributes:
+        index (int): 区画番号
+        queue (List[tuple]): (時刻, キー, 関数) のヒープ
+        inbox (List[tuple]): 他の区画から届き、次の窓の前に queue に加えるイベント
+        events_processed (int): 実行したイベント数
+    """
+
+    __slots__ = ("index", "queue", "inbox", "events_processed")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.queue: List[tuple] = []
+        self.inbox: List[tuple] = []
+        self.events_processed = 0
+
+    def peek_time(self) -> float:
+        return self.queue[0][0] if self.queue else math.inf
+
+
+class PartitionedSimulationEngine(SimulationEngine):
+    """
+    トポロジの区画ごとの論理プロセスで実行する保守的な並列離散イベントシミュレーションエンジン
+
+    同期は YAWNS 方式の時間窓で行う。次のイベント時刻 T から先読み時間 L（区画をまたぐリンクの最小遅延）の
+    窓 [T, T+L) では、区画をまたぐイベントが窓の中に届くことはないため、各論理プロセスは他と同期せずに
+    窓内の自分のイベントを実行できる。区画をまたぐイベントは窓の終わりに宛先のキューへ届ける。
+    所有するノードのないイベント（障害・復旧など全体に関わるイベント）は窓の境界で実行する。
+
+    同時刻のイベントは "entity" 順序のキーで並べるため、同じシードの逐次実行
+    （SimulationEngine(event_ordering="entity")）と同じ順序で各ノードのイベントが実行される。
+
+    論理プロセスは窓内のイベントを区画ごとに実行するため、出力（SimulationEngine.defer）は窓の終わりまで遅らせ、
+    全区画の出力を時刻とキーの順に並べて実行する。メトリクスとトレースは逐次実行と同じ順序で記録される。
+
+    モデルのイベントは共有オブジェクトを参照するクロージャであり別プロセスに移せないため、
+    論理プロセスは窓ごとに同じプロセス内で順に実行する。statistics() の ideal_speedup は
+    各窓で最も多くのイベントを実行した論理プロセスの合計から求めた、区画ごとに並列実行した場合の速度向上の上限。
+
+    Attributes:
+        partitions (int): 区画数の上限
+        partition_method (str): 分割方法
+        partition (Dict[int, int]): ノードIDをキーとする区画番号
+        lookahead (float): 先読み時間
+        logical_processes (List[LogicalProcess]): 論理プロセスのリスト
+        windows (int): 実行した時間窓の数
+        messages (int): 区画をまたいだイベントの数
+        global_events (int): 窓の境界で実行した全体イベントの数
+        critical_path_events (int): 各窓で最も多い論理プロセスのイベント数と全体イベント数の合計
+    """
+
+    process_class = LogicalProcess
+
+    def __init__(self, partitions: int = 2, partition_method: str = "community", event_queue: str = "heap"):
+        """
+        Args:
+            partitions (int, optional): 区画数の上限
+            partition_method (str, optional): 分割方法（"community" または "metis"）
+            event_queue (str, optional): 全体イベントのキューの種類
+        """
+        super().__init__(event_queue=event_queue, event_ordering="entity")
+        self.partitions = partitions
+        self.partition_method = partition_method
+        self.partition: Dict[int, int] = {}
+        self.lookahead = math.inf
+        self.logical_processes: List[LogicalProcess] = []
+        self._reset_statistics()
+
+    def _reset_statistics(self):
+        self.windows = 0
+        self.messages = 0
+        self.global_events = 0
+        self.critical_path_events = 0
+        self._active: Optional[LogicalProcess] = None
+        self._window_end = -math.inf
+        self._current_key: Optional[tuple] = None
+        self._outputs: List[tuple] = []
+        for logical_process in self.logical_processes:
+            logical_process.queue = []
+            logical_process.inbox = []
+            logical_process.events_processed = 0
+
+    def initialize(self, simulation_time: float):
+        super().initialize(simulation_time)
+        self._reset_statistics()
+
+    def assign_partitions(self, topology_manager, partition: Optional[Dict[int, int]] = None):
+        """
+        トポロジを区画に分割し、先読み時間を計算
+
+        Args:
+            topology_manager (TopologyManager): トポロジマネージャ
+            partition (Optional[Dict[int, int]], optional): ノードIDをキーとする区画番号（指定がない場合は partition_method で分割）
+        """
+        if partition is None:
+            partition = partition_topology(topology_manager, self.partitions, self.partition_method)
+        self.partition = dict(partition)
+        self.lookahead = partition_lookahead(topology_manager, self.partition)
+        count = max(self.partition.values(), default=0) + 1
+        self.logical_processes = [self.process_class(index) for index in range(count)]
+        self._reset_statistics()
+
+    def defer(self, output: Callable):
+        """
+        出力を窓の終わりまで遅らせる（全体イベントの実行中は直ちに実行する）
+        """
+        if self._active is None:
+            output()
+        else:
+            self._outputs.append((self.current_time, self._current_key, output))
+
+    def schedule_event(self, event_time: float, event_function: Callable, parallel_safe: bool = False,
+                       owner: Optional[int] = None):
+        """
+        イベントのスケジューリング
+
+        ノードが所有するイベントはその区画の論理プロセスのキューに、所有するノードのないイベントは
+        全体イベントのキューに加える。論理プロセスの実行中に他の区画へ送るイベントは次の窓の前に届ける。
+
+        Raises:
+            RuntimeError: 実行中の窓の中に他の区画または全体のイベントをスケジュールした場合（先読み時間の違反）
+        """
+        if not self.logical_processes:
+            raise RuntimeError("assign_partitions must be called before scheduling events")
+        entry = (event_time, self.event_key(owner), event_function)
+        active = self._active
+        target = None if owner is None else self.logical_processes[self.partition[owner]]
+        if active is not None and target is not active and event_time < self._window_end:
+            raise RuntimeError(f"Event at {event_time} violates the lookahead of the window ending at {self._window_end}")
+        if target is None:
+            self.event_queue.push_keyed(*entry)
+        elif active is None or target is active:
+            heapq.heappush(target.queue, entry)
+        else:
+            target.inbox.append(entry)
+            self.messages += 1
+
+    def run(self):
+        """
+        シミュレーションの開始
+
+        全体イベントと時間窓を交互に実行する。
+        """
+        if not self.logical_processes:
+            raise RuntimeError("assign_partitions must be called before run")
+        global_queue = self.event_queue
+        logical_processes = self.logical_processes
+        end_time = self.simulation_end_time
+        last_time = self.current_time
+        while True:
+            global_time = global_queue.peek_time()
+            next_time = min(global_time, min(logical_process.peek_time() for logical_process in logical_processes))
+            if next_time > end_time:
+                break
+            last_time = next_time
+            if global_time == next_time:
+                # 同時刻では全体イベントが先（キーの先頭が0）
+                self._run_global(next_time)
+                continue
+
+            self._window_end = min(next_time + self.lookahead, global_time, math.nextafter(end_time, math.inf))
+            busiest = 0
+            window_outputs = []
+            for logical_process in logical_processes:
+                executed, event_time, outputs = self._run_window(logical_process)
+                busiest = max(busiest, executed)
+                last_time = max(last_time, event_time)
+                window_outputs.append(outputs)
+            # 各区画の出力はイベントの実行順（時刻とキーの順）に並んでいるため、マージして逐次実行と同じ順序にする
+            for event_time, _, output in heapq.merge(*window_outputs, key=lambda item: item[:2]):
+                self.current_time = event_time
+                output()
+            self.windows += 1
+            self.critical_path_events += busiest
+            self._window_end = -math.inf
+            for logical_process in logical_processes:
+                for entry in logical_process.inbox:
+                    heapq.heappush(logical_process.queue, entry)
+                logical_process.inbox = []
+        self.current_time = last_time
+
+    def _run_global(self, event_time: float):
+        """
+        指定時刻の全体イベントを実行（実行中に追加された同時刻の全体イベントも含む）
+        """
+        global_queue = self.event_queue
+        while global_queue.peek_time() == event_time:
+            self.current_time, _, event_function = global_queue.pop()
+            self._current_owner = None
+            self.events_processed += 1
+            self.global_events += 1
+            self.critical_path_events += 1
+            event_function()
+
+    def _run_window(self, logical_process: LogicalProcess):
+        """
+        論理プロセスの窓内のイベントを実行
+
+        Returns:
+            Tuple[int, float, List[tuple]]: 実行したイベント数、最後のイベントの時刻と、
+                遅らせた出力の (時刻, キー, 関数) のリスト
+        """
+        queue = logical_process.queue
+        window_end = self._window_end
+        executed = 0
+        event_time = -math.inf
+        outputs = self._outputs = []
+        self._active = logical_process
+        try:
+            while queue and queue[0][0] < window_end:
+                event_time, key, event_function = heapq.heappop(queue)
+                self.current_time = event_time
+                self._current_key = key
+                self._current_owner = key[3]
+                executed += 1
+                event_function()
+        finally:
+            self._active = None
+            self._current_key = None
+            self._current_owner = None
+            self._outputs = []
+        logical_process.events_processed += executed
+        self.events_processed += executed
+        return executed, event_time, outputs
+
+    def statistics(self) -> Dict:
+        """
+        分割実行の統計を取得
+
+        Returns:
+            Dict: 区画数、先読み時間、窓の数、区画をまたいだイベント数、区画ごとのイベント数、
+                並列実行した場合の速度向上の上限（ideal_speedup）と効率（ideal_speedup / 区画数）
+        """
+        partitions = len(self.logical_processes)
+        ideal_speedup = self.events_processed / self.critical_path_events if self.critical_path_events else 1.0
+        return {
+            'partitions': partitions,
+            'lookahead': self.lookahead,
+            'windows': self.windows,
+            'events_processed': self.events_processed,
+            'global_events': self.global_events,
+            'messages': self.messages,
+            'events_per_partition': [logical_process.events_processed for logical_process in self.logical_processes],
+            'ideal_speedup': ideal_speedup,
+            'efficiency': ideal_speedup / partitions if partitions else 0.0
+        }
@@ -0,0 +1,473 @@
+# queue_discipline.py
+
+import copy
+import heapq
+import random
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+# キューの要素: (パケット, キューに入った時刻)
+QueueEntry = Tuple[object, float]
+
+DEFAULT_SERVICE_TYPE = "data"
+
+
+class Scheduler:
+    """
+    ノードのバッファからパケットを取り出す順序を決めるスケジューラの基底クラス
+
+    容量の判定とバイト数の管理は Node 側で行い、スケジューラは並び順のみを扱う。
+    """
+
+    def __init__(self):
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __bool__(self) -> bool:
+        return self._length > 0
+
+    def __iter__(self) -> Iterator:
+        raise NotImplementedError
+
+    def push(self, packet, now: float):
+        """
+        パケットを追加
+
+        Args:
+            packet (Packet): 追加するパケット
+            now (float): 現在時刻
+        """
+        raise NotImplementedError
+
+    def pop(self) -> Optional[QueueEntry]:
+        """
+        次に送信するパケットを取り出す
+
+        Returns:
+            Optional[QueueEntry]: (パケット, キューに入った時刻)、空の場合None
+        """
+        raise NotImplementedError
+
+    def copy(self) -> "Scheduler":
+        """
+        キューの並びをコピーしたスケジューラを作成（パケットはコピーせず同じオブジェクトを参照する）
+
+        Returns:
+            Scheduler: コピーしたスケジューラ
+        """
+        return copy.deepcopy(self, {id(packet): packet for packet in self})
+
+
+class FIFOScheduler(Scheduler):
+    """
+    到着順に取り出すスケジューラ
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._queue: Deque[QueueEntry] = deque()
+
+    def __iter__(self) -> Iterator:
+        return (packet for packet, _ in self._queue)
+
+    def push(self, packet, now: float):
+        self._queue.append((packet, now))
+        self._length += 1
+
+    def pop(self) -> Optional[QueueEntry]:
+        if not self._queue:
+            return None
+        self._length -= 1
+        return self._queue.popleft()
+
+    def copy(self) -> "FIFOScheduler":
+        scheduler = FIFOScheduler()
+        scheduler._queue = self._queue.copy()
+        scheduler._length = self._length
+        return scheduler
+
+
+class ClassScheduler(Scheduler):
+    """
+    パケットのサービス種別（Flow.service_type）ごとにキューを分けるスケジューラの基底クラス
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._queues: Dict[str, Deque] = {}
+
+    def __iter__(self) -> Iterator:
+        for queue in self._queues.values():
+            for entry in queue:
+                yield entry[0]
+
+    @staticmethod
+    def classify(packet) -> str:
+        return getattr(packet, "service_type", None) or DEFAULT_SERVICE_TYPE
+
+    def class_length(self, service_type: str) -> int:
+        """
+        サービス種別ごとのキュー長を取得
+
+        Args:
+            service_type (str): サービス種別
+
+        Returns:
+            int: キュー内のパケット数
+        """
+        queue = self._queues.get(service_type)
+        return len(queue) if queue else 0
+
+
+class PriorityScheduler(ClassScheduler):
+    """
+    サービス種別の優先度が高いキューから常に先に取り出す厳密優先スケジューラ
+
+    Attributes:
+        priorities (Dict[str, int]): サービス種別ごとの優先度（小さいほど優先）
+        default_priority (int): 未登録のサービス種別の優先度
+    """
+
+    DEFAULT_PRIORITIES = {"voice": 0, "video": 1, "data": 2}
+
+    def __init__(self, priorities: Optional[Dict[str, int]] = None, default_priority: Optional[int] = None):
+        super().__init__()
+        self.priorities = dict(priorities or self.DEFAULT_PRIORITIES)
+        self.default_priority = max(self.priorities.values(), default=0) if default_priority is None else default_priority
+        # 優先度の昇順に並べたキュー（優先度の種類数は少数なので走査は定数時間）
+        self._levels: List[Tuple[int, Deque[QueueEntry]]] = []
+
+    def _queue_for(self, service_type: str) -> Deque[QueueEntry]:
+        queue = self._queues.get(service_type)
+        if queue is None:
+            priority = self.priorities.get(service_type, self.default_priority)
+            for level, level_queue in self._levels:
+                if level == priority:
+                    queue = level_queue
+                    break
+            else:
+                queue = deque()
+                self._levels.append((priority, queue))
+                self._levels.sort(key=lambda item: item[0])
+            self._queues[service_type] = queue
+        return queue
+
+    def __iter__(self) -> Iterator:
+        for _, queue in self._levels:
+            for packet, _ in queue:
+                yield packet
+
+    def class_length(self, service_type: str) -> int:
+        return sum(1 for packet in self if self.classify(packet) == service_type)
+
+    def push(self, packet, now: float):
+        self._queue_for(self.classify(packet)).append((packet, now))
+        self._length += 1
+
+    def pop(self) -> Optional[QueueEntry]:
+        for _, queue in self._levels:
+            if queue:
+                self._length -= 1
+                return queue.popleft()
+        return None
+
+
+class DRRScheduler(ClassScheduler):
+    """
+    Deficit Round Robin スケジューラ（Shreedhar & Varghese）
+
+    サービス種別ごとのキューを巡回し、各巡回でクォンタム分のバイト数を送信できる。
+
+    Attributes:
+        quanta (Dict[str, int]): サービス種別ごとのクォンタム（バイト）
+        default_quantum (int): 未登録のサービス種別のクォンタム（バイト）
+    """
+
+    def __init__(self, quanta: Optional[Dict[str, int]] = None, default_quantum: int = 1500):
+        super().__init__()
+        self.quanta = dict(quanta or {})
+        self.default_quantum = default_quantum
+        self._deficits: Dict[str, int] = {}
+        self._active: Deque[str] = deque()
+        self._granted = False
+
+    def push(self, packet, now: float):
+        service_type = self.classify(packet)
+        queue = self._queues.get(service_type)
+        if queue is None:
+            queue = self._queues[service_type] = deque()
+        if not queue:
+            self._active.append(service_type)
+            self._deficits[service_type] = 0
+        queue.append((packet, now))
+        self._length += 1
+
+    def pop(self) -> Optional[QueueEntry]:
+        active = self._active
+        while active:
+            service_type = active[0]
+            queue = self._queues[service_type]
+            if not self._granted:
+                self._deficits[service_type] += self.quanta.get(service_type, self.default_quantum)
+                self._granted = True
+            size = queue[0][0].size
+            if size <= self._deficits[service_type]:
+                self._deficits[service_type] -= size
+                self._length -= 1
+                entry = queue.popleft()
+                if not queue:
+                    # 空になったキューは持ち越し分を失う
+                    self._deficits[service_type] = 0
+                    active.popleft()
+                    self._granted = False
+                return entry
+            active.rotate(-1)
+            self._granted = False
+        return None
+
+
+class WFQScheduler(ClassScheduler):
+    """
+    重み付き公平キューイング（Self-Clocked Fair Queueing による近似）
+
+    各パケットに仮想終了時刻を付与し、各キュー先頭のうち最小のものを取り出す。
+    キュー先頭の終了時刻はヒープで管理するため、取り出しはサービス種別数の対数時間。
+
+    Attributes:
+        weights (Dict[str, float]): サービス種別ごとの重み
+        default_weight (float): 未登録のサービス種別の重み
+        virtual_time (float): 直近に送信したパケットの仮想終了時刻
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, default_weight: float = 1.0):
+        super().__init__()
+        self.weights = dict(weights or {})
+        self.default_weight = default_weight
+        self.virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+        self._heads: List[Tuple[float, int, str]] = []
+        self._sequence = 0
+
+    def push(self, packet, now: float):
+        service_type = self.classify(packet)
+        queue = self._queues.get(service_type)
+        if queue is None:
+            queue = self._queues[service_type] = deque()
+        weight = self.weights.get(service_type, self.default_weight)
+        start = max(self.virtual_time, self._last_finish.get(service_type, 0.0))
+        finish = start + packet.size / weight
+        self._last_finish[service_type] = finish
+        queue.append((packet, now, finish))
+        if len(queue) == 1:
+            self._push_head(finish, service_type)
+        self._length += 1
+
+    def _push_head(self, finish: float, service_type: str):
+        # 同じ終了時刻はキューに入った順に取り出す
+        heapq.heappush(self._heads, (finish, self._sequence, service_type))
+        self._sequence += 1
+
+    def pop(self) -> Optional[QueueEntry]:
+        if not self._heads:
+            return None
+        finish, _, service_type = heapq.heappop(self._heads)
+        queue = self._queues[service_type]
+        packet, enqueue_time, _ = queue.popleft()
+        self.virtual_time = finish
+        if queue:
+            self._push_head(queue[0][2], service_type)
+        self._length -= 1
+        return packet, enqueue_time
+
+
+class ActiveQueueManager:
+    """
+    能動的キュー管理（AQM）の基底クラス
+    """
+
+    def on_enqueue(self, queue_bytes: int, now: float) -> bool:
+        """
+        パケット到着時に破棄するかどうかを判定
+
+        Args:
+            queue_bytes (int): 到着前のキュー長（バイト）
+            now (float): 現在時刻
+
+        Returns:
+            bool: 破棄する場合True
+        """
+        return False
+
+    def on_dequeue(self, sojourn_time: float, queue_bytes: int, now: float) -> bool:
+        """
+        パケット取り出し時に破棄するかどうかを判定
+
+        Args:
+            sojourn_time (float): パケットのキュー滞在時間
+            queue_bytes (int): 取り出し後のキュー長（バイト）
+            now (float): 現在時刻
+
+        Returns:
+            bool: 破棄する場合True
+        """
+        return False
+
+
+class REDQueueManager(ActiveQueueManager):
+    """
+    Random Early Detection（Floyd & Jacobson）
+
+    平均キュー長が最小閾値と最大閾値の間にある場合、平均キュー長に比例した確率で到着パケットを破棄する。
+
+    Attributes:
+        min_threshold (float): 最小閾値（バイト）
+        max_threshold (float): 最大閾値（バイト）
+        max_probability (float): 最大閾値での破棄確率
+        weight (float): 平均キュー長の指数移動平均の重み
+        average (float): 平均キュー長（バイト）
+    """
+
+    def __init__(self, min_threshold: float = 150000, max_threshold: float = 450000, max_probability: float = 0.1,
+                 weight: float = 0.002, seed: Optional[int] = None):
+        if not 0 <= min_threshold < max_threshold:
+            raise ValueError("RED thresholds must satisfy 0 <= min_threshold < max_threshold")
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+        self.max_probability = max_probability
+        self.weight = weight
+        self.average = 0.0
+        self._count = -1
+        self._random = random.Random(seed)
+
+    def on_enqueue(self, queue_bytes: int, now: float) -> bool:
+        self.average += self.weight * (queue_bytes - self.average)
+        if self.average < self.min_threshold:
+            self._count = -1
+            return False
+        if self.average >= self.max_threshold:
+            self._count = 0
+            return True
+        self._count += 1
+        probability = self.max_probability * (self.average - self.min_threshold) / (self.max_threshold - self.min_threshold)
+        # 破棄の間隔を均一にするため、前回の破棄からの到着数で確率を補正する
+        denominator = 1.0 - self._count * probability
+        if denominator <= 0 or self._random.random() < probability / denominator:
+            self._count = 0
+            return True
+        return False
+
+
+class CoDelQueueManager(ActiveQueueManager):
+    """
+    Controlled Delay（RFC 8289）
+
+    滞在時間が target を interval 以上上回り続けた場合に、interval / sqrt(count) の間隔で
+    取り出し時にパケットを破棄する。
+
+    Attributes:
+        target (float): 許容する滞在時間（秒）
+        interval (float): 監視区間（秒）
+        mtu (int): これ以下のキュー長では破棄しない（バイト）
+    """
+
+    def __init__(self, target: float = 0.005, interval: float = 0.1, mtu: int = 1500):
+        self.target = target
+        self.interval = interval
+        self.mtu = mtu
+        self.dropping = False
+        self._first_above_time: Optional[float] = None
+        self._drop_next = 0.0
+        self._count = 0
+        self._last_count = 0
+
+    def _control_law(self, time: float) -> float:
+        return time + self.interval / (self._count ** 0.5)
+
+    def _ok_to_drop(self, sojourn_time: float, queue_bytes: int, now: float) -> bool:
+        if sojourn_time < self.target or queue_bytes <= self.mtu:
+            self._first_above_time = None
+            return False
+        if self._first_above_time is None:
+            self._first_above_time = now + self.interval
+            return False
+        return now >= self._first_above_time
+
+    def on_dequeue(self, sojourn_time: float, queue_bytes: int, now: float) -> bool:
+        ok_to_drop = self._ok_to_drop(sojourn_time, queue_bytes, now)
+        if self.dropping:
+            if not ok_to_drop:
+                self.dropping = False
+                return False
+            if now >= self._drop_next:
+                self._count += 1
+                self._drop_next = self._control_law(self._drop_next)
+                return True
+            return False
+        if ok_to_drop:
+            self.dropping = True
+            # 直前の破棄状態から間もない場合は破棄間隔を引き継ぐ
+            delta = self._count - self._last_count
+            recently = now - self._drop_next < 16 * self.interval
+            self._count = delta if delta > 1 and recently else 1
+            self._last_count = self._count
+            self._drop_next = self._control_law(now)
+            return True
+        return False
+
+
+SCHEDULER_TYPES = {
+    "fifo": FIFOScheduler,
+    "priority": PriorityScheduler,
+    "drr": DRRScheduler,
+    "wfq": WFQScheduler,
+}
+
+AQM_TYPES = {
+    "red": REDQueueManager,
+    "codel": CoDelQueueManager,
+}
+
+
+def _from_spec(spec, types: Dict[str, type], kind: str):
+    if isinstance(spec, str):
+        name, params = spec, {}
+    else:
+        params = dict(spec)
+        name = params.pop("type")
+    if name not in types:
+        raise ValueError(f"Unknown {kind}: {name}")
+    return types[name](**params)
+
+
+def create_scheduler(spec: Union[str, Dict, Scheduler] = "fifo") -> Scheduler:
+    """
+    スケジューラを生成
+
+    Args:
+        spec (Union[str, Dict, Scheduler], optional): 種類名（"fifo", "priority", "drr", "wfq"）、
+            "type" とコンストラクタ引数を持つ辞書、またはスケジューラそのもの
+
+    Returns:
+        Scheduler: スケジューラ
+    """
+    if isinstance(spec, Scheduler):
+        return spec
+    return _from_spec(spec, SCHEDULER_TYPES, "scheduler")
+
+
+def create_aqm(spec: Union[None, str, Dict, ActiveQueueManager]) -> Optional[ActiveQueueManager]:
+    """
+    AQMを生成
+
+    Args:
+        spec (Union[None, str, Dict, ActiveQueueManager]): 種類名（"red", "codel"）、
+            "type" とコンストラクタ引数を持つ辞書、AQMそのもの、または使用しない場合None
+
+    Returns:
+        Optional[ActiveQueueManager]: AQM
+    """
+    if spec is None or isinstance(spec, ActiveQueueManager):
+        return spec
+    return _from_spec(spec, AQM_TYPES, "AQM")
@@ -0,0 +1,363 @@
+# replication_runner.py
+
+import argparse
+import contextlib
+import io
+import itertools
+import math
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from simulation_engine import SimulationEngine
+from partitioned_engine import PartitionedSimulationEngine, check_partitionable
+from time_warp_engine import TimeWarpSimulationEngine, PacketModelStateSaver
+from topology_manager import TopologyManager
+from flow_manager import FlowManager
+from central_controller import CentralController
+from failure_manager import FailureManager
+from metrics_collector import MetricsCollector
+
+try:
+    from scipy.stats import t as student_t
+except ImportError:  # scipy がない環境では正規分布で近似する
+    student_t = None
+
+# 1レプリカの結果として集計する指標
+REPLICA_METRICS = (
+    "average_throughput", "average_delay", "average_packet_loss_rate", "average_jitter",
+    "delivered_packets", "lost_packets", "wall_time"
+)
+
+
+def seed_global_random(seed_sequence: np.random.SeedSequence):
+    """
+    レプリカのシード系列から random と numpy.random のグローバルな状態を初期化
+
+    シミュレーションの各モジュールはグローバルな random を使用するため、
+    プロセス内で1レプリカずつ実行する前に毎回初期化する。
+
+    Args:
+        seed_sequence (np.random.SeedSequence): レプリカのシード系列
+    """
+    state = seed_sequence.generate_state(2, np.uint32)
+    random.seed(int(state[0]) << 32 | int(state[1]))
+    np.random.seed(state)
+
+
+def create_simulation_engine(parameters: Dict) -> SimulationEngine:
+    """
+    シミュレーションパラメータからシミュレーションエンジンを作成
+
+    partitions が2以上の場合は synchronization に応じて分割実行のエンジン
+    （"conservative": PartitionedSimulationEngine、"optimistic": TimeWarpSimulationEngine）を作成する。
+
+    Args:
+        parameters (Dict): シミュレーションパラメータ（simulation_parameters と同じキー）
+
+    Returns:
+        SimulationEngine: シミュレーションエンジン（initialize は呼び出し側で行う）
+    """
+    partitions = parameters.get('partitions', 1)
+    synchronization = parameters.get('synchronization', 'conservative')
+    if partitions > 1 and synchronization == 'optimistic':
+        return TimeWarpSimulationEngine(
+            partitions=partitions,
+            partition_method=parameters.get('partition_method', 'community'),
+            event_queue=parameters.get('event_queue', 'heap'),
+            batch_size=parameters.get('time_warp_batch_size', 64),
+            optimism_window=parameters.get('optimism_window', math.inf)
+        )
+    if partitions > 1:
+        if synchronization != 'conservative':
+            raise ValueError(f"Unknown synchronization: {synchronization}")
+        return PartitionedSimulationEngine(
+            partitions=partitions,
+            partition_method=parameters.get('partition_method', 'community'),
+            event_queue=parameters.get('event_queue', 'heap')
+        )
+    return SimulationEngine(
+        dispatch_mode=parameters.get('dispatch_mode', 'sequential'),
+        max_workers=parameters.get('max_workers'),
+        event_queue=parameters.get('event_queue', 'heap'),
+        event_ordering=parameters.get('event_ordering', 'sequence'),
+        immediate_queue=parameters.get('immediate_queue', True)
+    )
+
+
+def create_flow_manager(parameters: Dict, topology_manager: TopologyManager, simulation_engine: SimulationEngine,
+                        central_controller: CentralController, metrics_collector: MetricsCollector,
+                        seed_sequence: np.random.SeedSequence) -> FlowManager:
+    """
+    シミュレーションパラメータからフローマネージャを作成
+
+    simulation_mode, packet_service_types, link_model, pacing を設定し、分割実行の場合はトポロジを区画に分割する。
+    "entity" 順序（分割実行を含む）では、ジッターとペーシングの乱数列のシードを seed_sequence から設定する。
+
+    Args:
+        parameters (Dict): シミュレーションパラメータ（simulation_parameters と同じキー）
+        topology_manager (TopologyManager): 読み込み済みのトポロジマネージャ
+        simulation_engine (SimulationEngine): create_simulation_engine で作成したエンジン
+        central_controller (CentralController): 中央コントローラ
+        metrics_collector (MetricsCollector): メトリクスコレクタ
+        seed_sequence (np.random.SeedSequence): シード系列
+
+    Returns:
+        FlowManager: フローマネージャ
+
+    Raises:
+        ValueError: 分割実行に対応していない設定の場合
+    """
+    partitioned = isinstance(simulation_engine, PartitionedSimulationEngine)
+    if partitioned:
+        simulation_engine.assign_partitions(topology_manager)
+    flow_manager = FlowManager(topology_manager, simulation_engine, central_controller, metrics_collector,
+                               simulation_mode=parameters.get('simulation_mode', 'packet'),
+                               packet_service_types=parameters.get('packet_service_types', ('voice',)),
+                               link_model=parameters.get('link_model', 'legacy'),
+                               pacing=parameters.get('pacing'))
+    if simulation_engine.event_ordering == "entity":
+        # 実行順序に依存しないよう、ジッターはリンクの方向ごと、ペーシングはフローごとの乱数列から抽出する
+        state = seed_sequence.generate_state(4, np.uint32)
+        flow_manager.packet_manager.jitter_seed = int(state[2])
+        flow_manager.pacing_seed = int(state[3])
+    if partitioned:
+        check_partitionable(flow_manager)
+    if isinstance(simulation_engine, TimeWarpSimulationEngine):
+        simulation_engine.state_saver = PacketModelStateSaver(topology_manager, flow_manager.packet_manager)
+    return flow_manager
+
+
+def run_replica(parameters: Dict, seed_sequence: np.random.SeedSequence, topology_file: str = "data/topology.yaml",
+                flow_scenario: Optional[str] = None, quiet: bool = True) -> Dict:
+    """
+    1回のシミュレーションを実行し、集計結果を取得
+
+    Args:
+        parameters (Dict): シミュレーションパラメータ（simulation_parameters と同じキー）
+        seed_sequence (np.random.SeedSequence): レプリカのシード系列
+        topology_file (str, optional): トポロジ定義のYAMLファイルパス
+        flow_scenario (Optional[str], optional): フローシナリオファイルのパス（指定がない場合はランダム生成）。
+            parameters に scenario_horizon を指定した場合は開始時刻の順に逐次読み込む
+        quiet (bool, optional): シミュレーション中の標準出力を抑制する場合True
+
+    Returns:
+        Dict: REPLICA_METRICS の各指標
+    """
+    seed_global_random(seed_sequence)
+    start = time.perf_counter()
+    output = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    with output:
+        simulation_engine = create_simulation_engine(parameters)
+        simulation_engine.initialize(parameters['simulation_time'])
+        topology_manager = TopologyManager(link_selection=parameters.get('link_selection', 'lowest_load'))
+        topology_manager.load_topology(topology_file, cache_dir=parameters.get('topology_cache'))
+        central_controller = CentralController(topology_manager, algorithm=parameters['algorithm'])
+        metrics_collector = MetricsCollector(retention="ring", capacity=parameters.get('metrics_capacity', 4096))
+        flow_manager = create_flow_manager(parameters, topology_manager, simulation_engine, central_controller,
+                                           metrics_collector, seed_sequence)
+        scenario_horizon = parameters.get('scenario_horizon')
+        if flow_scenario and scenario_horizon:
+            if isinstance(simulation_engine, PartitionedSimulationEngine):
+                raise ValueError("Partitioned execution does not support streamed scenarios (scenario_horizon)")
+            flow_manager.stream_flows(flow_scenario, simulation_engine, horizon=scenario_horizon)
+        else:
+            flow_manager.generate_flows(flow_scenario=flow_scenario)
+            flow_manager.schedule_flow_starts(simulation_engine)
+        failure_manager = FailureManager(simulation_engine, topology_manager, central_controller)
+        failure_manager.schedule_failures(
+            failure_rate=parameters['failure_rate'],
+            failure_distribution=parameters.get('failure_distribution', 'uniform'),
+            simulation_time=parameters['simulation_time']
+        )
+        simulation_engine.run()
+        flow_manager.finalize_flows(parameters['simulation_time'])
+        metrics_collector.record_network_metrics(simulation_engine.current_time)
+
+    accumulators = metrics_collector.flow_accumulators.values()
+    result = {
+        'average_throughput': 0.0,
+        'average_delay': 0.0,
+        'average_packet_loss_rate': 0.0,
+        'average_jitter': 0.0,
+        'delivered_packets': sum(accumulator.delivered_packets for accumulator in accumulators),
+        'lost_packets': sum(accumulator.lost_packets for accumulator in accumulators),
+        'wall_time': time.perf_counter() - start
+    }
+    if len(metrics_collector.network_metrics):
+        network_metric = metrics_collector.network_metrics[-1]
+        for name in ('average_throughput', 'average_delay', 'average_packet_loss_rate', 'average_jitter'):
+            result[name] = getattr(network_metric, name)
+    return result
+
+
+def _run_task(task) -> Dict:
+    setting_index, replica, setting, seed_sequence, topology_file, flow_scenario = task
+    parameters = dict(setting)
+    result = run_replica(parameters, seed_sequence, topology_file, parameters.pop('flow_scenario', flow_scenario))
+    row = {'setting': setting_index, 'replica': replica, 'seed_entropy': seed_sequence.entropy,
+           'seed_spawn_key': '/'.join(map(str, seed_sequence.spawn_key))}
+    row.update({name: value for name, value in setting.items() if not isinstance(value, (dict, list))})
+    row.update(result)
+    return row
+
+
+def confidence_interval(values: Sequence[float], confidence: float = 0.95):
+    """
+    平均値の信頼区間を計算（t分布、scipy がない場合は正規分布で近似）
+
+    Args:
+        values (Sequence[float]): 標本
+        confidence (float, optional): 信頼係数
+
+    Returns:
+        Tuple[float, float, float]: (平均, 下限, 上限)
+    """
+    count = len(values)
+    mean = statistics.fmean(values) if count else math.nan
+    if count < 2:
+        return mean, math.nan, math.nan
+    standard_error = statistics.stdev(values) / math.sqrt(count)
+    if student_t is not None:
+        quantile = student_t.ppf((1 + confidence) / 2, count - 1)
+    else:
+        quantile = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    return mean, mean - quantile * standard_error, mean + quantile * standard_error
+
+
+class ReplicationRunner:
+    """
+    独立したシミュレーションを複数プロセスで繰り返し実行するクラス
+
+    各レプリカのシードは numpy.random.SeedSequence.spawn で生成する。同じレプリカ番号には
+    全ての設定で同じシード系列を割り当てるため、設定間の比較では共通乱数法となる。
+
+    Attributes:
+        base_parameters (Dict): 全ての設定に共通するシミュレーションパラメータ
+        replications (int): 設定ごとのレプリカ数
+        seed (int): 全体のシード
+        max_workers (Optional[int]): プロセス数（1の場合は現在のプロセスで実行）
+        topology_file (str): トポロジ定義のYAMLファイルパス
+        flow_scenario (Optional[str]): フローシナリオYAMLファイルのパス
+    """
+
+    def __init__(self, base_parameters: Dict, replications: int = 10, seed: int = 0, max_workers: Optional[int] = None,
+                 topology_file: str = "data/topology.yaml", flow_scenario: Optional[str] = None):
+        if replications <= 0:
+            raise ValueError("replications must be positive")
+        self.base_parameters = dict(base_parameters)
+        self.replications = replications
+        self.seed = seed
+        self.max_workers = max_workers
+        self.topology_file = topology_file
+        self.flow_scenario = flow_scenario
+
+    def seed_sequences(self) -> List[np.random.SeedSequence]:
+        """
+        レプリカごとのシード系列を取得
+
+        Returns:
+            List[np.random.SeedSequence]: レプリカ番号順のシード系列
+        """
+        return np.random.SeedSequence(self.seed).spawn(self.replications)
+
+    def run(self, settings: Optional[List[Dict]] = None) -> pd.DataFrame:
+        """
+        全ての設定について全てのレプリカを実行
+
+        Args:
+            settings (Optional[List[Dict]], optional): base_parameters を上書きするパラメータのリスト
+                （指定がない場合は base_parameters のみ）
+
+        Returns:
+            pd.DataFrame: 1行1レプリカの結果（設定番号、レプリカ番号、上書きしたパラメータ、各指標）
+        """
+        settings = settings or [{}]
+        seed_sequences = self.seed_sequences()
+        tasks = [
+            (setting_index, replica, {**self.base_parameters, **setting}, seed_sequences[replica],
+             self.topology_file, self.flow_scenario)
+            for setting_index, setting in enumerate(settings)
+            for replica in range(self.replications)
+        ]
+        if self.max_workers == 1:
+            rows = [_run_task(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                rows = list(executor.map(_run_task, tasks))
+        return pd.DataFrame(rows)
+
+    @staticmethod
+    def summarize(results: pd.DataFrame, confidence: float = 0.95, by: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        設定ごとに各指標の平均と信頼区間を計算
+
+        Args:
+            results (pd.DataFrame): run の結果
+            confidence (float, optional): 信頼係数
+            by (Optional[Sequence[str]], optional): 集計のキー（指定がない場合は "setting" と上書きしたパラメータ）
+
+        Returns:
+            pd.DataFrame: 1行1設定の集計結果（指標ごとに mean, ci_low, ci_high, std の列）
+        """
+        if by is None:
+            excluded = set(REPLICA_METRICS) | {'replica', 'seed_entropy', 'seed_spawn_key'}
+            by = [column for column in results.columns if column not in excluded]
+        rows = []
+        for key, group in results.groupby(list(by), sort=True, dropna=False):
+            row = dict(zip(by, key if isinstance(key, tuple) else (key,)))
+            row['replications'] = len(group)
+            for name in REPLICA_METRICS:
+                values = group[name].astype(float).tolist()
+                mean, low, high = confidence_interval(values, confidence)
+                row[f'{name}_mean'] = mean
+                row[f'{name}_ci_low'] = low
+                row[f'{name}_ci_high'] = high
+                row[f'{name}_std'] = statistics.stdev(values) if len(values) > 1 else math.nan
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="シミュレーションを複数プロセスで繰り返し実行し、信頼区間を出力する")
+    parser.add_argument('--config', default='data/config.yaml')
+    parser.add_argument('--topology', default='data/topology.yaml')
+    parser.add_argument('--flow-scenario', default=None)
+    parser.add_argument('--replications', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--failure-rate', type=float, nargs='*', default=None)
+    parser.add_argument('--algorithm', nargs='*', default=None)
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--output', default=None, help='レプリカごとの結果を保存するCSVファイル')
+    args = parser.parse_args()
+
+    from configuration_manager import ConfigurationManager
+    config_manager = ConfigurationManager()
+    config_manager.load_configuration(args.config)
+    runner = ReplicationRunner(config_manager.simulation_parameters, args.replications, args.seed, args.workers,
+                               args.topology, args.flow_scenario)
+    failure_rates = args.failure_rate or [runner.base_parameters['failure_rate']]
+    algorithms = args.algorithm or [runner.base_parameters['algorithm']]
+    settings = [{'failure_rate': failure_rate, 'algorithm': algorithm}
+                for failure_rate, algorithm in itertools.product(failure_rates, algorithms)]
+
+    start = time.perf_counter()
+    results = runner.run(settings)
+    print(f"{len(results)} replications in {time.perf_counter() - start:.2f} s")
+    if args.output:
+        results.to_csv(args.output, index=False)
+    summary = ReplicationRunner.summarize(results, args.confidence)
+    columns = ['failure_rate', 'algorithm', 'replications'] + [
+        f'{name}_{suffix}' for name in ('average_delay', 'average_packet_loss_rate') for suffix in ('mean', 'ci_low', 'ci_high')
+    ]
+    print(summary[columns].to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+# route_cache.py
+
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+RouteKey = Tuple[int, int, str]
+
+
+class RouteCache:
+    """
+    経路計算結果のキャッシュ
+
+    (送信元, 送信先, アルゴリズム) ごとに経路を記録する。経路は中央コントローラの経路表
+    （RoutingTable）から求めるため、障害・復旧時には経路表が修復した宛先
+    （RoutingTable.repaired_destinations）への経路のみを無効化し、トポロジのグラフは持たない。
+
+    Attributes:
+        routing_table (Optional[RoutingTable]): 経路の計算に使う経路表（None の場合は変化のたびに全て無効化）
+        hits (int): キャッシュヒット数
+        misses (int): キャッシュミス数
+        invalidations (int): 無効化された経路の数
+    """
+
+    def __init__(self, routing_table=None):
+        """
+        Args:
+            routing_table (Optional[RoutingTable], optional): 経路の計算に使う経路表
+        """
+        self.routing_table = routing_table
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._routes: Dict[RouteKey, List[int]] = {}
+        self._keys_by_destination: Dict[int, Set[RouteKey]] = {}
+        self._keys_by_source: Dict[int, Set[RouteKey]] = {}
+
+    def get_route(self, source_node_id: int, destination_node_id: int, algorithm: str,
+                  compute: Callable[[int, int], List[int]]) -> List[int]:
+        """
+        キャッシュから経路を取得し、存在しない場合は計算して登録
+
+        Args:
+            source_node_id (int): 送信元ノードID
+            destination_node_id (int): 送信先ノードID
+            algorithm (str): ルーティングアルゴリズム名
+            compute (Callable[[int, int], List[int]]): キャッシュミス時に経路を計算する関数
+
+        Returns:
+            List[int]: 経路上のノードIDリスト（経路がない場合は空リスト）
+        """
+        key = (source_node_id, destination_node_id, algorithm)
+        path = self._routes.get(key)
+        if path is not None:
+            self.hits += 1
+            return path
+        self.misses += 1
+        path = compute(source_node_id, destination_node_id)
+        self._routes[key] = path
+        self._keys_by_destination.setdefault(destination_node_id, set()).add(key)
+        self._keys_by_source.setdefault(source_node_id, set()).add(key)
+        return path
+
+    def clear(self):
+        """
+        全ての経路を破棄（トポロジを読み込み直した場合に使用）
+        """
+        self.invalidations += len(self._routes)
+        self._routes.clear()
+        self._keys_by_destination.clear()
+        self._keys_by_source.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        キャッシュの統計情報を取得
+
+        Returns:
+            Dict[str, int]: ヒット数、ミス数、無効化数、保持している経路数
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'cached_routes': len(self._routes)
+        }
+
+    def element_failed(self, element_type: str, element_id: int):
+        """
+        障害発生時の通知を受け、経路表が修復した宛先への経路を無効化
+
+        Args:
+            element_type (str): "node" または "link"
+            element_id (int): 要素のID
+        """
+        self._repaired(element_type, element_id)
+
+    def element_recovered(self, element_type: str, element_id: int):
+        """
+        復旧時の通知を受け、経路表が修復した宛先への経路を無効化
+
+        Args:
+            element_type (str): "node" または "link"
+            element_id (int): 要素のID
+        """
+        self._repaired(element_type, element_id)
+
+    def _repaired(self, element_type: str, element_id: int):
+        """
+        中央コントローラが経路表を更新した後に呼び出され、次ホップが変わった経路を無効化
+        """
+        if not self._routes:
+            return
+        repaired: Optional[List[int]] = self.routing_table.repaired_destinations if self.routing_table is not None else None
+        if repaired is None:
+            self.clear()
+            return
+        keys: Set[RouteKey] = set()
+        for destination_node_id in repaired:
+            keys.update(self._keys_by_destination.get(destination_node_id, ()))
+        if element_type == "node":
+            # 経路表の修復範囲に含まれない、状態の変化したノード自身からの経路
+            keys.update(self._keys_by_source.get(element_id, ()))
+        self._invalidate(keys)
+
+    def _invalidate(self, keys: Set[RouteKey]):
+        for key in keys:
+            if self._routes.pop(key, None) is None:
+                continue
+            self.invalidations += 1
+            self._keys_by_source[key[0]].discard(key)
+            self._keys_by_destination[key[1]].discard(key)
@@ -0,0 +1,439 @@
+# routing_table.py
+
+import heapq
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra as csgraph_dijkstra
+except ImportError:  # scipy がない環境では純Pythonのダイクストラ法を使用
+    csr_matrix = None
+    csgraph_dijkstra = None
+
+NO_ROUTE = -1
+_NO_COLUMNS = np.zeros(0, dtype=np.int64)
+
+
+class RoutingTable:
+    """
+    全ノード対の距離行列と次ホップ行列
+
+    小規模・高密度なトポロジでは NumPy によるベクトル化 Floyd–Warshall 法、
+    それ以外では全始点からのダイクストラ法（scipy.sparse.csgraph があればそれを使用）で計算する。
+    行列はノードIDではなく node_ids のインデックスで管理する。
+
+    Attributes:
+        method (str): 計算方法（"auto", "floyd_warshall", "dijkstra"）
+        node_ids (List[int]): インデックスに対応するノードID
+        index (Dict[int, int]): ノードIDからインデックスへの対応
+        distances (np.ndarray): 距離行列（到達不能の場合は inf）
+        next_hops (np.ndarray): 次ホップ行列（インデックス、到達不能の場合は NO_ROUTE）
+        adjacency (List[Dict[int, float]]): 稼働中の隣接関係（インデックス → 重み）
+        active (np.ndarray): 各ノードが稼働中かどうか
+        version (int): 再計算の回数
+        repaired_destinations (Optional[List[int]]): 直近の build または apply_change で次ホップが変わった
+            （変わり得る）宛先のノードID（ノードの集合が変わった場合や初回の計算ではNone）。
+            ノードの障害・復旧では、そのノード自身を送信元とする次ホップの変化は含めない
+    """
+
+    FLOYD_WARSHALL_MAX_NODES = 256
+    FLOYD_WARSHALL_MIN_DENSITY = 0.25
+
+    def __init__(self, method: str = "auto"):
+        """
+        Args:
+            method (str, optional): 計算方法（デフォルトは "auto"）
+        """
+        if method not in ("auto", "floyd_warshall", "dijkstra"):
+            raise ValueError(f"Unknown routing table method: {method}")
+        self.method = method
+        self.node_ids: List[int] = []
+        self.index: Dict[int, int] = {}
+        self.distances = np.zeros((0, 0))
+        self.next_hops = np.zeros((0, 0), dtype=np.int32)
+        self.adjacency: List[Dict[int, float]] = []
+        self.active = np.zeros(0, dtype=bool)
+        self.version = 0
+        self.repaired_destinations: Optional[List[int]] = None
+
+    def build(self, topology_manager):
+        """
+        トポロジから距離行列と次ホップ行列を計算
+
+        Args:
+            topology_manager (TopologyManager): トポロジマネージャ
+        """
+        previous_node_ids, previous_next_hops = self.node_ids, self.next_hops
+        self.node_ids = list(topology_manager.nodes.keys())
+        self.index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.adjacency = [{} for _ in self.node_ids]
+        self.active = np.array([self._is_active(topology_manager, node_id) for node_id in self.node_ids], dtype=bool)
+        for link in topology_manager.links.values():
+            self._add_link_weight(topology_manager, link)
+
+        n = len(self.node_ids)
+        edge_count = sum(len(neighbors) for neighbors in self.adjacency) // 2
+        method = self.method
+        if method == "auto":
+            dense = n > 1 and edge_count >= self.FLOYD_WARSHALL_MIN_DENSITY * n * (n - 1) / 2
+            method = "floyd_warshall" if n <= self.FLOYD_WARSHALL_MAX_NODES or dense else "dijkstra"
+        if method == "floyd_warshall":
+            self._floyd_warshall()
+        elif csgraph_dijkstra is not None:
+            self._csgraph_dijkstra()
+        else:
+            self._repeated_dijkstra()
+        # ダウンしているノードは自身も含めて到達不能とする
+        inactive = ~self.active
+        self.distances[inactive, :] = np.inf
+        self.distances[:, inactive] = np.inf
+        self.next_hops[inactive, :] = NO_ROUTE
+        self.next_hops[:, inactive] = NO_ROUTE
+        self.version += 1
+        if previous_node_ids == self.node_ids and previous_next_hops.shape == self.next_hops.shape:
+            self._set_repaired(np.flatnonzero((previous_next_hops != self.next_hops).any(axis=0)))
+        else:
+            self.repaired_destinations = None
+
+    def _add_link_weight(self, topology_manager, link):
+        """
+        稼働中のリンクを隣接関係に追加（並行リンクは最小の重みを採用）
+        """
+        if link.status != "active":
+            return
+        node1_id, node2_id = link.connected_nodes
+        i, j = self.index[node1_id], self.index[node2_id]
+        if not (self.active[i] and self.active[j]):
+            return
+        weight = link.routing_weight()
+        if weight < self.adjacency[i].get(j, float('inf')):
+            self.adjacency[i][j] = weight
+            self.adjacency[j][i] = weight
+
+    @staticmethod
+    def _is_active(topology_manager, node_id: int) -> bool:
+        node = topology_manager.nodes.get(node_id)
+        return node is not None and node.status == "active"
+
+    def _floyd_warshall(self):
+        n = len(self.node_ids)
+        distances = np.full((n, n), np.inf)
+        next_hops = np.full((n, n), NO_ROUTE, dtype=np.int32)
+        for i, neighbors in enumerate(self.adjacency):
+            for j, weight in neighbors.items():
+                distances[i, j] = weight
+                next_hops[i, j] = j
+        diagonal = np.arange(n)
+        distances[diagonal, diagonal] = 0.0
+        next_hops[diagonal, diagonal] = diagonal
+        for k in range(n):
+            via = distances[:, k, None] + distances[None, k, :]
+            better = via < distances
+            np.copyto(distances, via, where=better)
+            np.copyto(next_hops, np.broadcast_to(next_hops[:, k, None], (n, n)), where=better)
+        self.distances = distances
+        self.next_hops = next_hops
+
+    def _csgraph_dijkstra(self):
+        n = len(self.node_ids)
+        rows, cols, weights = [], [], []
+        for i, neighbors in enumerate(self.adjacency):
+            for j, weight in neighbors.items():
+                rows.append(i)
+                cols.append(j)
+                weights.append(weight)
+        graph = csr_matrix((weights, (rows, cols)), shape=(n, n))
+        distances, predecessors = csgraph_dijkstra(graph, directed=False, return_predecessors=True)
+        # 無向グラフなので、j を始点とする最短路木での i の親が i から j への次ホップになる
+        next_hops = predecessors.T.astype(np.int32)
+        next_hops[next_hops < 0] = NO_ROUTE
+        diagonal = np.arange(n)
+        next_hops[diagonal, diagonal] = diagonal
+        self.distances = distances
+        self.next_hops = np.ascontiguousarray(next_hops)
+
+    def _repeated_dijkstra(self):
+        n = len(self.node_ids)
+        self.distances = np.full((n, n), np.inf)
+        self.next_hops = np.full((n, n), NO_ROUTE, dtype=np.int32)
+        for source in range(n):
+            distances, first_hops = self.single_source(source)
+            self.distances[source, :] = distances
+            self.next_hops[source, :] = first_hops
+
+    def single_source(self, source: int):
+        """
+        1つの始点からのダイクストラ法
+
+        Args:
+            source (int): 始点のインデックス
+
+        Returns:
+            Tuple[List[float], List[int]]: 各ノードへの距離と、始点から見た最初のホップ
+        """
+        n = len(self.node_ids)
+        distances = [float('inf')] * n
+        first_hops = [NO_ROUTE] * n
+        distances[source] = 0.0
+        first_hops[source] = source
+        heap = [(0.0, source)]
+        adjacency = self.adjacency
+        while heap:
+            distance, u = heapq.heappop(heap)
+            if distance > distances[u]:
+                continue
+            first_hop = first_hops[u]
+            for v, weight in adjacency[u].items():
+                candidate = distance + weight
+                if candidate < distances[v]:
+                    distances[v] = candidate
+                    first_hops[v] = v if u == source else first_hop
+                    heapq.heappush(heap, (candidate, v))
+        return distances, first_hops
+
+    def shortest_path_tree(self, root: int):
+        """
+        根に向かう最短路木をダイクストラ法で計算
+
+        Args:
+            root (int): 根（宛先）のインデックス
+
+        Returns:
+            Tuple[List[float], List[int]]: 各ノードから根までの距離と、根に向かう次ホップ
+        """
+        n = len(self.node_ids)
+        distances = [float('inf')] * n
+        parents = [NO_ROUTE] * n
+        distances[root] = 0.0
+        parents[root] = root
+        heap = [(0.0, root)]
+        adjacency = self.adjacency
+        while heap:
+            distance, u = heapq.heappop(heap)
+            if distance > distances[u]:
+                continue
+            for v, weight in adjacency[u].items():
+                candidate = distance + weight
+                if candidate < distances[v]:
+                    distances[v] = candidate
+                    parents[v] = u
+                    heapq.heappush(heap, (candidate, v))
+        return distances, parents
+
+    def apply_change(self, topology_manager, element_type: str, element_id: int) -> int:
+        """
+        1つのノードまたはリンクの状態変化を反映し、影響を受ける経路のみを修復
+
+        重みが減少した区間（復旧）は全ノード対に対して
+        d(s, t) = min(d(s, t), d(s, u) + w + d(v, t)) をベクトル化して適用する。
+        重みが増加した区間（障害）は、その区間を最短路木に含む宛先の列のみを再計算する
+        （Ramalingam–Reps 型の動的最短路更新）。
+
+        Args:
+            topology_manager (TopologyManager): トポロジマネージャ
+            element_type (str): "node" または "link"
+            element_id (int): 要素のID
+
+        Returns:
+            int: 距離または次ホップが更新された宛先の数
+        """
+        if element_type == "node":
+            node = topology_manager.get_node(element_id)
+            i = self.index.get(element_id)
+            columns = _NO_COLUMNS
+            if node is not None and i is not None:
+                if node.status == "active" and not self.active[i]:
+                    columns = self._activate_node(topology_manager, i)
+                elif node.status != "active" and self.active[i]:
+                    columns = self._deactivate_node(i)
+        elif element_type == "link":
+            link = topology_manager.get_link(element_id)
+            columns = self._refresh_pair(topology_manager, *link.connected_nodes) if link is not None else _NO_COLUMNS
+        else:
+            raise ValueError(f"Unknown element type: {element_type}")
+        self._set_repaired(columns)
+        return len(columns)
+
+    def _set_repaired(self, columns: np.ndarray):
+        self.repaired_destinations = [self.node_ids[column] for column in columns.tolist()]
+
+    def _pair_weight(self, topology_manager, i: int, j: int) -> float:
+        """
+        2ノード間の稼働中リンクの最小の重み
+        """
+        weight = float('inf')
+        if self.active[i] and self.active[j]:
+            for link in topology_manager.links_between(self.node_ids[i], self.node_ids[j]):
+                if link.status == "active":
+                    weight = min(weight, link.routing_weight())
+        return weight
+
+    def _refresh_pair(self, topology_manager, node1_id: int, node2_id: int) -> np.ndarray:
+        i = self.index.get(node1_id)
+        j = self.index.get(node2_id)
+        if i is None or j is None:
+            return _NO_COLUMNS
+        old_weight = self.adjacency[i].get(j, float('inf'))
+        weight = self._pair_weight(topology_manager, i, j)
+        if weight < old_weight:
+            return self._decrease_edge(i, j, weight)
+        if weight > old_weight:
+            return self._increase_edge(i, j, weight)
+        return _NO_COLUMNS
+
+    def _set_edge(self, i: int, j: int, weight: float):
+        if weight == float('inf'):
+            self.adjacency[i].pop(j, None)
+            self.adjacency[j].pop(i, None)
+        else:
+            self.adjacency[i][j] = weight
+            self.adjacency[j][i] = weight
+
+    def _affected_destinations(self, i: int, j: int) -> np.ndarray:
+        """
+        区間 (i, j) を最短路木に含む宛先のインデックス
+        """
+        return np.flatnonzero((self.next_hops[i, :] == j) | (self.next_hops[j, :] == i))
+
+    def _decrease_edge(self, i: int, j: int, weight: float) -> np.ndarray:
+        self._set_edge(i, j, weight)
+        distances = self.distances
+        next_hops = self.next_hops
+        n = len(self.node_ids)
+        # s から i（または j）へ向かう最初のホップ。s 自身が端点の場合は反対側の端点
+        hop_to_i = next_hops[:, i].copy()
+        hop_to_i[i] = j
+        hop_to_j = next_hops[:, j].copy()
+        hop_to_j[j] = i
+        via_ij = distances[:, i, None] + weight + distances[None, j, :]
+        via_ji = distances[:, j, None] + weight + distances[None, i, :]
+        improved_ij = via_ij < distances
+        np.copyto(distances, via_ij, where=improved_ij)
+        np.copyto(next_hops, np.broadcast_to(hop_to_i[:, None], (n, n)), where=improved_ij)
+        improved_ji = via_ji < distances
+        np.copyto(distances, via_ji, where=improved_ji)
+        np.copyto(next_hops, np.broadcast_to(hop_to_j[:, None], (n, n)), where=improved_ji)
+        return np.flatnonzero((improved_ij | improved_ji).any(axis=0))
+
+    def _increase_edge(self, i: int, j: int, weight: float) -> np.ndarray:
+        affected = self._affected_destinations(i, j)
+        self._set_edge(i, j, weight)
+        self._recompute_columns(affected)
+        return affected
+
+    def _deactivate_node(self, i: int) -> np.ndarray:
+        affected = set()
+        for j in list(self.adjacency[i]):
+            affected.update(self._affected_destinations(i, j).tolist())
+            self._set_edge(i, j, float('inf'))
+        self.active[i] = False
+        self.distances[i, :] = np.inf
+        self.distances[:, i] = np.inf
+        self.next_hops[i, :] = NO_ROUTE
+        self.next_hops[:, i] = NO_ROUTE
+        affected.discard(i)
+        columns = np.array(sorted(affected), dtype=np.int64)
+        self._recompute_columns(columns)
+        return np.append(columns, i)
+
+    def _activate_node(self, topology_manager, i: int) -> np.ndarray:
+        self.active[i] = True
+        self.distances[i, i] = 0.0
+        self.next_hops[i, i] = i
+        node = topology_manager.get_node(self.node_ids[i])
+        before = self.next_hops.copy()
+        for link_id in node.adjacent_links:
+            link = topology_manager.get_link(link_id)
+            if link:
+                self._refresh_pair(topology_manager, *link.connected_nodes)
+        # 復旧したノード自身の行（そのノードを送信元とする経路）は全ての宛先で変わるため除く
+        changed = before != self.next_hops
+        changed[i, :] = False
+        changed[:, i] = True
+        return np.flatnonzero(changed.any(axis=0))
+
+    def _recompute_columns(self, destinations: np.ndarray):
+        """
+        指定した宛先への距離と次ホップの列を再計算
+        """
+        if len(destinations) == 0:
+            return
+        if csgraph_dijkstra is not None:
+            n = len(self.node_ids)
+            rows, cols, weights = [], [], []
+            for u, neighbors in enumerate(self.adjacency):
+                for v, weight in neighbors.items():
+                    rows.append(u)
+                    cols.append(v)
+                    weights.append(weight)
+            graph = csr_matrix((weights, (rows, cols)), shape=(n, n))
+            distances, parents = csgraph_dijkstra(graph, directed=False, indices=destinations, return_predecessors=True)
+            parents = parents.astype(np.int32)
+            parents[parents < 0] = NO_ROUTE
+        else:
+            trees = [self.shortest_path_tree(int(t)) for t in destinations]
+            distances = np.array([tree[0] for tree in trees])
+            parents = np.array([tree[1] for tree in trees], dtype=np.int32)
+        self.distances[:, destinations] = distances.T
+        self.distances[destinations, :] = distances
+        self.next_hops[:, destinations] = parents.T
+        self.next_hops[destinations, destinations] = destinations
+
+    def next_hop(self, node_id: int, destination_node_id: int) -> Optional[int]:
+        """
+        宛先に向けた次ホップのノードIDを取得
+
+        Args:
+            node_id (int): 現在のノードID
+            destination_node_id (int): 宛先ノードID
+
+        Returns:
+            Optional[int]: 次ホップのノードID、到達不能の場合None
+        """
+        i = self.index.get(node_id)
+        j = self.index.get(destination_node_id)
+        if i is None or j is None:
+            return None
+        hop = self.next_hops[i, j]
+        return self.node_ids[hop] if hop != NO_ROUTE else None
+
+    def distance(self, source_node_id: int, destination_node_id: int) -> float:
+        """
+        2ノード間の最短距離を取得
+
+        Args:
+            source_node_id (int): 送信元ノードID
+            destination_node_id (int): 送信先ノードID
+
+        Returns:
+            float: 最短距離（到達不能の場合は inf）
+        """
+        i = self.index.get(source_node_id)
+        j = self.index.get(destination_node_id)
+        if i is None or j is None:
+            return float('inf')
+        return float(self.distances[i, j])
+
+    def path(self, source_node_id: int, destination_node_id: int) -> List[int]:
+        """
+        次ホップを辿って経路を取得
+
+        Args:
+            source_node_id (int): 送信元ノードID
+            destination_node_id (int): 送信先ノードID
+
+        Returns:
+            List[int]: 経路上のノードIDリスト（到達不能の場合は空リスト）
+        """
+        i = self.index.get(source_node_id)
+        j = self.index.get(destination_node_id)
+        if i is None or j is None or self.next_hops[i, j] == NO_ROUTE:
+            return []
+        next_hops = self.next_hops
+        path = [i]
+        while i != j:
+            i = int(next_hops[i, j])
+            path.append(i)
+        return [self.node_ids[k] for k in path]
@@ -0,0 +1,218 @@
+# scenario_loader.py
+
+import itertools
+import json
+import os
+from typing import Dict, Iterator, Optional
+
+import yaml
+
+import yaml_loader
+from flow import Flow
+from workload_generator import SCENARIO_FORMATS, read_scenario
+
+# 逐次読み込みに対応するファイルの拡張子ごとの形式
+STREAM_FORMATS = {**SCENARIO_FORMATS, ".jsonl": "jsonl", ".yaml": "yaml", ".yml": "yaml"}
+
+
+def stream_format(path: str) -> str:
+    """
+    ファイルの拡張子から逐次読み込みの形式を取得
+
+    Args:
+        path (str): シナリオファイルのパス
+
+    Returns:
+        str: "binary", "parquet", "jsonl" または "yaml"
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in STREAM_FORMATS:
+        raise ValueError(f"Unknown scenario format: {path}")
+    return STREAM_FORMATS[extension]
+
+
+def flow_from_record(record: Dict) -> Flow:
+    """
+    シナリオのフローの定義（YAML/JSONL の1要素）からフローを生成
+
+    Args:
+        record (Dict): flow_id, service_type, flow_size, source_node, destination_node と、
+            省略可能な fidelity, start_time を持つ辞書
+
+    Returns:
+        Flow: フローオブジェクト
+    """
+    return Flow(
+        flow_id=record['flow_id'],
+        service_type=record['service_type'],
+        flow_size=record['flow_size'],
+        source_node=record['source_node'],
+        destination_node=record['destination_node'],
+        fidelity=record.get('fidelity'),
+        start_time=record.get('start_time')
+    )
+
+
+def _compose_node(loader) -> yaml.Node:
+    # イベントから1つのノードを組み立てる（C 実装のパーサは compose_node を持たないため）
+    event = loader.get_event()
+    if isinstance(event, yaml.ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        return yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark, style=event.style)
+    if isinstance(event, yaml.SequenceStartEvent):
+        tag = event.tag if event.tag not in (None, "!") else loader.resolve(yaml.SequenceNode, None, event.implicit)
+        items = []
+        while not loader.check_event(yaml.SequenceEndEvent):
+            items.append(_compose_node(loader))
+        end = loader.get_event()
+        return yaml.SequenceNode(tag, items, event.start_mark, end.end_mark, flow_style=event.flow_style)
+    if isinstance(event, yaml.MappingStartEvent):
+        tag = event.tag if event.tag not in (None, "!") else loader.resolve(yaml.MappingNode, None, event.implicit)
+        pairs = []
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = _compose_node(loader)
+            pairs.append((key, _compose_node(loader)))
+        end = loader.get_event()
+        return yaml.MappingNode(tag, pairs, event.start_mark, end.end_mark, flow_style=event.flow_style)
+    raise ValueError(f"Unsupported YAML event in scenario: {event}")
+
+
+def _iter_yaml_records(file) -> Iterator[Dict]:
+    # 最上位の flows の要素を1つずつ組み立てて構築し、ファイル全体の木は作らない
+    loader = yaml_loader.SafeLoader(file)
+    try:
+        loader.get_event()  # StreamStartEvent
+        if loader.check_event(yaml.StreamEndEvent):
+            return
+        loader.get_event()  # DocumentStartEvent
+        if not loader.check_event(yaml.MappingStartEvent):
+            raise ValueError("Scenario YAML must be a mapping with a 'flows' list")
+        loader.get_event()
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = loader.construct_document(_compose_node(loader))
+            if key != 'flows':
+                _compose_node(loader)
+                continue
+            if not loader.check_event(yaml.SequenceStartEvent):
+                raise ValueError("Scenario 'flows' must be a list")
+            loader.get_event()
+            while not loader.check_event(yaml.SequenceEndEvent):
+                yield loader.construct_document(_compose_node(loader))
+            loader.get_event()
+    finally:
+        loader.dispose()
+
+
+def iter_flows(path: str, chunk_size: int = 65536) -> Iterator[Flow]:
+    """
+    シナリオファイルのフローをファイルの順に1つずつ生成
+
+    .npy と Parquet は chunk_size 行ずつ、JSONL は chunk_size 行ずつ読み込み、
+    YAML は最上位の flows の要素ごとにパースするため、ファイル全体をメモリに読み込まない。
+
+    Args:
+        path (str): シナリオファイルのパス（.npy, .parquet, .jsonl, .yaml, .yml）
+        chunk_size (int, optional): 1回に読み込む行数
+
+    Yields:
+        Flow: フローオブジェクト
+    """
+    file_format = stream_format(path)
+    if file_format in ("binary", "parquet"):
+        for chunk in read_scenario(path, chunk_size):
+            service_types = [service_type.decode() for service_type in chunk['service_type'].tolist()]
+            rows = chunk[['flow_id', 'start_time', 'flow_size', 'source_node', 'destination_node']].tolist()
+            for (flow_id, start_time, flow_size, source_node, destination_node), service_type in zip(rows, service_types):
+                yield Flow(flow_id, service_type, flow_size, source_node, destination_node, start_time=start_time)
+        return
+    with open(path, 'r', encoding='utf-8') as file:
+        if file_format == "yaml":
+            for record in _iter_yaml_records(file):
+                yield flow_from_record(record)
+            return
+        while True:
+            lines = list(itertools.islice(file, chunk_size))
+            if not lines:
+                return
+            for line in lines:
+                if line.strip():
+                    yield flow_from_record(json.loads(line))
+
+
+class ScenarioFeeder:
+    """
+    開始時刻の順に並んだシナリオのフローを、先読み時間（horizon）の範囲だけスケジュールするフィーダ
+
+    フィードイベントは常に1つだけスケジュールし、実行のたびに開始時刻が現在時刻 + horizon 以内の
+    フローを読み込んでフロー開始イベントをスケジュールする。次のフィードは、次のフローが範囲に
+    入る時刻（開始時刻 - horizon）に行う。そのため、イベントキューに載るフロー開始イベントは
+    horizon 内に開始するものだけになり、読み込みもシミュレーション時刻の進行に合わせて行われる。
+
+    Attributes:
+        flows (Iterator[Flow]): 開始時刻の昇順のフローの列
+        flow_manager (FlowManager): フローマネージャ
+        simulation_engine (SimulationEngine): シミュレーションエンジン
+        horizon (float): 先読み時間（秒）
+        loaded (int): 読み込んでスケジュールしたフロー数
+    """
+
+    def __init__(self, flows: Iterator[Flow], flow_manager, simulation_engine, horizon: float = 1.0):
+        """
+        Args:
+            flows (Iterator[Flow]): 開始時刻（scheduled_start）の昇順のフローの列
+            flow_manager (FlowManager): フローマネージャ
+            simulation_engine (SimulationEngine): シミュレーションエンジン
+            horizon (float, optional): 先読み時間（秒）
+        """
+        if horizon <= 0:
+            raise ValueError("horizon must be positive")
+        self.flows = iter(flows)
+        self.flow_manager = flow_manager
+        self.simulation_engine = simulation_engine
+        self.horizon = horizon
+        self.loaded = 0
+        self._pending: Optional[Flow] = None
+        self._last_start = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self._pending is None
+
+    def start(self):
+        """
+        最初のフローを読み込み、最初のフィードをスケジュール
+        """
+        self._pending = self._next_flow()
+        if self._pending is not None:
+            now = self.simulation_engine.current_time
+            self.simulation_engine.schedule_event(max(now, self._pending.start_time - self.horizon), self.feed)
+
+    def feed(self):
+        """
+        開始時刻が現在時刻 + horizon 以内のフローの開始イベントをスケジュールし、次のフィードをスケジュール
+        """
+        limit = self.simulation_engine.current_time + self.horizon
+        flow_manager = self.flow_manager
+        while self._pending is not None and self._pending.start_time <= limit:
+            flow = self._pending
+            flow_manager.flows[flow.flow_id] = flow
+            self.simulation_engine.schedule_event(flow.start_time, lambda f=flow: flow_manager.start_flow(f),
+                                                  owner=flow.source_node)
+            self.loaded += 1
+            self._pending = self._next_flow()
+        if self._pending is not None:
+            self.simulation_engine.schedule_event(self._pending.start_time - self.horizon, self.feed)
+
+    def _next_flow(self) -> Optional[Flow]:
+        flow = next(self.flows, None)
+        if flow is None:
+            return None
+        if flow.scheduled_start is None:
+            raise ValueError(f"Flow {flow.flow_id} has no start_time; streamed scenarios require start times")
+        if flow.scheduled_start < self._last_start:
+            raise ValueError(f"Flow {flow.flow_id} starts at {flow.scheduled_start} before the previous flow "
+                             f"({self._last_start}); streamed scenarios must be sorted by start_time")
+        self._last_start = flow.scheduled_start
+        return flow
@@ -1,38 +1,40 @@
-import heapq
-from typing import Callable, List
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional
 import threading
+from event_queue import EventQueue, QueueEntry, create_event_queue
+
+# イベントを発生させたエンティティがない（初期化時・障害イベントなど全体に関わる）場合のエンティティID
+GLOBAL_ENTITY = -1
 
 class Event:
     """
     イベントクラス
 
+    Note:
+        イベントキューは (時刻, シーケンス番号, 関数) のタプルで管理されるため、
+        このクラスは peek_event でイベント情報を受け渡すためのレコードとしてのみ使用する
+
     Attributes:
         event_time (float): イベントが発生するシミュレーション時間
         event_function (Callable): イベント時に実行される関数
+        parallel_safe (bool): 同時刻の他イベントと並列実行してよい場合True
     """
 
-    def __init__(self, event_time: float, event_function: Callable):
+    __slots__ = ("event_time", "event_function", "parallel_safe")
+
+    def __init__(self, event_time: float, event_function: Callable, parallel_safe: bool = False):
         """
         イベントの初期化
 
         Args:
             event_time (float): イベントが発生するシミュレーション時間
             event_function (Callable): イベント時に実行される関数
+            parallel_safe (bool, optional): 並列実行可能なイベントかどうか（デフォルトはFalse）
         """
         self.event_time = event_time
         self.event_function = event_function
-
-    def __lt__(self, other):
-        """
-        イベントの比較（優先度付きキュー用）
-
-        Args:
-            other (Event): 比較対象のイベント
-
-        Returns:
-            bool: 自身のイベントが他のイベントよりも早い場合True
-        """
-        return self.event_time < other.event_time
+        self.parallel_safe = parallel_safe
 
 class SimulationEngine:
     """
@@ -40,18 +42,58 @@ class SimulationEngine:
 
     Attributes:
         current_time (float): 現在のシミュレーション時間
-        event_queue (List[Event]): イベントの優先度付きキュー
+        event_queue (EventQueue): イベントの優先度付きキュー
+        event_queue_type (str): イベントキューの種類（"heap", "calendar", "ladder", "wheel"）
         simulation_end_time (float): シミュレーションの終了時間
+        dispatch_mode (str): イベントの実行方式（"sequential" または "parallel"）
+        max_workers (Optional[int]): "parallel" モードで使用するワーカースレッド数
+        event_ordering (str): 同時刻のイベントの順序（"sequence" または "entity"）
+        immediate_queue (bool): 現在時刻のイベントをイベントキューを経由せずに実行する場合True
+        events_processed (int): 実行したイベント数
+        immediate_events (int): イベントキューを経由せずに実行したイベント数
     """
 
-    def __init__(self):
+    DISPATCH_MODES = ("sequential", "parallel")
+    EVENT_ORDERINGS = ("sequence", "entity")
+
+    def __init__(self, dispatch_mode: str = "sequential", max_workers: Optional[int] = None, event_queue: str = "heap",
+                 event_ordering: str = "sequence", immediate_queue: bool = True):
         """
         シミュレーションエンジンの初期化
+
+        Args:
+            dispatch_mode (str, optional): イベントの実行方式（デフォルトは "sequential"）。
+                "parallel" の場合、parallel_safe が指定されたイベントのみスレッドプールで実行する
+            max_workers (Optional[int], optional): スレッドプールのワーカー数
+            event_queue (str, optional): イベントキューの種類（デフォルトは "heap"）
+            event_ordering (str, optional): 同時刻のイベントの順序（デフォルトは "sequence"）。
+                "sequence" はスケジュールした順。"entity" はイベントを発生させたエンティティ（ノード）と
+                そのエンティティ内の通し番号の順で、実行の順序に依存しないため分割実行と同じ結果になる
+            immediate_queue (bool, optional): 現在時刻にスケジュールしたイベント（パケット受信後の転送など）を
+                イベントキューを経由しない FIFO で実行するかどうか（デフォルトはTrue）。
+                "sequence" 順序の逐次実行でのみ有効で、実行順序はイベントキューを経由した場合と同じになる
         """
+        if dispatch_mode not in self.DISPATCH_MODES:
+            raise ValueError(f"Unknown dispatch mode: {dispatch_mode}")
+        if event_ordering not in self.EVENT_ORDERINGS:
+            raise ValueError(f"Unknown event ordering: {event_ordering}")
+        if event_ordering == "entity" and dispatch_mode == "parallel":
+            raise ValueError("event_ordering 'entity' requires dispatch_mode 'sequential'")
         self.current_time: float = 0.0
-        self.event_queue: List[Event] = []
+        self.event_queue_type = event_queue
+        self.event_queue: EventQueue = create_event_queue(event_queue)
         self.simulation_end_time: float = 0.0
+        self._parallel_safe_events = set()  # parallel_safe なイベントのシーケンス番号
+        self.dispatch_mode = dispatch_mode
+        self.max_workers = max_workers
         self.lock = threading.Lock()  # スレッドセーフのためのロック
+        self.event_ordering = event_ordering
+        self.immediate_queue = immediate_queue
+        self.events_processed = 0
+        self.immediate_events = 0
+        self._immediate: Deque[Callable] = deque()  # 現在時刻のイベント（スケジュール順）
+        self._entity_counters: Dict[int, int] = {}
+        self._current_owner: Optional[int] = None  # 実行中のイベントを所有するエンティティ
 
     def initialize(self, simulation_time: float):
         """
@@ -61,43 +103,171 @@ class SimulationEngine:
             simulation_time (float): シミュレーションの総時間
         """
         self.current_time = 0.0
-        self.event_queue = []
+        self.event_queue = create_event_queue(self.event_queue_type)
+        self._parallel_safe_events = set()
         self.simulation_end_time = simulation_time
+        self.events_processed = 0
+        self.immediate_events = 0
+        self._immediate = deque()
+        self._entity_counters = {}
+        self._current_owner = None
 
     def run(self):
         """
         シミュレーションの開始
+
+        同一時刻のイベントをまとめて取り出し、単一スレッドで順に実行する。
+        "parallel" モードでは parallel_safe なイベントのみスレッドプールに投入する。
         """
-        while self.event_queue and self.current_time <= self.simulation_end_time:
-            with self.lock:
-                event = heapq.heappop(self.event_queue)
-                self.current_time = event.event_time
+        if self.dispatch_mode == "parallel":
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                self._run_loop(executor)
+        elif self.event_ordering == "entity":
+            self._run_keyed_loop()
+        else:
+            self._run_loop(None)
 
+    def _run_loop(self, executor: Optional[ThreadPoolExecutor]):
+        """
+        イベントループ本体
+
+        Args:
+            executor (Optional[ThreadPoolExecutor]): 並列実行用のエグゼキュータ（逐次実行の場合None）
+        """
+        event_queue = self.event_queue
+        immediate = self._immediate
+        while True:
+            # 現在時刻のイベントは、キューに残っている同時刻のイベント（先にスケジュールされたもの）の後に実行する
+            while immediate and event_queue.peek_time() > self.current_time:
+                self.events_processed += 1
+                self.immediate_events += 1
+                immediate.popleft()()
+            if not event_queue or event_queue.peek_time() > self.simulation_end_time:
+                break
             # 同一時間のイベントを集める
-            simultaneous_events = [event]
             with self.lock:
-                while self.event_queue and self.event_queue[0].event_time == self.current_time:
-                    simultaneous_events.append(heapq.heappop(self.event_queue))
+                entry = event_queue.pop()
+                self.current_time = entry[0]
+                simultaneous_events = [entry]
+                while event_queue and event_queue.peek_time() == self.current_time:
+                    simultaneous_events.append(event_queue.pop())
+                self.events_processed += len(simultaneous_events)
+
+            if executor is None:
+                for _, _, event_function in simultaneous_events:
+                    event_function()
+            else:
+                self._dispatch_parallel(executor, simultaneous_events)
+
+    def _run_keyed_loop(self):
+        """
+        "entity" 順序のイベントループ
+
+        同時刻に実行中のイベントがより小さいキーのイベントを追加することがあるため、
+        同時刻のイベントをまとめて取り出さず1つずつ取り出す。
+        """
+        event_queue = self.event_queue
+        end_time = self.simulation_end_time
+        try:
+            while event_queue and event_queue.peek_time() <= end_time:
+                self.current_time, key, event_function = event_queue.pop()
+                self._current_owner = key[3]
+                self.events_processed += 1
+                event_function()
+        finally:
+            self._current_owner = None
 
-            # 同時イベントを並列処理
-            threads = []
-            for event in simultaneous_events:
-                t = threading.Thread(target=event.event_function)
-                threads.append(t)
-                t.start()
+    def defer(self, output: Callable):
+        """
+        取り消すことのない出力（メトリクス・トレースの記録など）を実行
+
+        逐次実行では直ちに実行する。楽観的な並列実行ではイベントの実行が確定した時点まで遅らせる。
+
+        Args:
+            output (Callable): 出力を行う関数
+        """
+        output()
+
+    def event_key(self, owner: Optional[int]) -> tuple:
+        """
+        "entity" 順序でのイベントのキーを発行
+
+        キーは (全体イベントなら0・エンティティのイベントなら1, 発生元のエンティティ, 発生元での通し番号, 所有エンティティ)。
+        発生元は実行中のイベントの所有エンティティで、通し番号はエンティティごとに数えるため、
+        各エンティティが同じ順にイベントを実行する限りキーは実行の順序によらず同じになる。
+        同時刻では全体イベントがエンティティのイベントより先に実行される。
+
+        Args:
+            owner (Optional[int]): イベントを実行するエンティティ（ノードID）、全体イベントの場合None
+
+        Returns:
+            tuple: イベントのキー
+        """
+        creator = GLOBAL_ENTITY if self._current_owner is None else self._current_owner
+        counter = self._entity_counters.get(creator, 0)
+        self._entity_counters[creator] = counter + 1
+        return (0 if owner is None else 1, creator, counter, owner)
+
+    def _dispatch_parallel(self, executor: ThreadPoolExecutor, events: List[QueueEntry]):
+        """
+        同時刻イベントのうち parallel_safe なものをスレッドプールで実行し、残りは順に実行する
 
-            # 全てのスレッドが終了するのを待つ
-            for t in threads:
-                t.join()
+        Args:
+            executor (ThreadPoolExecutor): エグゼキュータ
+            events (List[QueueEntry]): 同時刻のイベントのリスト
+        """
+        futures = []
+        sequential_events = []
+        with self.lock:
+            for _, seq, event_function in events:
+                if seq in self._parallel_safe_events:
+                    self._parallel_safe_events.discard(seq)
+                    futures.append(executor.submit(event_function))
+                else:
+                    sequential_events.append(event_function)
+        for event_function in sequential_events:
+            event_function()
+        # 例外は呼び出し元に伝播させる
+        for future in futures:
+            future.result()
 
-    def schedule_event(self, event_time: float, event_function: Callable):
+    def schedule_event(self, event_time: float, event_function: Callable, parallel_safe: bool = False,
+                       owner: Optional[int] = None):
         """
         イベントのスケジューリング
 
         Args:
             event_time (float): イベントが発生する時間
             event_function (Callable): 実行する関数
+            parallel_safe (bool, optional): 同時刻の他イベントと並列実行してよい場合True（デフォルトはFalse）
+            owner (Optional[int], optional): イベントの状態を所有するノードのID（全体に関わるイベントはNone）。
+                "entity" 順序と分割実行でのみ使用する
+        """
+        if self.event_ordering == "entity":
+            self.event_queue.push_keyed(event_time, self.event_key(owner), event_function)
+            return
+        if event_time == self.current_time and self.immediate_queue and self.dispatch_mode == "sequential":
+            # キュー内の同時刻のイベントは全てこれより前にスケジュールされているため、
+            # それらの後に FIFO で実行すればイベントキューを経由した場合と同じ順序になる
+            self._immediate.append(event_function)
+            return
+        with self.lock:
+            seq = self.event_queue.push(event_time, event_function)
+            if parallel_safe:
+                self._parallel_safe_events.add(seq)
+
+    def peek_event(self) -> Optional[Event]:
+        """
+        次に実行されるイベントを取り出さずに参照
+
+        Returns:
+            Optional[Event]: 次のイベント、キューが空の場合None
         """
-        event = Event(event_time, event_function)
         with self.lock:
-            heapq.heappush(self.event_queue, event)
+            entry = self.event_queue.peek()
+            if self._immediate and (entry is None or entry[0] > self.current_time):
+                return Event(self.current_time, self._immediate[0])
+            if entry is None:
+                return None
+            event_time, seq, event_function = entry
+            return Event(event_time, event_function, seq in self._parallel_safe_events)
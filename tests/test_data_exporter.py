@@ -1,9 +1,12 @@
 # tests/test_data_exporter.py
 
 import unittest
+import data_exporter
 from data_exporter import DataExporter
-from metrics_collector import FlowMetric, NetworkMetric
+from metrics_collector import MetricsCollector, FlowMetric, NetworkMetric
 import os
+import csv
+import tempfile
 
 class TestDataExporter(unittest.TestCase):
     """
@@ -42,5 +45,68 @@ class TestDataExporter(unittest.TestCase):
         os.remove(flow_metrics_file)
         os.remove(network_metrics_file)
 
+    def test_csv_contents_and_column_selection(self):
+        """
+        CSV出力の内容と列の選択のテスト
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'metrics')
+            self.data_exporter.export_simulation_data(self.flow_metrics, self.network_metrics, 'csv', file_path,
+                                                      columns=['timestamp', 'flow_id', 'delay'])
+            with open(file_path + '_flow_metrics.csv', newline='') as csvfile:
+                rows = list(csv.reader(csvfile))
+            self.assertEqual(rows, [['timestamp', 'flow_id', 'delay'], ['1.0', '1', '0.1'], ['2.0', '2', '0.2']])
+            with open(file_path + '_network_metrics.csv', newline='') as csvfile:
+                self.assertEqual(next(csv.reader(csvfile)), ['timestamp'])
+
+    @unittest.skipIf(data_exporter.pa is None, "pyarrow is not installed")
+    def test_columnar_formats(self):
+        """
+        Parquet / Arrow IPC 形式の出力のテスト
+        """
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'metrics')
+            self.data_exporter.export_simulation_data(self.flow_metrics, self.network_metrics, 'parquet', file_path,
+                                                      row_group_size=1)
+            parquet_file = pq.ParquetFile(file_path + '_flow_metrics.parquet')
+            self.assertEqual(parquet_file.metadata.num_row_groups, 2)
+            self.assertEqual(parquet_file.read().column('throughput').to_pylist(), [1000.0, 2000.0])
+
+            self.data_exporter.export_simulation_data(self.flow_metrics, self.network_metrics, 'arrow', file_path)
+            table = feather.read_table(file_path + '_network_metrics.arrow')
+            self.assertEqual(table.column('average_delay').to_pylist(), [0.15])
+
+    @unittest.skipIf(data_exporter.pa is None, "pyarrow is not installed")
+    def test_stream_metrics(self):
+        """
+        実行中にメトリクスを一定行数ごとに書き出すことのテスト
+        """
+        import pyarrow.parquet as pq
+        metrics_collector = MetricsCollector(retention="ring", capacity=8)
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'metrics')
+            self.data_exporter.stream_metrics(metrics_collector, 'parquet', file_path, batch_rows=4, row_group_size=10)
+            for i in range(25):
+                metrics_collector.flow_metrics.append_values(float(i), 1, 1000.0, 0.1, 0.0, 0.01)
+            writer = self.data_exporter.streams[0][1]
+            self.assertEqual(writer.rows_written, 24)
+            self.data_exporter.close_streams()
+            self.assertEqual(writer.rows_written, 25)
+            table = pq.read_table(file_path + '_flow_metrics.parquet')
+            self.assertEqual(table.column('timestamp').to_pylist(), [float(i) for i in range(25)])
+
+    @unittest.skipIf(data_exporter.h5py is None, "h5py is not installed")
+    def test_hdf5(self):
+        """
+        HDF5形式の出力のテスト
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'metrics')
+            self.data_exporter.export_simulation_data(self.flow_metrics, self.network_metrics, 'hdf5', file_path)
+            with data_exporter.h5py.File(file_path + '_flow_metrics.h5', 'r') as hdf5_file:
+                self.assertEqual(list(hdf5_file['metrics/flow_id'][:]), [1, 2])
+
 if __name__ == '__main__':
     unittest.main()
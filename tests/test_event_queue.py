@@ -0,0 +1,164 @@
+# tests/test_event_queue.py
+
+import heapq
+import random
+import unittest
+from event_queue import create_event_queue, HeapEventQueue, CalendarEventQueue, LadderEventQueue, TimerWheelEventQueue
+
+class TestEventQueue(unittest.TestCase):
+    """
+    イベントキュー各実装のユニットテストクラス
+    """
+
+    QUEUE_TYPES = ["heap", "calendar", "ladder", "wheel"]
+
+    def drain(self, queue):
+        entries = []
+        while queue:
+            entries.append(queue.pop())
+        return entries
+
+    def test_create_event_queue(self):
+        """
+        create_event_queue関数のテスト
+        """
+        self.assertIsInstance(create_event_queue("heap"), HeapEventQueue)
+        self.assertIsInstance(create_event_queue("calendar"), CalendarEventQueue)
+        self.assertIsInstance(create_event_queue("ladder"), LadderEventQueue)
+        self.assertIsInstance(create_event_queue("wheel"), TimerWheelEventQueue)
+        with self.assertRaises(ValueError):
+            create_event_queue("splay")
+
+    def test_pop_order_with_ties(self):
+        """
+        同時刻のイベントがスケジュール順に取り出されることのテスト
+        """
+        for queue_type in self.QUEUE_TYPES:
+            with self.subTest(queue_type=queue_type):
+                queue = create_event_queue(queue_type)
+                for name in ["a", "b", "c"]:
+                    queue.push(1.0, name)
+                queue.push(0.5, "first")
+                self.assertEqual([entry[2] for entry in self.drain(queue)], ["first", "a", "b", "c"])
+
+    def test_matches_sorted_order(self):
+        """
+        挿入と取り出しを交互に行った場合に全実装が同じ順序になることのテスト
+        """
+        for queue_type in self.QUEUE_TYPES:
+            with self.subTest(queue_type=queue_type):
+                rng = random.Random(42)
+                queue = create_event_queue(queue_type)
+                reference = create_event_queue("heap")
+                now = 0.0
+                popped, expected = [], []
+                for _ in range(5000):
+                    if rng.random() < 0.6 or not queue:
+                        # 離散的な時刻を混ぜて同時刻イベントを発生させる
+                        delay = rng.choice([0.0, 0.01, 0.02, rng.expovariate(1.0), rng.uniform(0, 100)])
+                        queue.push(now + delay, None)
+                        reference.push(now + delay, None)
+                    else:
+                        entry = queue.pop()
+                        now = entry[0]
+                        popped.append(entry[:2])
+                        expected.append(reference.pop()[:2])
+                popped.extend(entry[:2] for entry in self.drain(queue))
+                expected.extend(entry[:2] for entry in self.drain(reference))
+                self.assertEqual(popped, expected)
+
+    def test_monotone_integer_delays(self):
+        """
+        現在時刻からの整数の遅延で挿入しながら取り出した場合に heapq と同じ順序になることのテスト
+        （ラダーキューの段の範囲の端と同時刻のイベントを発生させる）
+        """
+        for queue_type in self.QUEUE_TYPES:
+            for seed in range(10):
+                with self.subTest(queue_type=queue_type, seed=seed):
+                    rng = random.Random(seed)
+                    queue = create_event_queue(queue_type)
+                    reference = []
+                    now = 0.0
+                    for _ in range(2000):
+                        if rng.random() < 0.5 or not queue:
+                            event_time = now + rng.randint(0, 30)
+                            heapq.heappush(reference, (event_time, queue.push(event_time, None)))
+                        else:
+                            entry = queue.pop()
+                            now = entry[0]
+                            self.assertEqual(entry[:2], heapq.heappop(reference))
+                    self.assertEqual([entry[:2] for entry in self.drain(queue)],
+                                     [heapq.heappop(reference) for _ in range(len(reference))])
+
+            with self.subTest(queue_type=queue_type):
+                # 全イベントを取り出した直後に最上段の範囲の端の時刻を挿入する
+                queue = create_event_queue(queue_type)
+                for event_time in [452, 457, 457, 467, 459, 463, 460, 459, 464, 460, 469, 462, 462, 461, 470, 462, 466, 461]:
+                    queue.push(float(event_time), None)
+                self.drain(queue)
+                queue.push(471.0, "last")
+                self.assertEqual(len(queue), 1)
+                self.assertEqual(queue.pop()[2], "last")
+
+    def test_peek(self):
+        """
+        peekおよびpeek_timeメソッドのテスト
+        """
+        for queue_type in self.QUEUE_TYPES:
+            with self.subTest(queue_type=queue_type):
+                queue = create_event_queue(queue_type)
+                self.assertIsNone(queue.peek())
+                self.assertEqual(queue.peek_time(), float('inf'))
+                queue.push(3.0, "x")
+                queue.push(2.0, "y")
+                self.assertEqual(queue.peek()[2], "y")
+                self.assertEqual(queue.peek_time(), 2.0)
+                self.assertEqual(len(queue), 2)
+                queue.pop()
+                queue.pop()
+                with self.assertRaises(IndexError):
+                    queue.pop()
+
+    def test_timer_wheel_cascade_and_overflow(self):
+        """
+        小さなタイマーホイールで段の間の移動とヒープへのあふれが正しく扱われることのテスト
+        """
+        rng = random.Random(7)
+        queue = TimerWheelEventQueue(tick=0.01, slot_count=4, levels=2)
+        reference = create_event_queue("heap")
+        popped, expected = [], []
+        for _ in range(3000):
+            if rng.random() < 0.55 or not queue:
+                # 過去の時刻・同じ刻み・全段の範囲（0.16秒）を超える時刻を含める
+                event_time = rng.choice([rng.uniform(0, 0.2), rng.uniform(0, 20.0)])
+                queue.push(event_time, None)
+                reference.push(event_time, None)
+            else:
+                popped.append(queue.pop()[:2])
+                expected.append(reference.pop()[:2])
+                self.assertEqual(queue.peek_time(), reference.peek_time())
+        popped.extend(entry[:2] for entry in self.drain(queue))
+        expected.extend(entry[:2] for entry in self.drain(reference))
+        self.assertEqual(popped, expected)
+        with self.assertRaises(ValueError):
+            TimerWheelEventQueue(tick=0.0)
+
+    def test_heap_operations(self):
+        """
+        二分ヒープの操作数のテスト（範囲内のイベントはタイマーホイールではヒープを経由しない）
+        """
+        heap = create_event_queue("heap")
+        wheel = create_event_queue("wheel")
+        for queue in (heap, wheel):
+            for event_time in (0.001, 0.002, 0.01):
+                queue.push(event_time, None)
+            self.drain(queue)
+        self.assertEqual(heap.heap_operations, 6)
+        self.assertEqual(wheel.heap_operations, 0)
+        # 全段の範囲を超えるイベントのみヒープに入る
+        wheel.push(1e6, None)
+        self.drain(wheel)
+        self.assertEqual(wheel.heap_operations, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+# tests/test_fluid_model.py
+
+import os
+import tempfile
+import unittest
+import yaml
+from fluid_model import max_min_fair_share
+from flow import Flow
+from flow_manager import FlowManager
+from topology_manager import TopologyManager
+from simulation_engine import SimulationEngine
+from node import Node
+from link import Link
+from central_controller import CentralController
+from metrics_collector import MetricsCollector
+
+class TestFluidModel(unittest.TestCase):
+    """
+    FluidModelクラスのユニットテストクラス
+    """
+
+    def setUp(self):
+        """
+        三角形のトポロジ（1-3 は直結、1-2-3 は迂回経路）を設定
+        """
+        self.topology_manager = TopologyManager()
+        for node_id in (1, 2, 3):
+            self.topology_manager.nodes[node_id] = Node(node_id=node_id)
+        self.topology_manager.add_link(Link(link_id=1, capacity=8000.0, delay=0.01, jitter=0.0, connected_nodes=(1, 2)))
+        self.topology_manager.add_link(Link(link_id=2, capacity=8000.0, delay=0.01, jitter=0.0, connected_nodes=(2, 3)))
+        self.topology_manager.add_link(Link(link_id=3, capacity=8000.0, delay=0.01, jitter=0.0, connected_nodes=(1, 3)))
+        self.simulation_engine = SimulationEngine()
+        self.simulation_engine.initialize(100.0)
+        self.central_controller = CentralController(self.topology_manager)
+        self.metrics_collector = MetricsCollector()
+        self.flow_manager = FlowManager(self.topology_manager, self.simulation_engine, self.central_controller,
+                                        self.metrics_collector, simulation_mode="fluid")
+
+    def start(self, flow: Flow, time: float = 0.0):
+        self.flow_manager.flows[flow.flow_id] = flow
+        self.simulation_engine.schedule_event(time, lambda: self.flow_manager.start_flow(flow))
+
+    def test_max_min_fair_share(self):
+        """
+        max-min 公平な帯域割り当てのテスト
+        """
+        rates = max_min_fair_share({'a': [1], 'b': [1, 2], 'c': [2]}, {1: 10.0, 2: 4.0})
+        self.assertEqual(rates, {'a': 8.0, 'b': 2.0, 'c': 2.0})
+        self.assertEqual(max_min_fair_share({}, {}), {})
+
+    def test_shared_bottleneck(self):
+        """
+        ボトルネックを共有するフローの完了時刻とメトリクスのテスト
+        """
+        # 両フローはリンク3を 4000 bps ずつ共有し、フロー1の完了後はフロー2が 8000 bps となる
+        self.start(Flow(1, "data", 1500, 1, 3))
+        self.start(Flow(2, "data", 3000, 1, 3))
+        self.simulation_engine.run()
+
+        self.assertEqual(self.flow_manager.flows[1].status, "completed")
+        self.assertEqual(self.flow_manager.flows[2].status, "completed")
+        self.assertAlmostEqual(self.metrics_collector.flow_accumulators[1].duration, 3.0)
+        self.assertAlmostEqual(self.metrics_collector.flow_accumulators[2].duration, 4.5)
+
+        metric = self.metrics_collector.flow_metrics[0]
+        self.assertEqual(metric.flow_id, 1)
+        self.assertAlmostEqual(metric.timestamp, 3.0)
+        self.assertAlmostEqual(metric.throughput, 4000.0)
+        self.assertAlmostEqual(metric.delay, 0.01 + 1500 * 8 / 8000.0)
+        self.assertEqual(metric.packet_loss_rate, 0)
+        self.assertEqual(len(self.flow_manager.packet_manager.packet_store), 0)
+
+    def test_reroute_and_failure(self):
+        """
+        リンク障害時の迂回と到達不能時のフローの失敗のテスト
+        """
+        self.start(Flow(1, "data", 3000, 1, 3))
+        self.simulation_engine.schedule_event(1.0, lambda: self.fail_link(3))
+        self.simulation_engine.run()
+        self.assertEqual(self.flow_manager.flows[1].status, "completed")
+        # 障害までに 1000 バイト、迂回後の 1-2-3 で残り 2000 バイト
+        self.assertAlmostEqual(self.metrics_collector.flow_accumulators[1].duration, 3.0)
+
+        self.start(Flow(2, "data", 3000, 1, 3), time=5.0)
+        self.simulation_engine.schedule_event(6.0, lambda: self.fail_link(1))
+        self.simulation_engine.schedule_event(6.0, lambda: self.fail_link(2))
+        self.simulation_engine.run()
+        self.assertEqual(self.flow_manager.flows[2].status, "failed")
+        accumulator = self.metrics_collector.flow_accumulators[2]
+        self.assertEqual(accumulator.delivered_bytes, 1000)
+        self.assertEqual(accumulator.lost_bytes, 2000)
+        self.assertEqual(accumulator.total_packets, 2)
+        self.assertEqual(accumulator.lost_packets, 2)
+        self.assertEqual(accumulator.packet_loss_rate, 100.0)
+
+    def test_restart_after_recovery(self):
+        """
+        到達不能で停止したフローが経路の復旧後に残りの転送を再開することのテスト
+        """
+        self.start(Flow(1, "data", 3000, 1, 3))
+        self.simulation_engine.schedule_event(1.0, lambda: self.fail_link(3))
+        self.simulation_engine.schedule_event(1.0, lambda: self.fail_link(1))
+        self.simulation_engine.schedule_event(2.0, lambda: self.recover_link(2))
+        self.simulation_engine.schedule_event(4.0, lambda: self.recover_link(3))
+        self.simulation_engine.run()
+
+        fluid_model = self.flow_manager.fluid_model
+        self.assertEqual(self.flow_manager.flows[1].status, "completed")
+        self.assertEqual(fluid_model.stranded_flows, {})
+        # 障害までに 1000 バイト、時刻 4.0 の復旧後に残り 2000 バイトを 8000 bps で転送
+        accumulator = self.metrics_collector.flow_accumulators[1]
+        self.assertAlmostEqual(accumulator.duration, 6.0)
+        self.assertEqual(accumulator.delivered_bytes, 3000)
+        self.assertEqual(accumulator.lost_bytes, 0)
+
+    def fail_link(self, link_id: int):
+        self.topology_manager.get_link(link_id).fail_link(0.0)
+        self.central_controller.notify_failure("link", link_id)
+
+    def recover_link(self, link_id: int):
+        self.topology_manager.get_link(link_id).recover_link()
+        self.central_controller.notify_recovery("link", link_id)
+
+    def test_unfinished_flows_are_recorded_at_end(self):
+        """
+        シミュレーション終了時に転送中のフローのメトリクスが記録されることのテスト
+        """
+        self.simulation_engine.initialize(1.0)
+        self.start(Flow(1, "data", 3000, 1, 3))
+        self.simulation_engine.run()
+        self.flow_manager.finalize_flows(1.0)
+        self.assertEqual(self.flow_manager.flows[1].status, "active")
+        self.assertEqual(self.metrics_collector.flow_accumulators[1].delivered_bytes, 1000)
+        self.assertEqual(self.metrics_collector.flow_metrics[-1].timestamp, 1.0)
+
+    def test_hybrid_foreground_packets_share_with_fluid(self):
+        """
+        ハイブリッド実行で音声フローをパケット単位、データフローを流体モデルで扱うことのテスト
+        """
+        self.flow_manager = FlowManager(self.topology_manager, self.simulation_engine, self.central_controller,
+                                        self.metrics_collector, simulation_mode="hybrid")
+        data_flow = Flow(1, "data", 15000, 1, 3)
+        voice_flow = Flow(2, "voice", 1500, 1, 3)
+        self.assertEqual(self.flow_manager.fidelity(data_flow), "fluid")
+        self.assertEqual(self.flow_manager.fidelity(voice_flow), "packet")
+        self.assertEqual(self.flow_manager.fidelity(Flow(3, "voice", 1500, 1, 3, fidelity="fluid")), "fluid")
+
+        self.start(data_flow)
+        self.start(voice_flow)
+        link = self.topology_manager.get_link(3)
+        loads = []
+        self.simulation_engine.schedule_event(0.0, lambda: loads.append(link.fluid_load))
+        self.simulation_engine.run()
+
+        # 音声フローが帯域の半分を確保し、データフローは 4000 bps となる
+        self.assertEqual(loads, [4000.0])
+        # 音声パケットの遅延 = 伝搬遅延 + 利用率0.5の M/M/1 待ち時間（送出時間 1.5 秒 × 0.5 / 0.5）
+        voice = self.metrics_collector.flow_accumulators[2]
+        self.assertEqual(voice.delivered_packets, 1)
+        self.assertAlmostEqual(voice.mean_delay, 0.01 + 1.5)
+        self.assertEqual(voice_flow.status, "completed")
+        # 音声フローの完了後はデータフローが 8000 bps で残りを転送する
+        self.assertEqual(data_flow.status, "completed")
+        expected = 1.51 + (15000 - 4000 * 1.51 / 8) / 1000
+        self.assertAlmostEqual(self.metrics_collector.flow_accumulators[1].duration, expected)
+        self.assertEqual(link.fluid_load, 0.0)
+        # パケットを生成したのは音声フローのみ
+        self.assertEqual(len(self.flow_manager.packet_manager.packet_store), 1)
+
+    def test_fidelity_from_scenario(self):
+        """
+        フローシナリオで指定した粒度が読み込まれることのテスト
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            scenario = os.path.join(directory, 'scenario.yaml')
+            with open(scenario, 'w', encoding='utf-8') as file:
+                yaml.safe_dump({'flows': [
+                    {'flow_id': 1, 'service_type': 'data', 'flow_size': 3000, 'source_node': 1, 'destination_node': 3,
+                     'fidelity': 'packet'},
+                    {'flow_id': 2, 'service_type': 'voice', 'flow_size': 3000, 'source_node': 2, 'destination_node': 3}
+                ]}, file)
+            flow_manager = FlowManager(self.topology_manager, self.simulation_engine, self.central_controller,
+                                       self.metrics_collector, simulation_mode="hybrid", packet_service_types=())
+            flow_manager.generate_flows(flow_scenario=scenario)
+        self.assertEqual(flow_manager.fidelity(flow_manager.flows[1]), "packet")
+        self.assertEqual(flow_manager.fidelity(flow_manager.flows[2]), "fluid")
+        with self.assertRaises(ValueError):
+            Flow(3, "data", 3000, 1, 3, fidelity="analytic")
+
+    def test_unknown_mode(self):
+        """
+        未知のシミュレーションの粒度を指定した場合のテスト
+        """
+        with self.assertRaises(ValueError):
+            FlowManager(self.topology_manager, self.simulation_engine, self.central_controller,
+                        self.metrics_collector, simulation_mode="unknown")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,13 @@
 import unittest
 from link import Link
 from packet import Packet
+from node import Node
+from flow import Flow
+from simulation_engine import SimulationEngine
+from topology_manager import TopologyManager
+from central_controller import CentralController
+from metrics_collector import MetricsCollector
+from flow_manager import FlowManager
 
 class TestLink(unittest.TestCase):
     """
@@ -30,6 +37,76 @@ class TestLink(unittest.TestCase):
         self.assertFalse(result)
         self.assertEqual(self.link.current_load, 500)  # 変化なし
 
+    def test_fluid_background_load(self):
+        """
+        流体モデルの背景負荷による容量と待ち行列遅延のテスト
+        """
+        self.assertEqual(self.link.queueing_delay(125), 0.0)
+        self.link.fluid_load = 750.0
+        self.assertEqual(self.link.available_capacity(), 250.0)
+        # 送出時間 1 秒、利用率 0.75 の M/M/1 待ち時間
+        self.assertAlmostEqual(self.link.queueing_delay(125), 3.0)
+        self.link.fluid_load = 1000.0
+        self.assertAlmostEqual(self.link.queueing_delay(125), 99.0)
+
+    def test_schedule_transmission(self):
+        """
+        方向ごとの出力キューを仮想時刻で表す送出のテスト
+        """
+        self.link.queue_limit = 250
+        self.assertEqual(self.link.transmission_time(125), 1.0)
+        self.assertEqual(self.link.schedule_transmission(125, 0.0, 1), 1.0)
+        self.assertEqual(self.link.schedule_transmission(125, 0.5, 1), 2.0)
+        self.assertAlmostEqual(self.link.backlog(0.5, 1), 187.5)
+        # 送出待ちの上限を超える場合
+        self.assertIsNone(self.link.schedule_transmission(125, 0.5, 1))
+        # 逆方向は独立に送出する
+        self.assertEqual(self.link.schedule_transmission(125, 0.5, 2), 1.5)
+        # 送出待ちがなくなった後は到着時刻から送出する
+        self.assertEqual(self.link.schedule_transmission(125, 5.0, 1), 6.0)
+        self.assertEqual(self.link.transmitted_bytes, 500)
+
+        self.link.fail_link(10.0)
+        self.assertIsNone(self.link.schedule_transmission(125, 5.0, 1))
+        self.link.recover_link()
+        self.assertEqual(self.link.schedule_transmission(125, 5.0, 1), 6.0)
+
+        # 送出後の障害の時点で送り終えていないパケットのみ失われる
+        self.link.fail_link(10.0, now=7.0)
+        self.assertFalse(self.link.lost_in_failure(6.0, epoch=1))
+        self.assertTrue(self.link.lost_in_failure(7.5, epoch=1))
+        self.assertFalse(self.link.lost_in_failure(7.5, epoch=2))
+        self.assertTrue(self.link.lost_in_failure(0.0, epoch=0))
+
+        # 1000 bps で 1500 バイトの送出は12秒かかる。障害の前に送り終えたパケットは配送され、
+        # 送出待ちのパケットは到着イベントがスケジュール済みでも破棄される
+        simulation_engine = SimulationEngine()
+        simulation_engine.initialize(100.0)
+        topology_manager = TopologyManager()
+        for node_id in (1, 2):
+            topology_manager.nodes[node_id] = Node(node_id=node_id)
+        link = Link(link_id=1, capacity=1000.0, delay=0.1, jitter=0.0, connected_nodes=(1, 2))
+        topology_manager.add_link(link)
+        metrics_collector = MetricsCollector()
+        flow_manager = FlowManager(topology_manager, simulation_engine, CentralController(topology_manager),
+                                   metrics_collector, link_model="serialization")
+        packet_manager = flow_manager.packet_manager
+        flow = Flow(1, "data", 1500 * 3, 1, 2)
+        flow_manager.flows[1] = flow
+
+        def send_all():
+            for packet in packet_manager.create_packets(flow):
+                packet_manager.send_packet(packet, topology_manager.get_node(1))
+
+        simulation_engine.schedule_event(0.0, send_all)
+        simulation_engine.schedule_event(13.0, lambda: link.fail_link(50.0, simulation_engine.current_time))
+        simulation_engine.run()
+        accumulator = metrics_collector.flow_accumulators[1]
+        self.assertEqual((accumulator.delivered_packets, accumulator.lost_packets), (1, 2))
+        self.assertEqual([packet.status for packet in flow.packets], ["delivered", "lost", "lost"])
+        self.assertEqual(link.packet_loss_count, 2)
+        self.assertEqual(link.current_load, 0)
+
     def test_fail_and_recover_link(self):
         """
         fail_linkおよびrecover_linkメソッドのテスト
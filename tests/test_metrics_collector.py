@@ -1,5 +1,7 @@
+import random
+import statistics
 import unittest
-from metrics_collector import MetricsCollector, FlowMetric, NetworkMetric
+from metrics_collector import MetricsCollector, FlowMetric, NetworkMetric, FlowAccumulator
 from flow import Flow
 from packet import Packet
 
@@ -46,5 +48,67 @@ class TestMetricsCollector(unittest.TestCase):
         network_metric = self.metrics_collector.network_metrics[0]
         self.assertGreater(network_metric.average_throughput, 0)
 
+    def test_flow_accumulator(self):
+        """
+        FlowAccumulatorの遅延統計とジッターが一括計算の結果と一致することのテスト
+        """
+        rng = random.Random(3)
+        accumulator = FlowAccumulator(flow_id=1, total_packets=100)
+        delays = []
+        jitter = 0.0
+        for i in range(100):
+            delay = rng.uniform(0.01, 0.2)
+            accumulator.record_delivery(1500, i * 0.1, i * 0.1 + delay)
+            if delays:
+                jitter += (abs(delay - delays[-1]) - jitter) / 16
+            delays.append(delay)
+        self.assertAlmostEqual(accumulator.mean_delay, statistics.mean(delays))
+        self.assertAlmostEqual(accumulator.delay_variance, statistics.variance(delays))
+        self.assertAlmostEqual(accumulator.max_delay, max(delays))
+        self.assertAlmostEqual(accumulator.jitter, jitter)
+        self.assertEqual(accumulator.delivered_bytes, 150000)
+        self.assertEqual(accumulator.packet_loss_rate, 0)
+
+    def test_streaming_updates(self):
+        """
+        配送・ロスの通知から記録したメトリクスがパケットの走査による結果と一致することのテスト
+        """
+        packet3 = Packet(packet_id=3, flow_id=1, size=1500)
+        self.flow.packets.append(packet3)
+        self.metrics_collector.register_flow(self.flow)
+        for packet in self.flow.packets[:2]:
+            self.metrics_collector.record_packet_delivered(packet)
+        packet3.status = "lost"
+        self.metrics_collector.record_packet_lost(packet3)
+        self.metrics_collector.record_flow_metrics(timestamp=2.0, flow=self.flow)
+
+        reference = MetricsCollector()
+        reference.record_flow_metrics(timestamp=2.0, flow=self.flow)
+        streamed, scanned = self.metrics_collector.flow_metrics[0], reference.flow_metrics[0]
+        for name in ["throughput", "delay", "packet_loss_rate", "jitter"]:
+            self.assertAlmostEqual(getattr(streamed, name), getattr(scanned, name))
+        self.assertAlmostEqual(streamed.packet_loss_rate, 100 / 3)
+        self.assertEqual(self.metrics_collector.flow_accumulators[1].lost_packets, 1)
+
+    def test_network_metrics_average_current_flow_values(self):
+        """
+        ネットワークメトリクスが各フローの現在の値の平均になることのテスト
+        """
+        other = Flow(flow_id=2, service_type='data', flow_size=1500, source_node=1, destination_node=2)
+        packet = Packet(packet_id=3, flow_id=2, size=1500)
+        other.packets = [packet]
+        self.metrics_collector.register_flow(other)
+        for _ in range(3):
+            self.metrics_collector.record_flow_metrics(timestamp=2.0, flow=self.flow)
+        packet.sent_time, packet.arrival_time, packet.status = 0.0, 0.5, "delivered"
+        self.metrics_collector.record_packet_delivered(packet)
+        self.metrics_collector.record_network_metrics(timestamp=3.0)
+
+        network_metric = self.metrics_collector.network_metrics[0]
+        accumulators = self.metrics_collector.flow_accumulators.values()
+        self.assertAlmostEqual(network_metric.average_delay, statistics.mean(a.mean_delay for a in accumulators))
+        self.assertAlmostEqual(network_metric.average_throughput, statistics.mean(a.throughput for a in accumulators))
+        self.assertAlmostEqual(network_metric.average_packet_loss_rate, 0)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,98 @@
+# tests/test_metrics_timeseries.py
+
+import unittest
+import numpy as np
+from metrics_timeseries import MetricSeries
+from metrics_collector import MetricsCollector, FlowMetric, FLOW_METRIC_FIELDS
+
+def append_rows(series: MetricSeries, count: int, start: int = 0):
+    for i in range(start, start + count):
+        series.append_values(float(i), i % 3, i * 10.0, i * 0.1, 0.0, 0.01)
+
+class TestMetricSeries(unittest.TestCase):
+    """
+    MetricSeriesクラスのユニットテストクラス
+    """
+
+    def test_unbounded(self):
+        """
+        全ての行を保持し、容量を超えると拡張されることのテスト
+        """
+        series = MetricSeries(FLOW_METRIC_FIELDS, FlowMetric, capacity=4)
+        append_rows(series, 10)
+        self.assertEqual(len(series), 10)
+        self.assertEqual(series[0].timestamp, 0.0)
+        self.assertEqual(series[-1].flow_id, 9 % 3)
+        self.assertIsInstance(series[3], FlowMetric)
+        self.assertEqual([metric.timestamp for metric in series], [float(i) for i in range(10)])
+
+    def test_ring_keeps_latest_rows_contiguous(self):
+        """
+        リングバッファが直近の行のみを古い順に連続領域として保持することのテスト
+        """
+        series = MetricSeries(FLOW_METRIC_FIELDS, FlowMetric, retention="ring", capacity=5)
+        memory = series.memory_usage()
+        append_rows(series, 13)
+        self.assertEqual(len(series), 5)
+        np.testing.assert_array_equal(series.column("timestamp"), [8.0, 9.0, 10.0, 11.0, 12.0])
+        self.assertEqual(series.memory_usage(), memory)
+        self.assertEqual([metric.timestamp for metric in series[1:3]], [9.0, 10.0])
+
+    def test_dataframe_is_zero_copy(self):
+        """
+        データフレームが列の配列をコピーせずに参照することのテスト
+        """
+        series = MetricSeries(FLOW_METRIC_FIELDS, FlowMetric, retention="ring", capacity=8)
+        append_rows(series, 11)
+        frame = series.to_dataframe()
+        self.assertEqual(list(frame.columns), list(FLOW_METRIC_FIELDS))
+        self.assertEqual(frame["timestamp"].tolist(), [float(i) for i in range(3, 11)])
+        for name in ["timestamp", "throughput"]:
+            self.assertTrue(np.shares_memory(frame[name].to_numpy(), series.column(name)))
+
+    def test_downsample(self):
+        """
+        あふれた行が集約されて粗い時系列に移ることのテスト
+        """
+        series = MetricSeries(FLOW_METRIC_FIELDS, FlowMetric, retention="downsample", capacity=10,
+                              downsample_factor=5, tiers=3)
+        memory = series.memory_usage()
+        append_rows(series, 1000)
+        self.assertEqual(len(series), 10)
+        self.assertEqual(series.memory_usage(), memory)
+        # 最初にあふれた5行（0〜4）の平均が1段目に入る
+        series = MetricSeries(FLOW_METRIC_FIELDS, FlowMetric, retention="downsample", capacity=10, downsample_factor=5)
+        append_rows(series, 15)
+        self.assertEqual(len(series.coarser), 1)
+        coarse = series.coarser[0]
+        self.assertEqual(coarse.timestamp, 4.0)
+        self.assertAlmostEqual(coarse.throughput, 20.0)
+        frame = series.to_dataframe(include_downsampled=True)
+        self.assertEqual(frame["timestamp"].tolist(), [4.0] + [float(i) for i in range(5, 15)])
+
+    def test_unknown_retention(self):
+        """
+        未知の保持方針を指定した場合のテスト
+        """
+        with self.assertRaises(ValueError):
+            MetricSeries(FLOW_METRIC_FIELDS, retention="forever")
+
+class TestMetricsCollectorRetention(unittest.TestCase):
+    """
+    MetricsCollectorの時系列保持のテストクラス
+    """
+
+    def test_list_assignment(self):
+        """
+        リストを代入した場合も時系列として扱えることのテスト
+        """
+        collector = MetricsCollector(retention="ring", capacity=2)
+        collector.flow_metrics = [
+            FlowMetric(timestamp=float(i), flow_id=1, throughput=1.0, delay=0.1, packet_loss_rate=0.0, jitter=0.0)
+            for i in range(3)
+        ]
+        self.assertEqual([metric.timestamp for metric in collector.flow_metrics], [1.0, 2.0])
+        self.assertEqual(collector.flow_metrics.retention, "ring")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -46,5 +46,22 @@ class TestNode(unittest.TestCase):
         dequeued_none = self.node.dequeue_packet()
         self.assertIsNone(dequeued_none)
 
+    def test_hold_packet(self):
+        """
+        hold_packetメソッドのテスト
+        """
+        first = Packet(packet_id=1, flow_id=1, size=1500)
+        second = Packet(packet_id=2, flow_id=1, size=1500)
+        self.node.enqueue_packet(first)
+        self.node.enqueue_packet(second)
+        held = self.node.dequeue_packet()
+        self.node.hold_packet(held)
+        self.assertEqual(self.node.buffer_occupancy, 3000)
+        # 保持したパケットはバッファ内のパケットより先に取り出される
+        self.assertIs(self.node.dequeue_packet(), first)
+        self.assertIsNone(self.node.held_packet)
+        self.assertIs(self.node.dequeue_packet(), second)
+        self.assertEqual(self.node.buffer_occupancy, 0)
+
 if __name__ == '__main__':
     unittest.main()
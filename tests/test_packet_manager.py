@@ -5,7 +5,8 @@ import random
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from packet_manager import PacketManager
+from packet_manager import PacketManager, make_packet_id
+from flow_manager import FlowManager
 from flow import Flow
 from topology_manager import TopologyManager
 from simulation_engine import SimulationEngine
@@ -54,6 +55,18 @@ class TestPacketManager(unittest.TestCase):
         packets = self.packet_manager.create_packets(flow)
         self.assertEqual(len(packets), 2)  # 1500バイトごとに分割
 
+    def test_packet_ids_are_unique_across_flows(self):
+        """
+        フローのパケット数が多い場合もフロー間でパケットIDが重複しないことのテスト
+        """
+        large_flow = Flow(flow_id=1, service_type='data', flow_size=1500 * 200000, source_node=1, destination_node=2)
+        packets = self.packet_manager.create_packets(large_flow)
+        next_flow = Flow(flow_id=2, service_type='data', flow_size=1500, source_node=1, destination_node=2)
+        next_id = self.packet_manager.create_packets(next_flow)[0].packet_id
+        self.assertEqual(next_id, make_packet_id(2, 0))
+        self.assertLess(packets[-1].packet_id, next_id)
+        self.assertEqual(self.packet_manager.create_packet(large_flow, 199999).packet_id, packets[-1].packet_id)
+
     def test_send_packet(self):
         """
         send_packetメソッドのテスト
@@ -77,10 +90,76 @@ class TestPacketManager(unittest.TestCase):
 
         # イベントキューにイベントがスケジュールされたか確認
         self.assertEqual(len(self.simulation_engine.event_queue), 1)
-        event = self.simulation_engine.event_queue[0]
+        event = self.simulation_engine.peek_event()
         expected_arrival_time = self.simulation_engine.current_time + link.delay  # 遅延時間を考慮
         self.assertEqual(event.event_time, expected_arrival_time)
 
+    def test_send_packet_serialization(self):
+        """
+        送出時間と出力キューを考慮するリンクモデルのテスト
+        """
+        self.packet_manager.link_model = "serialization"
+        flow = Flow(flow_id=1, service_type='data', flow_size=4500, source_node=1, destination_node=2)
+        packets = self.packet_manager.create_packets(flow)
+        link = self.topology_manager.get_link(1)
+        link.queue_limit = 3000
+        for packet in packets:
+            self.packet_manager.send_packet(packet, self.topology_manager.get_node(1))
+
+        # 1500バイトを 1000 bps で送出すると12秒、2つ目は1つ目を送り終えてから送出する
+        times = []
+        while self.simulation_engine.peek_event() is not None:
+            times.append(self.simulation_engine.event_queue.pop()[0])
+        self.assertEqual(times, [12.1, 24.1])
+        # 送出待ちが上限を超える3つ目はロスとなる
+        self.assertEqual(packets[2].status, "lost")
+        self.assertEqual(link.packet_loss_count, 1)
+        self.assertEqual(link.busy_until[1], 24.0)
+
+        with self.assertRaises(ValueError):
+            PacketManager(self.topology_manager, self.simulation_engine, self.central_controller,
+                          self.metrics_collector, link_model="store_and_forward")
+
+    def test_forward_waits_in_node_buffer(self):
+        """
+        出力先のリンクが送出中の間はパケットがノードのバッファに留まり、スケジューラが送信順を決めることのテスト
+        """
+        simulation_engine = SimulationEngine()
+        simulation_engine.initialize(100.0)
+        topology_manager = TopologyManager()
+        for node_id in (1, 2, 3):
+            scheduler = "priority" if node_id == 2 else "fifo"
+            topology_manager.nodes[node_id] = Node(node_id=node_id, scheduler=scheduler)
+        # 1500バイトの送出はリンク1で0.01秒、ボトルネックのリンク2で1秒
+        topology_manager.add_link(Link(link_id=1, capacity=1200000.0, delay=0.0, jitter=0.0, connected_nodes=(1, 2)))
+        topology_manager.add_link(Link(link_id=2, capacity=12000.0, delay=0.0, jitter=0.0, connected_nodes=(2, 3)))
+        flow_manager = FlowManager(topology_manager, simulation_engine, CentralController(topology_manager),
+                                   MetricsCollector(), link_model="serialization")
+        packet_manager = flow_manager.packet_manager
+        data_flow = Flow(1, "data", 1500 * 3, 1, 3)
+        voice_flow = Flow(2, "voice", 1500, 1, 3)
+        flow_manager.flows = {1: data_flow, 2: voice_flow}
+
+        def send_all():
+            packets = list(packet_manager.create_packets(data_flow)) + list(packet_manager.create_packets(voice_flow))
+            for packet in packets:
+                packet_manager.send_packet(packet, topology_manager.get_node(1))
+
+        node = topology_manager.get_node(2)
+        occupancy = []
+        simulation_engine.schedule_event(0.0, send_all)
+        simulation_engine.schedule_event(0.5, lambda: occupancy.append(node.buffer_occupancy))
+        simulation_engine.run()
+
+        # 1つ目のデータパケットの送出中に残りの3パケットがノード2のバッファで待つ
+        self.assertEqual(occupancy, [1500 * 3])
+        # 2つ目のデータパケットはリンクが空くのを待つ間に選ばれ、その後は音声パケットが優先される
+        arrivals = sorted((packet.arrival_time, packet.flow_id) for packet in list(data_flow.packets) + list(voice_flow.packets))
+        self.assertEqual([flow_id for _, flow_id in arrivals], [1, 1, 2, 1])
+        self.assertAlmostEqual(arrivals[-1][0], 4.01)
+        self.assertEqual(node.buffer_occupancy, 0)
+        self.assertIsNone(node.held_packet)
+
     def test_receive_packet(self):
         """
         receive_packetメソッドのテスト
@@ -0,0 +1,78 @@
+# tests/test_packet_store.py
+
+import unittest
+from packet_store import PacketStore, PacketHandle, STATUS_DELIVERED
+
+class TestPacketStore(unittest.TestCase):
+    """
+    PacketStoreクラスのユニットテストクラス
+    """
+
+    def setUp(self):
+        self.store = PacketStore()
+        self.packets = self.store.allocate(flow_id=7, count=3, size=1500, first_packet_id=700000, route=[1, 2, 3])
+
+    def test_allocate(self):
+        """
+        allocateメソッドのテスト
+        """
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(len(self.packets), 3)
+        packet = self.packets[2]
+        self.assertIsInstance(packet, PacketHandle)
+        self.assertEqual(packet.packet_id, 700002)
+        self.assertEqual(packet.flow_id, 7)
+        self.assertEqual(packet.size, 1500)
+        self.assertEqual(packet.route, (1, 2, 3))
+        self.assertEqual(packet.current_node_index, 0)
+        self.assertEqual(packet.status, "in_transit")
+
+        # 経路は共有される
+        other = self.store.allocate(flow_id=8, count=1, size=1500, first_packet_id=800000, route=[1, 2, 3])
+        self.assertEqual(len(self.store.routes), 2)
+        self.assertEqual(other[0].route, (1, 2, 3))
+        self.assertEqual(other.start, 3)
+
+    def test_handle_attributes(self):
+        """
+        ハンドル経由での属性更新のテスト
+        """
+        packet = self.packets[0]
+        packet.status = "delivered"
+        packet.sent_time = 1.0
+        packet.arrival_time = 2.5
+        packet.current_node_index = 2
+        packet.route = [1, 3]
+
+        same_packet = self.packets[0]
+        self.assertEqual(same_packet, packet)
+        self.assertEqual(same_packet.status, "delivered")
+        self.assertEqual(self.store.status_codes[0], STATUS_DELIVERED)
+        self.assertEqual(same_packet.sent_time, 1.0)
+        self.assertEqual(same_packet.arrival_time, 2.5)
+        self.assertEqual(same_packet.current_node_index, 2)
+        self.assertEqual(same_packet.route, (1, 3))
+        # 他のパケットの経路は変わらない
+        self.assertEqual(self.packets[1].route, (1, 2, 3))
+
+    def test_column(self):
+        """
+        columnメソッドのテスト
+        """
+        self.packets[1].sent_time = 4.0
+        sent_times = self.packets.column("sent_times")
+        self.assertEqual(sent_times.tolist(), [0.0, 4.0, 0.0])
+        self.assertEqual(self.store.column("packet_ids").tolist(), [700000, 700001, 700002])
+
+    def test_sequence_access(self):
+        """
+        PacketRangeのシーケンス操作のテスト
+        """
+        self.assertEqual([p.packet_id for p in self.packets], [700000, 700001, 700002])
+        self.assertEqual(self.packets[-1].packet_id, 700002)
+        self.assertEqual([p.packet_id for p in self.packets[1:]], [700001, 700002])
+        with self.assertRaises(IndexError):
+            self.packets[3]
+
+if __name__ == '__main__':
+    unittest.main()
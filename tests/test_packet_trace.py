@@ -0,0 +1,100 @@
+# tests/test_packet_trace.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from packet_trace import (
+    TraceRecorder, read_trace, packet_history, TRACE_DTYPE,
+    TRACE_SEND, TRACE_RECEIVE, TRACE_DELIVER, TRACE_DROP, NO_ELEMENT
+)
+from packet_manager import PacketManager
+from flow import Flow
+from topology_manager import TopologyManager
+from simulation_engine import SimulationEngine
+from node import Node
+from link import Link
+from central_controller import CentralController
+from metrics_collector import MetricsCollector
+
+class TestPacketTrace(unittest.TestCase):
+    """
+    TraceRecorderとread_traceのユニットテストクラス
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, 'trace.bin')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_record_and_read(self):
+        """
+        容量を超えて記録した場合もファイルが拡張され、全レコードを読み込めることのテスト
+        """
+        with TraceRecorder(self.file_path, initial_capacity=4) as recorder:
+            for i in range(10):
+                recorder.record(i * 0.5, 100 + i % 3, 1, i, NO_ELEMENT, TRACE_SEND)
+            self.assertEqual(recorder.capacity, 16)
+            self.assertEqual(len(recorder.records()), 10)
+        self.assertEqual(os.path.getsize(self.file_path), 24 + 10 * TRACE_DTYPE.itemsize)
+
+        trace = read_trace(self.file_path)
+        self.assertEqual(trace.dtype, TRACE_DTYPE)
+        self.assertEqual(len(trace), 10)
+        np.testing.assert_array_equal(trace["node"], np.arange(10))
+        np.testing.assert_array_equal(read_trace(self.file_path, mmap=False), trace)
+        history = packet_history(trace, 101)
+        self.assertEqual(history["time"].tolist(), [0.5, 2.0, 3.5])
+
+    def test_flush_updates_count(self):
+        """
+        flush後に閉じる前でも記録済みのレコードを読み込めることのテスト
+        """
+        recorder = TraceRecorder(self.file_path, initial_capacity=8)
+        recorder.record(1.0, 1, 1, 1, 1, TRACE_RECEIVE)
+        recorder.flush()
+        self.assertEqual(len(read_trace(self.file_path)), 1)
+        recorder.close()
+
+    def test_invalid_file(self):
+        """
+        トレースファイルでない場合のテスト
+        """
+        with open(self.file_path, 'wb') as file:
+            file.write(b'\0' * 64)
+        with self.assertRaises(ValueError):
+            read_trace(self.file_path)
+
+    def test_packet_manager_trace(self):
+        """
+        パケットの送出・到着・配送がトレースに記録されることのテスト
+        """
+        topology_manager = TopologyManager()
+        topology_manager.nodes = {node_id: Node(node_id=node_id) for node_id in (1, 2, 3)}
+        for link_id, (node1, node2) in enumerate([(1, 2), (2, 3)], start=1):
+            topology_manager.add_link(Link(link_id=link_id, capacity=1e6, delay=0.1, jitter=0.0, connected_nodes=(node1, node2)))
+        simulation_engine = SimulationEngine()
+        simulation_engine.initialize(10.0)
+        packet_manager = PacketManager(topology_manager, simulation_engine, CentralController(topology_manager), MetricsCollector())
+        packet_manager.flow_manager = type('FlowManagerStub', (), {'handle_flow_completion': lambda self, flow_id: None})()
+        flow = Flow(flow_id=1, service_type='data', flow_size=3000, source_node=1, destination_node=3)
+        packet_manager.flow_manager.flows = {1: flow}
+        packets = packet_manager.create_packets(flow)
+        packet_manager.trace_recorder = TraceRecorder(self.file_path)
+        for packet in packets:
+            packet_manager.send_packet(packet, topology_manager.get_node(1))
+        simulation_engine.run()
+        packet_manager.trace_recorder.close()
+
+        trace = read_trace(self.file_path)
+        history = packet_history(trace, packets[0].packet_id)
+        self.assertEqual(history["kind"].tolist(), [TRACE_SEND, TRACE_RECEIVE, TRACE_SEND, TRACE_RECEIVE, TRACE_DELIVER])
+        self.assertEqual(history["node"].tolist(), [1, 2, 2, 3, 3])
+        self.assertEqual(history["link"].tolist(), [1, 1, 2, 2, NO_ELEMENT])
+        np.testing.assert_allclose(history["time"], [0.0, 0.1, 0.1, 0.2, 0.2])
+        self.assertNotIn(TRACE_DROP, trace["kind"].tolist())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# tests/test_parameter_sweep.py
+
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from parameter_sweep import ParameterSweep, expand_grid, expand_latin_hypercube
+
+SPEC = {
+    'base': {'simulation_time': 100.0, 'failure_distribution': 'uniform', 'algorithm': 'dijkstra'},
+    'method': 'grid',
+    'replications': 2,
+    'seed': 0,
+    'parameters': {'failure_rate': [0.0, 0.1], 'topology': ['data/topology.yaml']}
+}
+
+class TestParameterSweep(unittest.TestCase):
+    """
+    ParameterSweepクラスのユニットテストクラス
+    """
+
+    def setUp(self):
+        """
+        テストの前準備
+        """
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_expand_grid(self):
+        """
+        直積の展開のテスト
+        """
+        points = expand_grid({'failure_rate': [0.0, 0.1], 'algorithm': ['dijkstra', 'dqn'], 'simulation_time': 100.0})
+        self.assertEqual(len(points), 4)
+        self.assertEqual(points[1], {'failure_rate': 0.0, 'algorithm': 'dqn', 'simulation_time': 100.0})
+
+    def test_expand_latin_hypercube(self):
+        """
+        ラテン超方格法で各層から1点ずつ抽出されることのテスト
+        """
+        points = expand_latin_hypercube({
+            'failure_rate': {'min': 0.0, 'max': 0.1},
+            'simulation_time': {'min': 100, 'max': 199},
+            'failure_distribution': ['uniform', 'exponential']
+        }, samples=10, seed=1)
+        strata = sorted(int(point['failure_rate'] / 0.01) for point in points)
+        self.assertEqual(strata, list(range(10)))
+        self.assertEqual(sorted(point['simulation_time'] // 10 for point in points), list(range(10, 20)))
+        self.assertTrue(all(isinstance(point['simulation_time'], int) for point in points))
+        self.assertEqual(sum(point['failure_distribution'] == 'uniform' for point in points), 5)
+        self.assertEqual(points, expand_latin_hypercube({
+            'failure_rate': {'min': 0.0, 'max': 0.1},
+            'simulation_time': {'min': 100, 'max': 199},
+            'failure_distribution': ['uniform', 'exponential']
+        }, samples=10, seed=1))
+
+    def test_unknown_parameter(self):
+        """
+        スイープできないパラメータを指定した場合のテスト
+        """
+        with self.assertRaises(ValueError):
+            ParameterSweep({'parameters': {'buffer_size': [1, 2]}}, self.cache_dir)
+        with self.assertRaises(ValueError):
+            ParameterSweep({'method': 'random'}, self.cache_dir)
+
+    def test_resume_runs_only_missing_points(self):
+        """
+        再実行時にキャッシュにない点のみを実行することのテスト
+        """
+        sweep = ParameterSweep(SPEC, self.cache_dir, max_workers=1)
+        first = sweep.run()
+        self.assertEqual((sweep.executed, sweep.cached), (4, 0))
+        self.assertEqual(first['point'].tolist(), [0, 0, 1, 1])
+        self.assertEqual(len(set(first['cache_key'])), 4)
+
+        # 中断を模擬して1件の結果を削除する
+        cached_files = glob.glob(os.path.join(self.cache_dir, '*', '*.json'))
+        self.assertEqual(len(cached_files), 4)
+        os.remove(os.path.join(self.cache_dir, first['cache_key'][2][:2], first['cache_key'][2] + '.json'))
+
+        resumed = ParameterSweep(SPEC, self.cache_dir, max_workers=1)
+        second = resumed.run()
+        self.assertEqual((resumed.executed, resumed.cached), (1, 3))
+        for name in ['average_delay', 'delivered_packets', 'lost_packets']:
+            self.assertEqual(first[name].tolist(), second[name].tolist())
+
+        summary = resumed.summarize(second)
+        self.assertEqual(summary['failure_rate'].tolist(), [0.0, 0.1])
+        self.assertEqual(summary['replications'].tolist(), [2, 2])
+
+    def test_cache_key_changes_with_inputs(self):
+        """
+        パラメータ・シードが異なる場合にキャッシュキーが異なることのテスト
+        """
+        sweep = ParameterSweep(SPEC, self.cache_dir, max_workers=1)
+        first, second = np.random.SeedSequence(0).spawn(2)
+        parameters = dict(SPEC['base'], failure_rate=0.0)
+        key = sweep.cache_key(parameters, 'data/topology.yaml', first, 'v1')
+        self.assertEqual(key, sweep.cache_key(dict(parameters), 'data/topology.yaml', first, 'v1'))
+        self.assertNotEqual(key, sweep.cache_key(parameters, 'data/topology.yaml', second, 'v1'))
+        self.assertNotEqual(key, sweep.cache_key(parameters, 'data/topology.yaml', first, 'v2'))
+        self.assertNotEqual(key, sweep.cache_key(dict(parameters, failure_rate=0.1), 'data/topology.yaml', first, 'v1'))
+
+if __name__ == '__main__':
+    unittest.main()
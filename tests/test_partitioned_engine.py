@@ -0,0 +1,184 @@
+# tests/test_partitioned_engine.py
+
+import math
+import random
+import unittest
+from partitioned_engine import (
+    PartitionedSimulationEngine, partition_topology, partition_lookahead, check_partitionable
+)
+from simulation_engine import SimulationEngine
+from flow import Flow
+from flow_manager import FlowManager
+from topology_manager import TopologyManager
+from node import Node
+from link import Link
+from central_controller import CentralController
+from metrics_collector import MetricsCollector
+
+# 2つの三角形 (1, 2, 3) と (4, 5, 6) を遅延の大きいリンクでつないだトポロジ
+LINKS = [
+    (1, 1, 2, 0.002), (2, 2, 3, 0.002), (3, 1, 3, 0.003),
+    (4, 4, 5, 0.002), (5, 5, 6, 0.002), (6, 4, 6, 0.003),
+    (7, 3, 4, 0.05), (8, 1, 6, 0.08)
+]
+
+def build_topology() -> TopologyManager:
+    topology_manager = TopologyManager(link_selection="lowest_delay")
+    for node_id in range(1, 7):
+        topology_manager.nodes[node_id] = Node(node_id=node_id)
+    for link_id, node1, node2, delay in LINKS:
+        topology_manager.add_link(Link(link_id=link_id, capacity=2e6, delay=delay, jitter=0.001,
+                                       connected_nodes=(node1, node2)))
+    return topology_manager
+
+def run_scenario(simulation_engine, partition=None, seed: int = 5, prepare=None):
+    """
+    全パケットを開始時に送出する複数のフローと、リンクの障害・復旧を含むシナリオを実行
+
+    prepare を指定した場合は、フローマネージャを作成した後に prepare(flow_manager) を呼び出す。
+    prepare でペーシングを設定した場合は、トラフィック生成器でフローを開始する。
+    """
+    random.seed(seed)
+    topology_manager = build_topology()
+    if isinstance(simulation_engine, PartitionedSimulationEngine):
+        simulation_engine.assign_partitions(topology_manager, partition)
+    simulation_engine.initialize(5.0)
+    central_controller = CentralController(topology_manager)
+    metrics_collector = MetricsCollector()
+    flow_manager = FlowManager(topology_manager, simulation_engine, central_controller, metrics_collector,
+                               link_model="serialization")
+    packet_manager = flow_manager.packet_manager
+    packet_manager.jitter_seed = seed
+    if prepare is not None:
+        prepare(flow_manager)
+
+    def start(flow):
+        if flow_manager.pacing is not None:
+            flow_manager.start_flow(flow)
+            return
+        source = topology_manager.get_node(flow.source_node)
+        for packet in packet_manager.create_packets(flow):
+            packet_manager.send_packet(packet, source)
+
+    pairs = [(1, 5), (2, 6), (6, 1), (4, 2), (3, 5), (5, 3), (1, 4), (6, 2)]
+    for flow_id, (source, destination) in enumerate(pairs, start=1):
+        flow = Flow(flow_id, "data", 1500 * random.randint(20, 60), source, destination)
+        flow_manager.flows[flow_id] = flow
+        simulation_engine.schedule_event(random.uniform(0, 0.5), lambda f=flow: start(f), owner=source)
+
+    def fail(link_id):
+        topology_manager.get_link(link_id).fail_link(0.0)
+        central_controller.notify_failure("link", link_id)
+
+    def recover(link_id):
+        topology_manager.get_link(link_id).recover_link()
+        central_controller.notify_recovery("link", link_id)
+
+    simulation_engine.schedule_event(0.4, lambda: fail(7))
+    simulation_engine.schedule_event(0.9, lambda: recover(7))
+    check_partitionable(flow_manager)
+    simulation_engine.run()
+    return metrics_collector
+
+def snapshot(metrics_collector):
+    accumulators = {
+        flow_id: tuple(getattr(accumulator, name) for name in type(accumulator).__slots__)
+        for flow_id, accumulator in metrics_collector.flow_accumulators.items()
+    }
+    rows = sorted((metric.timestamp, metric.flow_id, metric.throughput, metric.delay, metric.packet_loss_rate, metric.jitter)
+                  for metric in metrics_collector.flow_metrics)
+    return accumulators, rows
+
+class TestPartitionedEngine(unittest.TestCase):
+    """
+    PartitionedSimulationEngineクラスのユニットテストクラス
+    """
+
+    def test_partition_and_lookahead(self):
+        """
+        遅延の小さいリンクを区画内に残す分割と先読み時間の計算のテスト
+        """
+        topology_manager = build_topology()
+        partition = partition_topology(topology_manager, 2)
+        self.assertEqual(partition, {1: 0, 2: 0, 3: 0, 4: 1, 5: 1, 6: 1})
+        self.assertAlmostEqual(partition_lookahead(topology_manager, partition), 0.05 - 0.001)
+        self.assertEqual(partition_topology(topology_manager, 1), {node_id: 0 for node_id in range(1, 7)})
+        self.assertEqual(partition_lookahead(topology_manager, {node_id: 0 for node_id in range(1, 7)}), math.inf)
+        topology_manager.get_link(7).delay = 0.0
+        with self.assertRaises(ValueError):
+            partition_lookahead(topology_manager, partition)
+        with self.assertRaises(ValueError):
+            partition_topology(topology_manager, 2, method="unknown")
+
+    def test_matches_sequential_engine(self):
+        """
+        同じシードの逐次実行（"entity" 順序）とフローごとの結果が完全に一致することのテスト
+        """
+        sequential_engine = SimulationEngine(event_ordering="entity")
+        expected = snapshot(run_scenario(sequential_engine))
+        self.assertGreater(sum(accumulator[2] for accumulator in expected[0].values()), 0)
+
+        for partition in (None, {1: 0, 2: 1, 3: 2, 4: 0, 5: 1, 6: 2}):
+            engine = PartitionedSimulationEngine(partitions=2)
+            self.assertEqual(snapshot(run_scenario(engine, partition)), expected)
+            self.assertEqual(engine.events_processed, sequential_engine.events_processed)
+            self.assertEqual(engine.current_time, sequential_engine.current_time)
+            statistics = engine.statistics()
+            self.assertGreater(statistics['messages'], 0)
+            self.assertEqual(statistics['global_events'], 2)
+            self.assertEqual(sum(statistics['events_per_partition']) + 2, engine.events_processed)
+            self.assertGreaterEqual(statistics['ideal_speedup'], 1.0)
+
+    def test_outputs_in_time_order(self):
+        """
+        2つの区画のイベントが記録する同じフローの出力が、逐次実行と同じ時刻とキーの順に実行されることのテスト
+        """
+        def record(simulation_engine):
+            outputs = []
+
+            def deliver(node_id):
+                event_time = simulation_engine.current_time
+                simulation_engine.defer(lambda: outputs.append((1, event_time, node_id)))
+
+            if isinstance(simulation_engine, PartitionedSimulationEngine):
+                simulation_engine.assign_partitions(build_topology(), {1: 0, 2: 0, 3: 0, 4: 1, 5: 1, 6: 1})
+            simulation_engine.initialize(1.0)
+            # 区画0のノード3と区画1のノード4で、先読み時間の窓の中に交互に出力する
+            for index in range(10):
+                node_id = 3 if index % 2 else 4
+                simulation_engine.schedule_event(0.001 * index, lambda n=node_id: deliver(n), owner=node_id)
+            simulation_engine.schedule_event(0.0045, lambda: deliver(None))
+            simulation_engine.run()
+            return outputs
+
+        expected = record(SimulationEngine(event_ordering="entity"))
+        self.assertEqual([entry[1] for entry in expected], sorted(entry[1] for entry in expected))
+        engine = PartitionedSimulationEngine(partitions=2)
+        self.assertEqual(record(engine), expected)
+        self.assertGreater(engine.windows, 1)
+
+    def test_lookahead_violation(self):
+        """
+        窓の中に他の区画のイベントをスケジュールした場合のテスト
+        """
+        engine = PartitionedSimulationEngine()
+        engine.assign_partitions(build_topology(), {1: 0, 2: 0, 3: 0, 4: 1, 5: 1, 6: 1})
+        engine.initialize(1.0)
+        engine.schedule_event(0.0, lambda: engine.schedule_event(0.01, lambda: None, owner=4), owner=1)
+        with self.assertRaises(RuntimeError):
+            engine.run()
+
+    def test_unsupported_configuration(self):
+        """
+        分割実行で逐次実行と同じ結果にならない設定の検出のテスト
+        """
+        topology_manager = build_topology()
+        engine = SimulationEngine(event_ordering="entity")
+        flow_manager = FlowManager(topology_manager, engine, None, MetricsCollector(), link_model="legacy")
+        with self.assertRaises(ValueError):
+            check_partitionable(flow_manager)
+        with self.assertRaises(ValueError):
+            SimulationEngine(dispatch_mode="parallel", event_ordering="entity")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+# tests/test_queue_discipline.py
+
+import unittest
+from collections import Counter
+from packet import Packet
+from node import Node
+from queue_discipline import (
+    FIFOScheduler, PriorityScheduler, DRRScheduler, WFQScheduler,
+    REDQueueManager, CoDelQueueManager, create_scheduler, create_aqm
+)
+
+def make_packet(packet_id: int, service_type: str, size: int = 1500) -> Packet:
+    return Packet(packet_id=packet_id, flow_id=packet_id, size=size, service_type=service_type)
+
+def drain(scheduler):
+    packets = []
+    entry = scheduler.pop()
+    while entry is not None:
+        packets.append(entry[0])
+        entry = scheduler.pop()
+    return packets
+
+class TestSchedulers(unittest.TestCase):
+    """
+    スケジューラのユニットテストクラス
+    """
+
+    def test_fifo(self):
+        """
+        FIFOスケジューラが到着順に取り出すことのテスト
+        """
+        scheduler = FIFOScheduler()
+        packets = [make_packet(i, "data") for i in range(5)]
+        for packet in packets:
+            scheduler.push(packet, 0.0)
+        self.assertEqual(len(scheduler), 5)
+        self.assertEqual(list(scheduler), packets)
+        self.assertEqual(drain(scheduler), packets)
+        self.assertEqual(len(scheduler), 0)
+
+    def test_strict_priority(self):
+        """
+        厳密優先スケジューラが優先度の高いサービス種別から取り出すことのテスト
+        """
+        scheduler = PriorityScheduler()
+        for i, service_type in enumerate(["data", "video", "voice", "data", "voice"]):
+            scheduler.push(make_packet(i, service_type), 0.0)
+        order = [packet.service_type for packet in drain(scheduler)]
+        self.assertEqual(order, ["voice", "voice", "video", "data", "data"])
+
+    def test_drr_shares_bytes_by_quantum(self):
+        """
+        DRRスケジューラがクォンタムに比例してバイト数を配分することのテスト
+        """
+        scheduler = DRRScheduler(quanta={"video": 3000, "data": 1500})
+        for i in range(30):
+            scheduler.push(make_packet(i, "video"), 0.0)
+            scheduler.push(make_packet(100 + i, "data"), 0.0)
+        first = drain(scheduler)[:30]
+        counts = Counter(packet.service_type for packet in first)
+        self.assertEqual(counts["video"], 2 * counts["data"])
+
+    def test_drr_variable_packet_sizes(self):
+        """
+        パケットサイズがクォンタムを超える場合も全てのパケットが取り出されることのテスト
+        """
+        scheduler = DRRScheduler(default_quantum=500)
+        for i in range(4):
+            scheduler.push(make_packet(i, "data", size=1500), 0.0)
+            scheduler.push(make_packet(10 + i, "voice", size=200), 0.0)
+        self.assertEqual(len(drain(scheduler)), 8)
+        self.assertEqual(len(scheduler), 0)
+
+    def test_wfq_shares_bytes_by_weight(self):
+        """
+        WFQスケジューラが重みに比例してバイト数を配分することのテスト
+        """
+        scheduler = WFQScheduler(weights={"voice": 3.0, "data": 1.0})
+        for i in range(40):
+            scheduler.push(make_packet(i, "voice"), 0.0)
+            scheduler.push(make_packet(100 + i, "data"), 0.0)
+        first = drain(scheduler)[:40]
+        counts = Counter(packet.service_type for packet in first)
+        self.assertEqual(counts["voice"], 30)
+        self.assertEqual(counts["data"], 10)
+
+    def test_create_scheduler(self):
+        """
+        create_scheduler関数のテスト
+        """
+        self.assertIsInstance(create_scheduler("fifo"), FIFOScheduler)
+        scheduler = create_scheduler({"type": "drr", "default_quantum": 3000})
+        self.assertIsInstance(scheduler, DRRScheduler)
+        self.assertEqual(scheduler.default_quantum, 3000)
+        with self.assertRaises(ValueError):
+            create_scheduler("lifo")
+        with self.assertRaises(ValueError):
+            create_aqm("blue")
+
+class TestActiveQueueManagement(unittest.TestCase):
+    """
+    AQMのユニットテストクラス
+    """
+
+    def test_red_drops_between_thresholds(self):
+        """
+        REDが平均キュー長に応じて到着パケットを破棄することのテスト
+        """
+        red = REDQueueManager(min_threshold=3000, max_threshold=9000, max_probability=0.5, weight=1.0, seed=1)
+        self.assertFalse(red.on_enqueue(1500, 0.0))
+        drops = sum(red.on_enqueue(6000, 0.0) for _ in range(200))
+        self.assertGreater(drops, 0)
+        self.assertLess(drops, 200)
+        self.assertTrue(red.on_enqueue(9000, 0.0))
+
+    def test_codel_drops_persistent_delay(self):
+        """
+        CoDelが滞在時間の超過が続いた場合にのみ破棄し、破棄間隔を短くしていくことのテスト
+        """
+        codel = CoDelQueueManager(target=0.005, interval=0.1)
+        # 一時的な超過では破棄しない
+        self.assertFalse(codel.on_dequeue(0.02, 30000, 0.0))
+        self.assertFalse(codel.on_dequeue(0.001, 30000, 0.05))
+
+        drop_times = [now / 1000 for now in range(100, 1000) if codel.on_dequeue(0.02, 30000, now / 1000)]
+        self.assertGreater(len(drop_times), 3)
+        gaps = [later - earlier for earlier, later in zip(drop_times, drop_times[1:])]
+        self.assertLess(gaps[-1], gaps[0])
+
+        # 滞在時間が target を下回ると破棄状態を抜ける
+        self.assertFalse(codel.on_dequeue(0.001, 30000, 1.0))
+        self.assertFalse(codel.dropping)
+
+    def test_node_with_codel(self):
+        """
+        CoDelを設定したノードが取り出し時に古いパケットを破棄することのテスト
+        """
+        node = Node(node_id=1, scheduler="fifo", aqm={"type": "codel", "target": 0.005, "interval": 0.1})
+        packets = [make_packet(i, "data") for i in range(20)]
+        for packet in packets:
+            node.enqueue_packet(packet, now=0.0)
+        delivered = [node.dequeue_packet(now=0.2 + i * 0.01) for i in range(20)]
+        delivered = [packet for packet in delivered if packet is not None]
+        self.assertGreater(node.aqm_drop_count, 0)
+        self.assertEqual(len(delivered) + node.aqm_drop_count, 20)
+        self.assertEqual(node.buffer_occupancy, 0)
+        self.assertTrue(all(packet.status == "lost" for packet in packets if packet not in delivered))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+# tests/test_replication_runner.py
+
+import math
+import unittest
+import numpy as np
+import replication_runner
+from replication_runner import (
+    ReplicationRunner, run_replica, confidence_interval, create_simulation_engine, create_flow_manager, REPLICA_METRICS
+)
+from partitioned_engine import PartitionedSimulationEngine
+from time_warp_engine import TimeWarpSimulationEngine
+from topology_manager import TopologyManager
+from central_controller import CentralController
+from metrics_collector import MetricsCollector
+
+PARAMETERS = {
+    'simulation_time': 100.0,
+    'failure_rate': 0.05,
+    'failure_distribution': 'uniform',
+    'algorithm': 'dijkstra'
+}
+
+class TestReplicationRunner(unittest.TestCase):
+    """
+    ReplicationRunnerクラスのユニットテストクラス
+    """
+
+    def test_replica_is_reproducible(self):
+        """
+        同じシード系列のレプリカが同じ結果になることのテスト
+        """
+        seed_sequence = np.random.SeedSequence(7).spawn(1)[0]
+        first = run_replica(PARAMETERS, seed_sequence)
+        second = run_replica(PARAMETERS, seed_sequence)
+        for name in REPLICA_METRICS:
+            if name != 'wall_time':
+                self.assertEqual(first[name], second[name])
+
+    def test_run_and_summarize(self):
+        """
+        設定ごと・レプリカごとの結果の表と信頼区間の集計のテスト
+        """
+        runner = ReplicationRunner(PARAMETERS, replications=3, seed=1, max_workers=1)
+        results = runner.run([{'failure_rate': 0.0}, {'failure_rate': 0.1}])
+        self.assertEqual(len(results), 6)
+        self.assertEqual(results['setting'].tolist(), [0, 0, 0, 1, 1, 1])
+        self.assertEqual(results['failure_rate'].tolist(), [0.0] * 3 + [0.1] * 3)
+        # 共通乱数法: 同じレプリカ番号には同じシード系列
+        self.assertEqual(results['seed_spawn_key'][0], results['seed_spawn_key'][3])
+        self.assertNotEqual(results['average_delay'][0], results['average_delay'][1])
+
+        summary = ReplicationRunner.summarize(results)
+        self.assertEqual(summary['failure_rate'].tolist(), [0.0, 0.1])
+        self.assertEqual(summary['replications'].tolist(), [3, 3])
+        for _, row in summary.iterrows():
+            self.assertLessEqual(row['average_delay_ci_low'], row['average_delay_mean'])
+            self.assertGreaterEqual(row['average_delay_ci_high'], row['average_delay_mean'])
+
+    def test_process_pool_matches_in_process(self):
+        """
+        プロセスプールで実行した結果が現在のプロセスで実行した結果と一致することのテスト
+        """
+        in_process = ReplicationRunner(PARAMETERS, replications=2, seed=3, max_workers=1).run()
+        pooled = ReplicationRunner(PARAMETERS, replications=2, seed=3, max_workers=2).run()
+        for name in ['average_delay', 'delivered_packets', 'lost_packets']:
+            self.assertEqual(in_process[name].tolist(), pooled[name].tolist())
+
+    def test_create_from_parameters(self):
+        """
+        simulation_parameters のエンジン・フローマネージャの設定が反映されることのテスト（main.py と共通）
+        """
+        engine = create_simulation_engine({'event_queue': 'ladder', 'event_ordering': 'entity', 'immediate_queue': False})
+        self.assertEqual((engine.event_queue_type, engine.event_ordering, engine.immediate_queue), ("ladder", "entity", False))
+        self.assertIsInstance(create_simulation_engine({'partitions': 2}), PartitionedSimulationEngine)
+        self.assertIsInstance(create_simulation_engine({'partitions': 2, 'synchronization': 'optimistic'}),
+                              TimeWarpSimulationEngine)
+        with self.assertRaises(ValueError):
+            create_simulation_engine({'partitions': 2, 'synchronization': 'lazy'})
+
+        parameters = {'partitions': 2, 'synchronization': 'optimistic', 'link_model': 'serialization',
+                      'link_selection': 'lowest_delay', 'pacing': {'default': {'type': 'poisson', 'rate': 1e6}}}
+        engine = create_simulation_engine(parameters)
+        topology_manager = TopologyManager(link_selection='lowest_delay')
+        topology_manager.load_topology('data/topology.yaml')
+        flow_manager = create_flow_manager(parameters, topology_manager, engine, CentralController(topology_manager),
+                                           MetricsCollector(), np.random.SeedSequence(0))
+        self.assertEqual(flow_manager.packet_manager.link_model, "serialization")
+        self.assertEqual(flow_manager.pacing, parameters['pacing'])
+        self.assertIsNotNone(flow_manager.packet_manager.jitter_seed)
+        self.assertIsNotNone(flow_manager.pacing_seed)
+        self.assertEqual(len(engine.partition), len(topology_manager.nodes))
+        self.assertIsNotNone(engine.state_saver)
+
+        # 分割実行に対応していない設定
+        with self.assertRaises(ValueError):
+            create_flow_manager({'partitions': 2}, topology_manager, create_simulation_engine({'partitions': 2}),
+                                CentralController(topology_manager), MetricsCollector(), np.random.SeedSequence(0))
+
+    def test_confidence_interval(self):
+        """
+        confidence_interval関数のテスト
+        """
+        mean, low, high = confidence_interval([1.0, 2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(mean, 3.0)
+        self.assertAlmostEqual(high - mean, mean - low)
+        quantile = 2.776445 if replication_runner.student_t is not None else 1.959964
+        self.assertAlmostEqual(high - mean, quantile * math.sqrt(2.5) / math.sqrt(5), places=4)
+        self.assertTrue(math.isnan(confidence_interval([1.0])[1]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# tests/test_route_cache.py
+
+import random
+import unittest
+from topology_manager import TopologyManager
+from central_controller import CentralController
+from simulation_engine import SimulationEngine
+from failure_manager import FailureManager, FailureEvent
+from metrics_collector import MetricsCollector
+from packet_manager import PacketManager
+from node import Node
+from link import Link
+
+class TestRouteCache(unittest.TestCase):
+    """
+    RouteCacheクラスのユニットテストクラス
+    """
+
+    def setUp(self):
+        """
+        1-2-3-4 の直線と 1-4 の迂回リンク、5-6 の独立した区間からなるトポロジを作成
+        """
+        self.topology_manager = TopologyManager()
+        self.topology_manager.nodes = {node_id: Node(node_id=node_id) for node_id in range(1, 7)}
+        link_specs = [
+            (1, 1, 2, 0.01), (2, 2, 3, 0.01), (3, 3, 4, 0.01),
+            (4, 1, 4, 0.1), (5, 5, 6, 0.01)
+        ]
+        self.topology_manager.links = {}
+        for link_id, node1, node2, delay in link_specs:
+            self.topology_manager.links[link_id] = Link(link_id=link_id, capacity=1e9, delay=delay, jitter=0.0, connected_nodes=(node1, node2))
+            self.topology_manager.nodes[node1].adjacent_links.append(link_id)
+            self.topology_manager.nodes[node2].adjacent_links.append(link_id)
+
+        self.simulation_engine = SimulationEngine()
+        self.simulation_engine.initialize(100.0)
+        self.central_controller = CentralController(self.topology_manager)
+        self.packet_manager = PacketManager(self.topology_manager, self.simulation_engine, self.central_controller, MetricsCollector())
+        self.failure_manager = FailureManager(self.simulation_engine, self.topology_manager, self.central_controller)
+        self.route_cache = self.packet_manager.route_cache
+
+    def test_hit_and_miss(self):
+        """
+        キャッシュのヒット・ミスのカウントのテスト
+        """
+        self.assertEqual(self.packet_manager.calculate_route(1, 4), [1, 2, 3, 4])
+        self.assertEqual(self.packet_manager.calculate_route(1, 4), [1, 2, 3, 4])
+        self.assertEqual(self.packet_manager.calculate_route(5, 6), [5, 6])
+        stats = self.route_cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['cached_routes'], 2)
+
+    def test_link_failure_invalidates_affected_routes(self):
+        """
+        リンク障害時に、そのリンクを通る経路のみが無効化されることのテスト
+        """
+        self.packet_manager.calculate_route(1, 4)
+        self.packet_manager.calculate_route(5, 6)
+
+        self.failure_manager.execute_failure(FailureEvent(event_time=0.0, element_type="link", element_id=2, duration=10.0))
+        self.assertEqual(self.route_cache.invalidations, 1)
+        self.assertEqual(self.packet_manager.calculate_route(1, 4), [1, 4])
+        self.assertEqual(self.packet_manager.calculate_route(5, 6), [5, 6])
+        self.assertEqual(self.route_cache.hits, 1)
+
+        # 復旧すると短い経路が使えるようになるため (1, 4) のみ無効化される
+        self.failure_manager.recover_element("link", 2)
+        self.assertEqual(self.route_cache.invalidations, 2)
+        self.assertEqual(self.packet_manager.calculate_route(1, 4), [1, 2, 3, 4])
+        self.assertEqual(self.route_cache.stats()['cached_routes'], 2)
+
+    def test_recovery_keeps_unaffected_routes(self):
+        """
+        経路が短くならない復旧では無効化されないことのテスト
+        """
+        self.packet_manager.calculate_route(1, 4)
+        self.failure_manager.execute_failure(FailureEvent(event_time=0.0, element_type="link", element_id=4, duration=10.0))
+        self.failure_manager.recover_element("link", 4)
+        self.assertEqual(self.route_cache.invalidations, 0)
+        self.packet_manager.calculate_route(1, 4)
+        self.assertEqual(self.route_cache.hits, 1)
+
+    def test_node_failure(self):
+        """
+        ノード障害時に、そのノードを通る経路が迂回経路に切り替わることのテスト
+        """
+        self.packet_manager.calculate_route(1, 3)
+        self.failure_manager.execute_failure(FailureEvent(event_time=0.0, element_type="node", element_id=2, duration=10.0))
+        self.assertEqual(self.packet_manager.calculate_route(1, 3), [1, 4, 3])
+
+        self.failure_manager.recover_element("node", 2)
+        self.assertEqual(self.packet_manager.calculate_route(1, 3), [1, 2, 3])
+
+    def test_matches_routing_table(self):
+        """
+        障害・復旧を繰り返しても、キャッシュした経路が経路表から求めた経路と一致することのテスト
+        """
+        rng = random.Random(0)
+        pairs = [(source, destination) for source in range(1, 7) for destination in range(1, 7)]
+        for _ in range(40):
+            for source, destination in pairs:
+                self.packet_manager.calculate_route(source, destination)
+            element_type = rng.choice(("node", "link"))
+            element_id = rng.randint(1, 6) if element_type == "node" else rng.randint(1, 5)
+            element = (self.topology_manager.get_node if element_type == "node" else self.topology_manager.get_link)(element_id)
+            if element.status == "active":
+                self.failure_manager.execute_failure(FailureEvent(event_time=0.0, element_type=element_type,
+                                                                  element_id=element_id, duration=10.0))
+            else:
+                self.failure_manager.recover_element(element_type, element_id)
+            routing_table = self.central_controller.get_routing_table()
+            for source, destination in pairs:
+                self.assertEqual(self.packet_manager.calculate_route(source, destination),
+                                 routing_table.path(source, destination))
+        # 変化のない宛先への経路は保持される
+        self.assertGreater(self.route_cache.hits, self.route_cache.misses)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+# tests/test_routing_table.py
+
+import random
+import unittest
+from unittest.mock import patch
+import networkx as nx
+import routing_table
+from routing_table import RoutingTable
+from topology_manager import TopologyManager
+from central_controller import CentralController
+from node import Node
+from link import Link
+
+def build_random_topology(node_count: int, link_count: int, seed: int) -> TopologyManager:
+    rng = random.Random(seed)
+    topology_manager = TopologyManager()
+    topology_manager.nodes = {node_id: Node(node_id=node_id) for node_id in range(1, node_count + 1)}
+    topology_manager.links = {}
+    for link_id in range(1, link_count + 1):
+        node1, node2 = rng.sample(range(1, node_count + 1), 2)
+        link = Link(link_id=link_id, capacity=1e6, delay=rng.uniform(0.001, 0.1), jitter=0.0, connected_nodes=(node1, node2))
+        topology_manager.links[link_id] = link
+        topology_manager.nodes[node1].adjacent_links.append(link_id)
+        topology_manager.nodes[node2].adjacent_links.append(link_id)
+    return topology_manager
+
+def reference_distances(topology_manager: TopologyManager):
+    G = nx.Graph()
+    G.add_nodes_from(node_id for node_id, node in topology_manager.nodes.items() if node.status == "active")
+    for link in topology_manager.links.values():
+        node1, node2 = link.connected_nodes
+        if link.status == "active" and G.has_node(node1) and G.has_node(node2):
+            weight = link.routing_weight()
+            if not G.has_edge(node1, node2) or G[node1][node2]['weight'] > weight:
+                G.add_edge(node1, node2, weight=weight)
+    return dict(nx.all_pairs_dijkstra_path_length(G))
+
+class TestRoutingTable(unittest.TestCase):
+    """
+    RoutingTableクラスのユニットテストクラス
+    """
+
+    def setUp(self):
+        self.topology_manager = build_random_topology(node_count=30, link_count=60, seed=1)
+        self.topology_manager.links[3].status = "failed"
+        self.topology_manager.nodes[7].status = "failed"
+
+    def assert_matches_reference(self, table: RoutingTable):
+        expected = reference_distances(self.topology_manager)
+        for source in self.topology_manager.nodes:
+            for destination in self.topology_manager.nodes:
+                distance = expected.get(source, {}).get(destination, float('inf'))
+                self.assertAlmostEqual(table.distance(source, destination), distance)
+                path = table.path(source, destination)
+                if distance == float('inf'):
+                    self.assertEqual(path, [])
+                    continue
+                self.assertEqual(path[0], source)
+                self.assertEqual(path[-1], destination)
+                cost = sum(table.adjacency[table.index[u]][table.index[v]] for u, v in zip(path, path[1:]))
+                self.assertAlmostEqual(cost, distance)
+
+    def test_methods_match_reference(self):
+        """
+        各計算方法の結果がNetworkXによる最短距離と一致することのテスト
+        """
+        for method in ["floyd_warshall", "dijkstra"]:
+            with self.subTest(method=method):
+                table = RoutingTable(method)
+                table.build(self.topology_manager)
+                self.assert_matches_reference(table)
+
+    def test_dijkstra_without_scipy(self):
+        """
+        scipyがない場合の純Pythonダイクストラ法のテスト
+        """
+        with patch.object(routing_table, 'csgraph_dijkstra', None):
+            table = RoutingTable("dijkstra")
+            table.build(self.topology_manager)
+        self.assert_matches_reference(table)
+
+    def test_next_hop(self):
+        """
+        next_hopメソッドのテスト
+        """
+        table = RoutingTable()
+        table.build(self.topology_manager)
+        path = table.path(1, 2)
+        self.assertEqual(table.next_hop(1, 2), path[1] if len(path) > 1 else None)
+        self.assertEqual(table.next_hop(1, 1), 1)
+        self.assertIsNone(table.next_hop(1, 7))
+        self.assertIsNone(table.next_hop(1, 999))
+
+    def test_incremental_updates_match_full_rebuild(self):
+        """
+        障害・復旧を繰り返した場合に差分更新の結果が全再計算と一致することのテスト
+        """
+        rng = random.Random(5)
+        for method in ["floyd_warshall", "dijkstra"]:
+            with self.subTest(method=method):
+                table = RoutingTable(method)
+                table.build(self.topology_manager)
+                for _ in range(40):
+                    if rng.random() < 0.5:
+                        element_type, element = "link", self.topology_manager.links[rng.choice(list(self.topology_manager.links))]
+                        element_id = element.link_id
+                    else:
+                        element_type, element = "node", self.topology_manager.nodes[rng.choice(list(self.topology_manager.nodes))]
+                        element_id = element.node_id
+                    element.status = "failed" if element.status == "active" else "active"
+                    table.apply_change(self.topology_manager, element_type, element_id)
+                    self.assert_matches_reference(table)
+
+    def test_incremental_updates_without_scipy(self):
+        """
+        scipyがない場合の差分更新のテスト
+        """
+        table = RoutingTable()
+        table.build(self.topology_manager)
+        with patch.object(routing_table, 'csgraph_dijkstra', None):
+            for link_id in [1, 2, 5, 1]:
+                link = self.topology_manager.links[link_id]
+                link.status = "failed" if link.status == "active" else "active"
+                table.apply_change(self.topology_manager, "link", link_id)
+                self.assert_matches_reference(table)
+
+    def test_controller_updates_on_failure(self):
+        """
+        障害・復旧通知時に中央コントローラの経路表が差分更新されることのテスト
+        """
+        controller = CentralController(self.topology_manager)
+        version = controller.get_routing_table().version
+        destination = max(self.topology_manager.nodes, key=lambda node_id: len(controller.routing_table.path(1, node_id)))
+        path = controller.routing_table.path(1, destination)
+        self.assertGreater(len(path), 2)
+        self.topology_manager.nodes[path[1]].status = "failed"
+        controller.notify_failure("node", path[1])
+        self.assertNotIn(path[1], controller.routing_table.path(1, destination))
+        self.assertEqual(controller.routing_table.version, version)
+        self.assert_matches_reference(controller.routing_table)
+
+        self.topology_manager.nodes[path[1]].status = "active"
+        controller.notify_recovery("node", path[1])
+        self.assert_matches_reference(controller.routing_table)
+        self.assertEqual([record['mode'] for record in controller.routing_update_log], ["incremental", "incremental"])
+        self.assertEqual([record['action'] for record in controller.routing_update_log], ["failure", "recovery"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+# tests/test_scenario_loader.py
+
+import json
+import os
+import tempfile
+import unittest
+import yaml
+from scenario_loader import iter_flows, ScenarioFeeder
+from workload_generator import WorkloadGenerator, write_scenario, pq
+from simulation_engine import SimulationEngine
+from flow_manager import FlowManager
+from topology_manager import TopologyManager
+from node import Node
+from link import Link
+from central_controller import CentralController
+from metrics_collector import MetricsCollector
+
+def build_topology():
+    """
+    スター型のトポロジ（中心1、葉2〜4）を生成
+    """
+    topology_manager = TopologyManager()
+    for node_id in (1, 2, 3, 4):
+        topology_manager.nodes[node_id] = Node(node_id=node_id)
+    for link_id, leaf in enumerate((2, 3, 4), start=1):
+        topology_manager.add_link(Link(link_id=link_id, capacity=1e7, delay=0.01, jitter=0.0, connected_nodes=(1, leaf)))
+    return topology_manager
+
+def attributes(flow):
+    return (flow.flow_id, flow.service_type, flow.flow_size, flow.source_node, flow.destination_node, flow.scheduled_start)
+
+class TestScenarioLoader(unittest.TestCase):
+    """
+    シナリオの逐次読み込みと ScenarioFeeder のユニットテストクラス
+    """
+
+    def setUp(self):
+        """
+        開始時刻の昇順のシナリオを設定
+        """
+        self.workload = WorkloadGenerator(build_topology(), seed=3).generate(
+            20.0, {"type": "poisson", "rate": 10.0}, size={"type": "constant", "value": 3000}, pairs="uniform")
+        self.records = [{
+            'flow_id': int(row['flow_id']), 'service_type': row['service_type'].decode(), 'flow_size': int(row['flow_size']),
+            'source_node': int(row['source_node']), 'destination_node': int(row['destination_node']),
+            'start_time': float(row['start_time'])
+        } for row in self.workload]
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, records=None):
+        """
+        シナリオを拡張子に応じた形式で書き出す
+        """
+        records = self.records if records is None else records
+        path = os.path.join(self.directory.name, name)
+        if name.endswith(".yaml"):
+            with open(path, 'w', encoding='utf-8') as file:
+                yaml.safe_dump({'simulation_parameters': {'simulation_time': 10}, 'flows': records}, file)
+        elif name.endswith(".jsonl"):
+            with open(path, 'w', encoding='utf-8') as file:
+                file.writelines(json.dumps(record) + "\n" for record in records)
+        else:
+            write_scenario(path, self.workload)
+        return path
+
+    def engine_and_manager(self):
+        simulation_engine = SimulationEngine()
+        simulation_engine.initialize(100.0)
+        metrics_collector = MetricsCollector()
+        topology_manager = build_topology()
+        flow_manager = FlowManager(topology_manager, simulation_engine, CentralController(topology_manager),
+                                   metrics_collector, link_model="serialization")
+        return simulation_engine, flow_manager, metrics_collector
+
+    def test_iter_flows(self):
+        """
+        各形式のシナリオを同じフローの列として読み込むテスト
+        """
+        expected = [attributes(flow) for flow in iter_flows(self.write("flows.yaml"))]
+        self.assertEqual(len(expected), len(self.records))
+        self.assertEqual(expected[0], tuple(self.records[0][name] for name in
+                                            ('flow_id', 'service_type', 'flow_size', 'source_node', 'destination_node', 'start_time')))
+        names = ["flows.jsonl", "flows.npy"] + (["flows.parquet"] if pq is not None else [])
+        for name in names:
+            with self.subTest(name=name):
+                self.assertEqual([attributes(flow) for flow in iter_flows(self.write(name), chunk_size=7)], expected)
+
+        # 逐次読み込みでも generate_flows と同じフローになる
+        _, flow_manager, _ = self.engine_and_manager()
+        flow_manager.generate_flows(flow_scenario=self.write("flows.jsonl"))
+        self.assertEqual([attributes(flow) for flow in flow_manager.flows.values()], expected)
+
+    def test_lookahead_feed(self):
+        """
+        先読み時間内のフローだけをスケジュールし、全フローを一括でスケジュールした場合と同じ結果になることのテスト
+        """
+        path = self.write("flows.jsonl")
+        simulation_engine, flow_manager, metrics_collector = self.engine_and_manager()
+        feeder = flow_manager.stream_flows(path, simulation_engine, horizon=0.5, chunk_size=16)
+        self.assertEqual(feeder.loaded, 0)
+        probes = []
+        for step in range(40):
+            simulation_engine.schedule_event(step * 0.5 + 0.25, lambda: probes.append(
+                (simulation_engine.current_time, max(flow.start_time for flow in flow_manager.flows.values()))))
+        simulation_engine.run()
+        self.assertTrue(feeder.finished)
+        self.assertEqual(feeder.loaded, len(self.records))
+        # 読み込み済みのフローは現在時刻 + horizon 以内に開始するものだけ
+        self.assertTrue(all(latest <= now + 0.5 for now, latest in probes))
+
+        eager_engine, eager_manager, eager_metrics = self.engine_and_manager()
+        eager_manager.generate_flows(flow_scenario=path)
+        eager_manager.schedule_flow_starts(eager_engine)
+        eager_engine.run()
+        self.assertEqual(simulation_engine.current_time, eager_engine.current_time)
+        for flow_id, accumulator in eager_metrics.flow_accumulators.items():
+            streamed = metrics_collector.flow_accumulators[flow_id]
+            self.assertEqual((streamed.delivered_packets, streamed.mean_delay),
+                             (accumulator.delivered_packets, accumulator.mean_delay))
+
+    def test_invalid_streams(self):
+        """
+        開始時刻の指定がない、または昇順でないシナリオのテスト
+        """
+        simulation_engine, flow_manager, _ = self.engine_and_manager()
+        unsorted = [dict(record) for record in self.records[:3]]
+        unsorted[0]['start_time'], unsorted[2]['start_time'] = unsorted[2]['start_time'], unsorted[0]['start_time']
+        missing = [dict(record) for record in self.records[:3]]
+        del missing[1]['start_time']
+        for records in (unsorted, missing):
+            feeder = ScenarioFeeder(iter_flows(self.write("invalid.jsonl", records)), flow_manager, simulation_engine)
+            with self.assertRaises(ValueError):
+                feeder.start()
+                simulation_engine.run()
+        with self.assertRaises(ValueError):
+            ScenarioFeeder(iter([]), flow_manager, simulation_engine, horizon=0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 # tests/test_simulation_engine.py
 
+import threading
 import unittest
 from simulation_engine import SimulationEngine, Event
 
@@ -33,7 +34,7 @@ class TestSimulationEngine(unittest.TestCase):
 
         self.engine.schedule_event(10.0, dummy_event)
         self.assertEqual(len(self.engine.event_queue), 1)
-        event = self.engine.event_queue[0]
+        event = self.engine.peek_event()
         self.assertEqual(event.event_time, 10.0)
         self.assertEqual(event.event_function, dummy_event)
 
@@ -58,5 +59,100 @@ class TestSimulationEngine(unittest.TestCase):
         self.assertEqual(event_times, [10.0, 20.0, 30.0])
         self.assertEqual(self.engine.current_time, 30.0)
 
+    def test_run_does_not_execute_events_after_end_time(self):
+        """
+        終了時間を過ぎたイベントが実行されないことのテスト
+        """
+        self.engine.initialize(15.0)
+        executed = []
+        self.engine.schedule_event(10.0, lambda: executed.append(10.0))
+        self.engine.schedule_event(20.0, lambda: executed.append(20.0))
+
+        self.engine.run()
+
+        self.assertEqual(executed, [10.0])
+        self.assertEqual(self.engine.current_time, 10.0)
+        self.assertEqual(self.engine.events_processed, 1)
+
+    def test_run_sequential_uses_caller_thread(self):
+        """
+        逐次モードではイベントごとにスレッドを生成しないことのテスト
+        """
+        self.engine.initialize(10.0)
+        thread_ids = []
+        for _ in range(5):
+            self.engine.schedule_event(1.0, lambda: thread_ids.append(threading.get_ident()))
+
+        self.engine.run()
+
+        self.assertEqual(thread_ids, [threading.get_ident()] * 5)
+
+    def test_run_parallel_mode(self):
+        """
+        parallelモードでparallel_safeなイベントのみスレッドプールで実行されることのテスト
+        """
+        engine = SimulationEngine(dispatch_mode="parallel", max_workers=2)
+        engine.initialize(10.0)
+        main_thread = threading.get_ident()
+        safe_threads = []
+        unsafe_threads = []
+        for _ in range(3):
+            engine.schedule_event(1.0, lambda: safe_threads.append(threading.get_ident()), parallel_safe=True)
+            engine.schedule_event(1.0, lambda: unsafe_threads.append(threading.get_ident()))
+
+        engine.run()
+
+        self.assertEqual(len(safe_threads), 3)
+        self.assertNotIn(main_thread, safe_threads)
+        self.assertEqual(unsafe_threads, [main_thread] * 3)
+
+    def test_run_with_event_queue_types(self):
+        """
+        各イベントキューで同じ順序でイベントが実行されることのテスト
+        """
+        for queue_type in ["heap", "calendar", "ladder", "wheel"]:
+            with self.subTest(queue_type=queue_type):
+                engine = SimulationEngine(event_queue=queue_type)
+                engine.initialize(100.0)
+                executed = []
+                for i, event_time in enumerate([30.0, 10.0, 10.0, 20.0, 10.0]):
+                    engine.schedule_event(event_time, lambda i=i: executed.append(i))
+                engine.run()
+                self.assertEqual(executed, [1, 2, 4, 3, 0])
+
+    def test_immediate_queue(self):
+        """
+        現在時刻のイベントがイベントキューを経由せず、経由した場合と同じ順序で実行されることのテスト
+        """
+        orders = []
+        for immediate_queue in (True, False):
+            engine = SimulationEngine(immediate_queue=immediate_queue)
+            engine.initialize(10.0)
+            executed = []
+
+            def event(name, children=()):
+                executed.append(name)
+                for child in children:
+                    engine.schedule_event(engine.current_time, lambda child=child: event(*child))
+
+            engine.schedule_event(1.0, lambda: event("a", [("a1", [("a11",)]), ("a2",)]))
+            engine.schedule_event(1.0, lambda: event("b", [("b1",)]))
+            engine.schedule_event(0.0, lambda: event("start"))
+            engine.run()
+            orders.append(executed)
+            self.assertEqual(engine.events_processed, 7)
+            self.assertEqual(engine.immediate_events, 5 if immediate_queue else 0)
+            if immediate_queue:
+                self.assertEqual(engine.event_queue.heap_operations, 4)
+        self.assertEqual(orders[0], ["start", "a", "b", "a1", "a2", "b1", "a11"])
+        self.assertEqual(orders[0], orders[1])
+
+    def test_unknown_dispatch_mode(self):
+        """
+        未知の実行方式を指定した場合のテスト
+        """
+        with self.assertRaises(ValueError):
+            SimulationEngine(dispatch_mode="threads")
+
 if __name__ == '__main__':
     unittest.main()
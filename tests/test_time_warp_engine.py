@@ -0,0 +1,148 @@
+# tests/test_time_warp_engine.py
+
+import random
+import unittest
+from time_warp_engine import TimeWarpSimulationEngine, TimeWarpProcess, PacketModelStateSaver
+from simulation_engine import SimulationEngine
+from node import Node
+from link import Link
+from packet import Packet
+from flow import Flow
+from traffic_source import TrafficSource, CBRPacing, PoissonPacing
+from tests.test_partitioned_engine import build_topology, run_scenario, snapshot
+
+def attach_state_saver(simulation_engine):
+    def prepare(flow_manager):
+        simulation_engine.state_saver = PacketModelStateSaver(flow_manager.topology_manager, flow_manager.packet_manager)
+    return prepare
+
+class TestTimeWarpEngine(unittest.TestCase):
+    """
+    TimeWarpSimulationEngineクラスのユニットテストクラス
+    """
+
+    def test_matches_sequential_engine(self):
+        """
+        巻き戻しが発生しても、同じシードの逐次実行とフローごとの結果が完全に一致することのテスト
+        """
+        sequential_engine = SimulationEngine(event_ordering="entity")
+        expected = snapshot(run_scenario(sequential_engine))
+
+        for batch_size, optimism_window in ((200, float('inf')), (16, 0.05), (1, float('inf'))):
+            engine = TimeWarpSimulationEngine(partitions=2, batch_size=batch_size, optimism_window=optimism_window)
+            self.assertEqual(snapshot(run_scenario(engine, prepare=attach_state_saver(engine))), expected)
+            self.assertEqual(engine.events_processed, sequential_engine.events_processed)
+            self.assertEqual(engine.current_time, sequential_engine.current_time)
+            statistics = engine.statistics()
+            self.assertEqual(statistics['events_executed'], engine.events_processed - 2 + statistics['rolled_back_events'])
+            self.assertEqual(sum(statistics['events_per_partition']) + 2, engine.events_processed)
+            self.assertTrue(all(not logical_process.processed for logical_process in engine.logical_processes))
+            if batch_size == 200:
+                # 先に実行した区画が他の区画からの到着より先に進むため巻き戻しが発生する
+                self.assertGreater(statistics['rollbacks'], 0)
+                self.assertGreater(statistics['anti_messages'], 0)
+                self.assertLess(statistics['efficiency'], 1.0)
+
+    def test_state_saver_restores_node_and_links(self):
+        """
+        状態の保存器がバッファ・送出待ち・リンクのカウンタを実行前の状態に戻すことのテスト
+        """
+        topology_manager = build_topology()
+        packet_manager = type('PacketManagerStub', (), {'jitter_states': {}, 'flow_manager': None})()
+        saver = PacketModelStateSaver(topology_manager, packet_manager)
+        node = topology_manager.get_node(1)
+        link = topology_manager.get_link(1)
+        first = Packet(packet_id=1, flow_id=1, size=1500)
+        node.enqueue_packet(first)
+        link.current_load = 3000
+
+        state = saver.before_event(1)
+        node.dequeue_packet()
+        first.current_node_index = 1
+        node.enqueue_packet(Packet(packet_id=2, flow_id=1, size=1500))
+        link.schedule_transmission(1500, 0.0, 1)
+        link.update_load(1500, "add")
+        saver.after_event(state)
+        # 他の論理プロセス（受信側）による更新は巻き戻さない
+        link.update_load(1500, "remove")
+        saver.restore(state)
+
+        self.assertEqual([packet.packet_id for packet in node.buffer], [1])
+        self.assertIs(next(iter(node.buffer)), first)
+        self.assertEqual(first.current_node_index, 0)
+        self.assertEqual(node.buffer_occupancy, 1500)
+        self.assertNotIn(1, link.busy_until)
+        self.assertEqual(link.transmitted_bytes, 0)
+        self.assertEqual(link.current_load, 1500)
+
+    def test_state_saver_per_event(self):
+        """
+        バッファを変更しないイベントではバッファをコピーせず、送出イベントの生成器のみ保存することのテスト
+        """
+        topology_manager = build_topology()
+        packet_manager = type('PacketManagerStub', (), {'jitter_states': {}, 'flow_manager': None})()
+        saver = PacketModelStateSaver(topology_manager, packet_manager)
+        node = topology_manager.get_node(1)
+        node.enqueue_packet(Packet(packet_id=1, flow_id=1, size=1500))
+        sources = [TrafficSource(Flow(flow_id, "default", 15000, 1, 3), pacing, None, None, rng)
+                   for flow_id, pacing, rng in ((1, CBRPacing(1e6), random.Random(0)), (2, PoissonPacing(1e6), random.Random(0)))]
+
+        state = saver.before_event(1, sources[0].emit)
+        saver.after_event(state)
+        self.assertIsNone(state[2])
+        self.assertEqual(state[3], [])
+        self.assertIs(state[5][0], sources[0])
+        # 乱数を使わないペーシングでは乱数生成器の状態を保存しない
+        self.assertIsNone(state[5][1][2])
+        for event_function, saved in ((sources[1].emit, True), (lambda: None, False)):
+            state = saver.before_event(1, event_function)
+            saver.after_event(state)
+            self.assertEqual(state[5] is not None and state[5][1][2] is not None, saved)
+        self.assertIsNone(node.state_observer)
+
+        rng = sources[1].rng
+        state = saver.before_event(1, sources[1].emit)
+        sources[1].emitted += 1
+        sources[1].pacing.next_emission(0.0, 1500, rng)
+        expected = rng.random()
+        saver.after_event(state)
+        saver.restore(state)
+        self.assertEqual(sources[1].emitted, 0)
+        sources[1].pacing.next_emission(0.0, 1500, rng)
+        self.assertEqual(rng.random(), expected)
+
+    def test_lazy_cancel(self):
+        """
+        取り消したイベントをキューに残したまま読み飛ばし、同じ時刻とキーの再スケジュールで置き換えることのテスト
+        """
+        logical_process = TimeWarpProcess(0)
+        first, second, third = (1.0, (0, 1, 1, 1), lambda: 'first'), (2.0, (0, 1, 2, 1), lambda: 'second'), \
+            (3.0, (0, 1, 3, 1), lambda: 'third')
+        for entry in (third, first, second):
+            logical_process.push(entry)
+        logical_process.cancel(first)
+        logical_process.cancel(second)
+        self.assertEqual(len(logical_process.queue), 3)
+        # 巻き戻したイベントの再実行で同じ時刻とキーのイベントがスケジュールされた場合
+        replacement = (2.0, (0, 1, 2, 1), lambda: 'replacement')
+        logical_process.push(replacement)
+        self.assertEqual(logical_process.peek_time(), 2.0)
+        self.assertIs(logical_process.pop(), replacement)
+        logical_process.cancel(third)
+        self.assertEqual(logical_process.peek_time(), float('inf'))
+        self.assertEqual((logical_process.queue, logical_process.cancelled), ([], {}))
+
+    def test_requires_state_saver(self):
+        """
+        状態の保存器を設定せずに実行した場合のテスト
+        """
+        engine = TimeWarpSimulationEngine()
+        engine.assign_partitions(build_topology())
+        engine.initialize(1.0)
+        with self.assertRaises(RuntimeError):
+            engine.run()
+        with self.assertRaises(ValueError):
+            TimeWarpSimulationEngine(batch_size=0)
+
+if __name__ == '__main__':
+    unittest.main()
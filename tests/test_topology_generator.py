@@ -0,0 +1,134 @@
+# tests/test_topology_generator.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from topology_generator import fat_tree, leaf_spine, torus, barabasi_albert, waxman, sample_attribute, generate_topology
+from topology_io import read_topology, save_topology
+from topology_manager import TopologyManager
+
+
+def degrees(count, node1, node2):
+    return np.bincount(np.concatenate([node1, node2]), minlength=count + 1)[1:]
+
+
+def is_connected(count, node1, node2):
+    adjacency = [[] for _ in range(count + 1)]
+    for a, b in zip(node1.tolist(), node2.tolist()):
+        adjacency[a].append(b)
+        adjacency[b].append(a)
+    visited, stack = {1}, [1]
+    while stack:
+        for neighbor in adjacency[stack.pop()]:
+            if neighbor not in visited:
+                visited.add(neighbor)
+                stack.append(neighbor)
+    return len(visited) == count
+
+
+def unique_pairs(node1, node2):
+    return len({(min(a, b), max(a, b)) for a, b in zip(node1.tolist(), node2.tolist()) if a != b})
+
+
+class TestTopologyGenerator(unittest.TestCase):
+    """
+    合成トポロジ生成のユニットテストクラス
+    """
+
+    def test_structured_topologies(self):
+        """
+        fat-tree、leaf-spine、トーラスのノード数・リンク数・次数のテスト
+        """
+        count, node1, node2 = fat_tree(4)
+        # コア4台、ポッドごとに集約2台・エッジ2台、ホスト16台
+        self.assertEqual((count, len(node1)), (36, 48))
+        self.assertEqual(unique_pairs(node1, node2), 48)
+        node_degrees = degrees(count, node1, node2)
+        self.assertTrue(np.all(node_degrees[:20] == 4))
+        self.assertTrue(np.all(node_degrees[20:] == 1))
+        self.assertTrue(is_connected(count, node1, node2))
+        count, node1, node2 = fat_tree(8, hosts=False)
+        self.assertEqual((count, len(node1)), (80, 256))
+        self.assertTrue(is_connected(count, node1, node2))
+
+        count, node1, node2 = leaf_spine(6, 3, hosts_per_leaf=2)
+        self.assertEqual((count, len(node1)), (21, 30))
+        self.assertEqual(degrees(count, node1, node2).tolist(), [6] * 3 + [5] * 6 + [1] * 12)
+
+        count, node1, node2 = torus([4, 5, 3])
+        self.assertEqual((count, len(node1)), (60, 180))
+        self.assertTrue(np.all(degrees(count, node1, node2) == 6))
+        self.assertEqual(unique_pairs(node1, node2), 180)
+        count, node1, node2 = torus([2, 1, 3])
+        self.assertEqual((count, len(node1), unique_pairs(node1, node2)), (6, 9, 9))
+
+        for invalid in (lambda: fat_tree(3), lambda: leaf_spine(0, 2), lambda: torus([4])):
+            with self.assertRaises(ValueError):
+                invalid()
+
+    def test_random_topologies(self):
+        """
+        Barabási–Albert と Waxman のトポロジが連結で、シードで再現できることのテスト
+        """
+        count, node1, node2 = barabasi_albert(500, m=3, rng=np.random.default_rng(1))
+        self.assertEqual(len(node1), 6 + 496 * 3)
+        self.assertEqual(unique_pairs(node1, node2), len(node1))
+        self.assertTrue(is_connected(count, node1, node2))
+        # 優先的選択により次数の大きいハブができる
+        self.assertGreater(degrees(count, node1, node2).max(), 30)
+
+        count, node1, node2, lengths = waxman(400, alpha=0.05, beta=0.05, rng=np.random.default_rng(2))
+        self.assertEqual(unique_pairs(node1, node2), len(node1))
+        self.assertTrue(is_connected(count, node1, node2))
+        self.assertTrue(np.all((lengths > 0) & (lengths <= np.sqrt(2))))
+        again = waxman(400, alpha=0.05, beta=0.05, rng=np.random.default_rng(2))
+        np.testing.assert_array_equal(again[1], node1)
+
+        # beta=1 で距離による減衰がない場合は完全グラフ
+        count, node1, node2, _ = waxman(30, alpha=1e9, beta=1.0, connected=False, rng=np.random.default_rng(3))
+        self.assertEqual((len(node1), unique_pairs(node1, node2)), (435, 435))
+
+    def test_attributes_and_loading(self):
+        """
+        リンク属性の分布、距離による遅延、TopologyManager への読み込みと .npz への保存のテスト
+        """
+        rng = np.random.default_rng(0)
+        self.assertEqual(sample_attribute(1e9, 3, rng).tolist(), [1e9] * 3)
+        values = sample_attribute({"type": "choice", "values": [1e8, 1e9], "weights": [0, 1]}, 10, rng)
+        self.assertEqual(set(values.tolist()), {1e9})
+        values = sample_attribute({"type": "uniform", "low": 0.001, "high": 0.002}, 1000, rng)
+        self.assertTrue(np.all((values >= 0.001) & (values < 0.002)))
+        with self.assertRaises(ValueError):
+            sample_attribute({"type": "zipf"}, 1, rng)
+
+        arrays = generate_topology({"type": "waxman", "nodes": 200, "delay": "distance", "region_size": 2e6,
+                                    "capacity": {"type": "choice", "values": [1e8, 1e10]}}, seed=5)
+        # 2000km 四方の領域では伝搬遅延は最大で約14ms
+        self.assertTrue(np.all((arrays["delay"] > 0) & (arrays["delay"] <= 2e6 * np.sqrt(2) / 2e8)))
+        self.assertEqual(set(arrays["capacity"].tolist()), {1e8, 1e10})
+        np.testing.assert_array_equal(generate_topology({"type": "waxman", "nodes": 200}, seed=5)["node1"], arrays["node1"])
+        with self.assertRaises(ValueError):
+            generate_topology({"type": "torus", "dimensions": [3, 3], "delay": "distance"})
+        with self.assertRaises(ValueError):
+            generate_topology({"type": "mesh"})
+
+        arrays = generate_topology({"type": "fat_tree", "k": 4, "capacity": 1e10, "buffer_size": 5000})
+        topology_manager = TopologyManager()
+        topology_manager.load_arrays(arrays)
+        self.assertEqual((len(topology_manager.nodes), len(topology_manager.links)), (36, 48))
+        self.assertEqual(topology_manager.nodes[1].buffer_size, 5000)
+        self.assertEqual(len(topology_manager.nodes[1].adjacent_links), 4)
+        self.assertEqual(topology_manager.links[1].capacity, 1e10)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "fat_tree.npz")
+            save_topology(path, arrays)
+            for name, values in read_topology(path).items():
+                np.testing.assert_array_equal(values, arrays[name])
+            topology_manager = TopologyManager()
+            topology_manager.load_topology(path)
+            self.assertEqual(len(topology_manager.links), 48)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+# tests/test_topology_io.py
+
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+from topology_io import read_topology, read_topology_cached, save_topology, great_circle_delay
+from topology_manager import TopologyManager
+
+GRAPHML = """<?xml version="1.0" encoding="utf-8"?>
+<graphml xmlns="http://graphml.graphdrawing.org/xmlns">
+  <key attr.name="Latitude" attr.type="double" for="node" id="d29" />
+  <key attr.name="Longitude" attr.type="double" for="node" id="d32" />
+  <key attr.name="LinkSpeedRaw" attr.type="double" for="edge" id="d40" />
+  <key attr.name="jitter" attr.type="double" for="edge" id="d41" />
+  <graph edgedefault="undirected">
+    <node id="0"><data key="d29">35.68</data><data key="d32">139.69</data></node>
+    <node id="1"><data key="d29">34.69</data><data key="d32">135.50</data></node>
+    <node id="2" />
+    <edge source="0" target="1"><data key="d40">10000000000.0</data></edge>
+    <edge source="1" target="2"><data key="d41">0.002</data></edge>
+  </graph>
+</graphml>
+"""
+
+ROCKETFUEL = """1 @Tokyo + bb (2) &1 -> <2> <3> {-100} =r1.example.net r0
+2 @Osaka bb (2) -> <1> <3> =r2.example.net r1
+3 @Nagoya (2) -> <1> <2> {-101} =r3.example.net r1
+-100 =ext1.example.net r1
+"""
+
+class TestTopologyIO(unittest.TestCase):
+    """
+    トポロジファイルの読み込みとキャッシュのユニットテストクラス
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        return path
+
+    def test_yaml_topology(self):
+        """
+        YAML のトポロジがノード・リンクの属性を保って読み込まれることのテスト
+        """
+        path = self.write("topology.yaml", """
+nodes:
+  - id: 1
+    buffer_size: 5000
+    scheduler: {type: "drr", default_quantum: 3000}
+  - id: 2
+links:
+  - {id: 7, node1: 1, node2: 2, capacity: 1000000, delay: 0.01, jitter: 0.001, queue_limit: 30000}
+""")
+        topology_manager = TopologyManager()
+        topology_manager.load_topology(path)
+        self.assertEqual(topology_manager.nodes[1].buffer_size, 5000)
+        self.assertEqual(type(topology_manager.nodes[1].buffer).__name__, "DRRScheduler")
+        self.assertEqual(topology_manager.nodes[2].buffer_size, 1000000)
+        link = topology_manager.links[7]
+        self.assertEqual((link.capacity, link.delay, link.jitter, link.queue_limit, link.connected_nodes),
+                         (1000000, 0.01, 0.001, 30000, (1, 2)))
+        self.assertEqual(topology_manager.nodes[2].adjacent_links, [7])
+
+        topology_manager = TopologyManager()
+        topology_manager.load_topology('data/topology.yaml')
+        self.assertEqual(len(topology_manager.nodes), 8)
+        self.assertIsNone(topology_manager.links[1].queue_limit)
+
+    def test_importers(self):
+        """
+        GraphML（Topology Zoo）、エッジリストCSV、Rocketfuel の読み込みのテスト
+        """
+        arrays = read_topology(self.write("zoo.graphml", GRAPHML), defaults={"capacity": 1e6, "delay": 0.005})
+        self.assertEqual(arrays["node_id"].tolist(), [0, 1, 2])
+        self.assertEqual(arrays["capacity"].tolist(), [1e10, 1e6])
+        # 東京-大阪間（約400km）の伝搬遅延は約2ms、座標のないノードとのリンクは defaults の遅延
+        self.assertAlmostEqual(arrays["delay"][0], 0.002, delta=0.0002)
+        self.assertEqual(arrays["delay"][1], 0.005)
+        self.assertEqual(arrays["jitter"].tolist(), [0.0, 0.002])
+
+        arrays = read_topology(self.write("edges.csv", "source,target,capacity,delay\n1,2,1e8,0.01\n2,5,2e8,\n"))
+        self.assertEqual(arrays["node_id"].tolist(), [1, 2, 5])
+        self.assertEqual(arrays["link_id"].tolist(), [1, 2])
+        self.assertEqual(arrays["delay"].tolist(), [0.01, 0.001])
+
+        topology_manager = TopologyManager()
+        topology_manager.load_topology(self.write("isp.cch", ROCKETFUEL))
+        self.assertEqual(sorted(topology_manager.nodes), [1, 2, 3])
+        self.assertEqual(sorted(link.connected_nodes for link in topology_manager.links.values()), [(1, 2), (1, 3), (2, 3)])
+
+        self.assertTrue(np.isnan(great_circle_delay(np.array([[np.nan, 0.0]]), np.array([[0.0, 0.0]]))[0]))
+        with self.assertRaises(ValueError):
+            read_topology(self.write("topology.txt", ""))
+
+    def test_cache(self):
+        """
+        キャッシュがファイルの更新時刻と内容のハッシュで再利用・更新されることのテスト
+        """
+        text = "nodes:\n  - id: 1\n  - id: 2\nlinks:\n  - {id: 1, node1: 1, node2: 2, capacity: %d, delay: 0.01, jitter: 0.0}\n"
+        path = self.write("topology.yaml", text % 1000)
+        cache_dir = os.path.join(self.directory.name, "cache")
+        arrays = read_topology_cached(path, cache_dir)
+        cache_file = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+        written = os.stat(cache_file).st_mtime_ns
+
+        # 更新されていなければキャッシュを書き換えずに使用する
+        cached = read_topology_cached(path, cache_dir)
+        self.assertEqual(os.stat(cache_file).st_mtime_ns, written)
+        for name in arrays:
+            np.testing.assert_array_equal(cached[name], arrays[name])
+
+        # 内容が同じで更新時刻だけが変わった場合もキャッシュを使用し、内容が変わった場合は読み直す
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+        self.assertEqual(read_topology_cached(path, cache_dir)["capacity"].tolist(), [1000.0])
+        self.write("topology.yaml", text % 2000)
+        topology_manager = TopologyManager()
+        topology_manager.load_topology(path, cache_dir=cache_dir)
+        self.assertEqual(topology_manager.links[1].capacity, 2000)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+        # 保存した配列表現はそのまま読み込める
+        saved = os.path.join(self.directory.name, "topology.npz")
+        save_topology(saved, arrays)
+        np.testing.assert_array_equal(read_topology(saved)["node_id"], [1, 2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 # tests/test_topology_manager.py
 
+import copy
+import pickle
 import unittest
-from topology_manager import TopologyManager
+from topology_manager import TopologyManager, LinkTable
 from node import Node
 from link import Link
 
@@ -49,5 +51,63 @@ class TestTopologyManager(unittest.TestCase):
         link_none = self.topology_manager.get_link(2)
         self.assertIsNone(link_none)
 
+    def test_link_index(self):
+        """
+        リンクの追加・削除時にノード間の索引が更新されることのテスト
+        """
+        self.assertEqual([link.link_id for link in self.topology_manager.links_between(2, 1)], [1])
+        self.topology_manager.add_link(Link(link_id=2, capacity=1000.0, delay=0.05, jitter=0.0, connected_nodes=(1, 2)))
+        self.assertEqual([link.link_id for link in self.topology_manager.links_between(1, 2)], [1, 2])
+        self.assertIn(2, self.topology_manager.nodes[1].adjacent_links)
+
+        self.topology_manager.remove_link(1)
+        self.assertEqual([link.link_id for link in self.topology_manager.links_between(1, 2)], [2])
+        self.assertNotIn(1, self.topology_manager.nodes[2].adjacent_links)
+        del self.topology_manager.links[2]
+        self.assertEqual(self.topology_manager.links_between(1, 2), [])
+        self.assertIsNone(self.topology_manager.select_link(1, 2))
+
+    def test_pickle_round_trip(self):
+        """
+        pickle とコピーで復元したトポロジのリンクの索引が元と一致することのテスト
+        """
+        self.topology_manager.add_link(Link(link_id=2, capacity=1000.0, delay=0.05, jitter=0.0, connected_nodes=(1, 2)))
+        for restored in (pickle.loads(pickle.dumps(self.topology_manager)), copy.deepcopy(self.topology_manager)):
+            self.assertIsInstance(restored.links, LinkTable)
+            self.assertEqual(sorted(restored.links), [1, 2])
+            self.assertEqual(restored.links.ids_between(2, 1), [1, 2])
+            self.assertEqual([link.link_id for link in restored.links_between(1, 2)], [1, 2])
+            del restored.links[1]
+            self.assertEqual(restored.links.ids_between(1, 2), [2])
+        self.assertEqual(self.topology_manager.links.ids_between(1, 2), [1, 2])
+
+    def test_select_link(self):
+        """
+        並行リンクの選択方針と障害リンクの除外のテスト
+        """
+        self.topology_manager.add_link(Link(link_id=2, capacity=1000.0, delay=0.05, jitter=0.0, connected_nodes=(1, 2)))
+        self.topology_manager.links[1].current_load = 0
+        self.topology_manager.links[2].current_load = 500
+        self.assertEqual(self.topology_manager.select_link(1, 2).link_id, 1)
+
+        self.topology_manager.link_selection = "lowest_delay"
+        self.assertEqual(self.topology_manager.select_link(1, 2).link_id, 2)
+        self.topology_manager.links[2].status = "failed"
+        self.assertEqual(self.topology_manager.select_link(2, 1).link_id, 1)
+        self.topology_manager.links[2].status = "active"
+
+        self.topology_manager.link_selection = "ecmp"
+        chosen = {flow_id: self.topology_manager.select_link(1, 2, flow_id).link_id for flow_id in range(20)}
+        self.assertEqual(set(chosen.values()), {1, 2})
+        for flow_id, link_id in chosen.items():
+            self.assertEqual(self.topology_manager.select_link(2, 1, flow_id).link_id, link_id)
+
+    def test_unknown_link_selection(self):
+        """
+        未知の選択方針を指定した場合のテスト
+        """
+        with self.assertRaises(ValueError):
+            TopologyManager(link_selection="random")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,161 @@
+# tests/test_traffic_source.py
+
+import random
+import unittest
+from traffic_source import (
+    create_pacing, BurstPacing, CBRPacing, PoissonPacing, OnOffPacing, TokenBucketPacing
+)
+from simulation_engine import SimulationEngine
+from partitioned_engine import PartitionedSimulationEngine, check_partitionable
+from time_warp_engine import TimeWarpSimulationEngine, PacketModelStateSaver
+from flow import Flow
+from flow_manager import FlowManager
+from topology_manager import TopologyManager
+from node import Node
+from link import Link
+from central_controller import CentralController
+from metrics_collector import MetricsCollector
+from tests.test_partitioned_engine import run_scenario, snapshot
+
+PACING = {"voice": {"type": "cbr", "rate": 120000}, "video": {"type": "on_off", "rate": 240000, "mean_on": 0.2},
+          "default": {"type": "poisson", "rate": 240000}}
+
+class TestTrafficSource(unittest.TestCase):
+    """
+    TrafficSourceクラスとペーシングモデルのユニットテストクラス
+    """
+
+    def setUp(self):
+        """
+        直線のトポロジ（1-2-3）を設定
+        """
+        self.topology_manager = TopologyManager()
+        for node_id in (1, 2, 3):
+            self.topology_manager.nodes[node_id] = Node(node_id=node_id)
+        self.topology_manager.add_link(Link(link_id=1, capacity=1e6, delay=0.01, jitter=0.0, connected_nodes=(1, 2)))
+        self.topology_manager.add_link(Link(link_id=2, capacity=1e6, delay=0.01, jitter=0.0, connected_nodes=(2, 3)))
+        self.simulation_engine = SimulationEngine()
+        self.simulation_engine.initialize(100.0)
+        self.metrics_collector = MetricsCollector()
+        self.flow_manager = FlowManager(self.topology_manager, self.simulation_engine,
+                                        CentralController(self.topology_manager), self.metrics_collector,
+                                        link_model="serialization", pacing={"voice": {"type": "cbr", "rate": 120000}})
+
+    def test_pacing_models(self):
+        """
+        各ペーシングモデルの送出時刻のテスト
+        """
+        self.assertEqual(BurstPacing().next_emission(1.0, 1500, random), 1.0)
+        self.assertAlmostEqual(CBRPacing(rate=12000).next_emission(1.0, 1500, random), 2.0)
+
+        # 3パケット分のバケットは続けて送出し、その後は補充レートで送出する
+        bucket = TokenBucketPacing(rate=12000, bucket_size=4500)
+        times = [0.0]
+        for _ in range(5):
+            times.append(bucket.next_emission(times[-1], 1500, random))
+        self.assertEqual(times[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(times[3], 1.0)
+        self.assertAlmostEqual(times[5], 3.0)
+
+        rng = random.Random(1)
+        poisson = PoissonPacing(rate=12000)
+        gaps = [poisson.next_emission(0.0, 1500, rng) for _ in range(20000)]
+        self.assertAlmostEqual(sum(gaps) / len(gaps), 1.0, delta=0.05)
+
+        # ON 期間の送出間隔は rate で決まり、それより長い間隔は OFF 期間を挟む
+        on_off = OnOffPacing(rate=12000, mean_on=5.0, mean_off=5.0)
+        now, gaps = 0.0, []
+        for _ in range(2000):
+            next_time = on_off.next_emission(now, 1500, rng)
+            gaps.append(next_time - now)
+            now = next_time
+        self.assertAlmostEqual(min(gaps), 1.0)
+        self.assertGreater(max(gaps), 1.0)
+
+        self.assertIsInstance(create_pacing({"type": "cbr", "rate": 1e6}), CBRPacing)
+        with self.assertRaises(ValueError):
+            create_pacing("constant")
+        with self.assertRaises(ValueError):
+            create_pacing({"type": "token_bucket", "rate": 1e6, "bucket_size": 100})
+
+    def test_paced_flow(self):
+        """
+        ペーシングしたフローの全パケットが送出され、送出イベントが常に1つであることのテスト
+        """
+        flow = Flow(1, "voice", 1500 * 20, 1, 3)
+        self.flow_manager.flows[1] = flow
+        self.simulation_engine.schedule_event(0.0, lambda: self.flow_manager.start_flow(flow))
+        source_events = []
+        for step in range(19):
+            self.simulation_engine.schedule_event(step * 0.1 + 0.05, lambda: source_events.append(
+                sum(1 for entry in self.simulation_engine.event_queue._heap
+                    if getattr(entry[2], '__self__', None) is self.flow_manager.traffic_sources[1])))
+        self.simulation_engine.run()
+
+        source = self.flow_manager.traffic_sources[1]
+        self.assertTrue(source.finished)
+        self.assertEqual(set(source_events), {1})
+        self.assertEqual(flow.status, "completed")
+        accumulator = self.metrics_collector.flow_accumulators[1]
+        self.assertEqual(accumulator.total_packets, 20)
+        self.assertEqual(accumulator.delivered_packets, 20)
+        # 120 kbps で 1500 バイトを 0.1 秒間隔で送出するため待ち行列は生じず、最後のパケットは 1.9 秒に送出される
+        self.assertAlmostEqual(accumulator.mean_delay, 0.01 + 0.012)
+        self.assertAlmostEqual(self.simulation_engine.current_time, 1.9 + 2 * (0.01 + 0.012))
+        # パケットは packet_store に確保しない
+        self.assertEqual(len(self.flow_manager.packet_manager.packet_store), 0)
+        self.assertEqual(flow.packets, [])
+
+    def test_unreachable_destination(self):
+        """
+        送信先のノードの障害中に送出したパケットが、送信元で配送済みではなくロスとなることのテスト
+        """
+        flow = Flow(1, "voice", 1500 * 20, 1, 3)
+        self.flow_manager.flows[1] = flow
+        central_controller = self.flow_manager.central_controller
+
+        def fail():
+            self.topology_manager.get_node(3).fail_node(0.0)
+            central_controller.notify_failure("node", 3)
+
+        def recover():
+            self.topology_manager.get_node(3).recover_node()
+            central_controller.notify_recovery("node", 3)
+
+        self.simulation_engine.schedule_event(0.0, lambda: self.flow_manager.start_flow(flow))
+        self.simulation_engine.schedule_event(0.45, fail)
+        self.simulation_engine.schedule_event(1.05, recover)
+        self.simulation_engine.run()
+
+        accumulator = self.metrics_collector.flow_accumulators[1]
+        # 0.5〜1.0秒に送出した6パケットは経路がなく、送信元でロスとなる
+        self.assertEqual((accumulator.delivered_packets, accumulator.lost_packets), (14, 6))
+        self.assertAlmostEqual(accumulator.mean_delay, 0.01 + 0.012)
+        self.assertEqual(flow.status, "completed")
+
+    def test_partitioned_execution_with_pacing(self):
+        """
+        乱数を使うペーシングでも分割実行が同じシードの逐次実行と一致することのテスト
+        """
+        def paced(simulation_engine):
+            def prepare(flow_manager):
+                flow_manager.pacing = PACING
+                flow_manager.pacing_seed = 11
+                if isinstance(simulation_engine, TimeWarpSimulationEngine):
+                    simulation_engine.state_saver = PacketModelStateSaver(flow_manager.topology_manager,
+                                                                          flow_manager.packet_manager)
+            return prepare
+
+        sequential_engine = SimulationEngine(event_ordering="entity")
+        expected = snapshot(run_scenario(sequential_engine, prepare=paced(sequential_engine)))
+        for engine in (PartitionedSimulationEngine(partitions=2), TimeWarpSimulationEngine(partitions=2, batch_size=200)):
+            with self.subTest(engine=type(engine).__name__):
+                self.assertEqual(snapshot(run_scenario(engine, prepare=paced(engine))), expected)
+                self.assertEqual(engine.events_processed, sequential_engine.events_processed)
+
+        self.flow_manager.pacing = PACING
+        with self.assertRaises(ValueError):
+            check_partitionable(self.flow_manager)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+# tests/test_workload_generator.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from workload_generator import WorkloadGenerator, FLOW_DTYPE, write_scenario, read_scenario, pq
+from simulation_engine import SimulationEngine
+from flow_manager import FlowManager
+from topology_manager import TopologyManager
+from node import Node
+from link import Link
+from central_controller import CentralController
+from metrics_collector import MetricsCollector
+
+class TestWorkloadGenerator(unittest.TestCase):
+    """
+    WorkloadGeneratorクラスとシナリオファイルの読み書きのユニットテストクラス
+    """
+
+    def setUp(self):
+        """
+        スター型のトポロジ（中心1、葉2〜4）を設定
+        """
+        self.topology_manager = TopologyManager()
+        for node_id in (1, 2, 3, 4):
+            self.topology_manager.nodes[node_id] = Node(node_id=node_id)
+        for link_id, leaf in enumerate((2, 3, 4), start=1):
+            self.topology_manager.add_link(Link(link_id=link_id, capacity=1e6, delay=0.01, jitter=0.0,
+                                                connected_nodes=(1, leaf)))
+        self.generator = WorkloadGenerator(self.topology_manager, seed=1)
+
+    def test_arrivals_and_sizes(self):
+        """
+        到着モデル、日周変動、サイズの分布のテスト
+        """
+        times = self.generator.arrival_times(1000.0, {"type": "poisson", "rate": 100.0})
+        self.assertAlmostEqual(len(times) / 100000, 1.0, delta=0.02)
+        self.assertTrue((np.diff(times) >= 0).all())
+
+        # 状態ごとの滞在時間の比は遷移率の逆比（1:4）のため、平均到着率は 10*0.2 + 110*0.8 = 90
+        times = self.generator.arrival_times(5000.0, {"type": "mmpp", "rates": [10.0, 110.0], "switch_rates": [2.0, 0.5]})
+        self.assertAlmostEqual(len(times) / 5000 / 90, 1.0, delta=0.1)
+
+        # 周期の後半は倍率が0のため到着しない
+        times = self.generator.arrival_times(400.0, {"type": "poisson", "rate": 50.0}, diurnal=[1.0, 0.0], period=100.0)
+        self.assertTrue(len(times) > 0)
+        self.assertTrue((times % 100.0 < 50.0).all())
+
+        sizes = self.generator.flow_sizes(200000, {"type": "pareto", "alpha": 2.0, "minimum": 1500})
+        self.assertEqual(sizes.min(), 1500)
+        self.assertAlmostEqual(sizes.mean() / 3000, 1.0, delta=0.05)
+        sizes = self.generator.flow_sizes(1000, {"type": "lognormal", "mean": 5.0, "sigma": 1.0, "maximum": 10000})
+        self.assertTrue(((sizes >= 1500) & (sizes <= 10000)).all())
+
+        with self.assertRaises(ValueError):
+            self.generator.arrival_times(10.0, "weibull")
+        with self.assertRaises(ValueError):
+            self.generator.flow_sizes(10, {"type": "pareto", "alpha": 0})
+
+    def test_node_pairs(self):
+        """
+        送信元・送信先の選び方のテスト
+        """
+        for pairs in ("uniform", "gravity", {"type": "gravity", "weights": {1: 1.0, 2: 1.0}}):
+            with self.subTest(pairs=pairs):
+                sources, destinations = self.generator.node_pairs(10000, pairs)
+                self.assertFalse((sources == destinations).any())
+                self.assertTrue(set(np.unique(sources)) <= {1, 2, 3, 4})
+
+        # 中心ノードは隣接リンク数が3のため、葉の3倍の確率で送信元になる
+        sources, _ = self.generator.node_pairs(60000, "gravity")
+        self.assertAlmostEqual(np.count_nonzero(sources == 1) / np.count_nonzero(sources == 2), 3.0, delta=0.3)
+
+        sources, destinations = self.generator.node_pairs(10000, {"type": "matrix", "matrix": {2: {3: 3.0, 2: 5.0}, 4: {1: 1.0}}})
+        pairs = set(zip(sources.tolist(), destinations.tolist()))
+        self.assertEqual(pairs, {(2, 3), (4, 1)})
+        self.assertAlmostEqual(np.count_nonzero(sources == 2) / 10000, 0.75, delta=0.03)
+
+        with self.assertRaises(ValueError):
+            self.generator.node_pairs(10, {"type": "gravity", "weights": {1: 1.0}})
+
+    def test_scenario_files(self):
+        """
+        シナリオファイルの書き出しと、チャンクごとの読み込み、FlowManager への読み込みのテスト
+        """
+        flows = self.generator.generate(100.0, {"type": "poisson", "rate": 20.0}, size={"type": "constant", "value": 15000},
+                                        service_mix={"voice": 1.0, "data": 1.0}, first_flow_id=10)
+        self.assertEqual(flows.dtype, FLOW_DTYPE)
+        self.assertEqual(flows["flow_id"][0], 10)
+        self.assertTrue((np.diff(flows["start_time"]) >= 0).all())
+        self.assertEqual(set(flows["service_type"].tolist()), {b"voice", b"data"})
+
+        extensions = [".npy"] + ([".parquet"] if pq is not None else [])
+        with tempfile.TemporaryDirectory() as directory:
+            for extension in extensions:
+                with self.subTest(extension=extension):
+                    path = os.path.join(directory, "workload" + extension)
+                    write_scenario(path, flows)
+                    chunks = list(read_scenario(path, chunk_size=500))
+                    self.assertEqual(len(chunks), (len(flows) + 499) // 500)
+                    np.testing.assert_array_equal(np.concatenate(chunks), flows)
+
+                    simulation_engine = SimulationEngine()
+                    simulation_engine.initialize(1000.0)
+                    flow_manager = FlowManager(self.topology_manager, simulation_engine,
+                                               CentralController(self.topology_manager), MetricsCollector())
+                    flow_manager.generate_flows(flow_scenario=path)
+                    self.assertEqual(len(flow_manager.flows), len(flows))
+                    last = flows[-1]
+                    flow = flow_manager.flows[int(last["flow_id"])]
+                    self.assertEqual((flow.service_type, flow.flow_size, flow.source_node, flow.destination_node),
+                                     (last["service_type"].decode(), 15000, last["source_node"], last["destination_node"]))
+                    # シナリオの開始時刻にフロー開始イベントをスケジュールする
+                    flow_manager.schedule_flow_starts(simulation_engine)
+                    self.assertEqual(flow.start_time, last["start_time"])
+                    self.assertEqual(simulation_engine.peek_event().event_time, flows["start_time"][0])
+
+            with self.assertRaises(ValueError):
+                write_scenario(os.path.join(directory, "workload.csv"), flows)
+
+if __name__ == '__main__':
+    unittest.main()
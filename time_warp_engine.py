@@ -0,0 +1,474 @@
+# time_warp_engine.py
+
+import heapq
+import math
+from typing import Callable, Dict, List, Optional
+
+from partitioned_engine import LogicalProcess, PartitionedSimulationEngine
+from traffic_source import TrafficSource
+
+
+class PacketModelStateSaver:
+    """
+    パケット単位のモデルで、論理プロセスのイベントが変更する状態を保存・復元する
+
+    イベントを所有するノードについて、そのノードが送信側となる方向の送出待ち（Link.busy_until）と
+    ジッターの乱数列の状態を保存する。バッファ（スケジューラ・AQM・送信待ちの状態）はイベントが最初に変更する直前にのみ
+    コピーし（Node.state_observer による copy-on-write）、パケットの属性はバッファから取り出すパケットのみ保存する
+    （バッファ内のパケットの属性は取り出されるまで変更されない）。トラフィック生成器の状態は、
+    その生成器の送出イベント（TrafficSource.emit）の場合のみ保存する。
+    Link.current_load, transmitted_bytes, packet_loss_count はリンクの両端の論理プロセスが更新するため、
+    値ではなくイベントによる増分を保存し、復元時に差し引く（増分による状態保存）。
+
+    Note:
+        受信時に破棄したパケットの status はバッファの外にあるため復元しない。
+        メトリクスとトレースは確定時にのみ記録されるため、結果には影響しない。
+
+    Attributes:
+        topology_manager (TopologyManager): トポロジマネージャ
+        packet_manager (PacketManager): パケットマネージャ
+    """
+
+    PACKET_FIELDS = ("current_node_index", "status", "sent_time", "arrival_time")
+    LINK_COUNTERS = ("current_load", "transmitted_bytes", "packet_loss_count")
+
+    def __init__(self, topology_manager, packet_manager):
+        self.topology_manager = topology_manager
+        self.packet_manager = packet_manager
+        self._state: Optional[list] = None
+
+    def before_event(self, owner: int, event_function: Optional[Callable] = None) -> list:
+        """
+        イベントの実行前の状態を保存
+
+        Args:
+            owner (int): イベントを所有するノードID
+            event_function (Optional[Callable], optional): 実行するイベントの関数
+
+        Returns:
+            list: after_event と restore に渡す状態
+        """
+        node = self.topology_manager.get_node(owner)
+        if node is None:
+            return [owner, None, None, [], [], None]
+        links = []
+        jitter_states = self.packet_manager.jitter_states
+        for link_id in node.adjacent_links:
+            link = self.topology_manager.get_link(link_id)
+            links.append([link, link.busy_until.get(owner), jitter_states.get((link_id, owner)),
+                          [getattr(link, name) for name in self.LINK_COUNTERS]])
+        source = getattr(event_function, "__self__", None)
+        source = (source, source.save_state()) if isinstance(source, TrafficSource) else None
+        state = self._state = [owner, node, None, [], links, source]
+        node.state_observer = self
+        return state
+
+    def buffer_changing(self, node):
+        """
+        イベントが最初にバッファを変更する直前にバッファを保存（Node.state_observer から呼び出される）
+        """
+        if self._state[2] is None:
+            self._state[2] = node.save_state()
+
+    def packet_leaving(self, node, packet):
+        """
+        バッファから取り出すパケットの属性を保存（Node.state_observer から呼び出される）
+        """
+        self._state[3].append((packet, tuple(getattr(packet, name) for name in self.PACKET_FIELDS)))
+
+    def after_event(self, state: list):
+        """
+        イベントの実行後に、リンクのカウンタを増分に置き換える
+
+        Args:
+            state (list): before_event の戻り値
+        """
+        if state[1] is not None:
+            state[1].state_observer = None
+        self._state = None
+        for entry in state[4]:
+            link, before = entry[0], entry[3]
+            entry[3] = [getattr(link, name) - value for name, value in zip(self.LINK_COUNTERS, before)]
+
+    def restore(self, state: list):
+        """
+        イベントの実行前の状態に戻す
+
+        Args:
+            state (list): after_event を適用した before_event の戻り値
+        """
+        owner, node, node_state, packets, links, source = state
+        if node is None:
+            return
+        if node_state is not None:
+            node.restore_state(node_state)
+        for packet, values in reversed(packets):
+            for name, value in zip(self.PACKET_FIELDS, values):
+                setattr(packet, name, value)
+        jitter_states = self.packet_manager.jitter_states
+        for link, busy_until, jitter_state, deltas in links:
+            if busy_until is None:
+                link.busy_until.pop(owner, None)
+            else:
+                link.busy_until[owner] = busy_until
+            if jitter_state is None:
+                jitter_states.pop((link.link_id, owner), None)
+            else:
+                jitter_states[(link.link_id, owner)] = jitter_state
+            for name, delta in zip(self.LINK_COUNTERS, deltas):
+                setattr(link, name, getattr(link, name) - delta)
+        if source is not None:
+            source[0].restore_state(source[1])
+
+
+class ProcessedEvent:
+    """
+    実行済みで未確定のイベントの記録
+
+    Attributes:
+        entry (tuple): (時刻, キー, 関数)
+        counter (Optional[int]): 実行前の所有エンティティのイベントの通し番号
+        state: 状態の保存器が保存した実行前の状態
+        sent (List[tuple]): このイベントがスケジュールした (論理プロセス, エントリ) のリスト
+        outputs (List[Callable]): 確定時に実行する出力
+    """
+
+    __slots__ = ("entry", "counter", "state", "sent", "outputs")
+
+    def __init__(self, entry: tuple, counter: Optional[int], state):
+        self.entry = entry
+        self.counter = counter
+        self.state = state
+        self.sent: List[tuple] = []
+        self.outputs: List[Callable] = []
+
+
+class TimeWarpProcess(LogicalProcess):
+    """
+    楽観的に実行する論理プロセス
+
+    取り消したイベントはキューから取り除かず、(時刻, キー) を cancelled に記録して取り出す時に読み飛ばす。
+    取り消したイベントと同じ (時刻, キー) のイベントが再びスケジュールされた場合（巻き戻したイベントの再実行）は、
+    キューに加えずに cancelled の値とし、取り消したエントリの位置で実行する。
+
+    Attributes:
+        processed (List[ProcessedEvent]): 実行順の未確定のイベント
+        cancelled (Dict[tuple, Optional[tuple]]): 取り消したエントリの (時刻, キー) をキーとし、
+            代わりに実行するエントリ（ない場合None）を値とする辞書
+        events_executed (int): 巻き戻したものを含めて実行したイベント数
+    """
+
+    __slots__ = ("processed", "cancelled", "events_executed")
+
+    def __init__(self, index: int):
+        super().__init__(index)
+        self.processed: List[ProcessedEvent] = []
+        self.cancelled: Dict[tuple, Optional[tuple]] = {}
+        self.events_executed = 0
+
+    def push(self, entry: tuple):
+        """
+        エントリをキューに加える（同じ時刻とキーの取り消したエントリがあればその代わりとする）
+        """
+        key = entry[:2]
+        if key in self.cancelled:
+            self.cancelled[key] = entry
+        else:
+            heapq.heappush(self.queue, entry)
+
+    def cancel(self, entry: tuple):
+        """
+        キューにあるエントリを取り消す
+        """
+        self.cancelled[entry[:2]] = None
+
+    def discard_cancelled(self):
+        """
+        キューの先頭の取り消したエントリ（代わりのエントリがないもの）を取り除く
+        """
+        queue, cancelled = self.queue, self.cancelled
+        while cancelled and queue:
+            key = queue[0][:2]
+            if key not in cancelled or cancelled[key] is not None:
+                break
+            heapq.heappop(queue)
+            del cancelled[key]
+
+    def pop(self) -> tuple:
+        """
+        キューの先頭のエントリを取り出す（discard_cancelled の後に呼び出す）
+        """
+        entry = heapq.heappop(self.queue)
+        if self.cancelled:
+            entry = self.cancelled.pop(entry[:2], entry)
+        return entry
+
+    def peek_time(self) -> float:
+        self.discard_cancelled()
+        return super().peek_time()
+
+
+class TimeWarpSimulationEngine(PartitionedSimulationEngine):
+    """
+    Time Warp 方式の楽観的な並列離散イベントシミュレーションエンジン
+
+    各論理プロセスは他の区画からのイベントを待たずに自分のキューのイベントを実行し、実行前の状態を
+    state_saver で保存する。実行済みのイベントより前の時刻のイベント（straggler）が届いた場合は、
+    その時刻まで状態を巻き戻し、巻き戻したイベントがスケジュールしたイベントを取り消す（anti-message）。
+    GVT（未実行のイベントの最小時刻）より前のイベントは巻き戻されないため確定し、
+    保存した状態を破棄して遅らせていた出力（SimulationEngine.defer）を実行する（fossil collection）。
+
+    先読み時間が小さいトポロジでも窓に区切られずに実行できるが、巻き戻しの分だけ余分に実行する。
+    論理プロセスは同じプロセス内で batch_size 個ずつ順に実行するため、statistics() の
+    estimated_speedup は最も多く実行した論理プロセスのイベント数から見積もった並列実行時の速度向上である。
+
+    Attributes:
+        state_saver: 論理プロセスの状態の保存器（before_event(owner, event_function), after_event, restore を持つ）
+        batch_size (int): 論理プロセスを切り替えるまでに実行するイベント数
+        optimism_window (float): GVT からこの時間より先のイベントは実行しない
+        gvt (float): 直近に計算した GVT
+        events_executed (int): 巻き戻したものを含めて実行したイベント数
+        rollbacks (int): 巻き戻しの回数
+        rolled_back_events (int): 巻き戻したイベント数
+        anti_messages (int): 他の区画に送ったイベントの取り消し数
+        gvt_rounds (int): GVT を計算した回数
+        peak_saved_states (int): 同時に保持した実行前の状態の最大数
+    """
+
+    process_class = TimeWarpProcess
+
+    def __init__(self, partitions: int = 2, partition_method: str = "community", event_queue: str = "heap",
+                 batch_size: int = 64, optimism_window: float = math.inf, state_saver=None):
+        """
+        Args:
+            partitions (int, optional): 区画数の上限
+            partition_method (str, optional): 分割方法（"community" または "metis"）
+            event_queue (str, optional): 全体イベントのキューの種類
+            batch_size (int, optional): 論理プロセスを切り替えるまでに実行するイベント数
+            optimism_window (float, optional): GVT から先に実行してよい時間（デフォルトは無制限）
+            state_saver (optional): 状態の保存器（run の前に設定する）
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        if optimism_window <= 0:
+            raise ValueError("optimism_window must be positive")
+        self.batch_size = batch_size
+        self.optimism_window = optimism_window
+        self.state_saver = state_saver
+        super().__init__(partitions=partitions, partition_method=partition_method, event_queue=event_queue)
+
+    def _reset_statistics(self):
+        super()._reset_statistics()
+        self.gvt = 0.0
+        self.events_executed = 0
+        self.rollbacks = 0
+        self.rolled_back_events = 0
+        self.anti_messages = 0
+        self.gvt_rounds = 0
+        self.peak_saved_states = 0
+        self._record: Optional[ProcessedEvent] = None
+        self._last_time = 0.0
+        for logical_process in self.logical_processes:
+            logical_process.processed = []
+            logical_process.cancelled = {}
+            logical_process.events_executed = 0
+
+    def defer(self, output: Callable):
+        """
+        出力を実行中のイベントが確定するまで遅らせる（全体イベントの実行中は直ちに実行する）
+        """
+        if self._record is None:
+            output()
+        else:
+            self._record.outputs.append(output)
+
+    def schedule_event(self, event_time: float, event_function: Callable, parallel_safe: bool = False,
+                       owner: Optional[int] = None):
+        """
+        イベントのスケジューリング
+
+        他の区画の実行済みのイベントより前のイベントを送った場合は、宛先の論理プロセスを巻き戻す。
+
+        Raises:
+            RuntimeError: 論理プロセスのイベントが所有するノードのないイベントをスケジュールした場合
+        """
+        if not self.logical_processes:
+            raise RuntimeError("assign_partitions must be called before scheduling events")
+        entry = (event_time, self.event_key(owner), event_function)
+        record = self._record
+        if owner is None:
+            if record is not None:
+                raise RuntimeError("Events without an owner cannot be scheduled by optimistically executed events")
+            self.event_queue.push_keyed(*entry)
+            return
+        target = self.logical_processes[self.partition[owner]]
+        target.push(entry)
+        if record is not None:
+            record.sent.append((target, entry))
+            if target is not self._active:
+                self.messages += 1
+                processed = target.processed
+                if processed and processed[-1].entry[0] >= event_time:
+                    self._rollback(target, event_time, entry[1])
+
+    def run(self):
+        """
+        シミュレーションの開始
+
+        GVT の計算と fossil collection、全体イベントの実行、各論理プロセスの楽観的な実行を繰り返す。
+        """
+        if not self.logical_processes:
+            raise RuntimeError("assign_partitions must be called before run")
+        if self.state_saver is None:
+            raise RuntimeError("state_saver must be set before run")
+        global_queue = self.event_queue
+        end_time = self.simulation_end_time
+        while True:
+            gvt = min(global_queue.peek_time(),
+                      min(logical_process.peek_time() for logical_process in self.logical_processes))
+            self._fossil_collect(gvt)
+            if gvt > end_time:
+                break
+            global_time = global_queue.peek_time()
+            if global_time == gvt:
+                # GVT が全体イベントの時刻に達した時点で、それより前のイベントは全て確定している
+                self._run_global(global_time)
+                self._last_time = global_time
+                continue
+            limit = min(global_time, gvt + self.optimism_window, math.nextafter(end_time, math.inf))
+            for logical_process in self.logical_processes:
+                self._run_batch(logical_process, limit)
+            self.peak_saved_states = max(self.peak_saved_states,
+                                         sum(len(logical_process.processed) for logical_process in self.logical_processes))
+        self.current_time = self._last_time
+
+    def _run_batch(self, logical_process: TimeWarpProcess, limit: float):
+        """
+        論理プロセスのイベントを limit より前の時刻まで最大 batch_size 個実行
+        """
+        queue = logical_process.queue
+        state_saver = self.state_saver
+        counters = self._entity_counters
+        executed = 0
+        self._active = logical_process
+        try:
+            while executed < self.batch_size:
+                logical_process.discard_cancelled()
+                if not queue or queue[0][0] >= limit:
+                    break
+                entry = logical_process.pop()
+                owner = entry[1][3]
+                record = ProcessedEvent(entry, counters.get(owner), state_saver.before_event(owner, entry[2]))
+                self.current_time = entry[0]
+                self._current_owner = owner
+                self._record = record
+                entry[2]()
+                state_saver.after_event(record.state)
+                logical_process.processed.append(record)
+                executed += 1
+        finally:
+            self._active = None
+            self._record = None
+            self._current_owner = None
+        logical_process.events_executed += executed
+        self.events_executed += executed
+
+    def _rollback(self, logical_process: TimeWarpProcess, event_time: float, key: tuple):
+        """
+        (event_time, key) 以降の実行済みのイベントを実行順の逆に巻き戻す
+        """
+        processed = logical_process.processed
+        target = (event_time, key)
+        index = len(processed)
+        while index > 0 and processed[index - 1].entry[0] >= event_time:
+            index -= 1
+        while index < len(processed) and processed[index].entry[:2] < target:
+            index += 1
+        if index == len(processed):
+            return
+        self.rollbacks += 1
+        while len(processed) > index:
+            self._undo(logical_process, processed.pop())
+
+    def _undo(self, logical_process: TimeWarpProcess, record: ProcessedEvent):
+        """
+        1つのイベントを巻き戻し、キューに戻す
+        """
+        self.state_saver.restore(record.state)
+        owner = record.entry[1][3]
+        if record.counter is None:
+            self._entity_counters.pop(owner, None)
+        else:
+            self._entity_counters[owner] = record.counter
+        for target, entry in reversed(record.sent):
+            self._cancel(target, entry, target is not logical_process)
+        logical_process.push(record.entry)
+        self.rolled_back_events += 1
+
+    def _cancel(self, logical_process: TimeWarpProcess, entry: tuple, anti_message: bool):
+        """
+        スケジュール済みのイベントを取り消す（実行済みの場合は宛先を巻き戻してから取り消す）
+
+        実行済みかどうかは、そのイベントの時刻以降に実行したイベントのみを調べて判定する。
+        """
+        processed = logical_process.processed
+        index = len(processed) - 1
+        while index >= 0 and processed[index].entry[0] >= entry[0]:
+            if processed[index].entry is entry:
+                self._rollback(logical_process, entry[0], entry[1])
+                break
+            index -= 1
+        logical_process.cancel(entry)
+        if anti_message:
+            self.anti_messages += 1
+
+    def _fossil_collect(self, gvt: float):
+        """
+        GVT より前のイベントを確定し、遅らせていた出力を時刻とキーの順に実行
+        """
+        self.gvt = gvt
+        self.gvt_rounds += 1
+        batches = []
+        for logical_process in self.logical_processes:
+            processed = logical_process.processed
+            count = 0
+            while count < len(processed) and processed[count].entry[0] < gvt:
+                count += 1
+            if count:
+                batches.append(processed[:count])
+                del processed[:count]
+                logical_process.events_processed += count
+        for record in heapq.merge(*batches, key=lambda record: record.entry[:2]):
+            self.current_time = record.entry[0]
+            for output in record.outputs:
+                output()
+            self.events_processed += 1
+            self._last_time = max(self._last_time, self.current_time)
+
+    def statistics(self) -> Dict:
+        """
+        楽観的な実行の統計を取得
+
+        Returns:
+            Dict: 区画数、確定・実行・巻き戻したイベント数、巻き戻し率（巻き戻したイベント数 / 実行したイベント数）、
+                効率（確定したイベント数 / 実行したイベント数）、anti-message 数、保持した状態の最大数、
+                並列実行した場合の速度向上の見積もり（estimated_speedup）
+        """
+        busiest = max((logical_process.events_executed for logical_process in self.logical_processes), default=0)
+        executed = self.events_executed
+        return {
+            'partitions': len(self.logical_processes),
+            'events_processed': self.events_processed,
+            'events_executed': executed,
+            'global_events': self.global_events,
+            'messages': self.messages,
+            'rollbacks': self.rollbacks,
+            'rolled_back_events': self.rolled_back_events,
+            'anti_messages': self.anti_messages,
+            'rollback_rate': self.rolled_back_events / executed if executed else 0.0,
+            'efficiency': (self.events_processed - self.global_events) / executed if executed else 1.0,
+            'gvt_rounds': self.gvt_rounds,
+            'peak_saved_states': self.peak_saved_states,
+            'events_per_partition': [logical_process.events_processed for logical_process in self.logical_processes],
+            'estimated_speedup': self.events_processed / (busiest + self.global_events) if busiest else 1.0
+        }
@@ -0,0 +1,353 @@
+# topology_generator.py
+
+import argparse
+import time
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy がない環境では成分ごとに全ノード対の距離から最近傍を求める
+    cKDTree = None
+
+import yaml_loader
+from topology_io import DEFAULT_ATTRIBUTES, PROPAGATION_SPEED, topology_arrays, save_topology
+
+ATTRIBUTE_DISTRIBUTIONS = ("constant", "uniform", "choice", "normal", "lognormal")
+
+
+def sample_attribute(spec: Union[float, Dict], count: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    リンクの属性（容量・遅延・ジッター）を分布から生成
+
+    Args:
+        spec (Union[float, Dict]): 定数、または "type" とパラメータを持つ辞書
+            - {"type": "uniform", "low": 下限, "high": 上限}
+            - {"type": "choice", "values": 値のリスト, "weights": 重みのリスト（省略時は等確率）}
+            - {"type": "normal", "mean": 平均, "std": 標準偏差}（負の値は0にする）
+            - {"type": "lognormal", "mean": 対数の平均, "sigma": 対数の標準偏差}
+        count (int): リンク数
+        rng (np.random.Generator): 乱数生成器
+
+    Returns:
+        np.ndarray: 属性の値
+    """
+    if not isinstance(spec, dict):
+        return np.full(count, float(spec))
+    params = dict(spec)
+    name = params.pop("type")
+    if name == "constant":
+        return np.full(count, float(params["value"]))
+    if name == "uniform":
+        return rng.uniform(params["low"], params["high"], count)
+    if name == "choice":
+        weights = params.get("weights")
+        probabilities = None if weights is None else np.asarray(weights, dtype=np.float64) / np.sum(weights)
+        return rng.choice(np.asarray(params["values"], dtype=np.float64), size=count, p=probabilities)
+    if name == "normal":
+        return np.maximum(rng.normal(params["mean"], params["std"], count), 0.0)
+    if name == "lognormal":
+        return rng.lognormal(params["mean"], params["sigma"], count)
+    raise ValueError(f"Unknown attribute distribution: {name}")
+
+
+def fat_tree(k: int, hosts: bool = True) -> Tuple[int, np.ndarray, np.ndarray]:
+    """
+    k-ary fat-tree のリンクを生成
+
+    ノードIDはコアスイッチ（(k/2)^2 台）、ポッドごとの集約スイッチとエッジスイッチ（各 k/2 台）、
+    ホスト（エッジスイッチごとに k/2 台）の順に1から振る。
+
+    Args:
+        k (int): ポート数（偶数）
+        hosts (bool, optional): ホストを含める場合True
+
+    Returns:
+        Tuple[int, np.ndarray, np.ndarray]: ノード数と、リンクの両端のノードIDの配列
+    """
+    if k < 2 or k % 2:
+        raise ValueError("fat-tree requires an even k >= 2")
+    half = k // 2
+    cores = half * half
+    pod = np.arange(k)[:, None, None]
+    position = np.arange(half)
+    aggregation = 1 + cores + pod * k + position[None, :, None]  # (k, half, 1)
+    edge = 1 + cores + pod * k + half + position[None, None, :]  # (k, 1, half)
+
+    # コアスイッチ i*half+j は各ポッドの i 番目の集約スイッチに接続する
+    core_ids = 1 + np.arange(cores)
+    core_links = (np.broadcast_to(core_ids, (k, cores)), 1 + cores + np.arange(k)[:, None] * k + (core_ids[None, :] - 1) // half)
+    pod_links = np.broadcast_arrays(aggregation, edge)
+    node1 = [core_links[0].ravel(), pod_links[0].ravel()]
+    node2 = [core_links[1].ravel(), pod_links[1].ravel()]
+    switches = cores + k * k
+    count = switches
+    if hosts:
+        edge_ids = (1 + cores + np.arange(k)[:, None] * k + half + position[None, :]).ravel()
+        node1.append(np.repeat(edge_ids, half))
+        node2.append(switches + 1 + np.arange(len(edge_ids) * half))
+        count += len(edge_ids) * half
+    return count, np.concatenate(node1), np.concatenate(node2)
+
+
+def leaf_spine(leaves: int, spines: int, hosts_per_leaf: int = 0) -> Tuple[int, np.ndarray, np.ndarray]:
+    """
+    leaf-spine（2段の Clos）トポロジのリンクを生成
+
+    ノードIDはスパイン、リーフ、ホストの順に1から振り、全てのリーフを全てのスパインに接続する。
+
+    Args:
+        leaves (int): リーフスイッチ数
+        spines (int): スパインスイッチ数
+        hosts_per_leaf (int, optional): リーフごとのホスト数
+
+    Returns:
+        Tuple[int, np.ndarray, np.ndarray]: ノード数と、リンクの両端のノードIDの配列
+    """
+    if leaves < 1 or spines < 1 or hosts_per_leaf < 0:
+        raise ValueError("leaf-spine requires at least one leaf and one spine")
+    spine_ids = 1 + np.arange(spines)
+    leaf_ids = 1 + spines + np.arange(leaves)
+    node1 = [np.repeat(leaf_ids, spines)]
+    node2 = [np.tile(spine_ids, leaves)]
+    if hosts_per_leaf:
+        node1.append(np.repeat(leaf_ids, hosts_per_leaf))
+        node2.append(1 + spines + leaves + np.arange(leaves * hosts_per_leaf))
+    return spines + leaves * (1 + hosts_per_leaf), np.concatenate(node1), np.concatenate(node2)
+
+
+def torus(dimensions: Sequence[int]) -> Tuple[int, np.ndarray, np.ndarray]:
+    """
+    2次元または3次元のトーラスのリンクを生成
+
+    各ノードを各軸の前後のノードと接続する（軸の長さが2の場合は1本、1の場合は接続しない）。
+
+    Args:
+        dimensions (Sequence[int]): 各軸のノード数（例：[16, 16]、[8, 8, 8]）
+
+    Returns:
+        Tuple[int, np.ndarray, np.ndarray]: ノード数と、リンクの両端のノードIDの配列
+    """
+    dimensions = tuple(int(size) for size in dimensions)
+    if len(dimensions) not in (2, 3) or min(dimensions) < 1:
+        raise ValueError("torus requires 2 or 3 positive dimensions")
+    index = 1 + np.arange(int(np.prod(dimensions))).reshape(dimensions)
+    node1, node2 = [], []
+    for axis, size in enumerate(dimensions):
+        if size == 1:
+            continue
+        neighbor = np.roll(index, -1, axis=axis)
+        if size == 2:
+            # 前後のノードが同じため、片方向だけ接続する
+            first = np.take(index, [0], axis=axis)
+            node1.append(first.ravel())
+            node2.append(np.take(neighbor, [0], axis=axis).ravel())
+            continue
+        node1.append(index.ravel())
+        node2.append(neighbor.ravel())
+    if not node1:
+        return index.size, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return index.size, np.concatenate(node1), np.concatenate(node2)
+
+
+def barabasi_albert(nodes: int, m: int = 2, rng: Optional[np.random.Generator] = None) -> Tuple[int, np.ndarray, np.ndarray]:
+    """
+    Barabási–Albert モデル（優先的選択）のリンクを生成
+
+    m+1 ノードの完全グラフから始め、追加するノードごとに既存のノードを次数に比例した確率で m 個選んで接続する。
+
+    Args:
+        nodes (int): ノード数
+        m (int, optional): 追加するノードごとのリンク数
+        rng (Optional[np.random.Generator], optional): 乱数生成器
+
+    Returns:
+        Tuple[int, np.ndarray, np.ndarray]: ノード数と、リンクの両端のノードIDの配列
+    """
+    if m < 1 or nodes <= m:
+        raise ValueError("barabasi_albert requires 1 <= m < nodes")
+    rng = rng or np.random.default_rng()
+    seed_nodes = np.arange(m + 1)
+    first, second = np.triu_indices(m + 1, k=1)
+    count = len(first) + (nodes - m - 1) * m
+    node1 = np.empty(count, dtype=np.int64)
+    node2 = np.empty(count, dtype=np.int64)
+    node1[:len(first)], node2[:len(first)] = seed_nodes[first], seed_nodes[second]
+    # リンクの端点を並べた配列から一様に選ぶと、次数に比例した確率でノードを選べる
+    endpoints = np.empty(2 * count, dtype=np.int64)
+    endpoints[:len(first)], endpoints[len(first):2 * len(first)] = node1[:len(first)], node2[:len(first)]
+    filled, position = 2 * len(first), len(first)
+    for node in range(m + 1, nodes):
+        targets = set()
+        while len(targets) < m:
+            targets.update(endpoints[rng.integers(0, filled, m - len(targets))].tolist())
+        targets = sorted(targets)
+        node1[position:position + m] = node
+        node2[position:position + m] = targets
+        endpoints[filled:filled + m] = node
+        endpoints[filled + m:filled + 2 * m] = targets
+        filled += 2 * m
+        position += m
+    return nodes, node1 + 1, node2 + 1
+
+
+def waxman(nodes: int, alpha: float = 0.4, beta: float = 0.1, connected: bool = True,
+           rng: Optional[np.random.Generator] = None, chunk_size: int = 1 << 20) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Waxman モデルのリンクを生成
+
+    単位正方形に一様に配置したノードの各対を、確率 beta * exp(-d / (alpha * L)) で接続する
+    （d はノード間の距離、L は距離の最大値）。全ての対を判定する代わりに、確率 beta で選ばれる候補の対を
+    幾何分布の間隔で chunk_size 個ずつ生成し、候補を確率 exp(-d / (alpha * L)) で採用する。
+
+    Args:
+        nodes (int): ノード数
+        alpha (float, optional): 距離による減衰の大きさ
+        beta (float, optional): リンクの密度
+        connected (bool, optional): True の場合は孤立した連結成分を最も近い最大成分のノードに接続する
+        rng (Optional[np.random.Generator], optional): 乱数生成器
+        chunk_size (int, optional): 一度に生成する候補の対の数
+
+    Returns:
+        Tuple[int, np.ndarray, np.ndarray, np.ndarray]: ノード数、リンクの両端のノードIDの配列とリンクの長さ（単位正方形上の距離）
+    """
+    if nodes < 2 or not 0 < alpha or not 0 < beta <= 1:
+        raise ValueError("waxman requires nodes >= 2, alpha > 0 and 0 < beta <= 1")
+    rng = rng or np.random.default_rng()
+    points = rng.random((nodes, 2))
+    scale = alpha * np.linalg.norm(points.max(axis=0) - points.min(axis=0))
+    total = nodes * (nodes - 1) // 2
+    node1, node2 = [], []
+    position = -1
+    while position < total - 1:
+        # 上三角の対を行優先で並べた通し番号上で、候補の対の番号を生成
+        candidates = position + np.cumsum(rng.geometric(beta, chunk_size))
+        position = int(candidates[-1])
+        candidates = candidates[candidates < total]
+        first = nodes - 2 - np.floor((np.sqrt(4.0 * nodes * (nodes - 1) - 8.0 * candidates - 7) - 1) / 2).astype(np.int64)
+        second = candidates + first + 1 - total + (nodes - first) * (nodes - first - 1) // 2
+        distances = np.linalg.norm(points[first] - points[second], axis=1)
+        accepted = rng.random(len(candidates)) < np.exp(-distances / scale)
+        node1.append(first[accepted])
+        node2.append(second[accepted])
+    node1, node2 = np.concatenate(node1), np.concatenate(node2)
+    if connected:
+        extra1, extra2 = _connect_components(nodes, node1, node2, points)
+        node1, node2 = np.concatenate([node1, extra1]), np.concatenate([node2, extra2])
+    lengths = np.linalg.norm(points[node1] - points[node2], axis=1)
+    return nodes, node1 + 1, node2 + 1, lengths
+
+
+def _connect_components(nodes: int, node1: np.ndarray, node2: np.ndarray, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # Union-Find で連結成分を求め、最大成分以外の各成分から最も近い最大成分のノードへリンクを追加する
+    parent = list(range(nodes))
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for a, b in zip(node1.tolist(), node2.tolist()):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_a] = root_b
+    roots = np.asarray([find(node) for node in range(nodes)])
+    labels, sizes = np.unique(roots, return_counts=True)
+    if len(labels) == 1:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    main_label = labels[np.argmax(sizes)]
+    main = np.flatnonzero(roots == main_label)
+    if cKDTree is not None:
+        # 最大成分以外の全ノードの最近傍を一括で求め、成分ごとに距離が最小のノードを選ぶ
+        others = np.flatnonzero(roots != main_label)
+        distances, targets = cKDTree(points[main]).query(points[others])
+        order = np.lexsort((distances, roots[others]))
+        _, first = np.unique(roots[others][order], return_index=True)
+        chosen = order[first]
+        return others[chosen].astype(np.int64), main[targets[chosen]].astype(np.int64)
+    extra1, extra2 = [], []
+    for label in labels:
+        if label == main_label:
+            continue
+        members = np.flatnonzero(roots == label)
+        distances = ((points[members, None, :] - points[None, main, :]) ** 2).sum(axis=2)
+        member, target = np.unravel_index(np.argmin(distances), distances.shape)
+        extra1.append(members[member])
+        extra2.append(main[target])
+    return np.asarray(extra1, dtype=np.int64), np.asarray(extra2, dtype=np.int64)
+
+
+TOPOLOGY_GENERATORS = ("fat_tree", "leaf_spine", "waxman", "barabasi_albert", "torus")
+
+
+def generate_topology(spec: Dict, seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    トポロジを生成し、topology_io の配列表現で取得
+
+    TopologyManager.load_arrays でそのまま読み込むか、topology_io.save_topology で .npz に保存して
+    TopologyManager.load_topology で読み込む。
+
+    Args:
+        spec (Dict): "type"（TOPOLOGY_GENERATORS のいずれか）と生成関数の引数に加えて、次のリンク・ノードの属性を持つ辞書
+            - capacity, delay, jitter: 定数または分布（sample_attribute を参照）。waxman の delay に "distance" を
+              指定した場合は、単位正方形を region_size（m、デフォルト1000km）四方とした伝搬遅延
+            - buffer_size: ノードのバッファサイズ（バイト）
+        seed (Optional[int], optional): 乱数のシード
+
+    Returns:
+        Dict[str, np.ndarray]: トポロジの配列表現
+    """
+    params = dict(spec)
+    name = params.pop("type")
+    attributes = {key: params.pop(key, DEFAULT_ATTRIBUTES[key]) for key in ("capacity", "delay", "jitter", "buffer_size")}
+    region_size = params.pop("region_size", 1e6)
+    rng = np.random.default_rng(seed)
+    lengths = None
+    if name == "fat_tree":
+        count, node1, node2 = fat_tree(**params)
+    elif name == "leaf_spine":
+        count, node1, node2 = leaf_spine(**params)
+    elif name == "torus":
+        count, node1, node2 = torus(**params)
+    elif name == "barabasi_albert":
+        count, node1, node2 = barabasi_albert(rng=rng, **params)
+    elif name == "waxman":
+        count, node1, node2, lengths = waxman(rng=rng, **params)
+    else:
+        raise ValueError(f"Unknown topology generator: {name}")
+
+    links = {"node1": node1, "node2": node2}
+    for key in ("capacity", "delay", "jitter"):
+        if key == "delay" and attributes[key] == "distance":
+            if lengths is None:
+                raise ValueError("delay 'distance' is only available for waxman topologies")
+            links[key] = lengths * region_size / PROPAGATION_SPEED
+        else:
+            links[key] = sample_attribute(attributes[key], len(node1), rng)
+    return topology_arrays(np.arange(1, count + 1), links, buffer_sizes=np.full(count, attributes["buffer_size"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="合成トポロジを生成して .npz ファイルに保存する")
+    parser.add_argument('type', choices=TOPOLOGY_GENERATORS)
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=VALUE',
+                        help='生成関数の引数またはリンクの属性（値はYAMLとして解釈、例: k=8, capacity="{type: uniform, low: 1e8, high: 1e9}"）')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', required=True, help='出力ファイル（.npz）')
+    args = parser.parse_args()
+
+    spec = {"type": args.type}
+    for parameter in args.param:
+        name, _, value = parameter.partition('=')
+        spec[name] = yaml_loader.safe_load(value)
+    start = time.perf_counter()
+    arrays = generate_topology(spec, args.seed)
+    save_topology(args.output, arrays)
+    print(f"{len(arrays['node_id'])} nodes, {len(arrays['link_id'])} links written to {args.output} "
+          f"in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,386 @@
+# topology_io.py
+
+import hashlib
+import json
+import math
+import os
+import re
+import tempfile
+import xml.etree.ElementTree as ElementTree
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import yaml_loader
+
+# ファイルの拡張子ごとのトポロジの形式
+TOPOLOGY_FORMATS = {
+    ".yaml": "yaml", ".yml": "yaml",
+    ".graphml": "graphml",
+    ".csv": "edge_list",
+    ".cch": "rocketfuel",
+    ".npz": "arrays",
+}
+
+# トポロジの配列表現（ノードとリンクの属性ごとの配列）の列
+NODE_COLUMNS = ("node_id", "buffer_size")
+LINK_COLUMNS = ("link_id", "node1", "node2", "capacity", "delay", "jitter", "queue_limit")
+
+# ファイルに指定がない属性の値
+DEFAULT_ATTRIBUTES = {"buffer_size": 1000000, "capacity": 1e9, "delay": 0.001, "jitter": 0.0}
+
+# 緯度・経度から伝搬遅延を求める場合の光ファイバ中の伝搬速度（m/s）と地球の半径（m）
+PROPAGATION_SPEED = 2e8
+EARTH_RADIUS = 6371e3
+
+# キャッシュの形式を変更した場合に増やす
+CACHE_VERSION = 1
+
+# GraphML の属性名（小文字）とトポロジの属性の対応（Topology Zoo の属性名を含む）
+_GRAPHML_LINK_ATTRIBUTES = {
+    "capacity": "capacity", "bandwidth": "capacity", "linkspeedraw": "capacity",
+    "delay": "delay", "latency": "delay",
+    "jitter": "jitter",
+    "queue_limit": "queue_limit",
+}
+_GRAPHML_NODE_ATTRIBUTES = {"buffer_size": "buffer_size", "latitude": "latitude", "longitude": "longitude"}
+
+
+def topology_format(path: str) -> str:
+    """
+    ファイルの拡張子からトポロジの形式を取得
+
+    Args:
+        path (str): トポロジファイルのパス
+
+    Returns:
+        str: "yaml", "graphml", "edge_list", "rocketfuel" または "arrays"
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in TOPOLOGY_FORMATS:
+        raise ValueError(f"Unknown topology format: {path}")
+    return TOPOLOGY_FORMATS[extension]
+
+
+def topology_arrays(node_ids, links: Dict[str, object], defaults: Optional[Dict] = None,
+                    buffer_sizes=None, node_options: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    ノードとリンクの属性の列からトポロジの配列表現を生成
+
+    Args:
+        node_ids: ノードIDの列
+        links (Dict[str, object]): LINK_COLUMNS をキーとするリンクの属性の列（link_id を省略した場合は1からの連番、
+            capacity, delay, jitter の NaN と省略は defaults の値、queue_limit の NaN と省略は上限なし）
+        defaults (Optional[Dict], optional): 指定がない属性の値（DEFAULT_ATTRIBUTES を上書き）
+        buffer_sizes (optional): ノードのバッファサイズの列（省略時は defaults の値）
+        node_options (Optional[List[str]], optional): ノードごとのスケジューラ・AQMの指定（JSON文字列、指定なしは空文字列）
+
+    Returns:
+        Dict[str, np.ndarray]: NODE_COLUMNS と LINK_COLUMNS（と node_options）をキーとする配列
+    """
+    defaults = {**DEFAULT_ATTRIBUTES, **(defaults or {})}
+    node_ids = np.asarray(node_ids, dtype=np.int64)
+    arrays = {
+        "node_id": node_ids,
+        "buffer_size": np.full(len(node_ids), defaults["buffer_size"], dtype=np.int64) if buffer_sizes is None
+        else np.asarray(buffer_sizes, dtype=np.int64),
+    }
+    count = len(links["node1"])
+    for name in LINK_COLUMNS:
+        column = links.get(name)
+        if name == "link_id":
+            arrays[name] = np.arange(1, count + 1, dtype=np.int64) if column is None else np.asarray(column, dtype=np.int64)
+        elif name in ("node1", "node2"):
+            arrays[name] = np.asarray(column, dtype=np.int64)
+        else:
+            values = np.full(count, np.nan) if column is None else np.asarray(column, dtype=np.float64)
+            if name in defaults:
+                values = np.where(np.isnan(values), defaults[name], values)
+            arrays[name] = values
+    if node_options is not None and any(node_options):
+        arrays["node_options"] = np.asarray(node_options, dtype=str)
+    return arrays
+
+
+def _yaml_arrays(path: str, defaults: Optional[Dict]) -> Dict[str, np.ndarray]:
+    with open(path, 'r', encoding='utf-8') as file:
+        topology_data = yaml_loader.safe_load(file) or {}
+    defaults = {**DEFAULT_ATTRIBUTES, **(defaults or {})}
+    nodes = topology_data.get('nodes', [])
+    options = [json.dumps({key: node[key] for key in ('scheduler', 'aqm') if node.get(key) is not None}, sort_keys=True)
+               if node.get('scheduler') is not None or node.get('aqm') is not None else "" for node in nodes]
+    links = topology_data.get('links', [])
+    columns = {
+        "link_id": [link['id'] for link in links],
+        "node1": [link['node1'] for link in links],
+        "node2": [link['node2'] for link in links],
+    }
+    for name in ("capacity", "delay", "jitter", "queue_limit"):
+        columns[name] = [math.nan if link.get(name) is None else link[name] for link in links]
+    return topology_arrays([node['id'] for node in nodes], columns, defaults,
+                           buffer_sizes=[node.get('buffer_size', defaults["buffer_size"]) for node in nodes],
+                           node_options=options)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _numeric_ids(names: List[str]) -> Dict[str, int]:
+    # 全てのIDが整数として読める場合はそのまま、そうでない場合は出現順に1からの番号を振る
+    try:
+        return {name: int(name) for name in names}
+    except ValueError:
+        return {name: index for index, name in enumerate(names, start=1)}
+
+
+def read_graphml(path: str, defaults: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+    """
+    GraphML（Topology Zoo を含む）のトポロジを読み込む
+
+    リンクの属性は capacity/bandwidth/LinkSpeedRaw（bps）、delay/latency（秒）、jitter（秒）、queue_limit（バイト）、
+    ノードの属性は buffer_size（バイト）を使用する。遅延の指定がないリンクは、両端ノードに
+    Latitude/Longitude がある場合は大円距離の伝搬遅延とする。
+
+    Args:
+        path (str): GraphML ファイルのパス
+        defaults (Optional[Dict], optional): 指定がない属性の値
+
+    Returns:
+        Dict[str, np.ndarray]: トポロジの配列表現
+    """
+    keys: Dict[str, str] = {}
+    node_names: List[str] = []
+    node_data: Dict[str, Dict[str, float]] = {}
+    edges: List[tuple] = []
+    for _, element in ElementTree.iterparse(path, events=("end",)):
+        tag = _local_name(element.tag)
+        if tag == "key":
+            keys[element.get("id")] = element.get("attr.name", element.get("id")).lower()
+        elif tag == "node":
+            name = element.get("id")
+            node_names.append(name)
+            data = {}
+            for child in element:
+                attribute = _GRAPHML_NODE_ATTRIBUTES.get(keys.get(child.get("key"), ""))
+                if attribute and child.text:
+                    data[attribute] = float(child.text)
+            node_data[name] = data
+            element.clear()
+        elif tag == "edge":
+            data = {}
+            for child in element:
+                attribute = _GRAPHML_LINK_ATTRIBUTES.get(keys.get(child.get("key"), ""))
+                if attribute and child.text:
+                    data[attribute] = float(child.text)
+            edges.append((element.get("source"), element.get("target"), element.get("id"), data))
+            element.clear()
+
+    ids = _numeric_ids(node_names)
+    columns = {
+        "node1": [ids[source] for source, _, _, _ in edges],
+        "node2": [ids[target] for _, target, _, _ in edges],
+    }
+    edge_ids = [edge_id for _, _, edge_id, _ in edges]
+    if all(edge_id is not None for edge_id in edge_ids):
+        try:
+            columns["link_id"] = [int(edge_id) for edge_id in edge_ids]
+        except ValueError:
+            pass
+    for name in ("capacity", "delay", "jitter", "queue_limit"):
+        columns[name] = np.asarray([data.get(name, math.nan) for _, _, _, data in edges], dtype=np.float64)
+
+    # 遅延の指定がないリンクは緯度・経度から伝搬遅延を求める
+    coordinates = np.asarray([(node_data[name].get("latitude", math.nan), node_data[name].get("longitude", math.nan))
+                              for name in node_names], dtype=np.float64).reshape(-1, 2)
+    position = {name: index for index, name in enumerate(node_names)}
+    sources = np.asarray([position[source] for source, _, _, _ in edges], dtype=np.int64)
+    targets = np.asarray([position[target] for _, target, _, _ in edges], dtype=np.int64)
+    if len(edges):
+        geographic = great_circle_delay(coordinates[sources], coordinates[targets])
+        missing = np.isnan(columns["delay"])
+        columns["delay"][missing] = geographic[missing]
+
+    buffer_sizes = None
+    if any("buffer_size" in node_data[name] for name in node_names):
+        default_buffer = {**DEFAULT_ATTRIBUTES, **(defaults or {})}["buffer_size"]
+        buffer_sizes = [node_data[name].get("buffer_size", default_buffer) for name in node_names]
+    return topology_arrays([ids[name] for name in node_names], columns, defaults, buffer_sizes=buffer_sizes)
+
+
+def great_circle_delay(origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+    """
+    緯度・経度（度）の組の間の大円距離を光ファイバ中で伝搬する遅延を計算
+
+    Args:
+        origins (np.ndarray): (緯度, 経度) の配列
+        destinations (np.ndarray): (緯度, 経度) の配列
+
+    Returns:
+        np.ndarray: 伝搬遅延（秒）。座標がない組は NaN
+    """
+    latitude1, longitude1 = np.radians(origins[:, 0]), np.radians(origins[:, 1])
+    latitude2, longitude2 = np.radians(destinations[:, 0]), np.radians(destinations[:, 1])
+    haversine = (np.sin((latitude2 - latitude1) / 2) ** 2
+                 + np.cos(latitude1) * np.cos(latitude2) * np.sin((longitude2 - longitude1) / 2) ** 2)
+    distance = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.clip(haversine, 0.0, 1.0)))
+    return distance / PROPAGATION_SPEED
+
+
+def read_edge_list(path: str, defaults: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+    """
+    ヘッダ付きのエッジリストCSVのトポロジを読み込む
+
+    node1, node2（または source, target）の列が必須で、id, capacity, delay, jitter, queue_limit の列は省略できる。
+    ノードはリンクの両端のノードIDから作成する。
+
+    Args:
+        path (str): CSVファイルのパス
+        defaults (Optional[Dict], optional): 指定がない属性の値
+
+    Returns:
+        Dict[str, np.ndarray]: トポロジの配列表現
+    """
+    table = pd.read_csv(path)
+    table.columns = [column.strip().lower() for column in table.columns]
+    table = table.rename(columns={"source": "node1", "target": "node2", "id": "link_id"})
+    if "node1" not in table or "node2" not in table:
+        raise ValueError("Edge list requires node1/node2 (or source/target) columns")
+    columns = {name: table[name].to_numpy() for name in LINK_COLUMNS if name in table}
+    node_ids = np.unique(np.concatenate([columns["node1"], columns["node2"]]).astype(np.int64))
+    return topology_arrays(node_ids, columns, defaults)
+
+
+_ROCKETFUEL_LINE = re.compile(r"^\s*(-?\d+)\s")
+_ROCKETFUEL_NEIGHBOR = re.compile(r"<(\d+)>")
+
+
+def read_rocketfuel(path: str, defaults: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+    """
+    Rocketfuel の ISP マップ（.cch）のトポロジを読み込む
+
+    各行のルータID（uid）と、<uid> で示される内部の隣接ルータをリンクとする。外部のルータ（負の uid）の行は使用しない。
+    Rocketfuel のマップは容量と遅延を含まないため、リンクの属性は defaults の値とする。
+
+    Args:
+        path (str): .cch ファイルのパス
+        defaults (Optional[Dict], optional): リンクの属性の値
+
+    Returns:
+        Dict[str, np.ndarray]: トポロジの配列表現
+    """
+    node_ids = set()
+    pairs = set()
+    with open(path, 'r', encoding='utf-8', errors='replace') as file:
+        for line in file:
+            match = _ROCKETFUEL_LINE.match(line)
+            if match is None:
+                continue
+            uid = int(match.group(1))
+            if uid < 0:
+                continue
+            node_ids.add(uid)
+            for neighbor in _ROCKETFUEL_NEIGHBOR.findall(line.split("->", 1)[-1]):
+                neighbor = int(neighbor)
+                node_ids.add(neighbor)
+                if neighbor != uid:
+                    pairs.add((min(uid, neighbor), max(uid, neighbor)))
+    pairs = sorted(pairs)
+    return topology_arrays(sorted(node_ids), {"node1": [pair[0] for pair in pairs], "node2": [pair[1] for pair in pairs]},
+                           defaults)
+
+
+def save_topology(path: str, arrays: Dict[str, np.ndarray]):
+    """
+    トポロジの配列表現を .npz ファイルに保存（別のプロセスが読み込み中でも壊れないよう置き換えで書き出す）
+
+    Args:
+        path (str): 保存先のパス
+        arrays (Dict[str, np.ndarray]): トポロジの配列表現
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".npz")
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def load_arrays(path: str) -> Dict[str, np.ndarray]:
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
+
+
+def read_topology(path: str, defaults: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+    """
+    トポロジファイルを形式に応じて読み込む
+
+    Args:
+        path (str): トポロジファイルのパス（.yaml, .graphml, .csv, .cch, .npz）
+        defaults (Optional[Dict], optional): 指定がない属性の値
+
+    Returns:
+        Dict[str, np.ndarray]: トポロジの配列表現
+    """
+    file_format = topology_format(path)
+    if file_format == "yaml":
+        return _yaml_arrays(path, defaults)
+    if file_format == "graphml":
+        return read_graphml(path, defaults)
+    if file_format == "edge_list":
+        return read_edge_list(path, defaults)
+    if file_format == "rocketfuel":
+        return read_rocketfuel(path, defaults)
+    arrays = load_arrays(path)
+    arrays.pop("source", None)
+    arrays.pop("source_hash", None)
+    return arrays
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_topology_cached(path: str, cache_dir: str, defaults: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+    """
+    トポロジファイルを読み込み、配列表現を .npz のキャッシュに保存する
+
+    キャッシュはファイルのパスと defaults ごとに作り、ファイルの更新時刻とサイズが保存時と同じ場合は
+    そのまま使用する。異なる場合は内容のハッシュを比較し、内容が同じであればキャッシュを使用する。
+
+    Args:
+        path (str): トポロジファイルのパス
+        cache_dir (str): キャッシュの保存先のディレクトリ
+        defaults (Optional[Dict], optional): 指定がない属性の値
+
+    Returns:
+        Dict[str, np.ndarray]: トポロジの配列表現
+    """
+    key = hashlib.sha256(json.dumps([CACHE_VERSION, os.path.abspath(path), defaults], sort_keys=True).encode()).hexdigest()
+    cache_file = os.path.join(cache_dir, key[:32] + ".npz")
+    stat = os.stat(path)
+    source = np.asarray([stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+    source_hash = None
+    if os.path.exists(cache_file):
+        arrays = load_arrays(cache_file)
+        cached_source, cached_hash = arrays.pop("source"), str(arrays.pop("source_hash"))
+        if np.array_equal(cached_source, source):
+            return arrays
+        source_hash = file_hash(path)
+        if source_hash == cached_hash:
+            # 内容は同じため、更新時刻だけを更新する
+            save_topology(cache_file, {**arrays, "source": source, "source_hash": np.asarray(source_hash)})
+            return arrays
+    arrays = read_topology(path, defaults)
+    save_topology(cache_file, {**arrays, "source": source,
+                               "source_hash": np.asarray(source_hash or file_hash(path))})
+    return arrays
@@ -1,9 +1,87 @@
 # topology_manager.py
 
-import yaml
-from typing import Dict, List, Optional
+import json
+import math
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from node import Node
 from link import Link
+from topology_io import LINK_COLUMNS, read_topology, read_topology_cached
+
+LINK_SELECTION_POLICIES = ("lowest_load", "lowest_delay", "ecmp")
+
+class LinkTable(dict):
+    """
+    リンクIDをキーとするリンクの辞書に、ノード対からリンクIDへの索引を持たせたもの
+
+    要素の追加・削除のたびに索引を更新するため、辞書を直接操作しても索引と食い違わない。
+    """
+
+    def __init__(self, links: Optional[Dict[int, Link]] = None):
+        super().__init__()
+        # (ノード1, ノード2) をキーとするリンクIDのリスト（両方向を登録）
+        self._index: Dict[Tuple[int, int], List[int]] = {}
+        if links:
+            self.update(links)
+
+    def __setitem__(self, link_id: int, link: Link):
+        if link_id in self:
+            self._unindex(link_id, super().__getitem__(link_id))
+        super().__setitem__(link_id, link)
+        node1_id, node2_id = link.connected_nodes
+        self._index.setdefault((node1_id, node2_id), []).append(link_id)
+        if node1_id != node2_id:
+            self._index.setdefault((node2_id, node1_id), []).append(link_id)
+
+    def __delitem__(self, link_id: int):
+        self._unindex(link_id, super().__getitem__(link_id))
+        super().__delitem__(link_id)
+
+    def _unindex(self, link_id: int, link: Link):
+        node1_id, node2_id = link.connected_nodes
+        for key in ((node1_id, node2_id), (node2_id, node1_id)):
+            link_ids = self._index.get(key)
+            if link_ids and link_id in link_ids:
+                link_ids.remove(link_id)
+                if not link_ids:
+                    del self._index[key]
+
+    def update(self, *args, **kwargs):
+        for link_id, link in dict(*args, **kwargs).items():
+            self[link_id] = link
+
+    def setdefault(self, link_id: int, link: Optional[Link] = None) -> Link:
+        if link_id not in self:
+            self[link_id] = link
+        return self[link_id]
+
+    def pop(self, link_id: int, *default):
+        if link_id not in self:
+            if default:
+                return default[0]
+            raise KeyError(link_id)
+        link = self[link_id]
+        del self[link_id]
+        return link
+
+    def popitem(self):
+        link_id, link = super().popitem()
+        self._unindex(link_id, link)
+        return link_id, link
+
+    def clear(self):
+        super().clear()
+        self._index.clear()
+
+    def __reduce__(self):
+        # 既定の復元は __init__ の前に __setitem__ を呼び出すため、リンクの辞書から作り直して索引も再構築する
+        return self.__class__, (dict(self),)
+
+    def ids_between(self, node1_id: int, node2_id: int) -> List[int]:
+        """
+        2つのノード間のリンクIDのリストを取得（O(1)）
+        """
+        return self._index.get((node1_id, node2_id), [])
 
 class TopologyManager:
     """
@@ -11,45 +89,100 @@ class TopologyManager:
 
     Attributes:
         nodes (Dict[int, Node]): ノードIDをキーとするノードの辞書
-        links (Dict[int, Link]): リンクIDをキーとするリンクの辞書
+        links (LinkTable): リンクIDをキーとするリンクの辞書（ノード対の索引付き）
+        link_selection (str): 並行リンクの選択方針（"lowest_load", "lowest_delay", "ecmp"）
     """
 
-    def __init__(self):
+    def __init__(self, link_selection: str = "lowest_load"):
         """
         トポロジマネージャの初期化
+
+        Args:
+            link_selection (str, optional): 並行リンクの選択方針（デフォルトは "lowest_load"）
         """
+        if link_selection not in LINK_SELECTION_POLICIES:
+            raise ValueError(f"Unknown link selection policy: {link_selection}")
+        self.link_selection = link_selection
         self.nodes: Dict[int, Node] = {}
-        self.links: Dict[int, Link] = {}
+        self.links = LinkTable()
+
+    @property
+    def links(self) -> LinkTable:
+        return self._links
 
-    def load_topology(self, yaml_file: str):
+    @links.setter
+    def links(self, links: Dict[int, Link]):
+        # 通常の辞書が代入された場合も索引付きの辞書に変換する
+        self._links = links if isinstance(links, LinkTable) else LinkTable(links)
+
+    def add_link(self, link: Link):
         """
-        YAMLファイルからトポロジを読み込む
+        リンクを追加し、両端ノードの隣接リンクを更新
 
         Args:
-            yaml_file (str): トポロジ定義のYAMLファイルパス
+            link (Link): 追加するリンク
+        """
+        self._links[link.link_id] = link
+        for node_id in set(link.connected_nodes):
+            node = self.nodes.get(node_id)
+            if node is not None:
+                node.adjacent_links.append(link.link_id)
+
+    def remove_link(self, link_id: int) -> Optional[Link]:
         """
-        with open(yaml_file, 'r', encoding='utf-8') as file:
-            topology_data = yaml.safe_load(file)
+        リンクを削除し、両端ノードの隣接リンクを更新
 
+        Args:
+            link_id (int): 削除するリンクのID
+
+        Returns:
+            Optional[Link]: 削除したリンク、存在しない場合None
+        """
+        link = self._links.pop(link_id, None)
+        if link is None:
+            return None
+        for node_id in set(link.connected_nodes):
+            node = self.nodes.get(node_id)
+            if node is not None and link_id in node.adjacent_links:
+                node.adjacent_links.remove(link_id)
+        return link
+
+    def load_topology(self, topology_file: str, cache_dir: Optional[str] = None, defaults: Optional[Dict] = None):
+        """
+        ファイルからトポロジを読み込む
+
+        Args:
+            topology_file (str): トポロジファイルのパス（YAML、GraphML、エッジリストCSV、Rocketfuel の .cch、
+                または save_topology で保存した .npz）
+            cache_dir (Optional[str], optional): 指定した場合は読み込んだトポロジを .npz のキャッシュに保存し、
+                次回からはファイルが更新されていなければキャッシュから読み込む
+            defaults (Optional[Dict], optional): ファイルに指定がない属性（buffer_size, capacity, delay, jitter）の値
+        """
+        if cache_dir is not None:
+            arrays = read_topology_cached(topology_file, cache_dir, defaults)
+        else:
+            arrays = read_topology(topology_file, defaults)
+        self.load_arrays(arrays)
+
+    def load_arrays(self, arrays: Dict[str, np.ndarray]):
+        """
+        トポロジの配列表現（topology_io）からノードとリンクをまとめて追加
+
+        Args:
+            arrays (Dict[str, np.ndarray]): ノードとリンクの属性ごとの配列
+        """
         # ノードの読み込み
-        for node_data in topology_data.get('nodes', []):
-            node = Node(node_id=node_data['id'])
-            self.nodes[node.node_id] = node
-
-        # リンクの読み込み
-        for link_data in topology_data.get('links', []):
-            link = Link(
-                link_id=link_data['id'],
-                capacity=link_data['capacity'],
-                delay=link_data['delay'],
-                jitter=link_data['jitter'],
-                connected_nodes=(link_data['node1'], link_data['node2'])
-            )
-            self.links[link.link_id] = link
-
-            # 隣接リンクの設定
-            self.nodes[link.connected_nodes[0]].adjacent_links.append(link.link_id)
-            self.nodes[link.connected_nodes[1]].adjacent_links.append(link.link_id)
+        options = arrays.get('node_options')
+        options = options.tolist() if options is not None else None
+        for index, (node_id, buffer_size) in enumerate(zip(arrays['node_id'].tolist(), arrays['buffer_size'].tolist())):
+            extra = json.loads(options[index]) if options and options[index] else {}
+            self.nodes[node_id] = Node(node_id=node_id, buffer_size=buffer_size, **extra)
+
+        # リンクの読み込み（隣接リンクと索引も設定される）
+        for link_id, node1, node2, capacity, delay, jitter, queue_limit in zip(
+                *(arrays[name].tolist() for name in LINK_COLUMNS)):
+            self.add_link(Link(link_id=link_id, capacity=capacity, delay=delay, jitter=jitter, connected_nodes=(node1, node2),
+                               queue_limit=None if math.isnan(queue_limit) else int(queue_limit)))
 
     def get_node(self, node_id: int) -> Optional[Node]:
         """
@@ -63,6 +196,50 @@ class TopologyManager:
         """
         return self.nodes.get(node_id)
 
+    def links_between(self, node1_id: int, node2_id: int) -> List[Link]:
+        """
+        2つのノード間のリンクを全て取得（状態は問わない）
+
+        Args:
+            node1_id (int): ノード1のID
+            node2_id (int): ノード2のID
+
+        Returns:
+            List[Link]: リンクのリスト
+        """
+        links = self._links
+        return [links[link_id] for link_id in links.ids_between(node1_id, node2_id)]
+
+    def select_link(self, node1_id: int, node2_id: int, flow_id: Optional[int] = None) -> Optional[Link]:
+        """
+        2つのノード間の稼働中のリンクを選択方針に従って1つ選ぶ
+
+        Args:
+            node1_id (int): ノード1のID
+            node2_id (int): ノード2のID
+            flow_id (Optional[int], optional): フローID（"ecmp" でのハッシュに使用）
+
+        Returns:
+            Optional[Link]: 選択したリンク、稼働中のリンクがない場合None
+        """
+        links = self._links
+        link_ids = links.ids_between(node1_id, node2_id)
+        if not link_ids:
+            return None
+        if len(link_ids) == 1:
+            link = links[link_ids[0]]
+            return link if link.status == "active" else None
+        candidates = [links[link_id] for link_id in link_ids if links[link_id].status == "active"]
+        if not candidates:
+            return None
+        if self.link_selection == "lowest_load":
+            return min(candidates, key=lambda link: link.current_load)
+        if self.link_selection == "lowest_delay":
+            return min(candidates, key=lambda link: link.delay)
+        # ECMP: 同じフロー・区間のパケットは常に同じリンクを使う
+        key = hash((flow_id or 0, min(node1_id, node2_id), max(node1_id, node2_id)))
+        return candidates[key % len(candidates)]
+
     def get_link(self, link_id: int) -> Optional[Link]:
         """
         リンクIDからリンクを取得
@@ -0,0 +1,266 @@
+# traffic_source.py
+
+import random
+from typing import Dict, Optional, Tuple, Union
+
+from flow import Flow
+from packet import Packet
+
+# 送信元で生成するパケットのサイズ（バイト）
+PACKET_SIZE = 1500
+
+# pacing の設定でサービス種別の指定がない場合に使用するキー
+DEFAULT_PACING_KEY = "default"
+
+
+class PacingModel:
+    """
+    送信元でのパケットの送出間隔を決めるペーシングモデルの基底クラス
+
+    フローごとに生成し、送出ごとに next_emission を呼び出す。状態（トークン数など）は
+    save_state / restore_state で保存・復元できるよう、インスタンスの属性のみに持つ。
+    """
+
+    def next_emission(self, now: float, packet_size: int, rng) -> float:
+        """
+        現在時刻にパケットを1つ送出した後、次のパケットを送出する時刻を取得
+
+        Args:
+            now (float): 現在時刻（送出した時刻）
+            packet_size (int): パケットサイズ（バイト）
+            rng: 乱数生成器（random.Random または random モジュール）
+
+        Returns:
+            float: 次のパケットの送出時刻
+        """
+        raise NotImplementedError
+
+    def save_state(self) -> Dict:
+        return dict(self.__dict__)
+
+    def restore_state(self, state: Dict):
+        self.__dict__.update(state)
+
+
+class BurstPacing(PacingModel):
+    """
+    全パケットを開始時刻にまとめて送出する（送出間隔なし）
+    """
+
+    def next_emission(self, now: float, packet_size: int, rng) -> float:
+        return now
+
+
+class CBRPacing(PacingModel):
+    """
+    一定のレートで送出する（Constant Bit Rate）
+
+    Attributes:
+        rate (float): 送出レート（bps）
+    """
+
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+
+    def next_emission(self, now: float, packet_size: int, rng) -> float:
+        return now + packet_size * 8 / self.rate
+
+
+class PoissonPacing(PacingModel):
+    """
+    平均レートが rate となる指数分布の間隔で送出する
+
+    Attributes:
+        rate (float): 平均送出レート（bps）
+    """
+
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+
+    def next_emission(self, now: float, packet_size: int, rng) -> float:
+        return now + rng.expovariate(self.rate / (packet_size * 8))
+
+
+class OnOffPacing(PacingModel):
+    """
+    指数分布の長さの ON 期間に rate で送出し、OFF 期間は送出しない
+
+    Attributes:
+        rate (float): ON 期間の送出レート（bps）
+        mean_on (float): ON 期間の平均（秒）
+        mean_off (float): OFF 期間の平均（秒）
+    """
+
+    def __init__(self, rate: float, mean_on: float = 1.0, mean_off: float = 1.0):
+        if rate <= 0 or mean_on <= 0 or mean_off <= 0:
+            raise ValueError("rate, mean_on and mean_off must be positive")
+        self.rate = rate
+        self.mean_on = mean_on
+        self.mean_off = mean_off
+        self._on_until: Optional[float] = None  # 現在の ON 期間の終了時刻
+
+    def next_emission(self, now: float, packet_size: int, rng) -> float:
+        if self._on_until is None:
+            # 最初のパケットは ON 期間の開始時に送出している
+            self._on_until = now + rng.expovariate(1.0 / self.mean_on)
+        next_time = now + packet_size * 8 / self.rate
+        while next_time > self._on_until:
+            # OFF 期間は送出間隔の計時を止め、残りを次の ON 期間に持ち越す
+            remaining = next_time - self._on_until
+            start = self._on_until + rng.expovariate(1.0 / self.mean_off)
+            self._on_until = start + rng.expovariate(1.0 / self.mean_on)
+            next_time = start + remaining
+        return next_time
+
+
+class TokenBucketPacing(PacingModel):
+    """
+    トークンバケットで整形して送出する（バケットにトークンがある限り連続して送出する）
+
+    Attributes:
+        rate (float): トークンの補充レート（bps）
+        bucket_size (int): バケットの容量（バイト）
+    """
+
+    def __init__(self, rate: float, bucket_size: int = 15000):
+        if rate <= 0 or bucket_size < PACKET_SIZE:
+            raise ValueError("rate must be positive and bucket_size must hold at least one packet")
+        self.rate = rate
+        self.bucket_size = bucket_size
+        self._tokens: Optional[float] = None  # 直前の送出後のトークン数（バイト）
+        self._last_time = 0.0
+
+    def next_emission(self, now: float, packet_size: int, rng) -> float:
+        if self._tokens is None:
+            tokens = self.bucket_size
+        else:
+            tokens = min(self.bucket_size, self._tokens + (now - self._last_time) * self.rate / 8)
+        self._tokens = tokens - packet_size
+        self._last_time = now
+        if self._tokens >= packet_size:
+            return now
+        return now + (packet_size - self._tokens) * 8 / self.rate
+
+
+PACING_TYPES = {
+    "burst": BurstPacing,
+    "cbr": CBRPacing,
+    "poisson": PoissonPacing,
+    "on_off": OnOffPacing,
+    "token_bucket": TokenBucketPacing,
+}
+
+# 乱数を使用するペーシングモデル（分割実行では pacing_seed が必要）
+RANDOM_PACING_TYPES = (PoissonPacing, OnOffPacing)
+
+
+def create_pacing(spec: Union[str, Dict, PacingModel] = "burst") -> PacingModel:
+    """
+    ペーシングモデルを生成
+
+    Args:
+        spec (Union[str, Dict, PacingModel], optional): 種類名（"burst", "cbr", "poisson", "on_off", "token_bucket"）、
+            "type" とコンストラクタ引数を持つ辞書、またはペーシングモデルそのもの
+
+    Returns:
+        PacingModel: ペーシングモデル
+    """
+    if isinstance(spec, PacingModel):
+        return spec
+    if isinstance(spec, str):
+        name, params = spec, {}
+    else:
+        params = dict(spec)
+        name = params.pop("type")
+    if name not in PACING_TYPES:
+        raise ValueError(f"Unknown pacing: {name}")
+    return PACING_TYPES[name](**params)
+
+
+class TrafficSource:
+    """
+    フローのパケットを送信元で1つずつ生成し、ペーシングモデルの間隔で送出するトラフィック生成器
+
+    フローごとに「次の送出」イベントを1つだけスケジュールし、パケットは送出時に生成する。
+    生成したパケットは packet_store に確保しないため、メモリ使用量はフローのサイズではなく
+    転送中のパケット数に比例する。
+
+    Attributes:
+        flow (Flow): フローオブジェクト
+        pacing (PacingModel): ペーシングモデル
+        packet_manager (PacketManager): パケットマネージャ
+        simulation_engine (SimulationEngine): シミュレーションエンジン
+        rng: ペーシングモデルが使用する乱数生成器（random.Random または random モジュール）
+        emitted (int): 送出したパケット数
+    """
+
+    def __init__(self, flow: Flow, pacing: PacingModel, packet_manager, simulation_engine, rng=random):
+        """
+        Args:
+            flow (Flow): フローオブジェクト
+            pacing (PacingModel): ペーシングモデル
+            packet_manager (PacketManager): パケットマネージャ
+            simulation_engine (SimulationEngine): シミュレーションエンジン
+            rng (optional): 乱数生成器（デフォルトはグローバルな random）
+        """
+        self.flow = flow
+        self.pacing = pacing
+        self.packet_manager = packet_manager
+        self.simulation_engine = simulation_engine
+        self.rng = rng
+        self.emitted = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.emitted >= self.flow.packet_count
+
+    def start(self):
+        """
+        フローのメトリクスを登録し、最初のパケットを現在時刻に送出するイベントをスケジュール
+        """
+        self.packet_manager.register_flow(self.flow)
+        if not self.finished:
+            self.simulation_engine.schedule_event(self.simulation_engine.current_time, self.emit,
+                                                  owner=self.flow.source_node)
+
+    def emit(self):
+        """
+        パケットを1つ生成して送信し、残りがあれば次の送出をスケジュール
+        """
+        flow = self.flow
+        packet = self.packet_manager.create_packet(flow, self.emitted)
+        self.emitted += 1
+        self.packet_manager.send_packet(packet, self.packet_manager.topology_manager.get_node(flow.source_node))
+        if not self.finished:
+            now = self.simulation_engine.current_time
+            self.simulation_engine.schedule_event(self.pacing.next_emission(now, packet.size, self.rng), self.emit,
+                                                  owner=flow.source_node)
+
+    def save_state(self) -> Tuple:
+        """
+        送出数とペーシングモデル・乱数生成器の状態を保存
+
+        乱数生成器の状態は、ペーシングモデルが乱数を使う場合（RANDOM_PACING_TYPES）のみ保存する。
+
+        Returns:
+            Tuple: restore_state に渡す状態
+        """
+        rng_state = self.rng.getstate() \
+            if isinstance(self.pacing, RANDOM_PACING_TYPES) and isinstance(self.rng, random.Random) else None
+        return self.emitted, self.pacing.save_state(), rng_state
+
+    def restore_state(self, state: Tuple):
+        """
+        save_state で保存した状態に戻す
+
+        Args:
+            state (Tuple): save_state の戻り値
+        """
+        self.emitted, pacing_state, rng_state = state
+        self.pacing.restore_state(pacing_state)
+        if rng_state is not None:
+            self.rng.setstate(rng_state)
@@ -31,17 +31,9 @@ class VisualizationInterface:
         Args:
             metrics_collector (MetricsCollector): メトリクス収集クラス
         """
-        # フローメトリクスをデータフレームに変換
-        data = [{
-            'timestamp': fm.timestamp,
-            'throughput': fm.throughput,
-            'delay': fm.delay,
-            'packet_loss_rate': fm.packet_loss_rate,
-            'jitter': fm.jitter
-        } for fm in metrics_collector.flow_metrics]
-
-        df = pd.DataFrame(data)
-        self.display_metrics(df)
+        # フローメトリクスの列を参照するデータフレーム（行ごとのオブジェクトは生成しない）
+        df = metrics_collector.flow_metrics.to_dataframe()
+        self.display_metrics(df[['timestamp', 'throughput', 'delay', 'packet_loss_rate', 'jitter']])
 
     def get_user_settings(self) -> dict:
         """
@@ -0,0 +1,369 @@
+# workload_generator.py
+
+import argparse
+import os
+import time
+from typing import Dict, Iterator, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+import yaml_loader
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow がない環境では .npy 形式のみ使用できる
+    pa = pq = None
+
+# シナリオのフローのレコード（start_time の昇順に並べる）
+FLOW_DTYPE = np.dtype([
+    ("flow_id", np.int64),
+    ("start_time", np.float64),
+    ("flow_size", np.int64),
+    ("source_node", np.int64),
+    ("destination_node", np.int64),
+    ("service_type", "S8"),
+])
+
+ARRIVAL_MODELS = ("poisson", "mmpp")
+SIZE_MODELS = ("pareto", "lognormal", "constant")
+PAIR_MODELS = ("uniform", "gravity", "matrix")
+
+# ファイルの拡張子ごとのシナリオ形式
+SCENARIO_FORMATS = {".npy": "binary", ".parquet": "parquet"}
+
+DEFAULT_SERVICE_MIX = {"video": 1.0, "voice": 1.0, "data": 1.0}
+
+# 1日の周期（秒）
+DAY = 86400.0
+
+
+def _spec(spec: Union[str, Dict]) -> Tuple[str, Dict]:
+    if isinstance(spec, str):
+        return spec, {}
+    params = dict(spec)
+    return params.pop("type"), params
+
+
+def scenario_format(path: str) -> str:
+    """
+    ファイルの拡張子からシナリオの形式を取得
+
+    Args:
+        path (str): シナリオファイルのパス
+
+    Returns:
+        str: "binary" または "parquet"
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SCENARIO_FORMATS:
+        raise ValueError(f"Unknown scenario format: {path}")
+    return SCENARIO_FORMATS[extension]
+
+
+class WorkloadGenerator:
+    """
+    フローのワークロードを NumPy でまとめて生成するジェネレータ
+
+    到着時刻、フローサイズ、送信元・送信先、サービスの種類をそれぞれ配列として一度に生成し、
+    FLOW_DTYPE の構造化配列（開始時刻の昇順）にまとめる。
+
+    Attributes:
+        node_ids (np.ndarray): 送信元・送信先に選ぶノードIDの配列
+        masses (np.ndarray): グラビティモデルで使うノードの重み（デフォルトは隣接リンク数）
+        rng (np.random.Generator): 乱数生成器
+    """
+
+    def __init__(self, topology_manager, seed: Optional[int] = None):
+        """
+        Args:
+            topology_manager (TopologyManager): トポロジマネージャ（nodes のノードを送信元・送信先に使う）
+            seed (Optional[int], optional): 乱数のシード
+        """
+        node_ids = sorted(topology_manager.nodes)
+        if len(node_ids) < 2:
+            raise ValueError("at least two nodes are required to generate flows")
+        self.node_ids = np.asarray(node_ids, dtype=np.int64)
+        self.masses = np.asarray([max(len(topology_manager.nodes[node_id].adjacent_links), 1) for node_id in node_ids],
+                                 dtype=np.float64)
+        self.rng = np.random.default_rng(seed)
+
+    def arrival_times(self, duration: float, arrival: Union[str, Dict] = "poisson",
+                      diurnal: Optional[Sequence[float]] = None, period: float = DAY) -> np.ndarray:
+        """
+        フローの到着時刻を生成
+
+        Args:
+            duration (float): 生成する期間（秒）
+            arrival (Union[str, Dict], optional): 到着モデル。"type" とパラメータを持つ辞書
+                - {"type": "poisson", "rate": 到着率（フロー/秒）}
+                - {"type": "mmpp", "rates": 状態ごとの到着率, "switch_rates": 状態ごとの遷移率（1/秒）}
+            diurnal (Optional[Sequence[float]], optional): 1周期を等分した区間ごとの到着率の倍率（例：24時間分）
+            period (float, optional): diurnal の周期（秒）
+
+        Returns:
+            np.ndarray: 昇順の到着時刻
+        """
+        name, params = _spec(arrival)
+        profile = None
+        if diurnal is not None:
+            profile = np.asarray(diurnal, dtype=np.float64)
+            if profile.ndim != 1 or len(profile) == 0 or (profile < 0).any() or profile.max() <= 0:
+                raise ValueError("diurnal must be a non-empty sequence of non-negative multipliers")
+        # 日周変動は倍率の最大値で一様に生成してから倍率に応じて間引く
+        peak = profile.max() if profile is not None else 1.0
+
+        if name == "poisson":
+            rate = params.get("rate", 1.0)
+            if rate <= 0:
+                raise ValueError("rate must be positive")
+            # ポアソン過程の到着数を決めれば、到着時刻は期間内で独立な一様分布になる
+            count = self.rng.poisson(rate * peak * duration)
+            times = self.rng.uniform(0.0, duration, count)
+        elif name == "mmpp":
+            times = self._mmpp_times(duration, peak, **params)
+        else:
+            raise ValueError(f"Unknown arrival model: {name}")
+
+        if profile is not None:
+            bins = (times % period * len(profile) / period).astype(np.int64)
+            times = times[self.rng.random(len(times)) < profile[bins] / peak]
+        times.sort()
+        return times
+
+    def _mmpp_times(self, duration: float, scale: float, rates: Sequence[float], switch_rates: Sequence[float]) -> np.ndarray:
+        rates = np.asarray(rates, dtype=np.float64)
+        switch_rates = np.asarray(switch_rates, dtype=np.float64)
+        if len(rates) < 2 or len(rates) != len(switch_rates) or (rates < 0).any() or (switch_rates <= 0).any():
+            raise ValueError("mmpp requires at least two states with non-negative rates and positive switch_rates")
+        # 状態の滞在区間を生成（滞在区間の数はフロー数よりはるかに少ない）
+        states, starts = [], []
+        now, state = 0.0, int(self.rng.integers(len(rates)))
+        while now < duration:
+            states.append(state)
+            starts.append(now)
+            now += self.rng.exponential(1.0 / switch_rates[state])
+            # 次の状態は現在以外の状態から一様に選ぶ
+            state = (state + 1 + int(self.rng.integers(len(rates) - 1))) % len(rates)
+        starts = np.asarray(starts)
+        lengths = np.diff(np.append(starts, duration))
+        counts = self.rng.poisson(rates[states] * scale * lengths)
+        return np.repeat(starts, counts) + self.rng.random(counts.sum()) * np.repeat(lengths, counts)
+
+    def flow_sizes(self, count: int, size: Union[str, Dict] = "pareto") -> np.ndarray:
+        """
+        フローサイズを生成
+
+        Args:
+            count (int): フロー数
+            size (Union[str, Dict], optional): サイズの分布。"type" とパラメータを持つ辞書
+                - {"type": "pareto", "alpha": 形状（デフォルト1.2）, "minimum": 最小値（バイト）}
+                - {"type": "lognormal", "mean": 対数の平均, "sigma": 対数の標準偏差}
+                - {"type": "constant", "value": サイズ（バイト）}
+                いずれも "minimum"（デフォルト1500）と "maximum" で範囲を制限できる
+
+        Returns:
+            np.ndarray: フローサイズ（バイト）
+        """
+        name, params = _spec(size)
+        minimum = params.pop("minimum", 1500)
+        maximum = params.pop("maximum", None)
+        if name == "pareto":
+            alpha = params.get("alpha", 1.2)
+            if alpha <= 0:
+                raise ValueError("alpha must be positive")
+            # numpy の pareto は Lomax 分布のため、1を足して最小値を掛ける
+            sizes = minimum * (1.0 + self.rng.pareto(alpha, count))
+        elif name == "lognormal":
+            sizes = self.rng.lognormal(params.get("mean", 13.0), params.get("sigma", 2.0), count)
+        elif name == "constant":
+            sizes = np.full(count, float(params.get("value", minimum)))
+        else:
+            raise ValueError(f"Unknown size model: {name}")
+        return np.clip(sizes, minimum, maximum if maximum is not None else np.inf).astype(np.int64)
+
+    def node_pairs(self, count: int, pairs: Union[str, Dict] = "uniform") -> Tuple[np.ndarray, np.ndarray]:
+        """
+        送信元と送信先のノードIDを生成（送信元と送信先は異なる）
+
+        Args:
+            count (int): フロー数
+            pairs (Union[str, Dict], optional): 選び方。"type" とパラメータを持つ辞書
+                - "uniform": 全ノードから一様に選ぶ
+                - {"type": "gravity", "weights": ノードIDごとの重み}: 送信元・送信先をそれぞれ重みに比例した確率で選ぶ
+                  （weights の指定がない場合は隣接リンク数）
+                - {"type": "matrix", "matrix": 送信元ノードIDごとの送信先ノードIDごとの交通量}:
+                  交通量に比例した確率でペアを選ぶ
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: 送信元ノードIDと送信先ノードIDの配列
+        """
+        name, params = _spec(pairs)
+        n = len(self.node_ids)
+        if name == "uniform":
+            sources = self.rng.integers(n, size=count)
+            destinations = self.rng.integers(n - 1, size=count)
+            destinations += destinations >= sources
+        elif name == "gravity":
+            weights = params.get("weights")
+            masses = self.masses if weights is None else np.asarray(
+                [float(weights.get(int(node_id), 0.0)) for node_id in self.node_ids])
+            if (masses < 0).any() or np.count_nonzero(masses) < 2:
+                raise ValueError("gravity weights must be non-negative with at least two positive nodes")
+            probabilities = masses / masses.sum()
+            sources = self.rng.choice(n, size=count, p=probabilities)
+            destinations = self.rng.choice(n, size=count, p=probabilities)
+            # 送信元と同じノードを選んだフローだけ選び直す
+            same = np.flatnonzero(sources == destinations)
+            while len(same):
+                destinations[same] = self.rng.choice(n, size=len(same), p=probabilities)
+                same = same[sources[same] == destinations[same]]
+        elif name == "matrix":
+            index = {int(node_id): position for position, node_id in enumerate(self.node_ids)}
+            volumes = np.zeros((n, n))
+            for source, row in params["matrix"].items():
+                for destination, volume in row.items():
+                    volumes[index[int(source)], index[int(destination)]] = volume
+            np.fill_diagonal(volumes, 0.0)
+            if (volumes < 0).any() or volumes.sum() <= 0:
+                raise ValueError("traffic matrix must be non-negative with a positive off-diagonal volume")
+            cells = self.rng.choice(n * n, size=count, p=(volumes / volumes.sum()).ravel())
+            sources, destinations = np.divmod(cells, n)
+        else:
+            raise ValueError(f"Unknown pair model: {name}")
+        return self.node_ids[sources], self.node_ids[destinations]
+
+    def service_types(self, count: int, service_mix: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """
+        サービスの種類を生成
+
+        Args:
+            count (int): フロー数
+            service_mix (Optional[Dict[str, float]], optional): サービスの種類ごとの比率（デフォルトは video, voice, data が等確率）
+
+        Returns:
+            np.ndarray: サービスの種類（バイト列）
+        """
+        service_mix = service_mix or DEFAULT_SERVICE_MIX
+        names = np.asarray([name.encode() for name in service_mix], dtype=FLOW_DTYPE["service_type"])
+        weights = np.asarray(list(service_mix.values()), dtype=np.float64)
+        return names[self.rng.choice(len(names), size=count, p=weights / weights.sum())]
+
+    def generate(self, duration: float, arrival: Union[str, Dict] = "poisson", size: Union[str, Dict] = "pareto",
+                 pairs: Union[str, Dict] = "uniform", service_mix: Optional[Dict[str, float]] = None,
+                 diurnal: Optional[Sequence[float]] = None, period: float = DAY, first_flow_id: int = 1) -> np.ndarray:
+        """
+        フローのワークロードを生成
+
+        Args:
+            duration (float): 生成する期間（秒）
+            arrival (Union[str, Dict], optional): 到着モデル（arrival_times を参照）
+            size (Union[str, Dict], optional): サイズの分布（flow_sizes を参照）
+            pairs (Union[str, Dict], optional): 送信元・送信先の選び方（node_pairs を参照）
+            service_mix (Optional[Dict[str, float]], optional): サービスの種類ごとの比率
+            diurnal (Optional[Sequence[float]], optional): 周期の区間ごとの到着率の倍率
+            period (float, optional): diurnal の周期（秒）
+            first_flow_id (int, optional): 最初のフローID（開始時刻の順に連番を振る）
+
+        Returns:
+            np.ndarray: FLOW_DTYPE の構造化配列（開始時刻の昇順）
+        """
+        times = self.arrival_times(duration, arrival, diurnal, period)
+        count = len(times)
+        flows = np.empty(count, dtype=FLOW_DTYPE)
+        flows["flow_id"] = np.arange(first_flow_id, first_flow_id + count)
+        flows["start_time"] = times
+        flows["flow_size"] = self.flow_sizes(count, size)
+        flows["source_node"], flows["destination_node"] = self.node_pairs(count, pairs)
+        flows["service_type"] = self.service_types(count, service_mix)
+        return flows
+
+
+def write_scenario(path: str, flows: np.ndarray, row_group_size: int = 65536, compression: str = "zstd"):
+    """
+    フローの構造化配列をシナリオファイルに書き出す
+
+    Args:
+        path (str): 出力ファイルのパス（.npy: NumPy のバイナリ形式、.parquet: Parquet 形式）
+        flows (np.ndarray): FLOW_DTYPE の構造化配列
+        row_group_size (int, optional): Parquet の行グループの行数
+        compression (str, optional): Parquet の圧縮形式
+    """
+    flows = np.asarray(flows, dtype=FLOW_DTYPE)
+    if scenario_format(path) == "binary":
+        np.save(path, flows)
+        return
+    if pq is None:
+        raise ImportError("pyarrow is required for Parquet scenarios")
+    columns = {name: flows[name] for name in FLOW_DTYPE.names}
+    names, codes = np.unique(flows["service_type"], return_inverse=True)
+    columns["service_type"] = pa.DictionaryArray.from_arrays(codes.astype(np.int32), np.char.decode(names).tolist())
+    pq.write_table(pa.table(columns), path, row_group_size=row_group_size, compression=compression)
+
+
+def read_scenario(path: str, chunk_size: int = 65536) -> Iterator[np.ndarray]:
+    """
+    シナリオファイルのフローを先頭から chunk_size 行ずつ読み込む
+
+    .npy はメモリマップで、Parquet は行のバッチごとに読み込むため、ファイル全体をメモリに読み込まない。
+
+    Args:
+        path (str): シナリオファイルのパス（.npy または .parquet）
+        chunk_size (int, optional): 1回に読み込む行数
+
+    Yields:
+        np.ndarray: FLOW_DTYPE の構造化配列
+    """
+    if scenario_format(path) == "binary":
+        flows = np.load(path, mmap_mode='r')
+        if flows.dtype != FLOW_DTYPE:
+            raise ValueError(f"Unexpected scenario dtype: {flows.dtype}")
+        for start in range(0, len(flows), chunk_size):
+            yield np.array(flows[start:start + chunk_size])
+        return
+    if pq is None:
+        raise ImportError("pyarrow is required for Parquet scenarios")
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        chunk = np.empty(batch.num_rows, dtype=FLOW_DTYPE)
+        for name in FLOW_DTYPE.names:
+            if name != "service_type":
+                chunk[name] = batch.column(name).to_numpy()
+                continue
+            column = batch.column(name)
+            if pa.types.is_dictionary(column.type):
+                # 辞書エンコードした列は辞書の値だけを変換する
+                names = column.dictionary.to_numpy(zero_copy_only=False).astype(FLOW_DTYPE[name])
+                chunk[name] = names[column.indices.to_numpy()]
+            else:
+                chunk[name] = column.to_numpy(zero_copy_only=False).astype(FLOW_DTYPE[name])
+        yield chunk
+
+
+def main():
+    from topology_manager import TopologyManager
+
+    parser = argparse.ArgumentParser(description="設定ファイルの workload の定義に従ってフローのシナリオファイルを生成する")
+    parser.add_argument('--config', default='data/config.yaml', help='workload を定義した設定ファイル')
+    parser.add_argument('--topology', default='data/topology.yaml')
+    parser.add_argument('--output', required=True, help='出力ファイル（.npy または .parquet）')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as file:
+        spec = dict((yaml_loader.safe_load(file) or {}).get('workload') or {})
+    duration = spec.pop('duration', None)
+    if duration is None:
+        raise ValueError("workload.duration is required")
+    topology_manager = TopologyManager()
+    topology_manager.load_topology(args.topology)
+
+    start = time.perf_counter()
+    flows = WorkloadGenerator(topology_manager, args.seed).generate(duration, **spec)
+    generated = time.perf_counter() - start
+    write_scenario(args.output, flows)
+    print(f"{len(flows)} flows generated in {generated:.2f} s, "
+          f"written to {args.output} in {time.perf_counter() - start - generated:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
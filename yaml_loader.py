@@ -0,0 +1,21 @@
+# yaml_loader.py
+
+from typing import Any, IO, Union
+
+import yaml
+
+# libyaml がある場合は C 実装のローダーを使用（yaml.safe_load と同じ型に変換する）
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def safe_load(stream: Union[str, IO]) -> Any:
+    """
+    YAML を読み込む（yaml.safe_load と同じ結果を、利用可能な場合は C 実装のローダーで得る）
+
+    Args:
+        stream (Union[str, IO]): YAML の文字列またはファイル
+
+    Returns:
+        Any: 読み込んだ値
+    """
+    return yaml.load(stream, Loader=SafeLoader)